@@ -1,19 +1,27 @@
 # ai/agent.py
 import random
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import os
 from collections import deque # Für den Replay Buffer
 
+import config
+from game.seeding import derive_seed, new_run_seed
+from ai.compact_replay import CompactReplayBuffer
+from ai.mmap_replay import MmapReplayBuffer
+from ai.inference_server import RemotePolicy
+from ai.fast_inference import NumpyQNetwork, make_inference_network
+
 # Definition des Neuronalen Netzwerks (DQN)
 class QNetwork(nn.Module):
-    def __init__(self, input_size, output_size):
+    def __init__(self, input_size, output_size, hidden_size=128):
         super(QNetwork, self).__init__()
         # Ein einfaches Feedforward-Netzwerk
-        self.fc1 = nn.Linear(input_size, 128)
+        self.fc1 = nn.Linear(input_size, hidden_size)
         self.relu = nn.ReLU()
-        self.fc2 = nn.Linear(128, output_size)
+        self.fc2 = nn.Linear(hidden_size, output_size)
 
     def forward(self, x):
         # Sicherstellen, dass der Input ein Float-Tensor ist
@@ -25,35 +33,89 @@ class QNetwork(nn.Module):
 
 # NEU: Replay Buffer Klasse
 class ReplayBuffer:
-    def __init__(self, capacity):
+    def __init__(self, capacity, rng=None, demo_fraction=0.25):
         self.buffer = deque(maxlen=capacity) # deque ist effizient für Hinzufügen/Entfernen an Enden
+        self.rng = rng if rng is not None else random.Random() # Zufallsquelle für das Sampling
+        # Experten-Demonstrationen (siehe ai/imitation.py): werden nie verdrängt und machen
+        # mindestens 'demo_fraction' jedes Batches aus, solange welche vorhanden sind
+        self.demonstrations = []
+        self.demo_fraction = demo_fraction
 
-    def push(self, state, action, reward, next_state, done):
-        """Fügt eine neue Erfahrung zum Puffer hinzu."""
+    def push(self, state, action, reward, next_state, done, steps=1):
+        """
+        Fügt eine neue Erfahrung zum Puffer hinzu.
+        'steps' ist die Anzahl der Einzelschritte (> 1 bei Makro-Aktionen, siehe game/junction_graph.py).
+        """
         # Speichert die Aktion als Index, nicht als Tupel (dx, dy)
-        self.buffer.append((state, action, reward, next_state, done))
+        self.buffer.append((state, action, reward, next_state, done, steps))
+
+    def add_demonstrations(self, transitions):
+        """Fügt Demonstrationen (state, action, reward, next_state, done[, steps]) dauerhaft hinzu."""
+        for transition in transitions:
+            if len(transition) == 5:
+                transition = (*transition, 1)
+            self.demonstrations.append(tuple(transition))
 
     def sample(self, batch_size):
-        """Zieht einen zufälligen Batch von Erfahrungen aus dem Puffer."""
-        if len(self.buffer) < batch_size:
+        """Zieht einen zufälligen Batch von Erfahrungen aus dem Puffer (und den Demonstrationen)."""
+        if len(self) < batch_size:
             return [] # Nicht genug Erfahrungen für einen Batch
-        return random.sample(self.buffer, batch_size)
+        if not self.demonstrations:
+            return self.rng.sample(self.buffer, batch_size)
+        # Fester Anteil Demonstrationen; fehlende eigene Erfahrungen werden ebenfalls damit aufgefüllt
+        num_demos = max(round(batch_size * self.demo_fraction), batch_size - len(self.buffer))
+        num_demos = min(num_demos, len(self.demonstrations))
+        return (self.rng.sample(self.demonstrations, num_demos)
+                + self.rng.sample(self.buffer, batch_size - num_demos))
+
+    def sample_arrays(self, batch_size):
+        """
+        Zieht einen Batch und gibt ihn spaltenweise zurück.
+        Returns:
+            (states, actions, rewards, next_states, dones, steps) als NumPy-Arrays oder None.
+        """
+        transitions = self.sample(batch_size)
+        if not transitions:
+            return None
+        states, actions, rewards, next_states, dones, steps = zip(*transitions)
+        return (np.array(states, dtype=np.float32), np.array(actions, dtype=np.int64),
+                np.array(rewards, dtype=np.float32), np.array(next_states, dtype=np.float32),
+                np.array(dones, dtype=np.bool_), np.array(steps, dtype=np.float32))
 
     def __len__(self):
-        """Gibt die aktuelle Größe des Puffers zurück."""
-        return len(self.buffer)
+        """Gibt die aktuelle Größe des Puffers zurück (inklusive Demonstrationen)."""
+        return len(self.buffer) + len(self.demonstrations)
 
 
 class Agent:
-    def __init__(self, maze_logic, model_path="ai/q_network_model.pth"):
+    def __init__(self, maze_logic, model_path="ai/q_network_model.pth", seed=None, compact_replay=False,
+                 replay_dir=None, replay_capacity=10_000_000, agent_config=None, inference_address=None,
+                 inference_mode=None):
         """
         Initialisiert den KI-Agenten.
         Args:
             maze_logic: Eine Instanz von MazeLogic, um auf den Spielzustand zugreifen zu können.
             model_path: Pfad zum Speichern/Laden des Modells.
+            seed: Optionaler Seed, aus dem alle Zufallsquellen des Agenten abgeleitet werden
+                  (Gewichtsinitialisierung, Exploration, Replay-Sampling). None = zufällig.
+            compact_replay: Übergänge kompakt speichern (siehe ai/compact_replay.py); die Zustände
+                  werden dann aus maze_logic kodiert und beim Sampling rekonstruiert.
+            replay_dir: Verzeichnis für einen Replay Buffer auf der Festplatte (siehe ai/mmap_replay.py),
+                  der über Neustarts erhalten bleibt. None = Puffer im Arbeitsspeicher.
+            replay_capacity: Kapazität des Puffers auf der Festplatte (nur beim ersten Anlegen).
+            agent_config: Hyperparameter (config.AgentConfig); None = config.RUN_CONFIG.agent.
+            inference_address: Adresse eines Inferenz-Dienstes (siehe ai/inference_server.py), der beim
+                  Handeln statt des eigenen policy_net gefragt wird. None = lokal rechnen.
+            inference_mode: "numpy" oder "quantized": beim Handeln eine schnelle Kopie von policy_net verwenden
+                  (siehe ai/fast_inference.py; wird bei load_model() erneuert, nicht aber beim Lernen). None = policy_net.
         """
         self.maze_logic = maze_logic
         self.model_path = model_path
+        self.seed = seed if seed is not None else new_run_seed()
+        self.config = agent_config if agent_config is not None else config.RUN_CONFIG.agent
+
+        # Eigene Zufallsquellen, damit der Agent unabhängig vom globalen Zustand reproduzierbar ist
+        self.rng = random.Random(derive_seed(self.seed, 'explore')) # Epsilon-Greedy
 
         # Definiere mögliche Aktionen: (dx, dy) für Bewegung
         # Die Reihenfolge ist wichtig und muss konsistent sein.
@@ -69,26 +131,62 @@ class Agent:
         # (2 * vision_radius + 1) * (2 * vision_radius + 1)
         self.input_size = (2 * self.maze_logic.vision_radius + 1) ** 2 
         
-        self.policy_net = QNetwork(self.input_size, self.num_actions)
-        self.target_net = QNetwork(self.input_size, self.num_actions)
+        # Gewichte mit dem eigenen Seed initialisieren, ohne den globalen Torch-Zustand zu verändern
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(derive_seed(self.seed, 'init'))
+            self.policy_net = QNetwork(self.input_size, self.num_actions, self.config.hidden_size)
+            self.target_net = QNetwork(self.input_size, self.num_actions, self.config.hidden_size)
         self.target_net.load_state_dict(self.policy_net.state_dict()) # Target-Netzwerk initialisieren
         self.target_net.eval() # Target-Netzwerk in den Evaluierungsmodus setzen
 
-        self.optimizer = optim.Adam(self.policy_net.parameters(), lr=0.001)
+        self.optimizer = optim.Adam(self.policy_net.parameters(), lr=self.config.learning_rate)
         self.loss_fn = nn.MSELoss()
 
-        # Hyperparameter für Reinforcement Learning (Q-Learning)
-        self.gamma = 0.99  # Diskontierungsfaktor (bleibt hoch, um zukünftige Belohnungen zu berücksichtigen)
-        self.epsilon = 1.0 # Startwert für Exploration (100% Exploration)
-        self.epsilon_decay = 0.995 # Epsilon-Abnahme pro Schritt/Episode (etwas schneller als 0.999)
-        self.epsilon_min = 0.05 # Minimaler Epsilon-Wert (mindestens 5% Exploration)
+        # Hyperparameter für Reinforcement Learning (Q-Learning), siehe config.AgentConfig
+        self.gamma = self.config.gamma # Diskontierungsfaktor
+        self.epsilon = self.config.epsilon_start # Startwert für Exploration
+        self.epsilon_decay = self.config.epsilon_decay # Epsilon-Abnahme pro Lernschritt
+        self.epsilon_min = self.config.epsilon_min # Minimaler Epsilon-Wert
 
         # NEU: Replay Buffer Initialisierung
-        self.replay_buffer = ReplayBuffer(capacity=10000) # Pufferkapazität
-        self.batch_size = 64 # Größe des Batches, der aus dem Puffer gezogen wird
-        self.target_update_frequency = 10 # Wie oft das Target-Netzwerk aktualisiert wird (in Lernschritten)
+        if compact_replay and replay_dir is not None:
+            raise ValueError("compact_replay und replay_dir können nicht kombiniert werden")
+        self.compact_replay = compact_replay
+        self._compact_state = None # Kodierter Zustand vor der letzten Aktion (nur bei compact_replay)
+        if replay_dir is not None:
+            self.replay_buffer = MmapReplayBuffer(replay_dir, capacity=replay_capacity,
+                                                  values=self.maze_logic.char_to_numeric_map.values(),
+                                                  observation_size=self.input_size, seed=derive_seed(self.seed, 'replay'))
+            print(f"Replay Buffer auf der Festplatte: {replay_dir} ({self.replay_buffer.size} Übergänge vorhanden)")
+        elif compact_replay:
+            # Ein kompakter Übergang braucht weniger als ein Zehntel des Speichers, daher mehr Kapazität
+            self.replay_buffer = CompactReplayBuffer(capacity=10 * self.config.replay_buffer_size, maze_logic=maze_logic,
+                                                     seed=derive_seed(self.seed, 'replay'))
+        else:
+            self.replay_buffer = ReplayBuffer(capacity=self.config.replay_buffer_size, rng=random.Random(derive_seed(self.seed, 'replay')))
+        self.batch_size = self.config.batch_size # Größe des Batches, der aus dem Puffer gezogen wird
+        self.target_update_frequency = self.config.target_update_frequency # Wie oft das Target-Netzwerk aktualisiert wird (in Lernschritten)
         self.learn_step_counter = 0 # Zähler für Lernschritte
 
+        # Optionale Funktion Zustandstensor -> Q-Werte, die beim Handeln statt policy_net verwendet wird
+        # (z.B. AsyncLearner.q_values, wenn ein eigener Thread lernt, siehe ai/async_learner.py)
+        self.acting_policy = None
+        if inference_address is not None:
+            # Ist der Dienst nicht erreichbar, wird mit dem eigenen policy_net weitergespielt
+            self.acting_policy = RemotePolicy(inference_address, fallback=self.policy_net)
+        self.inference_mode = inference_mode
+        self.refresh_inference_network()
+
+    def refresh_inference_network(self):
+        """Erzeugt die schnelle Inferenz-Kopie (inference_mode) aus den aktuellen Gewichten von policy_net neu."""
+        if self.inference_mode is None:
+            return
+        network = make_inference_network(self.policy_net, self.inference_mode)
+        if isinstance(self.acting_policy, RemotePolicy):
+            self.acting_policy.fallback = network # Der Inferenz-Dienst hat Vorrang
+        else:
+            self.acting_policy = network
+
     def choose_action(self, state, last_move_resulted_in_wall_hit=False, last_move_vector=None):
         """
         Wählt eine Aktion basierend auf dem aktuellen Zustand (epsilon-greedy).
@@ -100,8 +198,8 @@ class Agent:
         Returns:
             Ein Tupel (dx, dy) der gewählten Bewegung.
         """
-        # Konvertiere den Zustand in einen PyTorch-Tensor
-        state_tensor = torch.tensor(state, dtype=torch.float32).unsqueeze(0) # Unsqueeze für Batch-Dimension
+        if self.compact_replay:
+            self._compact_state = self.replay_buffer.encode()
 
         # Bestimme die umgekehrte Aktion, die vermieden werden soll
         reverse_action_id = -1
@@ -113,7 +211,7 @@ class Agent:
                     break
 
         # Epsilon-Greedy-Strategie: Zufällige Aktion (Exploration) oder beste Aktion (Exploitation)
-        if random.random() < self.epsilon:
+        if self.rng.random() < self.epsilon:
             # Exploration: Wähle eine zufällige gültige Aktion
             valid_moves = []
             player_x, player_y = self.maze_logic.get_player_pos()['x'], self.maze_logic.get_player_pos()['y']
@@ -130,20 +228,30 @@ class Agent:
                 # print(f"DEBUG: Exploration: Umgekehrte Aktion {self.actions[reverse_action_id]} vermieden.")
 
             if valid_moves:
-                chosen_action_id = random.choice(valid_moves)
+                chosen_action_id = self.rng.choice(valid_moves)
             else:
                 # Fallback: Wenn keine anderen gültigen Züge möglich sind, muss die KI eventuell doch zurück
-                chosen_action_id = random.choice(list(self.actions.keys())) # Wähle zufällig, auch wenn es die Rückwärtsbewegung ist
+                chosen_action_id = self.rng.choice(list(self.actions.keys())) # Wähle zufällig, auch wenn es die Rückwärtsbewegung ist
                 # print("DEBUG: Exploration: Keine anderen gültigen Züge, musste eventuell umgekehrte Aktion wählen.")
             
             return self.actions[chosen_action_id]
         else:
             # Exploitation: Wähle die Aktion mit dem höchsten Q-Wert vom Policy-Netzwerk
-            with torch.no_grad(): # Keine Gradientenberechnung für die Vorhersage
-                q_values = self.policy_net(state_tensor)
-                # Sortiere Aktionen nach Q-Werten absteigend
-                sorted_q_values, sorted_action_ids = torch.sort(q_values, descending=True)
-                sorted_action_ids = sorted_action_ids.squeeze().tolist() # Konvertiere zu Liste
+            if isinstance(self.acting_policy, NumpyQNetwork):
+                # Schnelle Inferenz ohne Torch (siehe ai/fast_inference.py): kein Tensor, kein torch.sort
+                q_values = self.acting_policy.forward_numpy(np.array(state, dtype=np.float32).reshape(1, -1))
+                sorted_action_ids = np.argsort(-q_values[0], kind='stable').tolist()
+            else:
+                # Konvertiere den Zustand in einen PyTorch-Tensor
+                state_tensor = torch.tensor(state, dtype=torch.float32).unsqueeze(0) # Unsqueeze für Batch-Dimension
+                with torch.no_grad(): # Keine Gradientenberechnung für die Vorhersage
+                    if self.acting_policy is not None:
+                        q_values = self.acting_policy(state_tensor)
+                    else:
+                        q_values = self.policy_net(state_tensor)
+                    # Sortiere Aktionen nach Q-Werten absteigend
+                    sorted_q_values, sorted_action_ids = torch.sort(q_values, descending=True)
+                    sorted_action_ids = sorted_action_ids.squeeze().tolist() # Konvertiere zu Liste
 
             chosen_action_id = -1
             player_x, player_y = self.maze_logic.get_player_pos()['x'], self.maze_logic.get_player_pos()['y']
@@ -175,42 +283,62 @@ class Agent:
                     if 0 <= new_x_v < len(maze[0]) and 0 <= new_y_v < len(maze) and maze[new_y_v][new_x_v] != 'W':
                         valid_moves.append(action_id)
                 if valid_moves:
-                    chosen_action_id = random.choice(valid_moves)
+                    chosen_action_id = self.rng.choice(valid_moves)
                     # print("DEBUG: Exploitation: Fallback zu zufälliger gültiger Aktion.")
                 else:
-                    chosen_action_id = random.choice(list(self.actions.keys())) # Letzter Ausweg
+                    chosen_action_id = self.rng.choice(list(self.actions.keys())) # Letzter Ausweg
                     # print("DEBUG: Exploitation: Keine gültigen Züge, musste zufällig wählen.")
 
             return self.actions[chosen_action_id]
 
-    def learn(self, state, action_idx, reward, next_state, done):
+    def learn(self, state, action_idx, reward, next_state, done, steps=1):
         """
         Führt einen Lernschritt für das Q-Netzwerk durch.
         Args:
             state: Der Zustand VOR der Aktion.
             action_idx: Der Index der ausgeführten Aktion.
-            reward: Die erhaltene Belohnung.
+            reward: Die erhaltene Belohnung (bei Makro-Aktionen bereits diskontiert aufsummiert).
             next_state: Der Zustand NACH der Aktion.
             done: True, wenn der nächste Zustand ein Endzustand ist.
+            steps: Anzahl der Einzelschritte der Aktion; der nächste Zustand wird mit gamma^steps diskontiert.
         """
-        # NEU: Erfahrung zum Replay Buffer hinzufügen
-        self.replay_buffer.push(state, action_idx, reward, next_state, done)
-
+        self.remember(state, action_idx, reward, next_state, done, steps)
+        return self.train_step()
+
+    def remember(self, state, action_idx, reward, next_state, done, steps=1):
+        """Speichert einen Übergang im Replay Buffer, ohne zu lernen (Argumente wie bei learn())."""
+        if self.compact_replay:
+            # Statt der Beobachtungslisten die kodierten Zustände vor (aus choose_action) und nach der Aktion speichern
+            if self._compact_state is None:
+                raise RuntimeError("Bei compact_replay muss vor learn() choose_action() aufgerufen werden.")
+            state, next_state = self._compact_state, self.replay_buffer.encode()
+        self.replay_buffer.push(state, action_idx, reward, next_state, done, steps)
+
+    def train_step(self):
+        """Zieht einen Batch aus dem Replay Buffer und lernt darauf (0.0, solange der Puffer zu klein ist)."""
         # Nur lernen, wenn genügend Erfahrungen im Puffer sind
         if len(self.replay_buffer) < self.batch_size:
             return 0.0 # Kein Lernschritt, Verlust 0
 
-        # NEU: Batch von Erfahrungen aus dem Puffer sampeln
-        transitions = self.replay_buffer.sample(self.batch_size)
-        # Transponiere den Batch (Batch von (state, action, reward, next_state, done) zu (states, actions, rewards, next_states, dones))
-        batch_state, batch_action, batch_reward, batch_next_state, batch_done = zip(*transitions)
+        # NEU: Batch von Erfahrungen aus dem Puffer sampeln (spaltenweise als NumPy-Arrays)
+        return self.train_on_batch(self.replay_buffer.sample_arrays(self.batch_size))
+
+    def train_on_batch(self, batch):
+        """
+        Ein Gradientenschritt auf einem Batch (states, actions, rewards, next_states, dones, steps)
+        aus sample_arrays(). Aktualisiert auch Epsilon und periodisch das Target-Netzwerk.
+        Returns:
+            Der Verlustwert.
+        """
+        batch_state, batch_action, batch_reward, batch_next_state, batch_done, batch_steps = batch
 
-        # Konvertiere zu PyTorch Tensoren
-        batch_state = torch.tensor(batch_state, dtype=torch.float32)
-        batch_action = torch.tensor(batch_action, dtype=torch.long).unsqueeze(1)
-        batch_reward = torch.tensor(batch_reward, dtype=torch.float32).unsqueeze(1)
-        batch_next_state = torch.tensor(batch_next_state, dtype=torch.float32)
-        batch_done = torch.tensor(batch_done, dtype=torch.bool).unsqueeze(1)
+        # Konvertiere zu PyTorch Tensoren (ohne Kopie)
+        batch_state = torch.from_numpy(batch_state)
+        batch_action = torch.from_numpy(batch_action).unsqueeze(1)
+        batch_reward = torch.from_numpy(batch_reward).unsqueeze(1)
+        batch_next_state = torch.from_numpy(batch_next_state)
+        batch_done = torch.from_numpy(batch_done).unsqueeze(1)
+        batch_steps = torch.from_numpy(batch_steps).unsqueeze(1)
 
         # Berechne Q-Werte für den aktuellen Zustand (Q(s,a))
         current_q_values = self.policy_net(batch_state).gather(1, batch_action)
@@ -221,7 +349,8 @@ class Agent:
         next_q_values[batch_done] = 0.0 # Wenn done ist, ist der Q-Wert des nächsten Zustands 0
 
         # Berechne den erwarteten Q-Wert (Ziel-Q-Wert)
-        expected_q_values = batch_reward + (self.gamma * next_q_values)
+        # (gamma^steps: bei Makro-Aktionen liegt der nächste Zustand mehrere Schritte in der Zukunft)
+        expected_q_values = batch_reward + (self.gamma ** batch_steps * next_q_values)
 
         # Berechne den Verlust und führe Backpropagation durch
         loss = self.loss_fn(current_q_values, expected_q_values)
@@ -245,9 +374,11 @@ class Agent:
         return loss.item() # Gibt den Verlustwert zurück
 
     def save_model(self):
-        """Speichert den Zustand des Policy-Netzwerks."""
+        """Speichert den Zustand des Policy-Netzwerks (und schreibt einen Replay Buffer auf der Festplatte zurück)."""
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         torch.save(self.policy_net.state_dict(), self.model_path)
+        if isinstance(self.replay_buffer, MmapReplayBuffer):
+            self.replay_buffer.flush()
         print(f"KI-Modell erfolgreich gespeichert unter: {self.model_path}")
 
     def load_model(self):
@@ -256,6 +387,7 @@ class Agent:
             try:
                 self.policy_net.load_state_dict(torch.load(self.model_path))
                 self.target_net.load_state_dict(self.policy_net.state_dict())
+                self.refresh_inference_network()
                 print(f"KI-Modell erfolgreich geladen von: {self.model_path}")
                 # Optional: Epsilon nach dem Laden anpassen, um nicht bei 1.0 zu starten
                 self.epsilon = max(self.epsilon_min, self.epsilon * 0.5) # Z.B. auf die Hälfte des aktuellen Epsilon setzen, aber nicht unter min
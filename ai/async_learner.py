@@ -0,0 +1,158 @@
+# ai/async_learner.py
+# Lernt in einem eigenen Thread, während der Agent weiterspielt. Das Verhältnis von Lernschritten zu
+# Umgebungsschritten (Replay Ratio) ist einstellbar; neue Gewichte bekommt der handelnde Agent über
+# einen Doppelpuffer, ohne dass einer der beiden Threads auf den anderen warten muss.
+
+import copy
+import threading
+from contextlib import contextmanager
+
+import torch
+
+
+class AsyncLearner:
+    """
+    Der Spiel-Thread legt Übergänge mit record_step() ab, der Lern-Thread zieht daraus Batches und
+    macht Gradientenschritte, bis gradient_steps = replay_ratio * env_steps erreicht ist. Läuft der
+    Spiel-Thread mehr als max_lag Lernschritte voraus, wartet er auf den Lern-Thread, damit das
+    Verhältnis auch bei langsamen Lernschritten eingehalten wird.
+
+    Gewichte: Der Agent handelt mit einer von zwei Kopien des Policy-Netzes (acting_policy). Der
+    Lern-Thread schreibt alle 'publish_interval' Lernschritte in die gerade nicht aktive Kopie und
+    schaltet dann um. Ein Lesemarker des Spiel-Threads verhindert, dass eine Kopie überschrieben
+    wird, die gerade noch ausgewertet wird – ohne Lock auf dem Spielpfad.
+    """
+
+    def __init__(self, agent, replay_ratio=1.0, publish_interval=10, max_lag=256):
+        """
+        Args:
+            agent: Der Agent, dessen policy_net trainiert wird.
+            replay_ratio: Lernschritte pro Umgebungsschritt (z.B. 0.25 = ein Batch pro vier Züge, 4 = vier Batches pro Zug).
+            publish_interval: Nach wie vielen Lernschritten die Gewichte an den Spiel-Thread übergeben werden.
+            max_lag: Wie viele Lernschritte der Lern-Thread höchstens zurückliegen darf, bevor der Spiel-Thread wartet.
+        """
+        if replay_ratio <= 0:
+            raise ValueError(f"replay_ratio muss positiv sein: {replay_ratio}")
+        self.agent = agent
+        self.replay_ratio = replay_ratio
+        self.publish_interval = publish_interval
+        self.max_lag = max_lag
+
+        self.env_steps = 0
+        self.gradient_steps = 0
+        self.last_loss = 0.0
+
+        self.buffer_lock = threading.Lock() # Schützt den Replay Buffer (Ablegen und Sampling)
+        self.train_lock = threading.Lock()  # Wird während jedes Lernschritts gehalten (siehe paused())
+        self._data_available = threading.Event()
+        self._progress = threading.Event()
+        self._stop_requested = False
+        self.thread = None
+        self._previous_acting_policy = None # acting_policy des Agenten vor start() (z.B. RemotePolicy)
+
+        # Doppelpuffer der Gewichte für den Spiel-Thread
+        self._networks = [copy.deepcopy(agent.policy_net) for _ in range(2)]
+        for network in self._networks:
+            network.eval()
+        self._front = 0 # Kopie, mit der gerade gehandelt wird
+        self._reading = None # Kopie, die der Spiel-Thread gerade auswertet
+
+    def start(self):
+        """Startet den Lern-Thread und lässt den Agenten ab jetzt mit den veröffentlichten Gewichten handeln."""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self._publish(force=True)
+        self._previous_acting_policy = self.agent.acting_policy
+        self.agent.acting_policy = self.q_values
+        self._stop_requested = False
+        self.thread = threading.Thread(target=self._run, name="AsyncLearner", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Beendet den Lern-Thread. Der Agent handelt danach wieder mit seiner vorherigen acting_policy
+        (Inferenz-Dienst oder schnelle Kopie, aus den neuen Gewichten neu erzeugt) bzw. direkt mit policy_net.
+        """
+        self._stop_requested = True
+        self._data_available.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+        if self.agent.acting_policy == self.q_values:
+            self.agent.acting_policy = self._previous_acting_policy
+            self._previous_acting_policy = None
+            self.agent.refresh_inference_network()
+
+    def is_running(self):
+        """True, solange der Lern-Thread läuft."""
+        return self.thread is not None and self.thread.is_alive()
+
+    @contextmanager
+    def paused(self):
+        """Hält den Lern-Thread zwischen zwei Lernschritten an (z.B. zum Speichern des Modells)."""
+        with self.train_lock:
+            yield
+
+    def record_step(self, state, action_idx, reward, next_state, done, steps=1):
+        """
+        Legt einen Übergang ab (Argumente wie bei Agent.learn). Wird vom Spiel-Thread aufgerufen.
+        Returns:
+            Der Verlust des letzten Lernschritts.
+        """
+        with self.buffer_lock:
+            self.agent.remember(state, action_idx, reward, next_state, done, steps)
+        self.env_steps += 1
+        self._data_available.set()
+
+        # Verhältnis einhalten: zu weit vorausgelaufen -> auf den Lern-Thread warten
+        while (self.is_running() and len(self.agent.replay_buffer) >= self.agent.batch_size
+               and self.replay_ratio * self.env_steps - self.gradient_steps > self.max_lag):
+            self._progress.wait(0.05)
+            self._progress.clear()
+        return self.last_loss
+
+    def q_values(self, state_tensor):
+        """Q-Werte mit der zuletzt veröffentlichten Kopie der Gewichte (für Agent.acting_policy)."""
+        while True:
+            index = self._front
+            self._reading = index
+            if self._front == index: # Nicht zwischen Lesen und Markieren umgeschaltet
+                break
+        try:
+            with torch.no_grad():
+                return self._networks[index](state_tensor)
+        finally:
+            self._reading = None
+
+    def _publish(self, force=False):
+        """Kopiert die aktuellen Gewichte in die inaktive Kopie und schaltet auf sie um."""
+        back = 1 - self._front
+        if self._reading == back and not force:
+            return # Wird noch ausgewertet, beim nächsten Mal veröffentlichen
+        with torch.no_grad():
+            for target, source in zip(self._networks[back].parameters(), self.agent.policy_net.parameters()):
+                target.copy_(source)
+        self._front = back
+
+    def _run(self):
+        """Schleife des Lern-Threads."""
+        batch_size = self.agent.batch_size
+        while not self._stop_requested:
+            if (self.gradient_steps >= self.replay_ratio * self.env_steps
+                    or len(self.agent.replay_buffer) < batch_size):
+                # Genug gelernt oder zu wenig Daten: auf neue Übergänge warten
+                self._data_available.wait(0.05)
+                self._data_available.clear()
+                continue
+
+            with self.buffer_lock:
+                batch = self.agent.replay_buffer.sample_arrays(batch_size)
+            if batch is None:
+                continue
+            # Die Torch-Operationen geben die GIL frei, der Spiel-Thread läuft währenddessen weiter
+            with self.train_lock:
+                self.last_loss = self.agent.train_on_batch(batch)
+            self.gradient_steps += 1
+            if self.gradient_steps % self.publish_interval == 0:
+                self._publish()
+            self._progress.set()
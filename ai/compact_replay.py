@@ -0,0 +1,248 @@
+# ai/compact_replay.py
+# Replay Buffer, der statt zwei Beobachtungslisten pro Übergang nur (Episode, Position, eingesammelte
+# Gegenstände, Aktion, Belohnung, Ende) speichert. Die Beobachtungen werden erst beim Sampling für den
+# ganzen Batch auf einmal aus zwischengespeicherten Map-Arrays rekonstruiert.
+
+import numpy as np
+
+# Speicherlayout eines Übergangs (Spalten als NumPy-Arrays, 36 Bytes pro Übergang statt ca. 660 Bytes
+# für zwei Listen aus 25 Python-Floats im normalen ReplayBuffer)
+RECORD_FIELDS = [
+    ('episode', np.uint32),      # Laufende Nummer der Episode (Zeile episode - Basis der Episodentabelle)
+    ('x', np.uint16), ('y', np.uint16),
+    ('items_mask', np.uint64),   # Bit i = item_cells[i] eingesammelt (Schlüssel sind auch Gegenstände)
+    ('next_x', np.uint16), ('next_y', np.uint16),
+    ('next_items_mask', np.uint64),
+    ('action', np.uint8),
+    ('done', np.bool_),
+    ('steps', np.uint16),
+    ('reward', np.float32),
+]
+MAX_ITEMS = 64 # items_mask ist 64 Bit breit
+
+
+class CompactReplayBuffer:
+    """
+    Ringpuffer mit fester Kapazität für kompakt kodierte Zustände (siehe encode()).
+    Pro Map wird einmal ein Array mit den statischen Zellwerten (Wände, Wege, Tür) angelegt,
+    pro Episode nur die Liste ihrer Gegenstände. Eine Beobachtung ist dann das Fenster um die
+    Spielerposition, in das die noch nicht eingesammelten Gegenstände eingetragen werden –
+    genau wie MazeLogic.get_state_representation(), nur für viele Zustände gleichzeitig.
+    """
+
+    def __init__(self, capacity, maze_logic, seed=None, demo_fraction=0.25):
+        """
+        Args:
+            capacity: Maximale Anzahl gespeicherter Übergänge.
+            maze_logic: MazeLogic-Instanz, deren Zustände kodiert werden (liefert Sichtradius und Zellwerte).
+            seed: Seed für das Sampling.
+            demo_fraction: Mindestanteil Demonstrationen pro Batch (wie bei ReplayBuffer).
+        """
+        self.capacity = capacity
+        self.maze_logic = maze_logic
+        self.rng = np.random.default_rng(seed)
+        self.records = {name: np.zeros(capacity, dtype=dtype) for name, dtype in RECORD_FIELDS}
+        self.position = 0 # Nächste Schreibposition
+        self.size = 0
+
+        values = maze_logic.char_to_numeric_map
+        self.wall_value = values['W']
+        self.empty_value = values[' ']
+        self.player_value = values['S']
+        self.radius = maze_logic.vision_radius
+        side = 2 * self.radius + 1
+        self._window_y = np.arange(side).reshape(1, side, 1)
+        self._window_x = np.arange(side).reshape(1, 1, side)
+
+        # Statische Map-Arrays (mit Rand aus Wänden der Breite radius) und Episodentabelle
+        self.grids = []
+        self._map_layouts = [] # original_maze_layout je Map-Index (Referenz, damit die Identität eindeutig bleibt)
+        self._episode_cells = None # item_cells der aktuellen Episode
+        self._episode_id = -1
+        self._next_episode_id = 0
+        # (Basis, Map, xs, ys, Werte, Anzahl): Zeile i gehört zur Episode Basis + i. Neue Episoden werden in freie
+        # Zeilen geschrieben; ist die Tabelle voll, wird sie ohne die Episoden vor dem ältesten gespeicherten
+        # Übergang neu angelegt und als Ganzes ersetzt (ein Sampling im Lern-Thread sieht so immer eine gültige Tabelle).
+        self._item_table = self._allocate_item_table(0, 16, 0)
+
+        # Experten-Demonstrationen als fertige Beobachtungen (siehe ai/imitation.py)
+        self.demonstrations = []
+        self.demo_fraction = demo_fraction
+        self._demo_arrays = None
+
+    def _map_id(self):
+        """Index des statischen Arrays der aktuellen Map (wird beim ersten Zustand der Map angelegt)."""
+        logic = self.maze_logic
+        for map_id, layout in enumerate(self._map_layouts):
+            if layout is logic.original_maze_layout:
+                return map_id
+        # Wege, Wände und Tür ohne Spieler und Gegenstände
+        values = logic.char_to_numeric_map
+        height, width = len(logic.maze), len(logic.maze[0])
+        grid = np.full((height + 2 * self.radius, width + 2 * self.radius), self.wall_value, dtype=np.float32)
+        inner = grid[self.radius:self.radius + height, self.radius:self.radius + width]
+        for y, row in enumerate(logic.maze):
+            inner[y] = [values.get(cell, 0.0) for cell in row]
+        player_x, player_y = logic.player_pos['x'], logic.player_pos['y']
+        inner[player_y, player_x] = values['E'] if (player_x, player_y) == logic.end_pos else self.empty_value
+        for x, y, _ in logic.item_cells:
+            inner[y, x] = self.empty_value
+        self.grids.append(grid)
+        self._map_layouts.append(logic.original_maze_layout)
+        return len(self.grids) - 1
+
+    def encode(self, maze_logic=None):
+        """
+        Kodiert den aktuellen Zustand der Spiellogik.
+        Returns:
+            Tupel (Episode, x, y, items_mask), wie es push() erwartet.
+        """
+        logic = maze_logic or self.maze_logic
+        if logic.item_cells is not self._episode_cells:
+            if len(logic.item_cells) > MAX_ITEMS:
+                raise ValueError(f"Zu viele Gegenstände für den kompakten Replay Buffer: {len(logic.item_cells)}")
+            self._add_episode(self._next_episode_id, self._map_id(), logic)
+            self._episode_cells = logic.item_cells
+            self._episode_id = self._next_episode_id
+            self._next_episode_id += 1
+        return (self._episode_id, logic.player_pos['x'], logic.player_pos['y'], logic.items_mask)
+
+    @staticmethod
+    def _allocate_item_table(base, rows, width):
+        return (base, np.zeros(rows, dtype=np.int64), np.zeros((rows, width), dtype=np.int64),
+                np.zeros((rows, width), dtype=np.int64), np.zeros((rows, width), dtype=np.float32),
+                np.zeros(rows, dtype=np.int64))
+
+    def _add_episode(self, episode_id, map_id, logic):
+        """Trägt die Gegenstände einer neuen Episode in die Episodentabelle ein."""
+        item_cells = logic.item_cells
+        base, episode_map, xs, ys, values, counts = self._item_table
+        row = episode_id - base
+        if row >= len(episode_map) or len(item_cells) > xs.shape[1]:
+            # Episoden vor dem ältesten gespeicherten Übergang werden nicht mehr gebraucht
+            oldest = int(self.records['episode'][:self.size].min()) if self.size else episode_id
+            oldest = min(max(oldest, base), episode_id)
+            kept = slice(oldest - base, row)
+            live = row - (oldest - base)
+            table = self._allocate_item_table(oldest, max(16, 2 * (live + 1)), max(xs.shape[1], len(item_cells)))
+            for new_column, column in zip(table[1:], self._item_table[1:]):
+                if column.ndim == 1:
+                    new_column[:live] = column[kept]
+                else:
+                    new_column[:live, :column.shape[1]] = column[kept]
+            self._item_table = table
+            base, episode_map, xs, ys, values, counts = table
+            row = episode_id - base
+        # Die Zeile wird erst von Übergängen benutzt, die nach diesem Aufruf abgelegt werden
+        numeric = logic.char_to_numeric_map
+        n = len(item_cells)
+        episode_map[row] = map_id
+        xs[row, :n] = [x for x, _, _ in item_cells]
+        ys[row, :n] = [y for _, y, _ in item_cells]
+        values[row, :n] = [numeric.get(char, 0.0) for _, _, char in item_cells]
+        counts[row] = n
+
+    def push(self, state, action, reward, next_state, done, steps=1):
+        """Speichert einen Übergang zwischen zwei mit encode() kodierten Zuständen."""
+        records = self.records
+        i = self.position
+        records['episode'][i], records['x'][i], records['y'][i], records['items_mask'][i] = state
+        _, records['next_x'][i], records['next_y'][i], records['next_items_mask'][i] = next_state
+        records['action'][i] = action
+        records['reward'][i] = reward
+        records['done'][i] = done
+        records['steps'][i] = steps
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_demonstrations(self, transitions):
+        """Fügt Demonstrationen (state, action, reward, next_state, done[, steps]) mit Beobachtungslisten dauerhaft hinzu."""
+        for transition in transitions:
+            if len(transition) == 5:
+                transition = (*transition, 1)
+            self.demonstrations.append(tuple(transition))
+        self._demo_arrays = None
+
+    def observations(self, episodes, xs, ys, items_masks):
+        """
+        Rekonstruiert die Beobachtungen vieler kodierter Zustände auf einmal.
+        Returns:
+            float32-Array (Anzahl, (2 * Sichtradius + 1)^2), identisch zu get_state_representation().
+        """
+        base, episode_map, item_xs, item_ys, item_values, item_counts = self._item_table
+        episodes = episodes.astype(np.int64) - base # Zeilen der Episodentabelle
+        xs = xs.astype(np.int64)
+        ys = ys.astype(np.int64)
+        side = 2 * self.radius + 1
+        obs = np.empty((len(episodes), side, side), dtype=np.float32)
+
+        # Fenster aus den statischen Arrays (der Rand aus Wänden ersetzt die Bereichsprüfung)
+        map_ids = episode_map[episodes]
+        for map_id in np.unique(map_ids):
+            rows = np.nonzero(map_ids == map_id)[0]
+            obs[rows] = self.grids[map_id][ys[rows, None, None] + self._window_y, xs[rows, None, None] + self._window_x]
+
+        # Noch nicht eingesammelte Gegenstände im Fenster eintragen
+        if item_xs.shape[1]:
+            bits = np.arange(item_xs.shape[1], dtype=np.uint64)
+            collected = (items_masks.astype(np.uint64)[:, None] >> bits) & np.uint64(1)
+            present = (collected == 0) & (bits[None, :] < item_counts[episodes, None].astype(np.uint64))
+            rel_x = item_xs[episodes] - xs[:, None] + self.radius
+            rel_y = item_ys[episodes] - ys[:, None] + self.radius
+            visible = present & (rel_x >= 0) & (rel_x < side) & (rel_y >= 0) & (rel_y < side)
+            rows, items = np.nonzero(visible)
+            obs[rows, rel_y[rows, items], rel_x[rows, items]] = item_values[episodes[rows], items]
+
+        obs[:, self.radius, self.radius] = self.player_value
+        return obs.reshape(len(episodes), side * side)
+
+    def _sample_demonstrations(self, count):
+        if self._demo_arrays is None:
+            states, actions, rewards, next_states, dones, steps = zip(*self.demonstrations)
+            self._demo_arrays = (
+                np.array(states, dtype=np.float32), np.array(actions, dtype=np.int64),
+                np.array(rewards, dtype=np.float32), np.array(next_states, dtype=np.float32),
+                np.array(dones, dtype=np.bool_), np.array(steps, dtype=np.float32),
+            )
+        picks = self.rng.choice(len(self.demonstrations), size=count, replace=False)
+        return tuple(column[picks] for column in self._demo_arrays)
+
+    def sample_arrays(self, batch_size):
+        """
+        Zieht einen zufälligen Batch und rekonstruiert dessen Beobachtungen.
+        Returns:
+            (states, actions, rewards, next_states, dones, steps) als NumPy-Arrays oder None,
+            wenn noch nicht genug Übergänge vorhanden sind.
+        """
+        if len(self) < batch_size:
+            return None
+        num_demos = 0
+        if self.demonstrations:
+            num_demos = max(round(batch_size * self.demo_fraction), batch_size - self.size)
+            num_demos = min(num_demos, len(self.demonstrations))
+
+        # Sortierte Indizes: die Spalten werden dann in Speicherreihenfolge gelesen
+        picks = np.sort(self.rng.choice(self.size, size=batch_size - num_demos, replace=False))
+        records = {name: column[picks] for name, column in self.records.items()}
+        episodes = records['episode']
+        batch = (
+            self.observations(episodes, records['x'], records['y'], records['items_mask']),
+            records['action'].astype(np.int64),
+            records['reward'],
+            self.observations(episodes, records['next_x'], records['next_y'], records['next_items_mask']),
+            records['done'],
+            records['steps'].astype(np.float32),
+        )
+        if num_demos:
+            demos = self._sample_demonstrations(num_demos)
+            batch = tuple(np.concatenate([own, demo]) for own, demo in zip(batch, demos))
+        return batch
+
+    def nbytes(self):
+        """Speicherbedarf der Übergänge, Map-Arrays und Episodentabelle in Bytes (ohne Demonstrationen)."""
+        return (sum(column.nbytes for column in self.records.values()) + sum(grid.nbytes for grid in self.grids)
+                + sum(column.nbytes for column in self._item_table[1:]))
+
+    def __len__(self):
+        """Anzahl gespeicherter Übergänge (inklusive Demonstrationen)."""
+        return self.size + len(self.demonstrations)
@@ -0,0 +1,259 @@
+# ai/evaluation.py
+# Bewertet gespeicherte Modelle (q_network_model.pth) auf einer Auswahl von Maps, die nicht zum Training
+# gehören: gierige Episoden (epsilon = 0) in einem Prozesspool, Bericht als JSON-Datei.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m ai.evaluation ai/q_network_model.pth --maps assets/maps --episodes 5
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game.seeding import derive_seed
+
+DEFAULT_REPORT_DIR = os.path.join("assets", "evaluations")
+
+
+def _init_worker():
+    """Auswertungsprozesse mit niedriger Priorität und nur einem Torch-Thread, damit das Training Vorrang hat."""
+    import torch
+    torch.set_num_threads(1)
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+def _evaluate_map(args):
+    """
+    Spielt alle Episoden eines Modells auf einer Map (läuft in einem eigenen Prozess).
+    Returns:
+        Liste mit einem Ergebnis-Dictionary pro Episode.
+    """
+    model_path, map_path, episodes, max_steps, seed = args
+    # Imports hier, damit nur die Auswertungsprozesse Torch und die Spiellogik laden
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+    from ai.imitation import shortest_path_actions
+    from ai.training import EpisodeRunner
+
+    env = MazeLogic()
+    env.verbose = False
+    results = []
+    agent = None
+    for episode in range(episodes):
+        episode_seed = derive_seed(seed, map_path, episode)
+        if episode == 0:
+            if not env.load_maze_from_file(map_path, seed=episode_seed):
+                return [{'map': map_path, 'episode': 0, 'error': "Map konnte nicht geladen werden"}]
+            agent = Agent(env, model_path=model_path, seed=derive_seed(seed, 'agent'))
+            agent.load_model()
+            agent.epsilon = 0.0
+        else:
+            env.reset_game_for_ai_training(seed=episode_seed)
+
+        optimal = shortest_path_actions(env)
+        result = EpisodeRunner(env, agent, learn=False).run_episode(max_steps=max_steps)
+        result['map'] = map_path
+        result['episode'] = episode
+        result['optimal_steps'] = len(optimal) if optimal is not None else None
+        results.append(result)
+    return results
+
+
+def summarize(results):
+    """
+    Fasst Episodenergebnisse zusammen.
+    success_rate ist der Anteil gewonnener Episoden unter denen, für die der Löser einen Weg findet.
+    optimality_gap ist der mittlere relative Umweg gewonnener Episoden gegenüber dem kürzesten Weg
+    (0.0 = optimal, 1.0 = doppelt so viele Schritte).
+    """
+    results = [result for result in results if 'error' not in result]
+    if not results:
+        return {'episodes': 0}
+    solvable = [result for result in results if result['optimal_steps'] is not None]
+    won = [result for result in solvable if result['won']] # Nur lösbare Episoden, damit success_rate <= 1 bleibt
+    gaps = [(result['steps'] - result['optimal_steps']) / result['optimal_steps']
+            for result in won if result['optimal_steps']]
+    return {
+        'episodes': len(results),
+        'solvable_episodes': len(solvable),
+        'success_rate': len(won) / len(solvable) if solvable else 0.0,
+        'mean_steps': sum(result['steps'] for result in results) / len(results),
+        'mean_score': sum(result['score'] for result in results) / len(results),
+        'optimality_gap': sum(gaps) / len(gaps) if gaps else None,
+    }
+
+
+def build_report(checkpoint, results_per_map, seed, episodes_per_map, max_steps):
+    """
+    Baut den Bericht eines Modells aus den Episodenergebnissen.
+    Args:
+        results_per_map: Liste von (Map-Pfad, Liste der Episodenergebnisse).
+    """
+    report = {
+        'checkpoint': checkpoint,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'seed': seed,
+        'episodes_per_map': episodes_per_map,
+        'max_steps': max_steps,
+        'maps': {},
+        'episodes': [],
+    }
+    for map_path, results in results_per_map:
+        report['maps'][map_path] = summarize(results)
+        report['episodes'].extend(results)
+    report['summary'] = summarize(report['episodes'])
+    return report
+
+
+def evaluate_checkpoints(model_paths, map_paths, episodes_per_map=5, max_steps=1000, seed=0,
+                         processes=None, executor=None):
+    """
+    Bewertet ein oder mehrere Modelle auf allen Maps (ein Auftrag pro Modell und Map).
+    Args:
+        executor: Optionaler bestehender Prozesspool (sonst wird einer für diesen Aufruf angelegt).
+    Returns:
+        Dictionary {Modellpfad: Bericht} mit Zusammenfassung und Ergebnissen pro Map.
+    """
+    jobs = [(model_path, map_path, episodes_per_map, max_steps, seed)
+            for model_path in model_paths for map_path in map_paths]
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker) as own_executor:
+            outputs = list(own_executor.map(_evaluate_map, jobs))
+    else:
+        outputs = list(executor.map(_evaluate_map, jobs))
+
+    results_per_model = {}
+    for (model_path, map_path, *_), results in zip(jobs, outputs):
+        results_per_model.setdefault(model_path, []).append((map_path, results))
+    return {
+        model_path: build_report(model_path, results_per_map, seed, episodes_per_map, max_steps)
+        for model_path, results_per_map in results_per_model.items()
+    }
+
+
+def write_report(report, report_dir=DEFAULT_REPORT_DIR, name=None):
+    """Schreibt einen Bericht als JSON-Datei (Name mit Zeitstempel, damit sich Verläufe vergleichen lassen)."""
+    os.makedirs(report_dir, exist_ok=True)
+    if name is None:
+        name = os.path.splitext(os.path.basename(report['checkpoint']))[0]
+    path = os.path.join(report_dir, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def find_maps(paths):
+    """Erweitert Verzeichnisse zu allen enthaltenen .map-Dateien (ein einzelner Pfad ist auch erlaubt)."""
+    if isinstance(paths, str):
+        paths = [paths]
+    maps = []
+    for path in paths:
+        if os.path.isdir(path):
+            maps.extend(sorted(glob.glob(os.path.join(path, "*.map"))))
+        else:
+            maps.append(path)
+    return maps
+
+
+class BackgroundEvaluator:
+    """
+    Bewertet Modelle während des Trainings in einem eigenen Prozesspool mit niedriger Priorität.
+    submit() kopiert das Modell zuerst, damit weiteres Speichern durch das Training den laufenden
+    Auftrag nicht verändert, und kehrt sofort zurück. Der Bericht wird geschrieben, sobald er fertig ist.
+    """
+
+    def __init__(self, map_paths, report_dir=DEFAULT_REPORT_DIR, episodes_per_map=3, max_steps=1000,
+                 seed=0, processes=1):
+        self.map_paths = find_maps(map_paths)
+        self.report_dir = report_dir
+        self.episodes_per_map = episodes_per_map
+        self.max_steps = max_steps
+        self.seed = seed
+        self.executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker)
+        self.snapshot_dir = tempfile.mkdtemp(prefix="maze_eval_")
+        self.pending = [] # Laufende Aufträge: (Modellpfad, Kopie, Futures)
+        self.last_summary = None
+        self._count = 0
+        self._lock = threading.Lock() # submit() und die Callbacks des Pools greifen auf 'pending' zu
+
+    def submit(self, model_path):
+        """Startet die Bewertung einer Kopie von 'model_path' im Hintergrund."""
+        if not self.map_paths or not os.path.exists(model_path):
+            return
+        self._count += 1
+        name = f"{os.path.splitext(os.path.basename(model_path))[0]}_{self._count:04d}"
+        snapshot = os.path.join(self.snapshot_dir, name + ".pth")
+        shutil.copyfile(model_path, snapshot)
+        futures = [
+            self.executor.submit(_evaluate_map, (snapshot, map_path, self.episodes_per_map, self.max_steps, self.seed))
+            for map_path in self.map_paths
+        ]
+        with self._lock:
+            self.pending.append((model_path, snapshot, futures))
+        for future in futures:
+            future.add_done_callback(lambda _: self._collect())
+
+    def _collect(self):
+        """Schreibt die Berichte aller fertigen Aufträge (läuft im Verwaltungs-Thread des Pools)."""
+        with self._lock:
+            finished = [job for job in self.pending if all(future.done() for future in job[2])]
+            self.pending = [job for job in self.pending if job not in finished]
+        for model_path, snapshot, futures in finished:
+            if any(future.cancelled() for future in futures):
+                continue
+            results_per_map = []
+            for map_path, future in zip(self.map_paths, futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [{'map': map_path, 'episode': 0, 'error': str(e)}]
+                results_per_map.append((map_path, results))
+            report = build_report(model_path, results_per_map, self.seed, self.episodes_per_map, self.max_steps)
+            path = write_report(report, self.report_dir, name=os.path.splitext(os.path.basename(snapshot))[0])
+            self.last_summary = report['summary']
+            print(f"Auswertung gespeichert: {path} (Erfolgsquote {report['summary'].get('success_rate', 0.0):.0%})")
+            os.remove(snapshot)
+
+    def shutdown(self, wait=False):
+        """Beendet den Prozesspool (laufende Aufträge werden bei wait=False abgebrochen)."""
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bewertet gespeicherte KI-Modelle auf zurückgehaltenen Maps")
+    parser.add_argument("checkpoints", nargs="+", help=".pth-Dateien")
+    parser.add_argument("--maps", nargs="+", required=True, help=".map-Dateien oder Verzeichnisse")
+    parser.add_argument("--episodes", type=int, default=5, help="Episoden pro Map")
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--report-dir", default=DEFAULT_REPORT_DIR)
+    args = parser.parse_args(argv)
+
+    reports = evaluate_checkpoints(args.checkpoints, find_maps(args.maps), args.episodes, args.max_steps,
+                                   args.seed, args.processes)
+    print(f"{'Modell':<30} {'Erfolg':>7} {'Schritte':>9} {'Punkte':>8} {'Umweg':>7}")
+    for model_path, report in reports.items():
+        path = write_report(report, args.report_dir)
+        summary = report['summary']
+        gap = summary.get('optimality_gap')
+        gap_text = f"{gap:>7.0%}" if gap is not None else f"{'-':>7}"
+        print(f"{os.path.basename(model_path):<30} {summary.get('success_rate', 0.0):>7.0%} "
+              f"{summary.get('mean_steps', 0.0):>9.1f} {summary.get('mean_score', 0.0):>8.1f} {gap_text}")
+        print(f"  Bericht: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# ai/fast_inference.py
+# Schnelle Vorwärtsrechnung des QNetwork nur zum Spielen (ohne Lernen), z.B. für viele schwache Rechner,
+# die pro Zug genau eine Beobachtung auswerten. Zwei Varianten:
+#   "numpy":     Gewichte einmal als float32-Arrays kopieren, Linear+ReLU zusammengefasst in NumPy
+#                (kein Autograd, kein Modul-Aufruf pro Schicht; exakt dieselben Q-Werte).
+#   "quantized": fc1+ReLU mit torch.ao.quantization fusionieren und dynamisch nach int8 quantisieren
+#                (kleinere Gewichte, leicht abweichende Q-Werte). Ohne Quantisierungs-Backend wird
+#                auf "numpy" zurückgefallen.
+# Beide sind Momentaufnahmen der Gewichte: nach einem Lernschritt oder Neuladen neu erzeugen.
+#
+# Vergleich von Latenz und Genauigkeit mit dem float32-Modell:
+#   python -m ai.fast_inference ai/q_network_model.pth
+
+import argparse
+import copy
+import glob
+import random
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+INFERENCE_MODES = ("float", "numpy", "quantized")
+
+
+class NumpyQNetwork:
+    """
+    QNetwork-Vorwärtsrechnung in NumPy. Aufrufbar wie das Modul (Tensor rein, Tensor raus),
+    kann also als Agent.acting_policy oder Netz des Inferenz-Dienstes verwendet werden.
+    """
+
+    def __init__(self, network):
+        # Transponiert und zusammenhängend: x @ W ohne Umkopieren
+        self.w1 = np.ascontiguousarray(network.fc1.weight.detach().numpy().T, dtype=np.float32)
+        self.b1 = network.fc1.bias.detach().numpy().astype(np.float32)
+        self.w2 = np.ascontiguousarray(network.fc2.weight.detach().numpy().T, dtype=np.float32)
+        self.b2 = network.fc2.bias.detach().numpy().astype(np.float32)
+        self.in_features = self.w1.shape[0]
+        self.out_features = self.w2.shape[1]
+
+    def forward_numpy(self, observations):
+        """Q-Werte für ein Array (n x Eingabegröße) als NumPy-Array (n x Aktionen)."""
+        hidden = np.dot(observations, self.w1)
+        hidden += self.b1
+        np.maximum(hidden, 0.0, out=hidden) # ReLU direkt im selben Puffer
+        q_values = np.dot(hidden, self.w2)
+        q_values += self.b2
+        return q_values
+
+    def __call__(self, state_tensor):
+        observations = state_tensor.numpy() if isinstance(state_tensor, torch.Tensor) else state_tensor
+        return torch.from_numpy(self.forward_numpy(np.asarray(observations, dtype=np.float32)))
+
+
+def quantize_qnetwork(network):
+    """
+    Kopie des Netzes mit fusioniertem fc1+ReLU und dynamischer int8-Quantisierung aller Linear-Schichten.
+    Raises:
+        RuntimeError: Wenn Torch ohne Quantisierungs-Backend gebaut ist.
+    """
+    from torch.ao.quantization import fuse_modules, quantize_dynamic
+    import torch.ao.nn.intrinsic as nni
+
+    if torch.backends.quantized.engine == "none":
+        raise RuntimeError("Kein Quantisierungs-Backend in dieser Torch-Version verfügbar")
+    fused = fuse_modules(copy.deepcopy(network).eval(), [["fc1", "relu"]])
+    with warnings.catch_warnings():
+        # Neuere Torch-Versionen verweisen auf das separate Paket torchao; die Eager-API funktioniert weiterhin
+        warnings.simplefilter("ignore")
+        return quantize_dynamic(fused, {nn.Linear, nni.LinearReLU}, dtype=torch.qint8)
+
+
+def make_inference_network(network, mode="numpy"):
+    """
+    Netz für reine Inferenz aus einem (float32-)QNetwork.
+    Args:
+        mode: "float" (das Netz selbst), "numpy" oder "quantized" (siehe oben).
+    """
+    if mode == "float":
+        return network
+    if mode == "numpy":
+        return NumpyQNetwork(network)
+    if mode == "quantized":
+        try:
+            return quantize_qnetwork(network)
+        except (RuntimeError, AssertionError) as e:
+            print(f"Quantisierung nicht möglich ({e}), verwende NumPy.")
+            return NumpyQNetwork(network)
+    raise ValueError(f"Unbekannter Inferenz-Modus: {mode} (erlaubt: {', '.join(INFERENCE_MODES)})")
+
+
+def sample_observations(map_paths, count, seed=0):
+    """Beobachtungen aus zufälligen Spaziergängen auf echten Maps (realistischer als Zufallswerte)."""
+    from game.maze_logic import MazeLogic
+
+    rng = random.Random(seed)
+    logic = MazeLogic(seed=seed)
+    logic.verbose = False
+    observations = []
+    per_map = max(1, count // len(map_paths))
+    for map_path in map_paths:
+        if not logic.load_maze_from_file(map_path, seed=seed):
+            continue
+        logic.verbose = False
+        for _ in range(per_map):
+            observations.append(logic.get_state_representation())
+            _, done = logic.move_player(*rng.choice(((0, -1), (0, 1), (-1, 0), (1, 0))))
+            if done:
+                logic.reset_game_for_ai_training(seed=rng.randrange(1 << 30))
+                logic.verbose = False
+    return np.array(observations, dtype=np.float32)
+
+
+def measure_latency(network, observations, repeats=2000):
+    """Mittlere Zeit pro Aufruf in Mikrosekunden (wie in choose_action: ein Tensor pro Aufruf)."""
+    state_tensor = torch.from_numpy(observations)
+    with torch.inference_mode():
+        for _ in range(min(200, repeats)):
+            network(state_tensor)
+        started = time.perf_counter()
+        for _ in range(repeats):
+            network(state_tensor)
+    return (time.perf_counter() - started) / repeats * 1e6
+
+
+def compare(network, observations, modes=INFERENCE_MODES, batch_sizes=(1, 256)):
+    """
+    Latenz und Genauigkeit der Inferenz-Varianten gegenüber dem float32-Netz.
+    Returns:
+        Liste von Dictionaries (mode, Latenz je Batchgröße, maximale Abweichung, Übereinstimmung der besten Aktion).
+    """
+    with torch.no_grad():
+        reference = network(torch.from_numpy(observations)).numpy()
+    results = []
+    for mode in modes:
+        fast = make_inference_network(network, mode)
+        with torch.no_grad():
+            q_values = fast(torch.from_numpy(observations)).numpy()
+        results.append({
+            'mode': mode,
+            'latency_us': {size: measure_latency(fast, observations[:size]) for size in batch_sizes},
+            'max_abs_error': float(np.abs(q_values - reference).max()),
+            'q_range': float(np.abs(reference).max()),
+            'action_agreement': float((q_values.argmax(axis=1) == reference.argmax(axis=1)).mean()),
+        })
+    return results
+
+
+def main(argv=None):
+    from ai.inference_server import load_network
+
+    parser = argparse.ArgumentParser(description="Latenz und Genauigkeit der schnellen Inferenz-Varianten")
+    parser.add_argument("model", nargs="?", default="ai/q_network_model.pth")
+    parser.add_argument("--maps", nargs="*", default=None, help="Maps für die Beobachtungen (Standard: assets/maps/*.map)")
+    parser.add_argument("--observations", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=1, help="Torch-Threads (1 = wie auf einem schwachen Rechner)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    torch.set_num_threads(args.threads)
+    network = load_network(args.model)
+    observations = sample_observations(args.maps or sorted(glob.glob("assets/maps/*.map")), args.observations, args.seed)
+    print(f"{len(observations)} Beobachtungen, Modell {args.model}")
+    print(f"{'Modus':<10} {'Batch 1':>10} {'Batch 256':>10} {'max. Abw.':>10} {'gleiche Aktion':>15}")
+    results = compare(network, observations)
+    for result in results:
+        latency = result['latency_us']
+        print(f"{result['mode']:<10} {latency[1]:>8.1f}µs {latency[256]:>8.1f}µs "
+              f"{result['max_abs_error']:>10.3g} {result['action_agreement']:>15.2%}")
+    print(f"(Q-Werte betragsmäßig bis {results[0]['q_range']:.3g})")
+
+
+if __name__ == "__main__":
+    main()
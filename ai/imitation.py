@@ -0,0 +1,201 @@
+# ai/imitation.py
+# Vortraining des QNetwork aus Demonstrationen eines Kürzeste-Wege-Lösers (Behavior Cloning oder
+# DQfD-Margin-Loss), damit der Agent nicht bei null anfängt. Die Demonstrationen bleiben danach
+# dauerhaft im Replay Buffer und werden beim normalen Lernen (Agent.learn) mit gesampelt.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m ai.imitation assets/maps/*.map --episodes 20 --processes 4 --epochs 30
+
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+import torch.nn.functional as F
+
+from game.episode_recorder import ACTION_VECTORS
+from game.seeding import derive_seed
+
+
+def shortest_path_actions(maze_logic):
+    """
+    Sucht per Breitensuche über (Position, benötigter Schlüssel gesammelt) den kürzesten Weg
+    vom aktuellen Zustand zur Tür, inklusive Umweg über den benötigten Schlüssel.
+    Returns:
+        Liste von Aktionsindizes (Reihenfolge wie Agent.actions) oder None, wenn es keinen Weg gibt.
+    """
+    maze = maze_logic.get_maze_data()
+    height, width = len(maze), len(maze[0])
+    required_char = maze_logic.key_types[maze_logic.required_exit_key]['char']
+    start = (maze_logic.player_pos['x'], maze_logic.player_pos['y'],
+             maze_logic.has_key(maze_logic.required_exit_key))
+
+    previous = {start: None} # Zustand -> (Vorgänger, Aktion)
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        x, y, has_key = state
+        for action, (dx, dy) in enumerate(ACTION_VECTORS):
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height) or maze[ny][nx] == 'W':
+                continue
+            cell = maze[ny][nx]
+            next_state = (nx, ny, has_key or cell == required_char)
+            if next_state in previous:
+                continue
+            previous[next_state] = (state, action)
+            # Ohne Schlüssel ist die Tür ein gewöhnliches Feld (Strafe, Episode läuft weiter, siehe MazeLogic);
+            # liegt der Schlüssel hinter der Tür, führt der kürzeste Weg über sie hinweg
+            if cell == 'E' and has_key:
+                # Ziel erreicht: Weg rückwärts zusammensetzen
+                actions = []
+                while previous[next_state] is not None:
+                    next_state, action = previous[next_state]
+                    actions.append(action)
+                return actions[::-1]
+            queue.append(next_state)
+    return None
+
+
+def _demonstrations_for_map(args):
+    """
+    Erzeugt Demonstrationen für eine Map (läuft in einem eigenen Prozess).
+    Returns:
+        Liste von Übergängen (state, action, reward, next_state, done) im Format des ReplayBuffer.
+    """
+    map_path, episodes, seed = args
+    # Import hier, damit die Worker-Prozesse die Spiellogik selbst laden
+    from game.maze_logic import MazeLogic
+
+    logic = MazeLogic()
+    logic.verbose = False
+    transitions = []
+    for episode in range(episodes):
+        episode_seed = derive_seed(seed, map_path, episode)
+        if episode == 0:
+            if not logic.load_maze_from_file(map_path, seed=episode_seed):
+                print(f"Map konnte nicht geladen werden: {map_path}")
+                return []
+        else:
+            logic.reset_game_for_ai_training(seed=episode_seed)
+
+        actions = shortest_path_actions(logic)
+        if actions is None:
+            print(f"Kein Weg zur Tür gefunden: {map_path} (Episode {episode})")
+            continue
+        state = logic.get_state_representation()
+        for action in actions:
+            reward, done = logic.move_player(*ACTION_VECTORS[action])
+            next_state = logic.get_state_representation()
+            transitions.append((state, action, reward, next_state, done))
+            state = next_state
+            if done:
+                break
+    return transitions
+
+
+def generate_demonstrations(map_paths, episodes_per_map=10, seed=0, processes=None):
+    """
+    Erzeugt Experten-Demonstrationen für viele Maps parallel (ein Auftrag pro Map).
+    Jede Episode hat eigene, aus 'seed' abgeleitete Gegenstände und einen eigenen Türschlüssel.
+    Returns:
+        Liste aller Übergänge (state, action, reward, next_state, done).
+    """
+    jobs = [(map_path, episodes_per_map, seed) for map_path in map_paths]
+    if processes == 1:
+        results = map(_demonstrations_for_map, jobs)
+        return [transition for result in results for transition in result]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = executor.map(_demonstrations_for_map, jobs)
+        return [transition for result in results for transition in result]
+
+
+def pretrain_agent(agent, demonstrations, epochs=30, batch_size=256, loss='dqfd', margin=0.8,
+                   supervised_weight=1.0, learning_rate=0.001, epsilon_after=0.2, seed=0):
+    """
+    Trainiert das Policy-Netz des Agenten auf den Demonstrationen und legt sie anschließend
+    dauerhaft in seinen Replay Buffer, damit Agent.learn sie weiter mit sampelt.
+    Args:
+        loss: 'dqfd' = 1-Schritt-TD-Fehler plus Large-Margin-Loss
+              (max_a [Q(s,a) + margin * (a != a_E)] - Q(s,a_E)), wie bei DQfD;
+              'bc' = Behavior Cloning (Kreuzentropie über die Q-Werte als Logits).
+        supervised_weight: Gewicht des Margin-Loss gegenüber dem TD-Fehler (nur 'dqfd').
+        epsilon_after: Exploration nach dem Vortraining (statt wieder bei 1.0 zu beginnen).
+    Returns:
+        Anteil der Demonstrationen, in denen die gierige Aktion des Netzes der Experten-Aktion entspricht.
+    """
+    if loss not in ('dqfd', 'bc'):
+        raise ValueError(f"Unbekannter Loss: {loss}")
+    if not demonstrations:
+        return 0.0
+
+    states, actions, rewards, next_states, dones = zip(*demonstrations)
+    states = torch.tensor(states, dtype=torch.float32)
+    actions = torch.tensor(actions, dtype=torch.long)
+    rewards = torch.tensor(rewards, dtype=torch.float32)
+    next_states = torch.tensor(next_states, dtype=torch.float32)
+    dones = torch.tensor(dones, dtype=torch.bool)
+
+    optimizer = torch.optim.Adam(agent.policy_net.parameters(), lr=learning_rate)
+    generator = torch.Generator().manual_seed(derive_seed(seed, 'pretrain'))
+    count = len(actions)
+
+    for epoch in range(epochs):
+        permutation = torch.randperm(count, generator=generator)
+        for start in range(0, count, batch_size):
+            batch = permutation[start:start + batch_size]
+            q_values = agent.policy_net(states[batch])
+            batch_actions = actions[batch]
+            if loss == 'bc':
+                total_loss = F.cross_entropy(q_values, batch_actions)
+            else:
+                expert_q = q_values.gather(1, batch_actions.unsqueeze(1)).squeeze(1)
+                with torch.no_grad():
+                    next_q = agent.target_net(next_states[batch]).max(1)[0]
+                    next_q[dones[batch]] = 0.0
+                    td_target = rewards[batch] + agent.gamma * next_q
+                margins = torch.full_like(q_values, margin)
+                margins.scatter_(1, batch_actions.unsqueeze(1), 0.0)
+                margin_loss = ((q_values + margins).max(1)[0] - expert_q).mean()
+                total_loss = F.mse_loss(expert_q, td_target) + supervised_weight * margin_loss
+            optimizer.zero_grad()
+            total_loss.backward()
+            optimizer.step()
+        # Target-Netz wie beim normalen Lernen regelmäßig nachziehen
+        agent.target_net.load_state_dict(agent.policy_net.state_dict())
+        print(f"Vortraining Epoche {epoch + 1}/{epochs}: Loss {total_loss.item():.4f}")
+
+    # Übergabe an das normale Lernen: Demonstrationen bleiben im Replay Buffer
+    agent.replay_buffer.add_demonstrations(demonstrations)
+    agent.epsilon = max(agent.epsilon_min, epsilon_after)
+    with torch.no_grad():
+        accuracy = (agent.policy_net(states).argmax(1) == actions).float().mean().item()
+    return accuracy
+
+
+def main(argv=None):
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+
+    parser = argparse.ArgumentParser(description="Vortraining des DQN-Agenten aus Löser-Demonstrationen")
+    parser.add_argument("maps", nargs="+", help=".map-Dateien")
+    parser.add_argument("--episodes", type=int, default=10, help="Episoden (Gegenstandsverteilungen) pro Map")
+    parser.add_argument("--processes", type=int, default=None, help="Anzahl Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--loss", choices=["dqfd", "bc"], default="dqfd")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model-path", default=os.path.join("ai", "q_network_model.pth"))
+    args = parser.parse_args(argv)
+
+    demonstrations = generate_demonstrations(args.maps, args.episodes, args.seed, args.processes)
+    print(f"{len(demonstrations)} Übergänge aus {len(args.maps)} Maps erzeugt.")
+
+    agent = Agent(MazeLogic(), model_path=args.model_path, seed=args.seed)
+    accuracy = pretrain_agent(agent, demonstrations, epochs=args.epochs, loss=args.loss, seed=args.seed)
+    print(f"Übereinstimmung mit dem Experten: {accuracy:.1%}")
+    agent.save_model()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+# ai/inference_server.py
+# Lokaler Inferenz-Dienst: hält das QNetwork einmal im Speicher und beantwortet die Anfragen vieler
+# Spielinstanzen ("KI spielt"-Modus) über einen Unix-Socket oder localhost-TCP. Anfragen, die innerhalb
+# eines kurzen Zeitfensters (Standard 2 ms) eintreffen, werden zu einem Batch zusammengefasst.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m ai.inference_server ai/q_network_model.pth --address unix:/tmp/maze-ai.sock
+#   python -m ai.inference_server ai/q_network_model.pth --address 127.0.0.1:8765
+#
+# Protokoll (Little Endian): Anfrage = Kopf (Zeilen, Spalten als 2 x uint32) + Zeilen x Spalten float32
+# (Beobachtungen); Antwort = Kopf (Zeilen, Aktionen) + Zeilen x Aktionen float32 (Q-Werte).
+# Eine Antwort mit 0 Spalten bedeutet, dass die Anfrage nicht zum Modell passt (falsche Spaltenzahl oder mehr
+# Zeilen als max_batch; der Dienst schließt dann die Verbindung) oder nicht ausgewertet werden konnte.
+
+import argparse
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+import torch
+
+from ai.fast_inference import INFERENCE_MODES, make_inference_network
+
+HEADER = struct.Struct("<II")
+DEFAULT_ADDRESS = "unix:/tmp/maze-ai.sock"
+
+
+def parse_address(address):
+    """
+    'unix:/pfad' (oder ein absoluter Pfad) -> (AF_UNIX, Pfad), 'host:port' -> (AF_INET, (host, port)).
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    if address.startswith("/"):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _recv_exactly(sock, size):
+    """Liest genau 'size' Bytes (None, wenn die Gegenseite die Verbindung geschlossen hat)."""
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            return None
+        received += count
+    return data
+
+
+def load_network(model_path, hidden_size=None):
+    """
+    Lädt ein gespeichertes QNetwork; Ein- und Ausgabegröße werden aus den Gewichten gelesen.
+    """
+    from ai.agent import QNetwork
+    state_dict = torch.load(model_path)
+    hidden, input_size = state_dict['fc1.weight'].shape
+    output_size = state_dict['fc2.weight'].shape[0]
+    network = QNetwork(input_size, output_size, hidden_size or hidden)
+    network.load_state_dict(state_dict)
+    network.eval()
+    return network
+
+
+class _Request:
+    """Eine offene Anfrage: Beobachtungen und Platz für die Antwort des Batch-Threads."""
+    __slots__ = ("observations", "q_values", "done")
+
+    def __init__(self, observations):
+        self.observations = observations
+        self.q_values = None # Bleibt None, wenn der Vorwärtsdurchlauf fehlschlägt
+        self.done = threading.Event()
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """Bedient eine Client-Verbindung (ein Thread pro Verbindung), bis der Client sie schließt."""
+
+    def handle(self):
+        server = self.server.inference
+        sock = self.request
+        if sock.family == socket.AF_INET:
+            # Kleine Antworten sofort senden (sonst warten sie bis zu 40 ms auf Nagle)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            header = _recv_exactly(sock, HEADER.size)
+            if header is None:
+                return
+            rows, columns = HEADER.unpack(header)
+            if columns != server.input_size or not 0 < rows <= server.max_batch:
+                # Vor dem Lesen der Nutzdaten prüfen: sonst bestimmt ein beliebiger Kopf die Größe des Puffers
+                sock.sendall(HEADER.pack(rows, 0))
+                return
+            payload = _recv_exactly(sock, rows * columns * 4)
+            if payload is None:
+                return
+            observations = np.frombuffer(payload, dtype=np.float32).reshape(rows, columns)
+            q_values = server.submit(observations)
+            if q_values is None:
+                sock.sendall(HEADER.pack(rows, 0))
+                continue
+            sock.sendall(HEADER.pack(rows, q_values.shape[1]) + q_values.tobytes())
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128 # Viele Spielinstanzen verbinden sich gleichzeitig beim Start
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class InferenceServer:
+    """
+    Nimmt Beobachtungen von beliebig vielen Verbindungen entgegen und wertet sie gesammelt aus.
+    Ein Batch-Thread wartet auf die erste Anfrage, sammelt danach höchstens 'batch_window' Sekunden
+    (oder bis 'max_batch' Zeilen erreicht sind) weitere ein und rechnet alle in einem Vorwärtsdurchlauf.
+    Ändert sich die Modelldatei, werden die neuen Gewichte zwischen zwei Batches geladen.
+    """
+
+    def __init__(self, model_path, address=DEFAULT_ADDRESS, batch_window=0.002, max_batch=256,
+                 reload_interval=5.0, inference_mode="float"):
+        """
+        Args:
+            model_path: Gespeichertes Modell (Agent.save_model).
+            address: 'unix:/pfad' oder 'host:port' (siehe parse_address).
+            batch_window: Wie lange nach der ersten Anfrage eines Batches auf weitere gewartet wird (Sekunden).
+            max_batch: Höchstens so viele Beobachtungen pro Vorwärtsdurchlauf.
+            reload_interval: Abstand der Prüfungen auf eine neuere Modelldatei (Sekunden, None = nie).
+            inference_mode: "float", "numpy" oder "quantized" (siehe ai/fast_inference.py).
+        """
+        self.model_path = model_path
+        self.address = address
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.reload_interval = reload_interval
+        self.inference_mode = inference_mode
+
+        network = load_network(model_path)
+        self.input_size = network.fc1.in_features
+        self.network = make_inference_network(network, inference_mode)
+        self._model_mtime = os.path.getmtime(model_path)
+        self._last_reload_check = time.monotonic()
+
+        self._requests = queue.Queue()
+        self._stop_requested = False
+        self.batches = 0
+        self.observations = 0
+        self.server = None
+        self._threads = []
+
+    def submit(self, observations):
+        """
+        Reiht Beobachtungen ein und wartet auf ihre Q-Werte (wird von den Verbindungs-Threads aufgerufen).
+        Returns:
+            Die Q-Werte oder None, wenn der Batch nicht ausgewertet werden konnte.
+        """
+        request = _Request(observations)
+        self._requests.put(request)
+        request.done.wait()
+        return request.q_values
+
+    def start(self):
+        """Öffnet den Socket und startet Batch- und Verbindungs-Threads (nicht blockierend)."""
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.remove(address) # Übrig gebliebener Socket eines beendeten Dienstes
+            self.server = _UnixServer(address, _ConnectionHandler)
+        else:
+            self.server = _TCPServer(address, _ConnectionHandler)
+        self.server.inference = self
+        self._stop_requested = False
+        self._threads = [
+            threading.Thread(target=self._batch_loop, name="InferenceBatcher", daemon=True),
+            threading.Thread(target=self.server.serve_forever, name="InferenceServer", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"Inferenz-Dienst läuft auf {self.address} (Modell {self.model_path}, Batch-Fenster {self.batch_window * 1000:.1f} ms)")
+
+    def stop(self):
+        """Beendet den Dienst und entfernt einen Unix-Socket."""
+        self._stop_requested = True
+        self._requests.put(None) # Weckt den Batch-Thread
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            family, address = parse_address(self.address)
+            if family == socket.AF_UNIX and os.path.exists(address):
+                os.remove(address)
+            self.server = None
+        for thread in self._threads:
+            thread.join(1.0)
+        self._threads = []
+
+    def _collect_batch(self):
+        """Wartet auf die erste Anfrage und sammelt bis zum Ende des Zeitfensters weitere ein."""
+        first = self._requests.get()
+        if first is None:
+            return []
+        batch = [first]
+        rows = len(first.observations)
+        deadline = time.perf_counter() + self.batch_window
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                break
+            batch.append(request)
+            rows += len(request.observations)
+        return batch
+
+    def _reload_if_changed(self):
+        """Lädt das Modell neu, wenn die Datei seit dem letzten Laden geändert wurde."""
+        now = time.monotonic()
+        if self.reload_interval is None or now - self._last_reload_check < self.reload_interval:
+            return
+        self._last_reload_check = now
+        try:
+            mtime = os.path.getmtime(self.model_path)
+            if mtime != self._model_mtime:
+                network = load_network(self.model_path)
+                self._model_mtime = mtime
+                if network.fc1.in_features != self.input_size:
+                    # Die Clients senden weiter Beobachtungen der alten Größe: altes Modell behalten
+                    print(f"Inferenz-Dienst: Neues Modell erwartet {network.fc1.in_features} statt "
+                          f"{self.input_size} Eingaben, wird nicht übernommen ({self.model_path})")
+                    return
+                self.network = make_inference_network(network, self.inference_mode)
+                print(f"Inferenz-Dienst: Modell neu geladen ({self.model_path})")
+        except Exception as e: # Z.B. Datei wird gerade geschrieben: beim nächsten Mal erneut versuchen
+            print(f"Inferenz-Dienst: Modell konnte nicht neu geladen werden: {e}")
+
+    def _batch_loop(self):
+        """Schleife des Batch-Threads."""
+        while not self._stop_requested:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            observations = np.concatenate([request.observations for request in batch])
+            try:
+                with torch.no_grad():
+                    q_values = self.network(torch.from_numpy(observations)).numpy()
+            except Exception as e:
+                # Wartende Verbindungen nicht hängen lassen: sie antworten mit einem Fehler (0 Spalten)
+                print(f"Inferenz-Dienst: Batch konnte nicht ausgewertet werden: {e}")
+                for request in batch:
+                    request.done.set()
+                continue
+            start = 0
+            for request in batch:
+                end = start + len(request.observations)
+                request.q_values = q_values[start:end]
+                request.done.set()
+                start = end
+            self.batches += 1
+            self.observations += len(observations)
+            self._reload_if_changed()
+
+
+class RemotePolicy:
+    """
+    Client des Inferenz-Dienstes mit derselben Aufrufform wie ein QNetwork (Zustandstensor -> Q-Werte),
+    kann also als Agent.acting_policy gesetzt werden. Ist der Dienst nicht erreichbar, wird mit
+    'fallback' gerechnet (z.B. dem lokalen policy_net) und später erneut verbunden.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, fallback=None, retry_interval=5.0, timeout=1.0):
+        self.address = address
+        self.fallback = fallback
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self._sock = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock() # Eine Verbindung, Anfragen nacheinander
+
+    def _connect(self):
+        family, address = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _request(self, observations):
+        if self._sock is None:
+            self._sock = self._connect()
+            print(f"Verbunden mit dem Inferenz-Dienst auf {self.address}")
+        rows, columns = observations.shape
+        self._sock.sendall(HEADER.pack(rows, columns) + observations.tobytes())
+        header = _recv_exactly(self._sock, HEADER.size)
+        if header is None:
+            raise ConnectionError("Inferenz-Dienst hat die Verbindung geschlossen")
+        rows, actions = HEADER.unpack(header)
+        if actions == 0:
+            self._sock.close() # Der Dienst schließt die Verbindung bei unpassenden Anfragen
+            self._sock = None
+            # ConnectionError, damit __call__ wie bei einem Verbindungsabbruch auf 'fallback' ausweicht
+            raise ConnectionError(f"Inferenz-Dienst konnte {rows} Beobachtungen der Größe {columns} nicht auswerten")
+        payload = _recv_exactly(self._sock, rows * actions * 4)
+        if payload is None:
+            raise ConnectionError("Inferenz-Dienst hat die Verbindung geschlossen")
+        return np.frombuffer(payload, dtype=np.float32).reshape(rows, actions)
+
+    def __call__(self, state_tensor):
+        observations = np.ascontiguousarray(state_tensor.detach().numpy(), dtype=np.float32)
+        with self._lock:
+            if self._sock is not None or time.monotonic() >= self._next_attempt:
+                try:
+                    return torch.from_numpy(self._request(observations).copy())
+                except OSError as e:
+                    if self._sock is not None:
+                        self._sock.close()
+                        self._sock = None
+                    self._next_attempt = time.monotonic() + self.retry_interval
+                    if self.fallback is None:
+                        raise
+                    print(f"Inferenz-Dienst nicht erreichbar ({e}), rechne lokal.")
+        if self.fallback is None:
+            raise ConnectionError(f"Inferenz-Dienst auf {self.address} nicht erreichbar")
+        with torch.no_grad():
+            return self.fallback(state_tensor)
+
+    def close(self):
+        """Schließt die Verbindung."""
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler Inferenz-Dienst für viele Spielinstanzen")
+    parser.add_argument("model", nargs="?", default="ai/q_network_model.pth", help="Gespeichertes Modell (.pth)")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="'unix:/pfad' oder 'host:port'")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="Sammelzeit pro Batch in Millisekunden")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=None, help="Torch-Threads (Standard: Torch-Voreinstellung)")
+    parser.add_argument("--mode", choices=INFERENCE_MODES, default="float", help="Inferenz-Variante (siehe ai/fast_inference.py)")
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    server = InferenceServer(args.model, args.address, args.batch_window_ms / 1000.0, args.max_batch,
+                             inference_mode=args.mode)
+    server.start()
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Inferenz-Dienst: {server.observations} Beobachtungen in {server.batches} Batches")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
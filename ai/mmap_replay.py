@@ -0,0 +1,187 @@
+# ai/mmap_replay.py
+# Replay Buffer in speicherabgebildeten Dateien (np.memmap): Kapazitäten von zig Millionen Übergängen,
+# bleibt nach einem Neustart erhalten und kann von mehreren Lern-Prozessen nur lesend geöffnet werden.
+#
+# Verzeichnisinhalt:
+#   header.json   Kapazität, Beobachtungsgröße und Werte-Tabelle (fest für die Lebensdauer des Puffers)
+#   counters.bin  Schreibposition und Anzahl gespeicherter Übergänge (2 x int64)
+#   records.bin   Übergänge mit festem Layout (record_dtype), als Ringpuffer
+
+import json
+import os
+
+import numpy as np
+
+HEADER_FILE = "header.json"
+COUNTERS_FILE = "counters.bin"
+RECORDS_FILE = "records.bin"
+FORMAT_VERSION = 1
+
+
+def record_dtype(observation_size):
+    """
+    Festes Layout eines Übergangs. Die Beobachtungen werden als Index in die Werte-Tabelle gespeichert
+    (ein Byte pro Zelle), bei 25 Zellen sind das 58 Bytes pro Übergang.
+    """
+    return np.dtype([
+        ('state', np.uint8, (observation_size,)),
+        ('next_state', np.uint8, (observation_size,)),
+        ('action', np.uint8),
+        ('done', np.bool_),
+        ('steps', '<u2'),
+        ('reward', '<f4'),
+    ])
+
+
+class MmapReplayBuffer:
+    """
+    Ringpuffer auf der Festplatte mit derselben Schnittstelle wie ReplayBuffer (push, sample_arrays,
+    add_demonstrations, len). Nur die gerade gebrauchten Seiten liegen im Arbeitsspeicher; das
+    Betriebssystem lagert den Rest aus. Beim Sampling werden die Indizes sortiert, damit die
+    Datensätze in Dateireihenfolge gelesen werden und möglichst wenige Seiten nachgeladen werden müssen.
+    """
+
+    def __init__(self, directory, capacity=10_000_000, values=None, observation_size=25,
+                 readonly=False, seed=None, demo_fraction=0.25):
+        """
+        Öffnet den Puffer in 'directory' oder legt ihn dort neu an.
+        Args:
+            capacity: Maximale Anzahl Übergänge (nur beim Anlegen; ein bestehender Puffer behält seine).
+            values: Alle Werte, die in Beobachtungen vorkommen (z.B. MazeLogic.char_to_numeric_map.values()).
+            observation_size: Anzahl Werte pro Beobachtung.
+            readonly: Nur lesend öffnen (mehrere Prozesse gleichzeitig); push() ist dann nicht erlaubt.
+            seed: Seed für das Sampling.
+        """
+        self.directory = directory
+        self.readonly = readonly
+        self.rng = np.random.default_rng(seed)
+        header_path = os.path.join(directory, HEADER_FILE)
+
+        if os.path.exists(header_path):
+            with open(header_path, "r", encoding="utf-8") as f:
+                header = json.load(f)
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"Unbekanntes Format des Replay Buffers in {directory}: {header.get('version')}")
+            if header["observation_size"] != observation_size:
+                raise ValueError(f"Beobachtungsgröße {header['observation_size']} in {directory} passt nicht zu {observation_size}")
+            mode = "r" if readonly else "r+"
+        else:
+            if readonly:
+                raise FileNotFoundError(f"Kein Replay Buffer in {directory}")
+            if values is None:
+                raise ValueError("Zum Anlegen eines Replay Buffers wird die Werte-Tabelle benötigt")
+            header = {
+                "version": FORMAT_VERSION,
+                "capacity": int(capacity),
+                "observation_size": observation_size,
+                "values": sorted({float(value) for value in values}),
+            }
+            os.makedirs(directory, exist_ok=True)
+            # Die Datendatei wird in voller Größe angelegt (auf Linux als Sparse-Datei, belegt also erst beim Schreiben Platz)
+            np.memmap(os.path.join(directory, RECORDS_FILE), dtype=record_dtype(observation_size),
+                      mode="w+", shape=(header["capacity"],)).flush()
+            np.memmap(os.path.join(directory, COUNTERS_FILE), dtype=np.int64, mode="w+", shape=(2,)).flush()
+            with open(header_path, "w", encoding="utf-8") as f:
+                json.dump(header, f, indent=2)
+            mode = "r+"
+
+        self.capacity = header["capacity"]
+        self.observation_size = header["observation_size"]
+        self.values = np.array(header["values"], dtype=np.float32)
+        self.records = np.memmap(os.path.join(directory, RECORDS_FILE), dtype=record_dtype(self.observation_size),
+                                 mode=mode, shape=(self.capacity,))
+        self.counters = np.memmap(os.path.join(directory, COUNTERS_FILE), dtype=np.int64, mode=mode, shape=(2,))
+
+        # Experten-Demonstrationen bleiben im Arbeitsspeicher (siehe ai/imitation.py)
+        self.demonstrations = []
+        self.demo_fraction = demo_fraction
+        self._demo_arrays = None
+
+    @property
+    def position(self):
+        """Nächste Schreibposition."""
+        return int(self.counters[0])
+
+    @property
+    def size(self):
+        """Anzahl gespeicherter Übergänge (bei nur lesend geöffneten Puffern der aktuelle Stand des Schreibers)."""
+        return int(self.counters[1])
+
+    def _encode(self, observation):
+        """Übersetzt eine Beobachtung in Indizes der Werte-Tabelle."""
+        observation = np.asarray(observation, dtype=np.float32)
+        codes = np.searchsorted(self.values, observation)
+        codes = np.minimum(codes, len(self.values) - 1)
+        if not np.array_equal(self.values[codes], observation):
+            raise ValueError("Beobachtung enthält Werte, die nicht in der Werte-Tabelle stehen")
+        return codes
+
+    def push(self, state, action, reward, next_state, done, steps=1):
+        """Fügt eine neue Erfahrung hinzu (überschreibt bei voller Kapazität die älteste)."""
+        if self.readonly:
+            raise PermissionError("Replay Buffer ist nur lesend geöffnet")
+        i = self.position
+        self.records[i] = (self._encode(state), self._encode(next_state), action, done, steps, reward)
+        # Zähler erst nach dem Datensatz aktualisieren, damit lesende Prozesse nie halbe Datensätze sehen
+        self.counters[0] = (i + 1) % self.capacity
+        self.counters[1] = min(self.size + 1, self.capacity)
+
+    def add_demonstrations(self, transitions):
+        """Fügt Demonstrationen (state, action, reward, next_state, done[, steps]) dauerhaft hinzu (nur im Speicher)."""
+        for transition in transitions:
+            if len(transition) == 5:
+                transition = (*transition, 1)
+            self.demonstrations.append(tuple(transition))
+        self._demo_arrays = None
+
+    def _sample_demonstrations(self, count):
+        if self._demo_arrays is None:
+            states, actions, rewards, next_states, dones, steps = zip(*self.demonstrations)
+            self._demo_arrays = (
+                np.array(states, dtype=np.float32), np.array(actions, dtype=np.int64),
+                np.array(rewards, dtype=np.float32), np.array(next_states, dtype=np.float32),
+                np.array(dones, dtype=np.bool_), np.array(steps, dtype=np.float32),
+            )
+        picks = self.rng.choice(len(self.demonstrations), size=count, replace=False)
+        return tuple(column[picks] for column in self._demo_arrays)
+
+    def sample_arrays(self, batch_size):
+        """
+        Zieht einen zufälligen Batch.
+        Returns:
+            (states, actions, rewards, next_states, dones, steps) als NumPy-Arrays oder None,
+            wenn noch nicht genug Übergänge vorhanden sind.
+        """
+        size = self.size
+        if size + len(self.demonstrations) < batch_size:
+            return None
+        num_demos = 0
+        if self.demonstrations:
+            num_demos = max(round(batch_size * self.demo_fraction), batch_size - size)
+            num_demos = min(num_demos, len(self.demonstrations))
+
+        # Sortierte Indizes: Datensätze in Dateireihenfolge lesen (weniger Seitenfehler)
+        picks = np.sort(self.rng.choice(size, size=batch_size - num_demos, replace=False))
+        records = self.records[picks]
+        batch = (
+            self.values[records['state']],
+            records['action'].astype(np.int64),
+            records['reward'].astype(np.float32),
+            self.values[records['next_state']],
+            records['done'].copy(),
+            records['steps'].astype(np.float32),
+        )
+        if num_demos:
+            demos = self._sample_demonstrations(num_demos)
+            batch = tuple(np.concatenate([own, demo]) for own, demo in zip(batch, demos))
+        return batch
+
+    def flush(self):
+        """Schreibt alle Änderungen auf die Festplatte."""
+        if not self.readonly:
+            self.records.flush()
+            self.counters.flush()
+
+    def __len__(self):
+        """Anzahl gespeicherter Übergänge (inklusive Demonstrationen)."""
+        return self.size + len(self.demonstrations)
@@ -0,0 +1,111 @@
+# ai/novelty.py
+# Zählbasierte Exploration: zählt über alle Episoden hinweg, wie oft jeder Zustand (Map, Position,
+# gesammelte Schlüssel) besucht wurde, und gibt für selten besuchte Zustände eine zusätzliche
+# (intrinsische) Belohnung scale / sqrt(Anzahl). Anders als REWARD_REVISIT_CELL wird das beim
+# Zurücksetzen einer Episode nicht vergessen, sodass der Agent auf großen Maps gezielt Neues aufsucht.
+
+import zlib
+
+import numpy as np
+
+# Multiplikatoren der Hashfunktionen (ungerade 64-Bit-Konstanten, je Zeile eine)
+_HASH_MULTIPLIERS = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9,
+], dtype=np.uint64)
+_POSITION_MIX = np.uint64(0x9E3779B97F4A7C15)
+_KEYS_MIX = np.uint64(0xC2B2AE3D27D4EB4F)
+_MASK64 = (1 << 64) - 1
+
+
+def map_hash(layout):
+    """Stabile 32-Bit-Kennung einer Map aus ihren Wänden (unabhängig von Gegenständen und Spielerposition)."""
+    walls = "\n".join("".join('W' if cell == 'W' else '.' for cell in row) for row in layout)
+    return zlib.crc32(walls.encode("ascii"))
+
+
+class NoveltyBonus:
+    """
+    Count-Min-Sketch über Zustandsschlüssel: 'depth' Zeilen mit je 'width' Zählern (uint32, bei den
+    Standardwerten 16 MiB), jede Zeile mit eigener Hashfunktion. Die Anzahl eines Zustands ist das
+    Minimum seiner Zähler; Kollisionen können sie nur überschätzen, der Bonus fällt dann etwas zu klein aus.
+    Alle Methoden arbeiten auf Arrays, sodass viele Umgebungen in einem Aufruf bedient werden können.
+    """
+
+    def __init__(self, scale=1.0, width=1 << 20, depth=4):
+        """
+        Args:
+            scale: Bonus für einen zum ersten Mal besuchten Zustand (danach scale / sqrt(Anzahl)).
+            width: Zähler pro Zeile (wird auf eine Zweierpotenz aufgerundet).
+            depth: Anzahl Zeilen/Hashfunktionen (höchstens 8).
+        """
+        if not 1 <= depth <= len(_HASH_MULTIPLIERS):
+            raise ValueError(f"depth muss zwischen 1 und {len(_HASH_MULTIPLIERS)} liegen: {depth}")
+        self.scale = scale
+        self.bits = max(1, int(width - 1).bit_length())
+        self.width = 1 << self.bits
+        self.depth = depth
+        self.counts = np.zeros((depth, self.width), dtype=np.uint32)
+        self._flat_counts = self.counts.reshape(-1) # Sicht auf dieselben Zähler für einen einzigen np.add.at-Aufruf
+        self._multipliers = _HASH_MULTIPLIERS[:depth].reshape(depth, 1)
+        self._rows = np.arange(depth).reshape(depth, 1)
+        self._row_offsets = (np.arange(depth, dtype=np.uint64) * np.uint64(self.width)).reshape(depth, 1)
+        self._python_multipliers = [int(m) for m in _HASH_MULTIPLIERS[:depth]] # Für den Einzelfall ohne NumPy-Overhead
+        self._layout = None # Zuletzt gesehenes original_maze_layout und seine Kennung
+        self._layout_hash = 0
+
+    @staticmethod
+    def state_keys(map_ids, xs, ys, keys_masks):
+        """
+        Kombiniert (Map, x, y, Schlüsselmaske) zu 64-Bit-Schlüsseln (alle Argumente Arrays gleicher Länge).
+        """
+        map_ids = np.asarray(map_ids, dtype=np.uint64)
+        positions = (np.asarray(ys, dtype=np.uint64) << np.uint64(16)) | np.asarray(xs, dtype=np.uint64)
+        keys_masks = np.asarray(keys_masks, dtype=np.uint64)
+        return (map_ids << np.uint64(32)) ^ (positions * _POSITION_MIX) ^ (keys_masks * _KEYS_MIX)
+
+    def _slots(self, keys):
+        """Zählerindex je Zeile und Schlüssel (depth x n), Multiplikations-Hashing mit den oberen Bits."""
+        return (np.asarray(keys, dtype=np.uint64).reshape(1, -1) * self._multipliers) >> np.uint64(64 - self.bits)
+
+    def count(self, keys):
+        """Geschätzte Besuchsanzahl je Schlüssel."""
+        slots = self._slots(keys)
+        return self.counts[self._rows, slots].min(axis=0)
+
+    def observe(self, keys):
+        """
+        Zählt einen Besuch je Schlüssel und gibt den Bonus für diesen Besuch zurück (Array float32).
+        Mehrfach vorkommende Schlüssel im selben Aufruf werden alle gezählt.
+        """
+        slots = self._slots(keys)
+        np.add.at(self._flat_counts, (slots + self._row_offsets).reshape(-1), 1)
+        counts = self.counts[self._rows, slots].min(axis=0)
+        return (self.scale / np.sqrt(counts)).astype(np.float32)
+
+    def key_for(self, maze_logic):
+        """Zustandsschlüssel der aktuellen Position einer MazeLogic-Instanz (wie state_keys, als int)."""
+        if maze_logic.original_maze_layout is not self._layout:
+            self._layout = maze_logic.original_maze_layout
+            self._layout_hash = map_hash(self._layout)
+        position = (maze_logic.player_pos['y'] << 16) | maze_logic.player_pos['x']
+        return ((self._layout_hash << 32) ^ (position * int(_POSITION_MIX)) ^ (maze_logic.keys_mask * int(_KEYS_MIX))) & _MASK64
+
+    def bonus(self, maze_logic):
+        """
+        Zählt den aktuellen Zustand einer einzelnen Umgebung und gibt dessen Bonus zurück.
+        Rechnet mit Python-Ints, weil sich NumPy für einen einzelnen Schlüssel nicht lohnt (gleiche Zähler wie observe).
+        """
+        key = self.key_for(maze_logic)
+        shift = 64 - self.bits
+        count = None
+        for row, multiplier in enumerate(self._python_multipliers):
+            slot = ((key * multiplier) & _MASK64) >> shift
+            value = int(self.counts[row, slot]) + 1
+            self.counts[row, slot] = value
+            count = value if count is None else min(count, value)
+        return self.scale / count ** 0.5
+
+    def reset(self):
+        """Vergisst alle Zählungen."""
+        self.counts.fill(0)
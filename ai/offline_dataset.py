@@ -0,0 +1,448 @@
+# ai/offline_dataset.py
+# Offline-Datensatz aus gespielten Übergängen: jeder Zug einer MazeLogic-Instanz (Tastatur im Spielfenster,
+# KI-Thread, Skripte ohne UI) kann mitgeschrieben werden und steht danach zum Trainieren neuer Netze zur
+# Verfügung, ohne die Episoden erneut zu simulieren.
+#
+# Verzeichnisinhalt:
+#   dataset.json                  Beobachtungsgröße und Werte-Tabelle (fest für den ganzen Datensatz)
+#   <quelle>-<start>-<nr>.npz     Shards mit je bis zu shard_size Übergängen, spaltenweise und komprimiert
+#                                 (eine Datei pro Spalte im Zip-Archiv, Beobachtungen als Index in die Werte-Tabelle)
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m ai.offline_dataset collect assets/datasets/run1 assets/maps/*.map --episodes 200
+#   python -m ai.offline_dataset info assets/datasets/run1
+#   python -m ai.offline_dataset train assets/datasets/run1 --steps 20000 --hidden-size 256 --model-path ai/offline.pth
+
+import argparse
+import dataclasses
+import glob
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import config
+from game.episode_recorder import ACTION_INDEX
+from game.seeding import derive_seed
+
+HEADER_FILE = "dataset.json"
+SHARD_EXTENSION = ".npz"
+FORMAT_VERSION = 1
+DEFAULT_SHARD_SIZE = 1 << 16 # Übergänge pro Shard
+
+
+def _open_header(directory, values=None, observation_size=None):
+    """Liest dataset.json oder legt die Datei an (nur wenn 'values' angegeben ist)."""
+    header_path = os.path.join(directory, HEADER_FILE)
+    if os.path.exists(header_path):
+        with open(header_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unbekanntes Format des Datensatzes in {directory}: {header.get('version')}")
+        if observation_size is not None and header["observation_size"] != observation_size:
+            raise ValueError(f"Beobachtungsgröße {header['observation_size']} in {directory} passt nicht zu {observation_size}")
+        if values is not None and not {float(value) for value in values} <= set(header["values"]):
+            raise ValueError(f"Die Werte-Tabelle in {directory} passt nicht zu den Beobachtungen")
+        return header
+    if values is None:
+        raise FileNotFoundError(f"Kein Datensatz in {directory}")
+    header = {
+        "version": FORMAT_VERSION,
+        "observation_size": observation_size,
+        "values": sorted({float(value) for value in values}),
+    }
+    os.makedirs(directory, exist_ok=True)
+    temp_path = header_path + f".{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    os.replace(temp_path, header_path)
+    return header
+
+
+class DatasetWriter:
+    """
+    Schreibt Übergänge spaltenweise in Shards. Wird wie ein EpisodeRecorder an eine MazeLogic-Instanz
+    gehängt (MazeLogic.transition_sink); dann landet jeder Zug von move_player() im Datensatz,
+    egal ob er von der Tastatur, der KI oder einem Skript kommt. Jeder Writer schreibt eigene Dateien,
+    sodass mehrere Writer (auch aus mehreren Prozessen) in dasselbe Verzeichnis schreiben können.
+    """
+
+    def __init__(self, directory, source, values, observation_size, shard_size=DEFAULT_SHARD_SIZE):
+        """
+        Args:
+            directory: Verzeichnis des Datensatzes (wird bei Bedarf angelegt).
+            source: Kurzer Name der Quelle ("human", "ai", "headless", ...); Teil der Dateinamen.
+            values: Alle Werte, die in Beobachtungen vorkommen (z.B. MazeLogic.char_to_numeric_map.values()).
+            observation_size: Anzahl Werte pro Beobachtung.
+            shard_size: Übergänge pro Shard; ein voller Shard wird sofort geschrieben.
+        """
+        self.directory = directory
+        self.source = source
+        self.shard_size = shard_size
+        header = _open_header(directory, values, observation_size)
+        self.observation_size = header["observation_size"]
+        self._codes = {value: code for code, value in enumerate(header["values"])}
+        # Eindeutiger Präfix je Writer: Quelle, Startzeit und Prozess
+        self._prefix = f"{source}-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{id(self) & 0xFFFF:04x}"
+        self._shard_index = 0
+        self.episode = 0 # Laufende Episodennummer innerhalb dieses Writers
+        self.written = 0 # Bereits in Shards geschriebene Übergänge
+        self._allocate()
+
+    @classmethod
+    def for_logic(cls, directory, source, maze_logic, **kwargs):
+        """Writer für die Beobachtungen einer MazeLogic-Instanz, direkt angehängt."""
+        writer = cls(directory, source, maze_logic.char_to_numeric_map.values(),
+                     (2 * maze_logic.vision_radius + 1) ** 2, **kwargs)
+        writer.attach(maze_logic)
+        return writer
+
+    def _allocate(self):
+        self.states = np.zeros((self.shard_size, self.observation_size), dtype=np.uint8)
+        self.next_states = np.zeros((self.shard_size, self.observation_size), dtype=np.uint8)
+        self.actions = np.zeros(self.shard_size, dtype=np.uint8)
+        self.rewards = np.zeros(self.shard_size, dtype=np.float32)
+        self.dones = np.zeros(self.shard_size, dtype=np.bool_)
+        self.episodes = np.zeros(self.shard_size, dtype=np.uint32)
+        self.count = 0 # Übergänge im aktuellen (noch nicht geschriebenen) Shard
+
+    def attach(self, maze_logic):
+        """Verbindet den Writer mit einer MazeLogic-Instanz (ersetzt einen vorherigen)."""
+        maze_logic.transition_sink = self
+
+    def start_episode(self, map_path, seed):
+        """Wird von MazeLogic beim Laden/Zurücksetzen aufgerufen."""
+        self.episode += 1
+
+    def record_transition(self, state, dx, dy, reward, next_state, done):
+        """Wird von MazeLogic.move_player nach jedem Zug aufgerufen."""
+        i = self.count
+        codes = self._codes
+        self.states[i] = [codes[value] for value in state]
+        self.next_states[i] = [codes[value] for value in next_state]
+        self.actions[i] = ACTION_INDEX[(dx, dy)]
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.episodes[i] = self.episode
+        self.count = i + 1
+        if self.count == self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Schreibt die gesammelten Übergänge als neuen Shard (nichts, wenn keine vorhanden sind)."""
+        n = self.count
+        if n == 0:
+            return None
+        path = os.path.join(self.directory, f"{self._prefix}-{self._shard_index:05d}{SHARD_EXTENSION}")
+        # Beobachtungen zeilenweise: aufeinanderfolgende Sichtfenster wiederholen sich oft vollständig,
+        # das findet zlib als Wiederholung ganzer Zeilen (etwa halb so groß wie spaltenweise je Zelle)
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            state=self.states[:n], next_state=self.next_states[:n],
+            action=self.actions[:n], reward=self.rewards[:n], done=self.dones[:n], episode=self.episodes[:n],
+        )
+        # Erst vollständig schreiben, dann umbenennen: Leser sehen nie halbe Shards
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(buffer.getbuffer())
+        os.replace(temp_path, path)
+        self._shard_index += 1
+        self.written += n
+        self.count = 0
+        return path
+
+    def close(self):
+        """Schreibt den letzten, unvollständigen Shard."""
+        self.flush()
+
+
+def read_shard(path):
+    """
+    Liest einen Shard vollständig.
+    Returns:
+        Dictionary mit den Spalten state/next_state (n x Beobachtungsgröße, uint8-Codes), action,
+        reward, done und steps (immer 1, Einzelschritte).
+    """
+    with np.load(path) as shard:
+        columns = {name: shard[name] for name in shard.files}
+    columns['steps'] = np.ones(len(columns['action']), dtype=np.uint16)
+    return columns
+
+
+def _shard_length(path):
+    """Anzahl Übergänge eines Shards (liest nur die kleine Aktions-Spalte)."""
+    with np.load(path) as shard:
+        return len(shard['action'])
+
+
+class ShuffleBuffer:
+    """
+    Puffer fester Größe, aus dem zufällige Batches gezogen werden. Gezogene Plätze werden mit den
+    letzten Einträgen aufgefüllt, sodass Ziehen und Nachfüllen nur die betroffenen Zeilen kopieren.
+    """
+
+    COLUMNS = ('state', 'next_state', 'action', 'reward', 'done', 'steps')
+
+    def __init__(self, capacity, observation_size, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.columns = {
+            'state': np.zeros((capacity, observation_size), dtype=np.uint8),
+            'next_state': np.zeros((capacity, observation_size), dtype=np.uint8),
+            'action': np.zeros(capacity, dtype=np.uint8),
+            'reward': np.zeros(capacity, dtype=np.float32),
+            'done': np.zeros(capacity, dtype=np.bool_),
+            'steps': np.zeros(capacity, dtype=np.uint16),
+        }
+        self.size = 0
+
+    def add(self, shard, start=0):
+        """Übernimmt so viele Zeilen des Shards ab 'start' wie Platz ist. Returns: neue Startposition."""
+        n = min(self.capacity - self.size, len(shard['action']) - start)
+        for name in self.COLUMNS:
+            self.columns[name][self.size:self.size + n] = shard[name][start:start + n]
+        self.size += n
+        return start + n
+
+    def take(self, batch_size):
+        """Zieht bis zu batch_size zufällige Einträge (ohne Zurücklegen)."""
+        batch_size = min(batch_size, self.size)
+        picks = self.rng.choice(self.size, size=batch_size, replace=False)
+        batch = {name: column[picks] for name, column in self.columns.items()}
+        # Lücken mit den nicht gezogenen Einträgen vom Ende füllen
+        new_size = self.size - batch_size
+        holes = picks[picks < new_size]
+        tail = np.arange(new_size, self.size)
+        tail = tail[~np.isin(tail, picks)]
+        for column in self.columns.values():
+            column[holes] = column[tail]
+        self.size = new_size
+        return batch
+
+
+class OfflineDataset:
+    """
+    Liest einen mit DatasetWriter geschriebenen Datensatz als Strom von Batches. Die Shards werden in
+    zufälliger Reihenfolge von mehreren Threads im Voraus geladen und entpackt (zlib gibt dabei den GIL frei),
+    ein Shuffle-Puffer mischt die Übergänge über Shard-Grenzen hinweg.
+    """
+
+    def __init__(self, directory, sources=None):
+        """
+        Args:
+            directory: Verzeichnis des Datensatzes.
+            sources: Optionale Liste von Quellen (z.B. ["human"]); None = alle Shards.
+        """
+        self.directory = directory
+        header = _open_header(directory)
+        self.observation_size = header["observation_size"]
+        self.values = np.array(header["values"], dtype=np.float32)
+        self.shards = sorted(glob.glob(os.path.join(directory, "*" + SHARD_EXTENSION)))
+        if sources is not None:
+            self.shards = [path for path in self.shards if os.path.basename(path).split("-", 1)[0] in sources]
+        self._length = None
+
+    def __len__(self):
+        """Anzahl Übergänge in allen Shards."""
+        if self._length is None:
+            self._length = sum(_shard_length(path) for path in self.shards)
+        return self._length
+
+    def sources(self):
+        """Übergänge je Quelle."""
+        counts = {}
+        for path in self.shards:
+            source = os.path.basename(path).split("-", 1)[0]
+            counts[source] = counts.get(source, 0) + _shard_length(path)
+        return counts
+
+    def batches(self, batch_size, shuffle_buffer=100_000, workers=2, prefetch=4, epochs=1, seed=None):
+        """
+        Erzeugt Batches im Format von ReplayBuffer.sample_arrays (states, actions, rewards, next_states,
+        dones, steps), also direkt verwendbar mit Agent.train_on_batch().
+        Args:
+            shuffle_buffer: Größe des Shuffle-Puffers in Übergängen (größer = besser gemischt, mehr Speicher).
+            workers: Threads, die Shards laden und entpacken.
+            prefetch: Wie viele Shards höchstens im Voraus geladen werden.
+            epochs: Durchläufe über alle Shards; None = endlos.
+            seed: Seed für Shard-Reihenfolge und Mischen.
+        """
+        if not self.shards:
+            return
+        rng = np.random.default_rng(seed)
+        buffer = ShuffleBuffer(max(shuffle_buffer, batch_size), self.observation_size, rng)
+
+        def shard_order():
+            epoch = 0
+            while epochs is None or epoch < epochs:
+                for index in rng.permutation(len(self.shards)):
+                    yield self.shards[index]
+                epoch += 1
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="dataset-loader") as executor:
+            pending = deque()
+            paths = shard_order()
+            for path in paths:
+                pending.append(executor.submit(read_shard, path))
+                if len(pending) >= max(1, prefetch):
+                    break
+            while pending:
+                shard = pending.popleft().result()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(executor.submit(read_shard, next_path))
+                start = 0
+                while start < len(shard['action']):
+                    start = buffer.add(shard, start)
+                    # Erst ziehen, wenn der Puffer voll ist (gute Durchmischung)
+                    while buffer.size == buffer.capacity:
+                        yield self._decode(buffer.take(batch_size))
+            # Rest des Puffers (letzter Batch kann kleiner sein)
+            while buffer.size:
+                yield self._decode(buffer.take(batch_size))
+
+    def _decode(self, batch):
+        """Codes -> Beobachtungen (float32) und Spalten in die Typen von sample_arrays."""
+        return (
+            self.values[batch['state']],
+            batch['action'].astype(np.int64),
+            batch['reward'],
+            self.values[batch['next_state']],
+            batch['done'],
+            batch['steps'].astype(np.float32),
+        )
+
+
+def train_offline(agent, dataset, steps, batch_size=None, log_every=1000, **batch_kwargs):
+    """
+    Trainiert einen Agenten nur aus dem Datensatz (ohne Umgebung).
+    Args:
+        agent: Agent (ai/agent.py); seine Netzarchitektur muss nicht zu der passen, mit der gesammelt wurde.
+        dataset: OfflineDataset.
+        steps: Anzahl Gradientenschritte.
+        batch_kwargs: Weitere Argumente für OfflineDataset.batches (shuffle_buffer, workers, prefetch, seed).
+    Returns:
+        Mittlerer Verlust der letzten log_every Schritte.
+    """
+    batch_size = batch_size or agent.batch_size
+    losses = deque(maxlen=log_every)
+    started = time.perf_counter()
+    done_steps = 0
+    for batch in dataset.batches(batch_size, epochs=None, **batch_kwargs):
+        losses.append(agent.train_on_batch(batch))
+        done_steps += 1
+        if done_steps % log_every == 0:
+            rate = done_steps / (time.perf_counter() - started)
+            print(f"Offline-Training: {done_steps}/{steps} Schritte, Verlust {sum(losses) / len(losses):.4f} ({rate:.0f} Schritte/s)")
+        if done_steps >= steps:
+            break
+    return sum(losses) / len(losses) if losses else 0.0
+
+
+def collect(directory, map_paths, episodes, max_steps=500, seed=0, model_path=None, epsilon=None,
+            shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Spielt Episoden ohne UI mit dem (optional geladenen) Agenten und schreibt alle Übergänge mit
+    (Quelle "headless"). Der Agent lernt dabei nicht.
+    """
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+    from ai.training import EpisodeRunner
+
+    env = MazeLogic(seed=derive_seed(seed, 'environment'))
+    env.verbose = False
+    agent = Agent(env, model_path=model_path or "ai/q_network_model.pth", seed=derive_seed(seed, 'agent'))
+    if model_path is not None:
+        agent.load_model()
+    if epsilon is not None:
+        agent.epsilon = epsilon
+    writer = DatasetWriter.for_logic(directory, "headless", env, shard_size=shard_size)
+    runner = EpisodeRunner(env, agent, learn=False)
+    loaded_map = None
+    wins = 0
+    for episode in range(episodes):
+        map_path = map_paths[episode % len(map_paths)]
+        episode_seed = derive_seed(seed, 'episode', episode)
+        if map_path != loaded_map:
+            env.load_maze_from_file(map_path, seed=episode_seed)
+            loaded_map = map_path
+        else:
+            env.reset_game_for_ai_training(seed=episode_seed)
+        env.verbose = False
+        wins += runner.run_episode(max_steps=max_steps)['won']
+    writer.close()
+    print(f"{writer.written} Übergänge aus {episodes} Episoden geschrieben ({wins} gewonnen).")
+    return writer.written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline-Datensätze aus gespielten Übergängen")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = commands.add_parser("info", help="Übersicht über einen Datensatz")
+    info_parser.add_argument("directory")
+
+    collect_parser = commands.add_parser("collect", help="Episoden ohne UI spielen und mitschreiben")
+    collect_parser.add_argument("directory")
+    collect_parser.add_argument("maps", nargs="+")
+    collect_parser.add_argument("--episodes", type=int, default=100)
+    collect_parser.add_argument("--max-steps", type=int, default=500)
+    collect_parser.add_argument("--model-path", default=None, help="Modell, das spielt (sonst zufällig initialisiert)")
+    collect_parser.add_argument("--epsilon", type=float, default=None, help="Explorationsrate (Standard: Startwert der Konfiguration)")
+    collect_parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    collect_parser.add_argument("--seed", type=int, default=0)
+
+    train_parser = commands.add_parser("train", help="Ein neues Modell nur aus dem Datensatz trainieren")
+    train_parser.add_argument("directory")
+    train_parser.add_argument("--steps", type=int, default=10_000)
+    train_parser.add_argument("--sources", nargs="*", default=None, help="Nur diese Quellen (z.B. human headless)")
+    train_parser.add_argument("--hidden-size", type=int, default=None)
+    train_parser.add_argument("--batch-size", type=int, default=None)
+    train_parser.add_argument("--shuffle-buffer", type=int, default=100_000)
+    train_parser.add_argument("--workers", type=int, default=2)
+    train_parser.add_argument("--model-path", default=os.path.join("ai", "offline_model.pth"))
+    train_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        collect(args.directory, args.maps, args.episodes, args.max_steps, args.seed, args.model_path,
+                args.epsilon, args.shard_size)
+        return
+
+    dataset = OfflineDataset(args.directory, sources=getattr(args, "sources", None))
+    if args.command == "info":
+        print(f"{args.directory}: {len(dataset.shards)} Shards, {len(dataset)} Übergänge, "
+              f"Beobachtungsgröße {dataset.observation_size}")
+        for source, count in sorted(dataset.sources().items()):
+            print(f"  {source}: {count}")
+        size = sum(os.path.getsize(path) for path in dataset.shards)
+        print(f"  {size / 1024:.1f} KiB auf der Festplatte ({size / max(1, len(dataset)):.1f} Bytes pro Übergang)")
+        return
+
+    import torch
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+
+    agent_config = config.RUN_CONFIG.agent
+    if args.hidden_size is not None:
+        agent_config = dataclasses.replace(agent_config, hidden_size=args.hidden_size)
+    if args.batch_size is not None:
+        agent_config = dataclasses.replace(agent_config, batch_size=args.batch_size)
+    logic = MazeLogic() # Nur für Sichtradius und Beobachtungsgröße
+    agent = Agent(logic, model_path=args.model_path, seed=derive_seed(args.seed, 'agent'), agent_config=agent_config)
+    if agent.input_size != dataset.observation_size:
+        parser.error(f"Beobachtungsgröße {dataset.observation_size} des Datensatzes passt nicht zum Agenten ({agent.input_size})")
+    torch.set_num_threads(1)
+    loss = train_offline(agent, dataset, args.steps, shuffle_buffer=args.shuffle_buffer, workers=args.workers,
+                         seed=derive_seed(args.seed, 'dataset'))
+    print(f"Fertig, mittlerer Verlust {loss:.4f}")
+    agent.save_model()
+
+
+if __name__ == "__main__":
+    main()
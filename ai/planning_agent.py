@@ -0,0 +1,206 @@
+# ai/planning_agent.py
+# Planender Agent: bewertet jede Aktion durch simulierte Rollouts auf der echten Spiellogik
+# (clone_state/restore_state) statt mit einem neuronalen Netz. Dient als Vergleich zum DQN-Agenten.
+#
+# Vergleich beider Agenten auf einer Map (aus dem Projektverzeichnis):
+#   python -m ai.planning_agent assets/maps/test2.map --episodes 5
+
+import argparse
+import random
+from contextlib import contextmanager
+
+from game.seeding import derive_seed, new_run_seed
+
+
+class PlanningAgent:
+    """
+    Monte-Carlo-Planer: Für jede mögliche Aktion werden mehrere zufällige Rollouts über
+    'horizon' Schritte simuliert und die diskontierten Belohnungen gemittelt; gewählt wird
+    die Aktion mit dem höchsten Mittelwert. Nach jedem Rollout wird der Ausgangszustand mit
+    restore_state() wiederhergestellt, das Labyrinth wird dabei nie kopiert.
+    Hat dieselbe Schnittstelle wie Agent (choose_action, learn, save_model, ...), damit er im
+    EpisodeRunner und im Trainings-Thread verwendet werden kann.
+    """
+
+    def __init__(self, maze_logic, rollouts_per_action=8, horizon=30, gamma=0.99, seed=None):
+        """
+        Args:
+            maze_logic: Die MazeLogic-Instanz, auf der gespielt und simuliert wird.
+            rollouts_per_action: Anzahl der Rollouts pro Aktion und Entscheidung.
+            horizon: Länge eines Rollouts in Schritten.
+            gamma: Diskontierungsfaktor für die Rollout-Belohnungen.
+            seed: Optionaler Seed für die Zufallszüge der Rollouts.
+        """
+        self.maze_logic = maze_logic
+        self.rollouts_per_action = rollouts_per_action
+        self.horizon = horizon
+        self.gamma = gamma
+        self.seed = seed if seed is not None else new_run_seed()
+        self.rng = random.Random(derive_seed(self.seed, 'planning'))
+        self.epsilon = 0.0 # Keine Exploration (nur für die Anzeige im UI)
+
+        # Gleiche Aktionsreihenfolge wie beim DQN-Agenten
+        self.actions = {
+            0: (0, -1), # Hoch (W)
+            1: (0, 1),  # Runter (S)
+            2: (-1, 0), # Links (A)
+            3: (1, 0)   # Rechts (D)
+        }
+        self.num_actions = len(self.actions)
+
+    @contextmanager
+    def _simulation(self):
+        """Schaltet Signale, Aufzeichnung und Konsolenausgaben der Spiellogik während der Rollouts ab."""
+        logic = self.maze_logic
+        recorder, sink, verbose = logic.episode_recorder, logic.transition_sink, logic.verbose
+        signals_blocked = logic.blockSignals(True)
+        logic.episode_recorder = None
+        logic.transition_sink = None
+        logic.verbose = False
+        try:
+            yield
+        finally:
+            logic.blockSignals(signals_blocked)
+            logic.episode_recorder = recorder
+            logic.transition_sink = sink
+            logic.verbose = verbose
+
+    def _valid_actions(self):
+        """Aktionen, die nicht direkt in eine Wand führen."""
+        maze = self.maze_logic.get_maze_data()
+        player_pos = self.maze_logic.get_player_pos()
+        valid = []
+        for action_id, (dx, dy) in self.actions.items():
+            new_x, new_y = player_pos['x'] + dx, player_pos['y'] + dy
+            if 0 <= new_x < len(maze[0]) and 0 <= new_y < len(maze) and maze[new_y][new_x] != 'W':
+                valid.append(action_id)
+        return valid
+
+    def _rollout_action(self, previous_action):
+        """Zufällige gültige Aktion, die nach Möglichkeit nicht direkt zurückläuft."""
+        valid = self._valid_actions()
+        if not valid:
+            return self.rng.choice(list(self.actions))
+        reverse = previous_action ^ 1 # 0<->1 (hoch/runter), 2<->3 (links/rechts)
+        if len(valid) > 1 and reverse in valid:
+            valid.remove(reverse)
+        return self.rng.choice(valid)
+
+    def _rollout(self, first_action):
+        """Simuliert einen Rollout, der mit 'first_action' beginnt, und gibt die diskontierte Summe zurück."""
+        reward, done = self.maze_logic.move_player(*self.actions[first_action])
+        total = reward
+        discount = self.gamma
+        action = first_action
+        for _ in range(self.horizon - 1):
+            if done:
+                break
+            action = self._rollout_action(action)
+            reward, done = self.maze_logic.move_player(*self.actions[action])
+            total += discount * reward
+            discount *= self.gamma
+        return total
+
+    def evaluate_actions(self, action_ids=None):
+        """
+        Schätzt den Wert jeder Aktion im aktuellen Zustand.
+        Returns:
+            Dictionary {Aktionsindex: mittlere diskontierte Rollout-Belohnung}.
+        """
+        if action_ids is None:
+            action_ids = self._valid_actions() or list(self.actions)
+        root = self.maze_logic.clone_state()
+        values = {}
+        with self._simulation():
+            for action_id in action_ids:
+                total = 0.0
+                for _ in range(self.rollouts_per_action):
+                    total += self._rollout(action_id)
+                    self.maze_logic.restore_state(root)
+                values[action_id] = total / self.rollouts_per_action
+        return values
+
+    def choose_action(self, state, last_move_resulted_in_wall_hit=False, last_move_vector=None):
+        """
+        Wählt die Aktion mit dem besten Rollout-Wert (gleiche Signatur wie Agent.choose_action).
+        'state' wird nicht benötigt, da direkt auf der Spiellogik simuliert wird.
+        Returns:
+            Ein Tupel (dx, dy) der gewählten Bewegung.
+        """
+        values = self.evaluate_actions()
+        best_value = max(values.values())
+        best_actions = [action_id for action_id, value in values.items() if value == best_value]
+        return self.actions[self.rng.choice(best_actions)]
+
+    def learn(self, *args, **kwargs):
+        """Der Planer lernt nicht; vorhanden für die gemeinsame Schnittstelle mit Agent."""
+        return 0.0
+
+    def save_model(self):
+        """Kein Modell zu speichern."""
+
+    def load_model(self):
+        """Kein Modell zu laden."""
+
+    def get_action_index(self, dx, dy):
+        """Hilfsfunktion: Gibt den Index einer Aktion basierend auf (dx, dy) zurück."""
+        for idx, (adx, ady) in self.actions.items():
+            if adx == dx and ady == dy:
+                return idx
+        return -1
+
+
+def compare_agents(map_path, episodes=5, max_steps=500, seed=0, model_path="ai/q_network_model.pth"):
+    """
+    Spielt dieselben Episoden (gleiche Seeds) mit dem DQN-Agenten (ohne Exploration, ohne Lernen)
+    und dem PlanningAgent und gibt die Ergebnisse beider Agenten zurück.
+    Returns:
+        Dictionary {Agentname: Liste der Ergebnisse von EpisodeRunner.run_episode()}.
+    """
+    # Imports hier, damit der Planer ohne Torch importiert werden kann
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+    from ai.training import EpisodeRunner
+
+    results = {}
+    for name in ('dqn', 'planning'):
+        env = MazeLogic()
+        if not env.load_maze_from_file(map_path, seed=derive_seed(seed, 'episode', 0)):
+            raise ValueError(f"Map konnte nicht geladen werden: {map_path}")
+        if name == 'dqn':
+            agent = Agent(env, model_path=model_path, seed=derive_seed(seed, 'agent'))
+            agent.load_model()
+            agent.epsilon = 0.0
+        else:
+            agent = PlanningAgent(env, seed=derive_seed(seed, 'agent'))
+        runner = EpisodeRunner(env, agent, learn=False)
+
+        results[name] = []
+        for episode in range(episodes):
+            if episode > 0:
+                env.reset_game_for_ai_training(seed=derive_seed(seed, 'episode', episode))
+            env.verbose = False
+            results[name].append(runner.run_episode(max_steps=max_steps))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vergleicht den DQN-Agenten mit dem PlanningAgent")
+    parser.add_argument("map", help="Pfad zur .map-Datei")
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--max-steps", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = compare_agents(args.map, args.episodes, args.max_steps, args.seed)
+    print(f"{'Agent':<10} {'gewonnen':>9} {'Schritte':>9} {'Punkte':>8} {'Belohnung':>11}")
+    for name, episodes in results.items():
+        wins = sum(1 for result in episodes if result['won'])
+        mean_steps = sum(result['steps'] for result in episodes) / len(episodes)
+        mean_score = sum(result['score'] for result in episodes) / len(episodes)
+        mean_reward = sum(result['total_reward'] for result in episodes) / len(episodes)
+        print(f"{name:<10} {wins:>5}/{len(episodes):<3} {mean_steps:>9.1f} {mean_score:>8.1f} {mean_reward:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# ai/sweep.py
+# Hyperparameter-Suche: erzeugt Varianten der Laufkonfiguration (Gitter oder Zufallssuche), trainiert
+# jede Variante ohne UI in einem eigenen Prozess (ein Kern pro Lauf) und fasst die Ergebnisse als Tabelle zusammen.
+# Schlechte Läufe werden früh abgebrochen (Median-Regel).
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m ai.sweep assets/maps/test2.map --grid agent.gamma=0.9,0.99 --grid agent.learning_rate=0.001,0.0003
+#   python -m ai.sweep assets/maps/*.map --random agent.learning_rate=log:0.0001:0.01 --random rewards.wall_hit=-20:-1 --trials 16
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from game.seeding import derive_seed
+
+DEFAULT_RESULTS_DIR = os.path.join("assets", "sweeps")
+
+
+def grid_search(grid):
+    """
+    Alle Kombinationen eines Gitters.
+    Args:
+        grid: Dictionary {"bereich.name": [Werte]}.
+    Returns:
+        Liste von Override-Dictionaries für RunConfig.with_overrides().
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def random_search(space, trials, seed=0):
+    """
+    Zufällige Konfigurationen.
+    Args:
+        space: Dictionary {"bereich.name": Verteilung}; Verteilung ist eine Liste (gleichverteilte Auswahl),
+               ("uniform", a, b), ("log", a, b) (log-gleichverteilt) oder ("int", a, b).
+    """
+    rng = random.Random(derive_seed(seed, 'sweep'))
+    samples = []
+    for _ in range(trials):
+        overrides = {}
+        for key, distribution in space.items():
+            if isinstance(distribution, list):
+                overrides[key] = rng.choice(distribution)
+            elif distribution[0] == "uniform":
+                overrides[key] = rng.uniform(distribution[1], distribution[2])
+            elif distribution[0] == "log":
+                overrides[key] = math.exp(rng.uniform(math.log(distribution[1]), math.log(distribution[2])))
+            elif distribution[0] == "int":
+                overrides[key] = rng.randint(distribution[1], distribution[2])
+            else:
+                raise ValueError(f"Unbekannte Verteilung für {key}: {distribution}")
+        samples.append(overrides)
+    return samples
+
+
+def _init_worker(cpu_queue):
+    """Bindet jeden Prozess des Pools an einen eigenen Kern und begrenzt Torch auf einen Thread."""
+    import torch
+    torch.set_num_threads(1)
+    cpu = cpu_queue.get()
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError:
+            pass
+
+
+def should_stop(progress, trial_id, checkpoint, value, min_trials=3):
+    """
+    Median-Regel: ein Lauf wird abgebrochen, wenn sein Wert an einem Prüfpunkt unter dem Median
+    der anderen Läufe am selben Prüfpunkt liegt (sobald mindestens 'min_trials' andere ihn erreicht haben).
+    """
+    progress[(trial_id, checkpoint)] = value
+    others = [v for (other, point), v in progress.items() if point == checkpoint and other != trial_id]
+    return len(others) >= min_trials and value < statistics.median(others)
+
+
+def run_trial(args):
+    """
+    Trainiert eine Konfiguration ohne UI (läuft in einem eigenen Prozess).
+    Returns:
+        Ergebnis-Dictionary mit Overrides, Kennzahlen und ob der Lauf früh abgebrochen wurde.
+    """
+    trial_id, overrides, map_paths, episodes, max_steps, seed, check_every, progress = args
+    # Imports hier, damit nur die Trainingsprozesse Torch und die Spiellogik laden
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+    from ai.training import EpisodeRunner
+    from ai.novelty import NoveltyBonus
+
+    run_config = config.RUN_CONFIG.with_overrides(overrides)
+    env = MazeLogic(seed=derive_seed(seed, 'environment'), rewards=run_config.rewards)
+    env.verbose = False
+    # Das Modell wird nicht gespeichert, der Pfad wird nur vom Agenten verlangt
+    agent = Agent(env, model_path=os.path.join(tempfile.gettempdir(), f"maze_sweep_{trial_id}.pth"), seed=derive_seed(seed, 'agent'),
+                  agent_config=run_config.agent)
+    novelty_scale = run_config.agent.novelty_scale
+    runner = EpisodeRunner(env, agent, novelty=NoveltyBonus(scale=novelty_scale) if novelty_scale > 0 else None)
+
+    started = time.perf_counter()
+    history = []
+    stopped_early = False
+    loaded_map = None
+    for episode in range(episodes):
+        # Maps reihum; jede Episode mit eigenem, für alle Läufe gleichem Seed
+        map_path = map_paths[episode % len(map_paths)]
+        episode_seed = derive_seed(seed, 'episode', episode)
+        if map_path != loaded_map:
+            env.load_maze_from_file(map_path, seed=episode_seed)
+            loaded_map = map_path
+        else:
+            env.reset_game_for_ai_training(seed=episode_seed)
+        env.verbose = False
+        history.append(runner.run_episode(max_steps=max_steps))
+
+        if progress is not None and (episode + 1) % check_every == 0 and episode + 1 < episodes:
+            window = history[-check_every:]
+            value = sum(result['total_reward'] for result in window) / len(window)
+            if should_stop(progress, trial_id, episode + 1, value):
+                stopped_early = True
+                break
+
+    window = history[-max(1, min(len(history), check_every)):]
+    return {
+        'trial': trial_id,
+        'overrides': overrides,
+        'episodes': len(history),
+        'stopped_early': stopped_early,
+        'success_rate': sum(1 for result in window if result['won']) / len(window),
+        'mean_reward': sum(result['total_reward'] for result in window) / len(window),
+        'mean_steps': sum(result['steps'] for result in window) / len(window),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_sweep(trials, map_paths, episodes=200, max_steps=500, seed=0, processes=None, check_every=20,
+              early_stopping=True):
+    """
+    Führt alle Läufe parallel aus (ein Prozess pro Kern, jeder an seinen Kern gebunden).
+    Args:
+        trials: Liste von Override-Dictionaries (siehe grid_search/random_search).
+    Returns:
+        Liste der Ergebnisse, beste zuerst (Erfolgsquote, dann mittlere Belohnung).
+    """
+    processes = processes or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        cpu_queue = manager.Queue()
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else [None] * processes
+        for i in range(processes):
+            cpu_queue.put(cpus[i % len(cpus)] if len(cpus) >= processes else None)
+        progress = manager.dict() if early_stopping else None
+        jobs = [(trial_id, overrides, map_paths, episodes, max_steps, seed, check_every, progress)
+                for trial_id, overrides in enumerate(trials)]
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=_init_worker, initargs=(cpu_queue,)) as executor:
+            results = list(executor.map(run_trial, jobs))
+    return sorted(results, key=lambda result: (result['success_rate'], result['mean_reward']), reverse=True)
+
+
+def format_results(results):
+    """Ergebnistabelle als Text."""
+    keys = sorted({key for result in results for key in result['overrides']})
+    columns = [max(len(key), 10) for key in keys]
+    header = "".join(f"{key:>{width + 2}}" for key, width in zip(keys, columns))
+    lines = [f"{'Lauf':>4}{header} {'Erfolg':>7} {'Belohnung':>10} {'Schritte':>9} {'Episoden':>9}"]
+    for result in results:
+        values = "".join(
+            f"{_format_value(result['overrides'].get(key)):>{width + 2}}" for key, width in zip(keys, columns)
+        )
+        marker = "*" if result['stopped_early'] else " "
+        lines.append(f"{result['trial']:>4}{values} {result['success_rate']:>7.0%} {result['mean_reward']:>10.1f} "
+                     f"{result['mean_steps']:>9.1f} {result['episodes']:>8}{marker}")
+    lines.append("* = früh abgebrochen")
+    return "\n".join(lines)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def _parse_value(text):
+    """Zahl, wenn möglich, sonst Text."""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _parse_random(text):
+    """'log:a:b', 'int:a:b', 'a:b' (gleichverteilt) oder 'a,b,c' (Auswahl)."""
+    if "," in text:
+        return [_parse_value(value) for value in text.split(",")]
+    parts = text.split(":")
+    if parts[0] in ("log", "int", "uniform"):
+        return (parts[0], _parse_value(parts[1]), _parse_value(parts[2]))
+    return ("uniform", float(parts[0]), float(parts[1]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hyperparameter-Suche für den DQN-Agenten")
+    parser.add_argument("maps", nargs="+", help="Trainings-Maps (.map)")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=W1,W2", help="Gitter-Dimension, z.B. agent.gamma=0.9,0.99")
+    parser.add_argument("--random", action="append", default=[], metavar="NAME=VERTEILUNG",
+                        help="Zufallssuche, z.B. agent.learning_rate=log:0.0001:0.01 oder rewards.wall_hit=-20:-1")
+    parser.add_argument("--trials", type=int, default=8, help="Anzahl Läufe bei Zufallssuche")
+    parser.add_argument("--episodes", type=int, default=200, help="Trainingsepisoden pro Lauf")
+    parser.add_argument("--max-steps", type=int, default=500)
+    parser.add_argument("--check-every", type=int, default=20, help="Episoden zwischen zwei Prüfpunkten (früher Abbruch)")
+    parser.add_argument("--no-early-stopping", action="store_true")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    if args.grid and args.random:
+        parser.error("--grid und --random können nicht kombiniert werden")
+    if args.grid:
+        grid = {}
+        for item in args.grid:
+            key, _, values = item.partition("=")
+            grid[key] = [_parse_value(value) for value in values.split(",")]
+        trials = grid_search(grid)
+    elif args.random:
+        space = {}
+        for item in args.random:
+            key, _, distribution = item.partition("=")
+            space[key] = _parse_random(distribution)
+        trials = random_search(space, args.trials, args.seed)
+    else:
+        trials = [{}] # Nur die Standardkonfiguration
+    # Ungültige Namen vor dem Start erkennen
+    for overrides in trials:
+        config.RUN_CONFIG.with_overrides(overrides)
+
+    print(f"Starte {len(trials)} Läufe mit je {args.episodes} Episoden...")
+    results = run_sweep(trials, args.maps, args.episodes, args.max_steps, args.seed, args.processes,
+                        args.check_every, not args.no_early_stopping)
+    print(format_results(results))
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"sweep_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({'base_config': config.RUN_CONFIG.to_dict(), 'args': vars(args), 'results': results}, f, indent=2)
+    print(f"Ergebnisse gespeichert: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# ai/training.py
+# Gemeinsame Trainingsschleife des KI-Agenten (ohne UI), genutzt vom Trainings-Thread und von Skripten.
+
+from game.junction_graph import MacroActionEnv
+
+
+class EpisodeRunner:
+    """
+    Führt die Schritte einer Episode aus: Zustand erfassen, Aktion wählen, Zug ausführen, lernen.
+    Merkt sich den letzten Zug, damit der Agent nicht sofort in eine Wand zurückläuft.
+    """
+
+    def __init__(self, env, agent, learn=True, macro_actions=False, learner=None, novelty=None):
+        """
+        Args:
+            env: Die MazeLogic-Instanz, in der gespielt wird.
+            agent: Der Agent, der die Aktionen wählt.
+            learn: Wenn False, wird nur gespielt (z.B. zur Auswertung).
+            macro_actions: Wenn True, läuft jede Aktion den Gang bis zur nächsten Kreuzung/zum nächsten Gegenstand.
+            learner: Optionaler AsyncLearner (ai/async_learner.py); dann werden die Übergänge nur abgelegt
+                     und in dessen eigenem Thread gelernt.
+            novelty: Optionaler NoveltyBonus (ai/novelty.py); dessen Bonus für selten besuchte Zustände
+                     wird beim Lernen zur Belohnung addiert (nicht zu total_reward).
+        """
+        self.env = env
+        self.agent = agent
+        self.learn = learn
+        self.learner = learner
+        self.novelty = novelty
+        self.macro_env = MacroActionEnv(env, gamma=agent.gamma) if macro_actions else None
+        self.reset()
+
+    def reset(self):
+        """Setzt die Informationen über den letzten Zug zurück (zu Beginn jeder Episode aufrufen)."""
+        self.last_move_vector = None
+        self.last_move_resulted_in_wall_hit = False
+        self.steps = 0 # Einzelschritte
+        self.decisions = 0 # Entscheidungen des Agenten (bei Makro-Aktionen weniger als Schritte)
+        self.total_reward = 0.0
+        self.last_loss = 0.0
+
+    def step(self):
+        """
+        Führt genau eine Aktion aus (bei Makro-Aktionen mehrere Einzelschritte).
+        Returns:
+            Ein Tupel (reward, done).
+        """
+        # 1. Aktuellen Zustand erfassen
+        state = self.env.get_state_representation()
+
+        # 2. Aktion wählen (epsilon-greedy), unter Berücksichtigung des letzten Zuges
+        chosen_move_vector = self.agent.choose_action(
+            state,
+            self.last_move_resulted_in_wall_hit,
+            self.last_move_vector
+        )
+
+        # 3. Aktion ausführen und Belohnung/neuen Zustand erhalten
+        if self.macro_env is not None:
+            reward, done, steps = self.macro_env.step(chosen_move_vector[0], chosen_move_vector[1])
+        else:
+            reward, done = self.env.move_player(chosen_move_vector[0], chosen_move_vector[1])
+            steps = 1
+
+        # Speichere den letzten Zug und ob er zu einem Wandtreffer führte
+        self.last_move_vector = chosen_move_vector
+        self.last_move_resulted_in_wall_hit = (reward == self.env.REWARD_WALL_HIT)
+
+        # 4. Neuen Zustand erfassen und 5. Agent lernen lassen
+        if self.learn:
+            next_state = self.env.get_state_representation()
+            action_idx = self.agent.get_action_index(chosen_move_vector[0], chosen_move_vector[1])
+            learn_reward = reward
+            if self.novelty is not None:
+                learn_reward += self.novelty.bonus(self.env)
+            if self.learner is not None:
+                self.last_loss = self.learner.record_step(state, action_idx, learn_reward, next_state, done, steps)
+            else:
+                self.last_loss = self.agent.learn(state, action_idx, learn_reward, next_state, done, steps)
+
+        self.steps += steps
+        self.decisions += 1
+        self.total_reward += reward
+        return reward, done
+
+    def run_episode(self, max_steps=None):
+        """
+        Spielt eine Episode bis zum Ende (oder bis max_steps) ohne Darstellung.
+        Returns:
+            Ein Dictionary mit Schritten, Gesamtbelohnung, Punktestand und ob gewonnen wurde.
+        """
+        self.reset()
+        done = False
+        while not done and (max_steps is None or self.steps < max_steps):
+            _, done = self.step()
+        return {
+            'steps': self.steps,
+            'decisions': self.decisions,
+            'total_reward': self.total_reward,
+            'score': self.env.get_current_score(),
+            'won': self.env.has_won(),
+            'done': done,
+        }
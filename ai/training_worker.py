@@ -0,0 +1,170 @@
+# ai/training_worker.py
+# Lässt den KI-Agenten in einem eigenen QThread spielen und lernen, unabhängig von der Bildwiederholrate.
+
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from ai.training import EpisodeRunner
+from ai.async_learner import AsyncLearner
+
+
+class AITrainingWorker(QObject):
+    """
+    Führt Episoden im Hintergrund aus (so schnell wie möglich oder gedrosselt).
+    Das UI fragt den Zustand nur in seiner eigenen Bildrate über take_snapshot() ab,
+    sodass ein langsamer Lernschritt das Fenster nicht mehr blockiert.
+    """
+
+    # Signalisiert das Ende einer Episode (True = gewonnen)
+    episode_finished = pyqtSignal(bool)
+    # Interne Anforderung, eine Episode im Worker-Thread zu starten
+    _start_requested = pyqtSignal()
+
+    def __init__(self, env, agent, macro_actions=False, replay_ratio=None, evaluator=None, eval_every=10, learn=True,
+                 novelty=None, parent=None):
+        """
+        Args:
+            env: Eigene MazeLogic-Instanz des Workers (nicht mit dem UI verbunden).
+            agent: Der Agent, der auf 'env' arbeitet.
+            macro_actions: Aktionen als "Gang bis zum nächsten Knoten folgen" ausführen (siehe EpisodeRunner).
+            replay_ratio: Wenn gesetzt, lernt ein eigener Thread mit diesem Verhältnis von Lernschritten
+                          zu Umgebungsschritten (siehe ai/async_learner.py); None = ein Lernschritt pro Zug.
+            evaluator: Optionaler BackgroundEvaluator (ai/evaluation.py), der das gespeicherte Modell
+                       alle 'eval_every' beendeten Episoden im Hintergrund bewertet.
+            learn: Wenn False, wird nur gespielt: kein Lernen, kein Speichern des Modells
+                   (z.B. wenn die Züge von einem Inferenz-Dienst kommen, siehe ai/inference_server.py).
+            novelty: Optionaler NoveltyBonus (ai/novelty.py) für zählbasierte Exploration über alle Episoden.
+        """
+        super().__init__(parent)
+        self.env = env
+        self.agent = agent
+        self.learn = learn
+        self.learner = AsyncLearner(agent, replay_ratio=replay_ratio) if learn and replay_ratio is not None else None
+        self.runner = EpisodeRunner(env, agent, learn=learn, macro_actions=macro_actions, learner=self.learner,
+                                    novelty=novelty)
+        self.step_delay_ms = 0 # Wartezeit pro Schritt (0 = ungebremst)
+        self.evaluator = evaluator
+        self.eval_every = eval_every
+        self.finished_episodes = 0
+
+        self._stop_requested = False
+        self._idle = threading.Event() # Gesetzt, solange keine Episode läuft
+        self._idle.set()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_requested = True
+        self._snapshot = None # Zuletzt veröffentlichter Zustand für das UI
+        self.steps_per_second = 0.0
+
+        self._start_requested.connect(self._run_episode)
+
+        # Der Worker lebt in einem eigenen Thread
+        self.worker_thread = QThread()
+        self.moveToThread(self.worker_thread)
+        self.worker_thread.start()
+
+    def start_episode(self):
+        """
+        Startet eine Episode auf der aktuell in 'env' geladenen Map (nicht blockierend).
+        Returns:
+            False (ohne zu starten), wenn die vorherige Episode nicht rechtzeitig angehalten hat.
+        """
+        if not self.stop_and_wait():
+            print("Warnung: KI-Thread ist noch beschäftigt, neue Episode wird nicht gestartet.")
+            return False
+        if self.learner is not None:
+            self.learner.start()
+        self._stop_requested = False
+        self._idle.clear()
+        self.runner.reset()
+        self._start_requested.emit()
+        return True
+
+    def stop_and_wait(self, timeout=5.0):
+        """
+        Bricht eine laufende Episode ab und wartet, bis der Worker angehalten hat.
+        Returns:
+            True, wenn der Worker angehalten hat; False, wenn er nach 'timeout' Sekunden noch beschäftigt ist
+            (z.B. beim Speichern des Modells). Dann darf 'env' noch nicht verändert werden.
+        """
+        self._stop_requested = True
+        return self._idle.wait(timeout)
+
+    def is_running(self):
+        """True, solange eine Episode läuft."""
+        return not self._idle.is_set()
+
+    def shutdown(self):
+        """Hält den Worker an und beendet seinen Thread (beim Schließen des Fensters aufrufen)."""
+        self.stop_and_wait()
+        if self.learner is not None:
+            self.learner.stop()
+        if self.evaluator is not None:
+            self.evaluator.shutdown()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+
+    def set_step_delay(self, delay_ms):
+        """Setzt die Wartezeit pro Schritt in ms (0 = so schnell wie möglich)."""
+        self.step_delay_ms = max(0, delay_ms)
+
+    def take_snapshot(self):
+        """
+        Gibt den neuesten veröffentlichten Zustand zurück (oder None, wenn es keinen neuen gibt)
+        und fordert gleichzeitig den nächsten an. Wird vom UI-Timer aufgerufen.
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            self._snapshot = None
+            self._snapshot_requested = True
+        return snapshot
+
+    def _publish_snapshot(self, force=False):
+        """Veröffentlicht den aktuellen Zustand, wenn das UI einen neuen angefordert hat."""
+        if not (force or self._snapshot_requested):
+            return
+        snapshot = self.env.get_snapshot()
+        with self._snapshot_lock:
+            self._snapshot = snapshot
+            self._snapshot_requested = False
+
+    @pyqtSlot()
+    def _run_episode(self):
+        """Die eigentliche Schleife, läuft im Worker-Thread."""
+        done = False
+        started = time.perf_counter()
+        steps_at_start = self.runner.steps
+        try:
+            while not self._stop_requested and not self.env.is_game_over():
+                _, done = self.runner.step()
+                self._publish_snapshot()
+
+                elapsed = time.perf_counter() - started
+                if elapsed > 0.5:
+                    self.steps_per_second = (self.runner.steps - steps_at_start) / elapsed
+                    started = time.perf_counter()
+                    steps_at_start = self.runner.steps
+
+                if done:
+                    break
+                if self.step_delay_ms > 0:
+                    QThread.msleep(int(self.step_delay_ms))
+
+            self._publish_snapshot(force=True)
+            if done and self.learn:
+                print(f"DEBUG: KI-Durchgang beendet nach {self.runner.steps} Schritten.")
+                # Modell automatisch speichern, wenn der Durchgang beendet ist
+                if self.learner is not None:
+                    with self.learner.paused():
+                        self.agent.save_model()
+                else:
+                    self.agent.save_model()
+                self.finished_episodes += 1
+                if self.evaluator is not None and self.finished_episodes % self.eval_every == 0:
+                    self.evaluator.submit(self.agent.model_path)
+        finally:
+            self._idle.set()
+
+        if done:
+            self.episode_finished.emit(self.env.has_won())
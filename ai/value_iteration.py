@@ -0,0 +1,323 @@
+# ai/value_iteration.py
+# Exakte Lösung des Labyrinths als MDP über (benötigter Schlüssel, Zelle, gesammelte Schlüssel)
+# mit vektorisierter Value Iteration. Liefert "wahre" Q-Werte zum Prüfen und Vortrainieren des QNetwork.
+#
+# Abstraktion gegenüber MazeLogic (damit der Zustandsraum klein und Markov bleibt):
+#   - Belohnungen für Schritt, Wand, Schlüssel, Tür (mit/ohne Schlüssel) wie in MazeLogic (REWARD_*).
+#   - Enten, die Strafe für erneut besuchte Zellen und die Verlustgrenze des Punktestands
+#     hängen vom bisherigen Verlauf ab und werden nicht modelliert.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m ai.value_iteration assets/maps/test2.map [--pretrain]
+
+import argparse
+import time
+
+import numpy as np
+
+from game.episode_recorder import ACTION_VECTORS
+
+
+class ValueIterationSolver:
+    """
+    Baut aus dem aktuell geladenen Labyrinth einer MazeLogic-Instanz die (deterministischen)
+    Übergänge als Index-Arrays auf und löst das MDP für alle drei möglichen Türschlüssel gleichzeitig.
+    Zustand = (benötigter Schlüssel r, Zelle c, Schlüsselmaske m), flach: (r * Zellen + c) * 2^Schlüssel + m.
+    """
+
+    def __init__(self, maze_logic, gamma=0.99):
+        self.maze_logic = maze_logic
+        self.gamma = gamma
+        self.key_names = list(maze_logic.key_types)
+        self.num_keys = len(self.key_names)
+        self.num_masks = 1 << self.num_keys
+        self.values = None
+        self.q = None
+        self._build()
+
+    def _episode_layout(self):
+        """
+        Labyrinth mit allen Gegenständen der Episode (auch bereits eingesammelten) und ohne Spieler,
+        damit der Solver auch mitten in einer Episode aufgebaut werden kann.
+        """
+        logic = self.maze_logic
+        layout = [row[:] for row in logic.get_maze_data()]
+        player_x, player_y = logic.player_pos['x'], logic.player_pos['y']
+        layout[player_y][player_x] = 'E' if (player_x, player_y) == logic.end_pos else ' '
+        for x, y, char in logic.item_cells:
+            layout[y][x] = char
+        return layout
+
+    def _build(self):
+        """Erzeugt Zellindizes, Folgezustände, Belohnungen und Endzustände als NumPy-Arrays."""
+        logic = self.maze_logic
+        self.layout = self._episode_layout()
+        grid = np.array(self.layout)
+        height, width = grid.shape
+        passable = grid != 'W'
+
+        # Zellindex pro Gitterposition (-1 = Wand)
+        self.cell_of = np.full((height, width), -1, dtype=np.int64)
+        self.cell_ys, self.cell_xs = np.nonzero(passable)
+        self.num_cells = len(self.cell_xs)
+        self.cell_of[self.cell_ys, self.cell_xs] = np.arange(self.num_cells)
+        self.height, self.width = height, width
+
+        # Schlüsselbit und Tür pro Zelle
+        key_bit = np.zeros(self.num_cells, dtype=np.int64)
+        for bit, key_name in enumerate(self.key_names):
+            key_bit[grid[self.cell_ys, self.cell_xs] == logic.key_types[key_name]['char']] = 1 << bit
+        is_door = grid[self.cell_ys, self.cell_xs] == 'E'
+        self.key_bit = key_bit
+
+        # Folgezelle pro (Zelle, Aktion); Wand oder Rand -> Zelle bleibt gleich
+        next_cell = np.empty((self.num_cells, len(ACTION_VECTORS)), dtype=np.int64)
+        hits_wall = np.zeros((self.num_cells, len(ACTION_VECTORS)), dtype=bool)
+        for action, (dx, dy) in enumerate(ACTION_VECTORS):
+            nx, ny = self.cell_xs + dx, self.cell_ys + dy
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            target = np.full(self.num_cells, -1, dtype=np.int64)
+            target[inside] = self.cell_of[ny[inside], nx[inside]]
+            hits_wall[:, action] = target < 0
+            next_cell[:, action] = np.where(target < 0, np.arange(self.num_cells), target)
+
+        # Alle Kombinationen (r, c, m, a) als Arrays der Form (Schlüssel, Zellen, Masken, Aktionen)
+        masks = np.arange(self.num_masks).reshape(1, 1, self.num_masks, 1)
+        required_bit = (1 << np.arange(self.num_keys)).reshape(self.num_keys, 1, 1, 1)
+        target_cell = next_cell.reshape(1, self.num_cells, 1, -1)
+        wall = hits_wall.reshape(1, self.num_cells, 1, -1)
+        target_key = key_bit[target_cell]
+        target_door = is_door[target_cell]
+
+        new_key = (target_key & ~masks) != 0
+        next_mask = masks | target_key
+        success = target_door & ((masks & required_bit) != 0) & ~wall
+
+        reward = np.full((self.num_keys, self.num_cells, self.num_masks, len(ACTION_VECTORS)),
+                         logic.REWARD_STEP, dtype=np.float64)
+        reward = reward + np.where(new_key & ~wall, logic.REWARD_KEY_COLLECTED, 0.0)
+        reward = reward + np.where(success, logic.REWARD_EXIT_SUCCESS, 0.0)
+        reward = reward + np.where(target_door & ~success & ~wall, logic.REWARD_EXIT_NO_KEY, 0.0)
+        reward = np.where(wall, logic.REWARD_WALL_HIT, reward)
+
+        required_index = np.arange(self.num_keys).reshape(-1, 1, 1, 1)
+        self.next_state = ((required_index * self.num_cells + target_cell) * self.num_masks + next_mask).reshape(-1, len(ACTION_VECTORS))
+        self.rewards = reward.reshape(-1, len(ACTION_VECTORS))
+        self.terminal = np.broadcast_to(success, reward.shape).reshape(-1, len(ACTION_VECTORS))
+        self.num_states = self.rewards.shape[0]
+
+    def solve(self, method='policy', tolerance=1e-6, max_iterations=100000):
+        """
+        Löst das MDP und setzt self.values und self.q.
+        Args:
+            method: 'policy' (Policy Iteration, schnell auch auf großen Maps) oder 'value' (Value Iteration).
+            tolerance: Abbruchgrenze der Value Iteration (größte Änderung pro Iteration).
+        Returns:
+            Die Anzahl der Iterationen.
+        """
+        if method == 'policy':
+            return self._policy_iteration(max_iterations)
+        if method != 'value':
+            raise ValueError(f"Unbekanntes Verfahren: {method}")
+
+        values = np.zeros(self.num_states)
+        continuation = self.gamma * (~self.terminal)
+        for iteration in range(1, max_iterations + 1):
+            q = self.rewards + continuation * values[self.next_state]
+            new_values = q.max(axis=1)
+            delta = np.abs(new_values - values).max()
+            values = new_values
+            if delta < tolerance:
+                break
+        self._set_values(values)
+        return iteration
+
+    def _set_values(self, values):
+        self.values = values
+        self.q = self.rewards + self.gamma * (~self.terminal) * values[self.next_state]
+
+    def evaluate_policy(self, policy):
+        """
+        Berechnet die Werte einer deterministischen Strategie (eine Aktion pro Zustand) exakt.
+        Da jeder Zustand genau einen Nachfolger hat, werden Belohnungen und Diskontierung per
+        Pointer-Doubling über 2, 4, 8, ... Schritte zusammengefasst (O(Zustände * log Pfadlänge)).
+        """
+        states = np.arange(self.num_states)
+        accumulated = self.rewards[states, policy].copy()
+        discount = self.gamma * ~self.terminal[states, policy]
+        jump = self.next_state[states, policy]
+        # Ab hier ist der Rest (discount * Wert nach 2^k Schritten) vernachlässigbar
+        while discount.max() > 1e-12:
+            accumulated = accumulated + discount * accumulated[jump]
+            discount = discount * discount[jump]
+            jump = jump[jump]
+        return accumulated
+
+    def _policy_iteration(self, max_iterations):
+        """Policy Iteration: exakt bewerten, gierig verbessern, bis sich nichts mehr ändert."""
+        states = np.arange(self.num_states)
+        policy = np.zeros(self.num_states, dtype=np.int64)
+        continuation = self.gamma * (~self.terminal)
+        for iteration in range(1, max_iterations + 1):
+            values = self.evaluate_policy(policy)
+            q = self.rewards + continuation * values[self.next_state]
+            best = q.argmax(axis=1)
+            # Nur bei echter Verbesserung wechseln, sonst endet die Schleife bei Gleichstand nie
+            improved = q[states, best] > q[states, policy] + 1e-9
+            if not improved.any():
+                break
+            policy = np.where(improved, best, policy)
+        self._set_values(values)
+        return iteration
+
+    def state_index(self, x, y, keys_mask, required_key):
+        """Flacher Zustandsindex für Position, Schlüsselmaske und benötigten Schlüssel (Name)."""
+        cell = self.cell_of[y, x]
+        if cell < 0:
+            raise ValueError(f"({x}, {y}) ist eine Wand.")
+        required_index = self.key_names.index(required_key)
+        return (required_index * self.num_cells + cell) * self.num_masks + keys_mask
+
+    def keys_mask(self, collected_keys):
+        """Wandelt eine Menge gesammelter Schlüsselnamen in die Schlüsselmaske um."""
+        return sum(1 << bit for bit, key_name in enumerate(self.key_names) if key_name in collected_keys)
+
+    def q_values(self, x, y, keys_mask, required_key):
+        """Gibt die exakten Q-Werte der vier Aktionen zurück (Reihenfolge wie Agent.actions)."""
+        return self.q[self.state_index(x, y, keys_mask, required_key)]
+
+    def current_q_values(self):
+        """Exakte Q-Werte für den aktuellen Zustand der MazeLogic-Instanz."""
+        logic = self.maze_logic
+        return self.q_values(logic.player_pos['x'], logic.player_pos['y'],
+                             logic.keys_mask, logic.required_exit_key)
+
+    def optimal_path_length(self, start_x, start_y, required_key, max_steps=100000):
+        """Anzahl der Schritte, die die optimale Strategie vom Start (ohne Schlüssel) bis zum Ziel braucht."""
+        state = self.state_index(start_x, start_y, 0, required_key)
+        for steps in range(1, max_steps + 1):
+            action = int(self.q[state].argmax())
+            if self.terminal[state, action]:
+                return steps
+            state = self.next_state[state, action]
+        return None
+
+    def observation(self, x, y, keys_mask):
+        """
+        Erzeugt die 5x5-Beobachtung (wie MazeLogic.get_state_representation) für den Spieler auf (x, y)
+        mit den Schlüsseln aus keys_mask bereits eingesammelt (deren Felder sind dann leer).
+        """
+        logic = self.maze_logic
+        maze = self.layout
+        collected_chars = {logic.key_types[name]['char'] for bit, name in enumerate(self.key_names) if keys_mask >> bit & 1}
+        values = logic.char_to_numeric_map
+        radius = logic.vision_radius
+        observation = []
+        for r_offset in range(-radius, radius + 1):
+            for c_offset in range(-radius, radius + 1):
+                cell_x, cell_y = x + c_offset, y + r_offset
+                if r_offset == 0 and c_offset == 0:
+                    observation.append(values['S'])
+                elif 0 <= cell_x < self.width and 0 <= cell_y < self.height:
+                    cell = maze[cell_y][cell_x]
+                    if cell in collected_chars:
+                        cell = ' ' # Eingesammelter Schlüssel
+                    observation.append(values.get(cell, 0.0))
+                else:
+                    observation.append(values['W'])
+        return observation
+
+    def training_data(self, required_key=None):
+        """
+        Beobachtungen und exakte Q-Werte für alle (Zelle, Schlüsselmaske) eines benötigten Schlüssels
+        (Standard: der der aktuellen Episode). Zum Vortrainieren des QNetwork.
+        Returns:
+            (observations float32 [M, 25], q_values float32 [M, 4])
+        """
+        if required_key is None:
+            required_key = self.maze_logic.required_exit_key
+        observations, targets = [], []
+        for cell in range(self.num_cells):
+            x, y = int(self.cell_xs[cell]), int(self.cell_ys[cell])
+            for keys_mask in range(self.num_masks):
+                observations.append(self.observation(x, y, keys_mask))
+                targets.append(self.q_values(x, y, keys_mask, required_key))
+        return np.array(observations, dtype=np.float32), np.array(targets, dtype=np.float32)
+
+
+def pretrain_q_network(agent, solver, epochs=500, learning_rate=0.001):
+    """
+    Trainiert das Policy-Netz des Agenten per Regression auf die exakten Q-Werte und übernimmt
+    die Gewichte ins Target-Netz. Returns: der letzte Verlust (MSE).
+    """
+    import torch
+
+    observations, targets = solver.training_data()
+    observations = torch.from_numpy(observations)
+    targets = torch.from_numpy(targets)
+    optimizer = torch.optim.Adam(agent.policy_net.parameters(), lr=learning_rate)
+    loss_fn = torch.nn.MSELoss()
+    for _ in range(epochs):
+        loss = loss_fn(agent.policy_net(observations), targets)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    agent.target_net.load_state_dict(agent.policy_net.state_dict())
+    return loss.item()
+
+
+def compare_with_network(agent, solver, required_key=None):
+    """
+    Vergleicht die Q-Werte des Netzes mit den exakten Werten über alle (Zelle, Schlüsselmaske).
+    Returns:
+        Dictionary mit mittlerem absolutem Fehler und dem Anteil der Zustände, in denen die
+        gierige Aktion des Netzes optimal ist.
+    """
+    import torch
+
+    observations, targets = solver.training_data(required_key)
+    with torch.no_grad():
+        predicted = agent.policy_net(torch.from_numpy(observations)).numpy()
+    best = targets.max(axis=1)
+    chosen = targets[np.arange(len(targets)), predicted.argmax(axis=1)]
+    return {
+        'mean_abs_error': float(np.abs(predicted - targets).mean()),
+        'optimal_action_rate': float(np.mean(np.isclose(chosen, best))),
+        'states': len(targets),
+    }
+
+
+def main(argv=None):
+    from game.maze_logic import MazeLogic
+    from ai.agent import Agent
+
+    parser = argparse.ArgumentParser(description="Exakte Value Iteration für eine Map")
+    parser.add_argument("map", help="Pfad zur .map-Datei")
+    parser.add_argument("--seed", type=int, default=0, help="Seed für die Platzierung der Gegenstände")
+    parser.add_argument("--pretrain", action="store_true", help="QNetwork auf die exakten Q-Werte vortrainieren")
+    args = parser.parse_args(argv)
+
+    logic = MazeLogic()
+    if not logic.load_maze_from_file(args.map, seed=args.seed):
+        raise SystemExit(f"Map konnte nicht geladen werden: {args.map}")
+
+    started = time.perf_counter()
+    solver = ValueIterationSolver(logic, gamma=0.99)
+    iterations = solver.solve()
+    elapsed = time.perf_counter() - started
+    start = logic.start_pos
+    print(f"{solver.num_states} Zustände, {iterations} Iterationen, {elapsed:.2f}s")
+    print(f"V(Start) = {solver.values[solver.state_index(start['x'], start['y'], 0, logic.required_exit_key)]:.1f}, "
+          f"optimale Schritte: {solver.optimal_path_length(start['x'], start['y'], logic.required_exit_key)}")
+
+    agent = Agent(logic, seed=args.seed)
+    agent.load_model()
+    print(f"DQN vs. exakt: {compare_with_network(agent, solver)}")
+    if args.pretrain:
+        loss = pretrain_q_network(agent, solver)
+        print(f"Nach Vortraining (MSE {loss:.1f}): {compare_with_network(agent, solver)}")
+        agent.save_model()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/harness.py
+# Kleines Mess-Framework für die Benchmark-Suite (ohne externe Abhängigkeiten).
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+# Registry aller Benchmarks: Name -> Funktion
+BENCHMARKS = {}
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def benchmark(name):
+    """
+    Dekorator, der eine Benchmark-Funktion registriert.
+    Die Funktion bekommt einen Seed und gibt ein Tupel (run, ops_per_call) zurück:
+    'run' ist die zu messende Funktion ohne Argumente, 'ops_per_call' die Anzahl
+    der Operationen, die ein Aufruf von 'run' ausführt (z.B. Schritte, Frames).
+    """
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@contextlib.contextmanager
+def quiet():
+    """Unterdrückt die (zahlreichen) DEBUG-Ausgaben des Spiels während einer Messung."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(run, ops_per_call=1, repeat=5, min_time=0.2):
+    """
+    Misst eine Funktion mehrfach und gibt Statistiken zurück.
+    Jede Wiederholung ruft 'run' so oft auf, bis mindestens 'min_time' Sekunden vergangen sind.
+    """
+    # Aufwärmen (z.B. Caches, Lazy-Initialisierung von Torch)
+    with quiet():
+        run()
+
+    per_op_times = []
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        with quiet():
+            while True:
+                run()
+                calls += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_time:
+                    break
+        per_op_times.append(elapsed / (calls * ops_per_call))
+
+    mean = statistics.mean(per_op_times)
+    return {
+        'mean_s': mean,
+        'min_s': min(per_op_times),
+        'stdev_s': statistics.stdev(per_op_times) if len(per_op_times) > 1 else 0.0,
+        'ops_per_s': 1.0 / mean if mean > 0 else float('inf'),
+        'repeat': repeat,
+    }
+
+
+def _git_revision():
+    """Gibt den aktuellen Git-Commit zurück (oder None, wenn nicht verfügbar)."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def machine_info():
+    """Sammelt Informationen über die Umgebung, damit Ergebnisse vergleichbar bleiben."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'git_revision': _git_revision(),
+    }
+
+
+def save_results(results, seed):
+    """Speichert die Ergebnisse als JSON im 'results'-Ordner und gibt den Pfad zurück."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    filepath = os.path.join(RESULTS_DIR, f"{timestamp}.json")
+    with open(filepath, 'w') as f:
+        json.dump({
+            'timestamp': timestamp,
+            'seed': seed,
+            'machine': machine_info(),
+            'results': results,
+        }, f, indent=2)
+    return filepath
+
+
+def load_results(filepath):
+    """Lädt eine gespeicherte Ergebnisdatei."""
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def latest_results_file(exclude=None):
+    """Gibt die neueste gespeicherte Ergebnisdatei zurück (optional ohne 'exclude')."""
+    if not os.path.exists(RESULTS_DIR):
+        return None
+    files = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith('.json'))
+    files = [os.path.join(RESULTS_DIR, f) for f in files]
+    if exclude:
+        files = [f for f in files if os.path.abspath(f) != os.path.abspath(exclude)]
+    return files[-1] if files else None
+
+
+def format_table(results, baseline=None):
+    """Formatiert die Ergebnisse als Texttabelle, optional mit Vergleich zu einer Baseline."""
+    name_width = max([45] + [len(name) for name in results])
+    lines = [f"{'Benchmark':<{name_width}} {'ops/s':>14} {'mean':>12} {'stdev':>10} {'Δ vs. Baseline':>16}"]
+    for name, stats in results.items():
+        delta = ""
+        if baseline and name in baseline:
+            old = baseline[name]['ops_per_s']
+            if old:
+                delta = f"{(stats['ops_per_s'] / old - 1.0) * 100:+.1f}%"
+        lines.append(
+            f"{name:<{name_width}} {stats['ops_per_s']:>14.1f} {stats['mean_s'] * 1e6:>10.1f}µs "
+            f"{stats['stdev_s'] * 1e6:>8.1f}µs {delta:>16}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,449 @@
+# benchmarks/run_benchmarks.py
+# Reproduzierbare Benchmark-Suite für die Hot Paths von Umgebung, Generator, Replay und Renderer.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m benchmarks.run_benchmarks                 # alle Benchmarks, Ergebnis wird gespeichert
+#   python -m benchmarks.run_benchmarks -k maze_logic   # nur Benchmarks, deren Name 'maze_logic' enthält
+#   python -m benchmarks.run_benchmarks --compare datei.json
+
+import os
+# Der Renderer-Benchmark läuft ohne Bildschirm
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import random
+import sys
+import tempfile
+
+import numpy as np
+import torch
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter
+
+from benchmarks.harness import (
+    BENCHMARKS, benchmark, measure, quiet, save_results, load_results,
+    latest_results_file, format_table
+)
+from game.maze_logic import MazeLogic
+from ui.maze_generator import MazeGenerator
+from game.junction_graph import JunctionGraph
+from game.path_hierarchy import PathHierarchy
+from ai.agent import Agent, ReplayBuffer
+from ai.compact_replay import CompactReplayBuffer
+from ai.mmap_replay import MmapReplayBuffer
+from ai.novelty import NoveltyBonus
+from ai.fast_inference import INFERENCE_MODES, make_inference_network
+from ai.offline_dataset import DatasetWriter, OfflineDataset
+
+DEFAULT_SEED = 1234
+GENERATOR_SIZES = [15, 51, 101]
+MAP_SIZES = [15, 51, 101]
+LARGE_MAP_SIZE = 1001 # Für den Palettenrenderer; zu groß für den Generator, daher zufällig gefüllt
+
+
+def seed_everything(seed):
+    """Setzt alle globalen Zufallsquellen, damit jeder Benchmark dieselben Eingaben sieht."""
+    random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def write_map(maze_data, directory, name):
+    """Schreibt ein Labyrinth im .map-Format und gibt den Dateipfad zurück."""
+    filepath = os.path.join(directory, f"{name}.map")
+    with open(filepath, 'w') as f:
+        for row in maze_data:
+            f.write("".join(row) + "\n")
+    return filepath
+
+
+def make_map_file(size, seed, directory):
+    """Erzeugt ein geseedetes Labyrinth der Größe size x size inklusive Start und Ende."""
+    generator = MazeGenerator(seed=seed)
+    with quiet():
+        maze_data = generator.add_elements_to_maze(generator.generate_maze(size, size))
+    return write_map(maze_data, directory, f"bench_{size}x{size}")
+
+
+def make_random_map_file(size, seed, directory, start=(1, 1)):
+    """
+    Erzeugt schnell eine große Map (Rand aus Wänden, innen zufällige Wände, Start und Ende).
+    Kein echtes Labyrinth, aber für Renderer-Benchmarks ausreichend.
+    """
+    rng = random.Random(seed)
+    maze_data = [['W' if x in (0, size - 1) or y in (0, size - 1) or rng.random() < 0.3 else ' '
+                  for x in range(size)] for y in range(size)]
+    maze_data[start[1]][start[0]] = 'S'
+    maze_data[size - 2][size - 2] = 'E'
+    return write_map(maze_data, directory, f"random_{size}x{size}_{start[0]}_{start[1]}")
+
+
+def make_loaded_logic(size, seed, directory, random_layout=False):
+    """Erzeugt ein MazeLogic-Objekt mit einem geladenen, geseedeten Labyrinth."""
+    if random_layout:
+        filepath = make_random_map_file(size, seed, directory)
+    else:
+        filepath = make_map_file(size, seed, directory)
+    logic = MazeLogic(seed=seed)
+    with quiet():
+        logic.load_maze_from_file(filepath)
+    return logic
+
+
+def _register_generator_benchmarks():
+    for size in GENERATOR_SIZES:
+        @benchmark(f"maze_generator.generate_maze[{size}x{size}]")
+        def bench_generate(seed, size=size):
+            generator = MazeGenerator(seed=seed)
+            return (lambda: generator.generate_maze(size, size)), 1
+
+
+def _register_load_benchmarks():
+    for size in MAP_SIZES:
+        @benchmark(f"maze_logic.load_maze_from_file[{size}x{size}]")
+        def bench_load(seed, size=size):
+            filepath = make_map_file(size, seed, WORK_DIR)
+            logic = MazeLogic(seed=seed)
+            return (lambda: logic.load_maze_from_file(filepath)), 1
+
+
+@benchmark("maze_logic.move_player[51x51]")
+def bench_move_player(seed):
+    logic = make_loaded_logic(51, seed, WORK_DIR)
+    rng = random.Random(seed)
+    moves = [rng.choice([(0, -1), (0, 1), (-1, 0), (1, 0)]) for _ in range(1000)]
+
+    def run():
+        for dx, dy in moves:
+            if logic.is_game_over():
+                logic.reset_game_for_ai_training()
+            logic.move_player(dx, dy)
+    return run, len(moves)
+
+
+@benchmark(f"maze_logic.move_player[{LARGE_MAP_SIZE}x{LARGE_MAP_SIZE}]")
+def bench_move_player_large(seed):
+    # Start in der Mitte: Kosten pro Zug sollen nicht von der Nähe zur Zelle (0, 0) abhängen
+    center = LARGE_MAP_SIZE // 2
+    logic = MazeLogic(seed=seed)
+    with quiet():
+        logic.load_maze_from_file(make_random_map_file(LARGE_MAP_SIZE, seed, WORK_DIR, start=(center, center)))
+    logic.verbose = False
+    logic.blockSignals(True)
+    logic.LOSS_THRESHOLD = -10**9 # Nur Schritte messen, keine Neustarts durch Wandtreffer
+    rng = random.Random(seed)
+    moves = [rng.choice([(0, -1), (0, 1), (-1, 0), (1, 0)]) for _ in range(1000)]
+
+    def run():
+        for dx, dy in moves:
+            if logic.is_game_over():
+                logic.reset_game_for_ai_training()
+                logic.verbose = False
+            logic.move_player(dx, dy)
+    return run, len(moves)
+
+
+@benchmark("maze_logic.get_state_representation[51x51]")
+def bench_state_representation(seed):
+    logic = make_loaded_logic(51, seed, WORK_DIR)
+
+    def run():
+        for _ in range(1000):
+            logic.get_state_representation()
+    return run, 1000
+
+
+@benchmark("maze_logic.clone_step_restore[101x101]")
+def bench_clone_restore(seed):
+    logic = make_loaded_logic(101, seed, WORK_DIR)
+    logic.verbose = False
+    logic.blockSignals(True)
+    rng = random.Random(seed)
+    moves = [rng.choice([(0, -1), (0, 1), (-1, 0), (1, 0)]) for _ in range(1000)]
+
+    def run():
+        root = logic.clone_state()
+        for i in range(0, 1000, 10):
+            for dx, dy in moves[i:i + 10]:
+                logic.move_player(dx, dy)
+            logic.restore_state(root)
+    return run, 100
+
+
+@benchmark("value_iteration.solve[101x101]")
+def bench_value_iteration(seed):
+    from ai.value_iteration import ValueIterationSolver
+    logic = make_loaded_logic(101, seed, WORK_DIR)
+
+    def run():
+        ValueIterationSolver(logic).solve()
+    return run, 1
+
+
+@benchmark("junction_graph.build[101x101]")
+def bench_junction_graph(seed):
+    logic = make_loaded_logic(101, seed, WORK_DIR)
+    return (lambda: JunctionGraph(logic.maze)), 1
+
+
+@benchmark("path_hierarchy.build[101x101]")
+def bench_path_hierarchy_build(seed):
+    loaded_map = make_loaded_logic(101, seed, WORK_DIR).loaded_map
+    return (lambda: PathHierarchy(loaded_map.rows, exit_distances=loaded_map.exit_distances)), 1
+
+
+@benchmark("path_hierarchy.find_path[101x101]")
+def bench_path_hierarchy_find_path(seed):
+    loaded_map = make_loaded_logic(101, seed, WORK_DIR).loaded_map
+    hierarchy = PathHierarchy(loaded_map.rows, exit_distances=loaded_map.exit_distances)
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(loaded_map.height) for x in range(loaded_map.width) if hierarchy.is_walkable(x, y)]
+    pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(100)]
+
+    def run():
+        hierarchy.clear_cache() # Ohne Cache messen, sonst treffen alle Wiederholungen
+        for start, goal in pairs:
+            hierarchy.find_path(start, goal)
+    return run, len(pairs)
+
+
+@benchmark("replay_buffer.push")
+def bench_replay_push(seed):
+    rng = random.Random(seed)
+    buffer = ReplayBuffer(capacity=10000)
+    state = [rng.uniform(-1.0, 1.0) for _ in range(25)]
+    next_state = [rng.uniform(-1.0, 1.0) for _ in range(25)]
+
+    def run():
+        for i in range(1000):
+            buffer.push(state, i % 4, -0.01, next_state, False)
+    return run, 1000
+
+
+@benchmark("replay_buffer.sample[batch=64]")
+def bench_replay_sample(seed):
+    rng = random.Random(seed)
+    buffer = ReplayBuffer(capacity=10000, rng=random.Random(seed))
+    for i in range(10000):
+        state = [rng.uniform(-1.0, 1.0) for _ in range(25)]
+        buffer.push(state, i % 4, -0.01, state, False)
+    return (lambda: buffer.sample(64)), 1
+
+
+@benchmark("replay_buffer.sample_arrays[batch=64]")
+def bench_replay_sample_arrays(seed):
+    rng = random.Random(seed)
+    buffer = ReplayBuffer(capacity=10000, rng=random.Random(seed))
+    for i in range(10000):
+        state = [rng.uniform(-1.0, 1.0) for _ in range(25)]
+        buffer.push(state, i % 4, -0.01, state, False)
+    return (lambda: buffer.sample_arrays(64)), 1
+
+
+@benchmark("compact_replay.sample_arrays[batch=64]")
+def bench_compact_replay_sample(seed):
+    logic = make_loaded_logic(101, seed, WORK_DIR)
+    logic.verbose = False
+    buffer = CompactReplayBuffer(capacity=10000, maze_logic=logic, seed=seed)
+    rng = random.Random(seed)
+    actions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+    with quiet():
+        state = buffer.encode()
+        for i in range(10000):
+            action = rng.randrange(4)
+            reward, done = logic.move_player(*actions[action])
+            next_state = buffer.encode()
+            buffer.push(state, action, reward, next_state, done)
+            if done:
+                logic.reset_game_for_ai_training()
+                next_state = buffer.encode()
+            state = next_state
+    return (lambda: buffer.sample_arrays(64)), 1
+
+
+@benchmark("mmap_replay.sample_arrays[batch=64, 1M]")
+def bench_mmap_replay_sample(seed):
+    directory = os.path.join(WORK_DIR, f"mmap_replay_{seed}")
+    values = MazeLogic().char_to_numeric_map.values()
+    buffer = MmapReplayBuffer(directory, capacity=1_000_000, values=values, seed=seed)
+    if buffer.size < buffer.capacity:
+        # Direkt in die Datei schreiben, push() pro Übergang wäre hier zu langsam
+        rng = np.random.default_rng(seed)
+        buffer.records['state'] = rng.integers(0, len(buffer.values), size=buffer.records['state'].shape)
+        buffer.records['next_state'] = buffer.records['state']
+        buffer.records['action'] = rng.integers(0, 4, size=buffer.capacity)
+        buffer.records['reward'] = rng.uniform(-10.0, 10.0, size=buffer.capacity)
+        buffer.counters[:] = (0, buffer.capacity)
+        buffer.flush()
+    return (lambda: buffer.sample_arrays(64)), 1
+
+
+@benchmark("offline_dataset.batches[batch=64, 256k]")
+def bench_offline_dataset_batches(seed):
+    directory = os.path.join(WORK_DIR, f"offline_dataset_{seed}")
+    if not os.path.isdir(directory):
+        # Vier volle Shards mit zufälligen Übergängen direkt in die Spalten des Writers schreiben
+        logic = MazeLogic()
+        writer = DatasetWriter(directory, "bench", logic.char_to_numeric_map.values(), 25)
+        rng = np.random.default_rng(seed)
+        for _ in range(4):
+            writer.states[:] = rng.integers(0, 6, size=writer.states.shape)
+            writer.next_states[:] = writer.states
+            writer.actions[:] = rng.integers(0, 4, size=writer.shard_size)
+            writer.rewards[:] = rng.uniform(-10.0, 10.0, size=writer.shard_size)
+            writer.count = writer.shard_size
+            writer.flush()
+    batches = OfflineDataset(directory).batches(64, epochs=None, seed=seed)
+    return (lambda: next(batches)), 1
+
+
+@benchmark("novelty.observe[batch=256]")
+def bench_novelty_observe(seed):
+    # Zustände von 256 Umgebungen gleichzeitig auf einer 1001x1001-Map
+    rng = np.random.default_rng(seed)
+    novelty = NoveltyBonus(scale=1.0)
+    keys = NoveltyBonus.state_keys(np.full(256, 12345), rng.integers(0, 1001, 256),
+                                   rng.integers(0, 1001, 256), rng.integers(0, 8, 256))
+    return (lambda: novelty.observe(keys)), 1
+
+
+@benchmark("novelty.bonus")
+def bench_novelty_bonus(seed):
+    logic = make_loaded_logic(51, seed, WORK_DIR)
+    novelty = NoveltyBonus(scale=1.0)
+    return (lambda: novelty.bonus(logic)), 1
+
+
+@benchmark("agent.learn[batch=64]")
+def bench_agent_learn(seed):
+    logic = make_loaded_logic(15, seed, WORK_DIR)
+    agent = Agent(logic, model_path=os.path.join(WORK_DIR, "bench_model.pth"), seed=seed)
+    rng = random.Random(seed)
+    for i in range(1000):
+        state = [rng.uniform(-1.0, 1.0) for _ in range(agent.input_size)]
+        agent.replay_buffer.push(state, i % 4, rng.uniform(-10.0, 10.0), state, i % 50 == 0)
+    state = [rng.uniform(-1.0, 1.0) for _ in range(agent.input_size)]
+    return (lambda: agent.learn(state, 0, -0.01, state, False)), 1
+
+
+def _register_inference_benchmarks():
+    # Ein Zug auf einem schwachen Rechner: eine Beobachtung pro Aufruf (Genauigkeit: python -m ai.fast_inference)
+    for mode in INFERENCE_MODES:
+        @benchmark(f"qnetwork.forward[{mode},batch=1]")
+        def bench_qnetwork_forward(seed, mode=mode):
+            logic = make_loaded_logic(15, seed, WORK_DIR)
+            agent = Agent(logic, model_path=os.path.join(WORK_DIR, "bench_model.pth"), seed=seed)
+            network = make_inference_network(agent.policy_net, mode)
+            state_tensor = torch.tensor([logic.get_state_representation()], dtype=torch.float32)
+
+            def run():
+                with torch.no_grad():
+                    return network(state_tensor)
+            return run, 1
+
+
+@benchmark("agent.choose_action[numpy,greedy]")
+def bench_agent_choose_action(seed):
+    logic = make_loaded_logic(15, seed, WORK_DIR)
+    agent = Agent(logic, model_path=os.path.join(WORK_DIR, "bench_model.pth"), seed=seed, inference_mode="numpy")
+    agent.epsilon = 0.0
+    state = logic.get_state_representation()
+    return (lambda: agent.choose_action(state)), 1
+
+
+def _make_paint_run(logic, render_mode=None, maze_changes=False):
+    """Gibt eine Funktion zurück, die das Spielfeld einmal offscreen zeichnet."""
+    # Import erst hier, damit die QApplication vor dem ersten Widget existiert
+    from ui.game_board_widget import GameBoardWidget
+    widget = GameBoardWidget(logic)
+    if render_mode is not None:
+        widget.set_render_mode(render_mode)
+    widget.resize(800, 600)
+    image = QImage(800, 600, QImage.Format.Format_ARGB32_Premultiplied)
+
+    def run():
+        if maze_changes:
+            logic.maze_updated.emit() # Wie nach einem Zug: Palettenbild muss neu aufgebaut werden
+        painter = QPainter(image)
+        widget.render(painter)
+        painter.end()
+    run.widget = widget
+    return run
+
+
+def _register_paint_benchmarks():
+    for size in MAP_SIZES:
+        @benchmark(f"game_board_widget.paintEvent[{size}x{size}]")
+        def bench_paint(seed, size=size):
+            return _make_paint_run(make_loaded_logic(size, seed, WORK_DIR), maze_changes=True), 1
+
+    @benchmark(f"game_board_widget.paintEvent[classic,{MAP_SIZES[-1]}x{MAP_SIZES[-1]}]")
+    def bench_paint_classic(seed):
+        logic = make_loaded_logic(MAP_SIZES[-1], seed, WORK_DIR)
+        return _make_paint_run(logic, render_mode='classic'), 1
+
+    @benchmark(f"game_board_widget.paintEvent[{LARGE_MAP_SIZE}x{LARGE_MAP_SIZE}]")
+    def bench_paint_large(seed):
+        logic = make_loaded_logic(LARGE_MAP_SIZE, seed, WORK_DIR, random_layout=True)
+        return _make_paint_run(logic, maze_changes=True), 1
+
+    @benchmark(f"game_board_widget.paintEvent[{LARGE_MAP_SIZE}x{LARGE_MAP_SIZE},zoom8,follow]")
+    def bench_paint_large_zoomed(seed):
+        logic = make_loaded_logic(LARGE_MAP_SIZE, seed, WORK_DIR, random_layout=True)
+        run = _make_paint_run(logic)
+        widget = run.widget
+        widget.set_follow_player(True)
+        widget.zoom_by(8)
+        return run, 1
+
+
+WORK_DIR = None
+
+
+def main(argv=None):
+    global WORK_DIR
+
+    parser = argparse.ArgumentParser(description="Benchmark-Suite für Maze-AI")
+    parser.add_argument("-k", "--filter", default="", help="Nur Benchmarks, deren Name diesen Text enthält")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed für alle Eingaben")
+    parser.add_argument("--repeat", type=int, default=5, help="Anzahl Wiederholungen pro Benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Mindestdauer einer Wiederholung in Sekunden")
+    parser.add_argument("--compare", default=None, help="Ergebnisdatei, mit der verglichen wird (Standard: letzte gespeicherte)")
+    parser.add_argument("--no-save", action="store_true", help="Ergebnisse nicht speichern")
+    args = parser.parse_args(argv)
+
+    # Ein Thread für Torch, damit die Messungen stabil bleiben
+    torch.set_num_threads(1)
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    _register_generator_benchmarks()
+    _register_load_benchmarks()
+    _register_inference_benchmarks()
+    _register_paint_benchmarks()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        WORK_DIR = work_dir
+        for name in sorted(BENCHMARKS):
+            if args.filter not in name:
+                continue
+            seed_everything(args.seed)
+            with quiet():
+                run, ops = BENCHMARKS[name](args.seed)
+            results[name] = measure(run, ops, repeat=args.repeat, min_time=args.min_time)
+            print(f"{name}: {results[name]['ops_per_s']:.1f} ops/s")
+
+    baseline_file = args.compare or latest_results_file()
+    baseline = load_results(baseline_file)['results'] if baseline_file else None
+
+    print()
+    print(format_table(results, baseline))
+    if baseline_file:
+        print(f"\nBaseline: {baseline_file}")
+
+    if not args.no_save:
+        print(f"Ergebnisse gespeichert unter: {save_results(results, args.seed)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
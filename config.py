@@ -0,0 +1,119 @@
+# config.py
+# Globale Einstellungen für das Spiel und das KI-Training.
+
+from dataclasses import dataclass, field, asdict, fields, replace
+
+# Seed, aus dem alle Zufallsquellen eines Laufs abgeleitet werden (Umgebung, Generator, Agent).
+# None bedeutet: bei jedem Programmstart wird ein neuer zufälliger Seed gewählt.
+RUN_SEED = None
+
+# Wenn True, folgt jede Aktion der KI dem Gang bis zur nächsten Kreuzung, Sackgasse oder zum nächsten
+# Gegenstand (Makro-Aktionen, siehe game/junction_graph.py). Spart auf großen Labyrinthen die meisten Entscheidungen.
+MACRO_ACTIONS = False
+
+# Wenn True, speichert der Replay Buffer der KI nur Position und eingesammelte Gegenstände pro Übergang
+# und rekonstruiert die Beobachtungen beim Lernen (siehe ai/compact_replay.py). Braucht weniger als ein Zehntel
+# des Speichers pro Übergang, dafür fasst der Puffer zehnmal so viele Übergänge.
+COMPACT_REPLAY = False
+
+# Verzeichnis für einen Replay Buffer auf der Festplatte (speicherabgebildete Dateien, siehe ai/mmap_replay.py).
+# Bleibt über Neustarts erhalten und kann sehr viel größer als der Arbeitsspeicher werden. None = im Arbeitsspeicher.
+REPLAY_DIR = None
+# Kapazität des Replay Buffers auf der Festplatte in Übergängen (58 Bytes pro Übergang; gilt nur beim ersten Anlegen).
+REPLAY_DISK_CAPACITY = 10_000_000
+
+# Verzeichnis für einen Offline-Datensatz (siehe ai/offline_dataset.py). Wenn gesetzt, wird jeder Zug im Spielfenster
+# (Quelle "human") und der KI (Quelle "ai") mit Beobachtungen gespeichert, um später neue Netze ohne erneutes
+# Spielen zu trainieren. None = nichts speichern.
+DATASET_DIR = None
+
+# Wenn True, werden auch die Episoden der KI als .traj-Dateien im Replay-Ordner gespeichert (sonst nur eigene Spiele).
+# Beim Training entstehen so sehr viele Dateien; es bleiben nur die neuesten AI_REPLAY_LIMIT erhalten.
+RECORD_AI_EPISODES = False
+AI_REPLAY_LIMIT = 200
+
+# Lernschritte pro Umgebungsschritt, wenn die KI in einem eigenen Lern-Thread lernen soll (siehe ai/async_learner.py),
+# z.B. 0.25 oder 4. None = wie bisher genau ein Lernschritt pro Zug im Trainings-Thread.
+REPLAY_RATIO = None
+
+# Maps (Dateien oder Verzeichnisse), auf denen das gespeicherte Modell während des Trainings im Hintergrund
+# bewertet wird (siehe ai/evaluation.py). Sollten nicht zum Training verwendet werden. None = keine Bewertung.
+EVAL_MAPS = None
+# Nach wie vielen beendeten KI-Episoden jeweils eine Bewertung gestartet wird.
+EVAL_EVERY_EPISODES = 10
+
+# Adresse eines lokalen Inferenz-Dienstes (python -m ai.inference_server), z.B. "unix:/tmp/maze-ai.sock" oder
+# "127.0.0.1:8765". Wenn gesetzt, fragt die KI den Dienst nach ihren Zügen und lernt selbst nicht mit
+# (für viele Instanzen im "KI spielt"-Modus). None = eigenes Modell, wie bisher.
+INFERENCE_SERVER = None
+
+# Schnelle Inferenz für Rechner, die nur spielen (siehe ai/fast_inference.py): "numpy" (exakt, ohne Torch-Overhead
+# pro Schicht) oder "quantized" (fc1+ReLU fusioniert, dynamisch int8). Wenn gesetzt, lernt die KI nicht mit.
+# None = float32-Modell wie bisher.
+INFERENCE_MODE = None
+
+
+# --- Laufkonfiguration: Hyperparameter des Agenten und Belohnungen der Spiellogik ---
+# Der Sweep-Runner (ai/sweep.py) erzeugt Varianten davon, z.B. {"agent.gamma": 0.95}.
+
+@dataclass
+class AgentConfig:
+    """Hyperparameter des DQN-Agenten (ai/agent.py)."""
+    gamma: float = 0.99 # Diskontierungsfaktor
+    learning_rate: float = 0.001 # Lernrate von Adam
+    hidden_size: int = 128 # Neuronen der versteckten Schicht des QNetwork
+    epsilon_start: float = 1.0 # Startwert für Exploration
+    epsilon_decay: float = 0.995 # Epsilon-Abnahme pro Lernschritt
+    epsilon_min: float = 0.05 # Minimale Exploration
+    batch_size: int = 64
+    target_update_frequency: int = 10 # In Lernschritten
+    replay_buffer_size: int = 10000 # Kapazität des Replay Buffers im Arbeitsspeicher
+    novelty_scale: float = 0.0 # Bonus für neue Zustände über Episoden hinweg (siehe ai/novelty.py); 0 = aus
+
+
+@dataclass
+class RewardConfig:
+    """Belohnungen für die KI (MazeLogic.REWARD_*), unabhängig vom Punktestand des Spiels."""
+    step: float = -0.01 # Sehr kleiner Abzug pro Schritt, damit die KI mehr explorieren kann
+    wall_hit: float = -10.0 # Hoher Abzug für Wandkollision
+    key_collected: float = 50.0 # Hohe Belohnung für Schlüssel
+    duck_collected_base: float = 10.0 # Belohnung für Enten (plus Zeitbonus * 0.5)
+    exit_success: float = 1000.0 # Sehr hohe Belohnung für erfolgreichen Abschluss
+    exit_no_key: float = -500.0 # Hoher Abzug für Erreichen des Ziels ohne Schlüssel
+    game_lost: float = -1000.0 # Sehr hoher Abzug für Spielverlust (Erreichen des LOSS_THRESHOLD)
+    revisit_cell: float = -20.0 # Abzug für das erneute Besuchen einer Zelle
+
+
+@dataclass
+class RunConfig:
+    """Alle Einstellungen eines Trainingslaufs."""
+    agent: AgentConfig = field(default_factory=AgentConfig)
+    rewards: RewardConfig = field(default_factory=RewardConfig)
+
+    def to_dict(self):
+        """Verschachteltes Dictionary (z.B. für JSON-Berichte)."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Gegenstück zu to_dict(); fehlende Werte bekommen ihren Standardwert."""
+        return cls(agent=AgentConfig(**data.get('agent', {})), rewards=RewardConfig(**data.get('rewards', {})))
+
+    def with_overrides(self, overrides):
+        """
+        Gibt eine Kopie mit geänderten Werten zurück.
+        Args:
+            overrides: Dictionary {"bereich.name": Wert}, z.B. {"agent.gamma": 0.95, "rewards.wall_hit": -5}.
+        """
+        sections = {'agent': {}, 'rewards': {}}
+        for key, value in overrides.items():
+            section, _, name = key.partition('.')
+            if section not in sections or name not in {f.name for f in fields(getattr(self, section))}:
+                raise KeyError(f"Unbekannte Einstellung: {key}")
+            sections[section][name] = value
+        return RunConfig(agent=replace(self.agent, **sections['agent']),
+                         rewards=replace(self.rewards, **sections['rewards']))
+
+
+# Standardkonfiguration für das Spiel und Skripte
+RUN_CONFIG = RunConfig()
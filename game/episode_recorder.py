@@ -0,0 +1,183 @@
+# game/episode_recorder.py
+# Zeichnet Episoden als (Map, Seed, Aktionsfolge) auf und spielt sie bit-genau wieder ab.
+
+import json
+import os
+from array import array
+from collections import deque
+from datetime import datetime
+
+from game.maze_logic import MazeLogic
+
+# Reihenfolge der Aktionen, identisch zu Agent.actions (0=Hoch, 1=Runter, 2=Links, 3=Rechts)
+ACTION_VECTORS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+ACTION_INDEX = {vector: idx for idx, vector in enumerate(ACTION_VECTORS)}
+
+
+class EpisodeRecord:
+    """
+    Eine aufgezeichnete Episode. Map und Seed legen den Startzustand eindeutig fest,
+    die Aktionsfolge den gesamten Verlauf.
+    """
+
+    def __init__(self, map_path, seed, actions=None, final_score=None, done=False):
+        self.map_path = map_path
+        self.seed = seed
+        self.actions = actions if actions is not None else [] # Aktionsindizes (siehe ACTION_VECTORS)
+        self.final_score = final_score # Punktestand nach dem letzten Zug (zur Kontrolle beim Abspielen)
+        self.done = done # True, wenn die Episode mit Sieg/Niederlage endete
+        self.rewards = array('f') # Belohnung pro Schritt (float32, wie im Trajektorien-Format)
+        self.map_hash = None # SHA-1 der Map-Datei (20 Bytes), erkennt veränderte Maps beim Abspielen
+
+    def __len__(self):
+        return len(self.actions)
+
+    def to_dict(self):
+        return {
+            'map_path': self.map_path,
+            'seed': self.seed,
+            'actions': self.actions,
+            'final_score': self.final_score,
+            'done': self.done,
+            'rewards': list(self.rewards),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls(data['map_path'], data['seed'], list(data['actions']),
+                     data.get('final_score'), data.get('done', False))
+        record.rewards = array('f', data.get('rewards', []))
+        return record
+
+    def save(self, filepath):
+        """Speichert die Episode als JSON-Datei."""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filepath):
+        """Lädt eine als JSON gespeicherte Episode."""
+        with open(filepath, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+class EpisodeRecorder:
+    """
+    Hängt sich an eine MazeLogic-Instanz und schreibt jede Episode mit.
+    MazeLogic ruft start_episode() beim Laden/Zurücksetzen und record_step() nach jedem Zug auf.
+    """
+
+    def __init__(self, maze_logic=None, max_episodes=100, trajectory_dir=None, max_files=None):
+        """
+        Args:
+            maze_logic: Optionale MazeLogic-Instanz, an die sich der Recorder sofort hängt.
+            max_episodes: Wie viele abgeschlossene Episoden im Speicher bleiben.
+            trajectory_dir: Wenn gesetzt, wird jede abgeschlossene Episode dort als .traj-Datei gespeichert.
+            max_files: Wenn gesetzt, bleiben nur die neuesten max_files der von diesem Recorder
+                geschriebenen .traj-Dateien erhalten; ältere werden gelöscht.
+        """
+        self.current = None # Die gerade laufende Episode
+        self.episodes = [] # Abgeschlossene Episoden (die neuesten max_episodes)
+        self.max_episodes = max_episodes
+        self.trajectory_dir = trajectory_dir
+        self.max_files = max_files
+        self._saved_files = deque() # Von diesem Recorder geschriebene Dateien, älteste zuerst
+        if maze_logic is not None:
+            self.attach(maze_logic)
+
+    def attach(self, maze_logic):
+        """Verbindet den Recorder mit einer MazeLogic-Instanz."""
+        maze_logic.episode_recorder = self
+        # Falls bereits eine Map geladen ist, sofort mit der Aufzeichnung beginnen
+        if maze_logic.map_path is not None and maze_logic.episode_seed is not None:
+            self.start_episode(maze_logic.map_path, maze_logic.episode_seed)
+
+    def start_episode(self, map_path, seed):
+        """Beginnt eine neue Episode. Eine laufende Episode wird abgeschlossen."""
+        # Import hier, da game.trajectory seinerseits dieses Modul importiert
+        from game.trajectory import map_file_hash
+
+        self.finish_episode()
+        self.current = EpisodeRecord(map_path, seed)
+        if map_path and os.path.exists(map_path):
+            self.current.map_hash = map_file_hash(map_path)
+
+    def record_step(self, dx, dy, reward, done, score):
+        """Schreibt einen ausgeführten Zug mit."""
+        if self.current is None:
+            return
+        self.current.actions.append(ACTION_INDEX[(dx, dy)])
+        self.current.rewards.append(reward)
+        self.current.final_score = score
+        if done:
+            self.current.done = True
+            self.finish_episode()
+
+    def finish_episode(self):
+        """Schließt die laufende Episode ab (leere Episoden werden verworfen)."""
+        if self.current is not None and self.current.actions:
+            self.episodes.append(self.current)
+            if len(self.episodes) > self.max_episodes:
+                del self.episodes[0]
+            if self.trajectory_dir:
+                self._save_trajectory(self.current)
+        self.current = None
+
+    def _save_trajectory(self, record):
+        """Speichert eine abgeschlossene Episode als .traj-Datei im trajectory_dir."""
+        from game.trajectory import write_trajectory, TRAJECTORY_EXTENSION
+
+        os.makedirs(self.trajectory_dir, exist_ok=True)
+        map_name = os.path.splitext(os.path.basename(record.map_path or "unbekannt"))[0]
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        filepath = os.path.join(self.trajectory_dir, f"{map_name}_{timestamp}_{record.seed}{TRAJECTORY_EXTENSION}")
+        try:
+            write_trajectory(record, filepath)
+        except Exception as e:
+            print(f"Fehler beim Speichern der Trajektorie {filepath}: {e}")
+            return
+        if filepath in self._saved_files: # Gleicher Name innerhalb derselben Sekunde: Datei wurde überschrieben
+            return
+        self._saved_files.append(filepath)
+        while self.max_files is not None and len(self._saved_files) > self.max_files:
+            oldest = self._saved_files.popleft()
+            try:
+                os.remove(oldest)
+            except OSError as e:
+                print(f"Alte Trajektorie {oldest} konnte nicht gelöscht werden: {e}")
+
+    def last_episode(self):
+        """Gibt die zuletzt abgeschlossene Episode zurück (oder None)."""
+        return self.episodes[-1] if self.episodes else None
+
+
+def replay_episode(record, maze_logic=None):
+    """
+    Spielt eine aufgezeichnete Episode ohne Darstellung so schnell wie möglich erneut ab.
+    Args:
+        record: Das EpisodeRecord.
+        maze_logic: Optionale MazeLogic-Instanz (ohne verbundenes UI); sonst wird eine neue erstellt.
+    Returns:
+        Ein Tupel (maze_logic, rewards) mit dem Endzustand und den Belohnungen aller Züge.
+    Raises:
+        ValueError: Wenn die Map nicht geladen werden kann oder der Endstand abweicht.
+    """
+    if maze_logic is None:
+        maze_logic = MazeLogic()
+    if not maze_logic.load_maze_from_file(record.map_path, seed=record.seed):
+        raise ValueError(f"Map für die Wiederholung konnte nicht geladen werden: {record.map_path}")
+
+    rewards = []
+    for action_idx in record.actions:
+        dx, dy = ACTION_VECTORS[action_idx]
+        reward, done = maze_logic.move_player(dx, dy)
+        rewards.append(reward)
+        if done:
+            break
+
+    if record.final_score is not None and maze_logic.get_current_score() != record.final_score:
+        raise ValueError(
+            f"Wiederholung weicht ab: Punktestand {maze_logic.get_current_score()}, "
+            f"aufgezeichnet {record.final_score}."
+        )
+    return maze_logic, rewards
@@ -0,0 +1,194 @@
+# game/highscore_store.py
+# Highscore-Speicher auf Basis von SQLite (ersetzt das Anhängen an .dascores-Textdateien).
+
+import os
+import sqlite3
+from datetime import datetime
+
+
+class HighscoreStore:
+    """
+    Speichert Highscores aller Maps in einer SQLite-Datenbank.
+    Der Index auf (map_name, final_time, score) sorgt dafür, dass Top-N-Abfragen und
+    Seiten auch bei Hunderttausenden Einträgen pro Map sofort beantwortet werden.
+    """
+
+    # Spalten, nach denen sortiert werden darf (Schutz vor SQL-Injection bei ORDER BY)
+    SORT_COLUMNS = ('datetime', 'map_name', 'score', 'final_time', 'raw_time', 'time_bonus')
+
+    def __init__(self, db_path=os.path.join("assets", "scores", "highscores.db")):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        """Legt Tabellen und Indizes an, falls sie noch nicht existieren."""
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS scores (
+                    id INTEGER PRIMARY KEY,
+                    datetime TEXT NOT NULL,
+                    map_name TEXT NOT NULL,
+                    score INTEGER NOT NULL,
+                    final_time INTEGER NOT NULL,
+                    raw_time INTEGER NOT NULL,
+                    time_bonus INTEGER NOT NULL
+                )
+            """)
+            # Standard-Sortierung: angepasste Zeit aufsteigend, dann Punkte absteigend
+            self.connection.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scores_map_time_score
+                ON scores (map_name, final_time, score DESC, id)
+            """)
+            # Weitere Indizes, damit auch das Sortieren nach anderen Spalten (Highscore-Tabelle) ohne Sortierschritt auskommt
+            for column in ('score', 'datetime', 'time_bonus'):
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_scores_map_{column} ON scores (map_name, {column}, id)"
+                )
+            # Merkt sich, welche .dascores-Dateien bereits importiert wurden
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS imported_files (
+                    filename TEXT PRIMARY KEY,
+                    imported_at TEXT NOT NULL
+                )
+            """)
+
+    def close(self):
+        """Schließt die Datenbankverbindung."""
+        self.connection.close()
+
+    def add_score(self, map_name, score, raw_time_seconds, time_bonus, date_time=None):
+        """
+        Speichert einen neuen Highscore.
+        Die angepasste Zeit (Rohzeit minus Zeitbonus, nicht negativ) wird hier berechnet.
+        """
+        if date_time is None:
+            date_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        final_time_seconds = max(0, raw_time_seconds - time_bonus)
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO scores (datetime, map_name, score, final_time, raw_time, time_bonus) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (date_time, map_name, score, final_time_seconds, raw_time_seconds, time_bonus)
+            )
+
+    def count(self, map_name):
+        """Gibt die Anzahl der gespeicherten Highscores einer Map zurück."""
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE map_name = ?", (map_name,)
+        ).fetchone()
+        return row[0]
+
+    def top_scores(self, map_name, limit=10, offset=0):
+        """
+        Gibt die besten Highscores einer Map zurück (angepasste Zeit aufsteigend, Punkte absteigend).
+        Mit 'offset' kann seitenweise geblättert werden.
+        Returns:
+            Liste von Dictionaries mit den Schlüsseln datetime, map_name, score, final_time, raw_time, time_bonus.
+        """
+        return self.query(map_name, limit=limit, offset=offset)
+
+    def query(self, map_name, order_by='final_time', descending=False, limit=100, offset=0, after=None):
+        """
+        Gibt eine Seite von Highscores einer Map in beliebiger Sortierung zurück.
+        Bei Sortierung nach 'final_time' gilt die Standard-Reihenfolge (Punkte absteigend als zweites Kriterium).
+        Args:
+            after: Letzte Zeile der vorherigen Seite (gleiche Sortierung). Die Seite beginnt direkt dahinter;
+                anders als mit 'offset' springt die Datenbank dabei über den Index an die Stelle, statt alle
+                übersprungenen Zeilen zu lesen, und neu eingefügte Highscores verschieben die Seiten nicht.
+        Returns:
+            Liste von Dictionaries mit den Schlüsseln id, datetime, map_name, score, final_time, raw_time, time_bonus.
+        Raises:
+            ValueError: Wenn nach einer unbekannten Spalte sortiert werden soll.
+        """
+        if order_by not in self.SORT_COLUMNS:
+            raise ValueError(f"Unbekannte Sortierspalte: {order_by}")
+        direction = "DESC" if descending else "ASC"
+        if order_by == 'final_time':
+            # Passt zum Index (map_name, final_time, score DESC, id)
+            tie_break = "score DESC, id ASC" if not descending else "score ASC, id DESC"
+            order_clause = f"final_time {direction}, {tie_break}"
+        else:
+            order_clause = f"{order_by} {direction}, id {direction}"
+
+        where_clause, parameters = "map_name = ?", [map_name]
+        if after is not None:
+            keyset_clause, keyset_parameters = self._keyset_condition(order_by, descending, after)
+            where_clause += f" AND {keyset_clause}"
+            parameters += keyset_parameters
+            offset = 0
+        rows = self.connection.execute(
+            "SELECT id, datetime, map_name, score, final_time, raw_time, time_bonus FROM scores "
+            f"WHERE {where_clause} ORDER BY {order_clause} LIMIT ? OFFSET ?",
+            parameters + [limit, offset]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _keyset_condition(order_by, descending, after):
+        """Bedingung 'kommt in der Sortierung nach der Zeile after' für query()."""
+        later = "<" if descending else ">"
+        if order_by == 'final_time':
+            # Punkte laufen entgegengesetzt zur Zeit. Die vorangestellte Bereichsbedingung auf final_time
+            # lässt SQLite direkt im Index (map_name, final_time, score DESC, id) einsteigen.
+            score_later = ">" if descending else "<"
+            return (f"final_time {later}= ? AND (final_time {later} ? OR (final_time = ? AND "
+                    f"(score {score_later} ? OR (score = ? AND id {later} ?))))",
+                    [after['final_time']] * 3 + [after['score']] * 2 + [after['id']])
+        # Zeilenwert-Vergleich, passt zu den Indizes (map_name, Spalte, id)
+        return f"({order_by}, id) {later} (?, ?)", [after[order_by], after['id']]
+
+    def import_dascores(self, scores_dir=os.path.join("assets", "scores")):
+        """
+        Importiert einmalig alle .dascores-Dateien aus dem alten Textformat
+        (Datum_Uhrzeit|MapName|Score|AngepassteZeit|Rohzeit|Zeitbonus).
+        Bereits importierte Dateien werden übersprungen.
+        Returns:
+            Die Anzahl der importierten Einträge.
+        """
+        if not os.path.exists(scores_dir):
+            return 0
+
+        imported = {row[0] for row in self.connection.execute("SELECT filename FROM imported_files")}
+        total_imported = 0
+
+        for filename in sorted(os.listdir(scores_dir)):
+            if not filename.endswith('.dascores') or filename in imported:
+                continue
+
+            entries = []
+            try:
+                with open(os.path.join(scores_dir, filename), 'r') as f:
+                    for line in f:
+                        parts = line.strip().split('|')
+                        if len(parts) != 6:
+                            print(f"Ungültiges Highscore-Format gefunden: {line.strip()}")
+                            continue
+                        try:
+                            entries.append((parts[0], parts[1], int(parts[2]), int(parts[3]),
+                                            int(parts[4]), int(parts[5])))
+                        except ValueError as ve:
+                            print(f"Fehler beim Parsen der Highscore-Zeile (ValueError): {line.strip()} - {ve}")
+            except Exception as e:
+                print(f"Fehler beim Lesen von {filename}: {e}")
+                continue
+
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO scores (datetime, map_name, score, final_time, raw_time, time_bonus) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    entries
+                )
+                self.connection.execute(
+                    "INSERT INTO imported_files (filename, imported_at) VALUES (?, ?)",
+                    (filename, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+            total_imported += len(entries)
+            print(f"Highscores aus '{filename}' importiert: {len(entries)} Einträge.")
+
+        return total_imported
@@ -0,0 +1,152 @@
+# game/junction_graph.py
+# Verdichtet ein Labyrinth zu einem Graphen aus Knoten (Sackgassen, Kreuzungen, Gegenstände)
+# und Gängen dazwischen, und führt darauf Makro-Aktionen aus ("folge dem Gang bis zum nächsten Knoten").
+
+from collections import namedtuple
+
+from game.episode_recorder import ACTION_VECTORS
+
+# Zellen mit diesen Zeichen sind immer Knoten, auch mitten in einem Gang
+# (Spieler/Start, Tür, Schlüssel, Enten): dort passiert etwas, also soll der Agent dort entscheiden.
+NODE_CHARS = frozenset('SEUAIGPRFB')
+
+# Ein Gang von einem Knoten in eine Richtung: Zielknoten, Länge in Schritten und die einzelnen Aktionen
+Corridor = namedtuple('Corridor', ['target', 'length', 'actions'])
+
+
+class JunctionGraph:
+    """
+    Knoten sind alle begehbaren Zellen, die nicht genau zwei begehbare Nachbarn haben
+    (Sackgassen, Kreuzungen), sowie Zellen mit Gegenständen. Jeder Knoten kennt pro Richtung
+    den Gang zum nächsten Knoten. In perfekten Labyrinthen hat der Graph nur einen Bruchteil
+    der Zellen als Knoten.
+    """
+
+    def __init__(self, maze, extra_nodes=()):
+        """
+        Args:
+            maze: Labyrinth als Liste von Zeilen aus Zeichen (z.B. MazeLogic.maze nach dem Platzieren der Gegenstände).
+            extra_nodes: Zusätzliche Knoten als (x, y), z.B. die aktuelle Spielerposition.
+        """
+        self.maze = maze
+        self.height = len(maze)
+        self.width = len(maze[0]) if maze else 0
+
+        self.nodes = [] # Knotenpositionen (x, y)
+        self.node_index = {} # (x, y) -> Knotennummer
+        for y in range(self.height):
+            for x in range(self.width):
+                if self.is_passable(x, y) and (maze[y][x] in NODE_CHARS or self._degree(x, y) != 2):
+                    self._add_node(x, y)
+        for x, y in extra_nodes:
+            if (x, y) not in self.node_index and self.is_passable(x, y):
+                self._add_node(x, y)
+
+        # edges[knoten][aktion] = Corridor oder None (Wand in dieser Richtung)
+        self.edges = [[self._walk(x, y, action) for action in range(len(ACTION_VECTORS))] for x, y in self.nodes]
+
+    def _add_node(self, x, y):
+        self.node_index[(x, y)] = len(self.nodes)
+        self.nodes.append((x, y))
+
+    def is_passable(self, x, y):
+        """True, wenn (x, y) im Labyrinth liegt und keine Wand ist."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.maze[y][x] != 'W'
+
+    def _degree(self, x, y):
+        """Anzahl der begehbaren Nachbarzellen."""
+        return sum(1 for dx, dy in ACTION_VECTORS if self.is_passable(x + dx, y + dy))
+
+    def _walk(self, x, y, action):
+        """
+        Folgt dem Gang von (x, y) in Richtung 'action' bis zum nächsten Knoten.
+        Returns:
+            Corridor oder None, wenn in dieser Richtung eine Wand ist.
+        """
+        dx, dy = ACTION_VECTORS[action]
+        if not self.is_passable(x + dx, y + dy):
+            return None
+        actions = [action]
+        prev_x, prev_y = x, y
+        x, y = x + dx, y + dy
+        while (x, y) not in self.node_index:
+            # Gangzelle: genau ein Nachbar, der nicht die vorherige Zelle ist
+            for next_action, (dx, dy) in enumerate(ACTION_VECTORS):
+                next_x, next_y = x + dx, y + dy
+                if (next_x, next_y) != (prev_x, prev_y) and self.is_passable(next_x, next_y):
+                    break
+            actions.append(next_action)
+            prev_x, prev_y = x, y
+            x, y = next_x, next_y
+        return Corridor(self.node_index[(x, y)], len(actions), tuple(actions))
+
+    def corridor_from(self, x, y, action):
+        """
+        Gibt den Gang zurück, der von (x, y) in Richtung 'action' beginnt (auch wenn (x, y) kein Knoten ist).
+        Returns:
+            Corridor oder None bei einer Wand.
+        """
+        node = self.node_index.get((x, y))
+        if node is not None:
+            return self.edges[node][action]
+        return self._walk(x, y, action)
+
+    def num_passable_cells(self):
+        """Anzahl aller begehbaren Zellen."""
+        return sum(1 for y in range(self.height) for x in range(self.width) if self.is_passable(x, y))
+
+    def compression_ratio(self):
+        """Begehbare Zellen pro Knoten (wie viele Entscheidungen eine Makro-Aktion im Mittel einspart)."""
+        return self.num_passable_cells() / max(1, len(self.nodes))
+
+
+class MacroActionEnv:
+    """
+    Führt Makro-Aktionen auf einer MazeLogic-Instanz aus: Eine Aktion läuft den Gang in die gewählte
+    Richtung bis zum nächsten Knoten. Jeder Einzelschritt geht weiterhin über move_player (Punkte,
+    Aufzeichnung und Signale bleiben gleich), die Belohnungen werden diskontiert aufsummiert:
+        R = r_0 + gamma * r_1 + ... + gamma^(k-1) * r_(k-1)
+    Beim Lernen muss der nächste Zustand dann mit gamma^k statt gamma gewichtet werden.
+    """
+
+    def __init__(self, maze_logic, gamma=0.99):
+        self.maze_logic = maze_logic
+        self.gamma = gamma
+        self.graph = None
+        self._graph_key = None
+
+    def get_graph(self):
+        """Gibt den Graphen der aktuellen Episode zurück (wird pro Episode einmal aufgebaut, da die Gegenstände wechseln)."""
+        key = (self.maze_logic.map_path, id(self.maze_logic.original_maze_layout), self.maze_logic.episode_seed)
+        if self.graph is None or key != self._graph_key:
+            player_pos = self.maze_logic.get_player_pos()
+            self.graph = JunctionGraph(self.maze_logic.get_maze_data(), extra_nodes=[(player_pos['x'], player_pos['y'])])
+            self._graph_key = key
+        return self.graph
+
+    def step(self, dx, dy):
+        """
+        Führt eine Makro-Aktion in Richtung (dx, dy) aus.
+        Returns:
+            Ein Tupel (reward, done, steps) mit der diskontierten Summe der Belohnungen
+            und der Anzahl ausgeführter Einzelschritte.
+        """
+        player_pos = self.maze_logic.get_player_pos()
+        corridor = self.get_graph().corridor_from(player_pos['x'], player_pos['y'], ACTION_VECTORS.index((dx, dy)))
+        if corridor is None:
+            # Wand: ein einzelner Schritt (mit Wand-Strafe), wie ohne Makro-Aktionen
+            reward, done = self.maze_logic.move_player(dx, dy)
+            return reward, done, 1
+
+        total_reward = 0.0
+        discount = 1.0
+        steps = 0
+        done = False
+        for action in corridor.actions:
+            reward, done = self.maze_logic.move_player(*ACTION_VECTORS[action])
+            total_reward += discount * reward
+            discount *= self.gamma
+            steps += 1
+            if done:
+                break
+        return total_reward, done, steps
@@ -0,0 +1,277 @@
+# game/map_catalog.py
+# Katalog aller Maps eines Verzeichnisses: jede .map-Datei wird einmal mit read_map (game/map_loader.py)
+# eingelesen und ihre Kenndaten (Größe, Inhalts-Hash, Start/Ziel, kürzester Weg, Gegenstände, Vorschaubild)
+# in einer SQLite-Datenbank abgelegt. refresh() liest danach nur noch Dateien neu ein, deren Änderungszeit
+# oder Größe sich geändert hat.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m game.map_catalog assets/maps
+
+import argparse
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass
+
+import numpy as np
+
+from game.map_loader import ITEM_CHARS, KEY_CHARS, MapLoadError, read_map
+
+DUCK_CHARS = ITEM_CHARS - KEY_CHARS
+THUMBNAIL_SIZE = 64 # Längere Seite des Vorschaubilds in Pixeln (höchstens)
+
+
+@dataclass(frozen=True)
+class MapInfo:
+    """Kenndaten einer Map. Bei ungültigen Dateien ist 'error' gesetzt und die übrigen Werte sind leer."""
+    path: str
+    name: str
+    mtime_ns: int
+    file_size: int
+    content_hash: str = ""
+    width: int = 0
+    height: int = 0
+    start: tuple = None # (x, y)
+    end: tuple = None # (x, y)
+    shortest_path: int = None # Schritte von S nach E ohne Schlüssel (die werden pro Episode verteilt); None = nicht erreichbar
+    open_cells: int = 0 # Begehbare Zellen
+    keys: int = 0 # Bereits in der Datei platzierte Schlüssel/Enten (sonst verteilt MazeLogic sie zufällig)
+    ducks: int = 0
+    thumbnail: bytes = b"" # Graustufen (0 = Wand, 255 = Weg), thumbnail_width x thumbnail_height, zeilenweise
+    thumbnail_width: int = 0
+    thumbnail_height: int = 0
+    error: str = None
+
+    @property
+    def solvable(self):
+        """True, wenn das Ziel vom Start aus erreichbar ist."""
+        return self.shortest_path is not None
+
+
+def make_thumbnail(rows, size=THUMBNAIL_SIZE):
+    """
+    Verkleinert die Map auf höchstens size x size Pixel: jeder Pixel ist der Anteil begehbarer Zellen
+    seines Blocks (0 = nur Wände, 255 = nur Wege). Returns: (Bytes, Breite, Höhe).
+    """
+    walls = np.frombuffer("".join(rows).encode("latin-1"), dtype=np.uint8).reshape(len(rows), len(rows[0]))
+    open_cells = (walls != ord('W')).astype(np.float32)
+    height, width = open_cells.shape
+    block = max(1, -(-max(width, height) // size)) # Aufrunden
+    thumb_height, thumb_width = -(-height // block), -(-width // block)
+    # Auf ein Vielfaches der Blockgröße auffüllen (Rand zählt als Wand) und blockweise mitteln
+    padded = np.zeros((thumb_height * block, thumb_width * block), dtype=np.float32)
+    padded[:height, :width] = open_cells
+    means = padded.reshape(thumb_height, block, thumb_width, block).mean(axis=(1, 3))
+    return (means * 255).round().astype(np.uint8).tobytes(), thumb_width, thumb_height
+
+
+def scan_map(path):
+    """Liest eine .map-Datei wie das Spiel mit read_map() ein und bestimmt ihre Kenndaten (MapInfo)."""
+    stat = os.stat(path)
+    name = os.path.basename(path)
+    try:
+        with open(path, "rb") as f:
+            content_hash = hashlib.sha1(f.read()).hexdigest()
+    except OSError as e:
+        return MapInfo(path, name, stat.st_mtime_ns, stat.st_size, error=str(e))
+    try:
+        loaded_map = read_map(path)
+    except MapLoadError as e:
+        return MapInfo(path, name, stat.st_mtime_ns, stat.st_size, content_hash, error=str(e))
+
+    rows = loaded_map.rows
+    text = "".join(rows)
+    start_x, start_y = loaded_map.start
+    distance = int(loaded_map.exit_distances[start_y, start_x]) # Derselbe Abstand, den das Spiel verwendet
+    thumbnail, thumb_width, thumb_height = make_thumbnail(rows)
+    return MapInfo(
+        path, name, stat.st_mtime_ns, stat.st_size, content_hash, loaded_map.width, loaded_map.height,
+        loaded_map.start, loaded_map.end,
+        shortest_path=distance if distance >= 0 else None,
+        open_cells=len(text) - text.count('W'),
+        keys=sum(text.count(char) for char in KEY_CHARS),
+        ducks=sum(text.count(char) for char in DUCK_CHARS),
+        thumbnail=thumbnail, thumbnail_width=thumb_width, thumbnail_height=thumb_height,
+    )
+
+
+class MapCatalog:
+    """
+    Katalog der Maps eines Verzeichnisses in einer SQLite-Datenbank.
+    Die Datenbank liegt standardmäßig neben dem Map-Verzeichnis, damit sie nicht selbst als Map erscheint.
+    """
+
+    # Spalten, nach denen sortiert werden darf (Schutz vor SQL-Injection bei ORDER BY)
+    SORT_COLUMNS = ('name', 'width', 'height', 'open_cells', 'shortest_path', 'ducks', 'mtime_ns')
+    _COLUMNS = ('path', 'name', 'mtime_ns', 'file_size', 'content_hash', 'width', 'height', 'start_x', 'start_y',
+                'end_x', 'end_y', 'shortest_path', 'open_cells', 'keys', 'ducks', 'thumbnail', 'thumbnail_width',
+                'thumbnail_height', 'error')
+
+    def __init__(self, maps_dir=os.path.join("assets", "maps"), db_path=None):
+        self.maps_dir = maps_dir
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(os.path.normpath(maps_dir)), "map_catalog.db")
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        """Legt Tabelle und Indizes an, falls sie noch nicht existieren."""
+        with self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS maps (
+                    path TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL,
+                    start_x INTEGER, start_y INTEGER,
+                    end_x INTEGER, end_y INTEGER,
+                    shortest_path INTEGER,
+                    open_cells INTEGER NOT NULL,
+                    keys INTEGER NOT NULL,
+                    ducks INTEGER NOT NULL,
+                    thumbnail BLOB NOT NULL,
+                    thumbnail_width INTEGER NOT NULL,
+                    thumbnail_height INTEGER NOT NULL,
+                    error TEXT
+                )
+            """)
+            # Für Abfragen wie "alle lösbaren Maps nach Schwierigkeit" (z.B. Curriculum)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_maps_shortest_path ON maps (shortest_path)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_maps_size ON maps (width, height)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_maps_hash ON maps (content_hash)")
+
+    def close(self):
+        """Schließt die Datenbankverbindung."""
+        self.connection.close()
+
+    def refresh(self):
+        """
+        Gleicht den Katalog mit dem Verzeichnis ab: neue und geänderte Dateien (Änderungszeit oder Größe)
+        werden eingelesen, gelöschte entfernt.
+        Returns:
+            (hinzugefügt, aktualisiert, entfernt) als Anzahlen.
+        """
+        known = {row['path']: (row['mtime_ns'], row['file_size'])
+                 for row in self.connection.execute("SELECT path, mtime_ns, file_size FROM maps")}
+        current = {}
+        if os.path.isdir(self.maps_dir):
+            with os.scandir(self.maps_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.map') and entry.is_file():
+                        stat = entry.stat()
+                        current[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = [path for path, signature in current.items() if known.get(path) != signature]
+        removed = [path for path in known if path not in current]
+        infos = []
+        for path in changed:
+            try:
+                infos.append(scan_map(path))
+            except OSError as e: # Datei zwischen scandir und Lesen gelöscht
+                print(f"Map konnte nicht eingelesen werden: {path} ({e})")
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO maps ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                [self._to_row(info) for info in infos]
+            )
+            self.connection.executemany("DELETE FROM maps WHERE path = ?", [(path,) for path in removed])
+        added = sum(1 for path in changed if path not in known)
+        return added, len(changed) - added, len(removed)
+
+    @staticmethod
+    def _to_row(info):
+        start = info.start or (None, None)
+        end = info.end or (None, None)
+        return (info.path, info.name, info.mtime_ns, info.file_size, info.content_hash, info.width, info.height,
+                start[0], start[1], end[0], end[1], info.shortest_path, info.open_cells, info.keys, info.ducks,
+                info.thumbnail, info.thumbnail_width, info.thumbnail_height, info.error)
+
+    @staticmethod
+    def _from_row(row):
+        return MapInfo(
+            row['path'], row['name'], row['mtime_ns'], row['file_size'], row['content_hash'], row['width'],
+            row['height'], (row['start_x'], row['start_y']) if row['start_x'] is not None else None,
+            (row['end_x'], row['end_y']) if row['end_x'] is not None else None, row['shortest_path'],
+            row['open_cells'], row['keys'], row['ducks'], row['thumbnail'], row['thumbnail_width'],
+            row['thumbnail_height'], row['error'],
+        )
+
+    def get(self, path):
+        """Kenndaten einer Map (None, wenn sie nicht im Katalog ist)."""
+        row = self.connection.execute("SELECT * FROM maps WHERE path = ?", (path,)).fetchone()
+        return self._from_row(row) if row is not None else None
+
+    def query(self, solvable=None, valid=True, min_size=None, max_size=None, min_path=None, max_path=None,
+              order_by='name', descending=False, limit=None):
+        """
+        Sucht Maps nach Kenndaten, z.B. query(solvable=True, order_by='shortest_path') für ein Curriculum.
+        Args:
+            solvable: True/False = nur (un)lösbare Maps, None = alle.
+            valid: True = nur fehlerfrei eingelesene Maps, None = alle.
+            min_size/max_size: Grenzen für die längere Seite.
+            min_path/max_path: Grenzen für die Länge des kürzesten Wegs.
+        Raises:
+            ValueError: Wenn nach einer unbekannten Spalte sortiert werden soll.
+        """
+        if order_by not in self.SORT_COLUMNS:
+            raise ValueError(f"Unbekannte Sortierspalte: {order_by}")
+        conditions, parameters = [], []
+        if valid is not None:
+            conditions.append("error IS NULL" if valid else "error IS NOT NULL")
+        if solvable is not None:
+            conditions.append("shortest_path IS NOT NULL" if solvable else "shortest_path IS NULL")
+        for value, condition in ((min_size, "MAX(width, height) >= ?"), (max_size, "MAX(width, height) <= ?"),
+                                 (min_path, "shortest_path >= ?"), (max_path, "shortest_path <= ?")):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT * FROM maps {where} ORDER BY {order_by} {direction}, name {direction}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [self._from_row(row) for row in self.connection.execute(sql, parameters)]
+
+    def find_by_hash(self, content_hash):
+        """Alle Dateien mit genau diesem Inhalt (z.B. um Duplikate zu erkennen)."""
+        rows = self.connection.execute("SELECT * FROM maps WHERE content_hash = ? ORDER BY name", (content_hash,))
+        return [self._from_row(row) for row in rows]
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM maps").fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Katalog der Maps eines Verzeichnisses anzeigen")
+    parser.add_argument("maps_dir", nargs="?", default=os.path.join("assets", "maps"))
+    parser.add_argument("--db", default=None, help="Pfad der Katalog-Datenbank")
+    parser.add_argument("--sort", default="name", choices=MapCatalog.SORT_COLUMNS)
+    parser.add_argument("--solvable", action="store_true", help="Nur lösbare Maps")
+    args = parser.parse_args(argv)
+
+    catalog = MapCatalog(args.maps_dir, args.db)
+    added, updated, removed = catalog.refresh()
+    print(f"Katalog {catalog.db_path}: {len(catalog)} Maps ({added} neu, {updated} geändert, {removed} entfernt)")
+    print(f"{'Map':<30} {'Größe':>9} {'Weg':>6} {'Zellen':>7} {'Schl.':>5} {'Enten':>5}  Hash")
+    for info in catalog.query(solvable=True if args.solvable else None, valid=None, order_by=args.sort):
+        if info.error:
+            print(f"{info.name:<30} Fehler: {info.error}")
+            continue
+        path_text = str(info.shortest_path) if info.solvable else "-"
+        print(f"{info.name:<30} {f'{info.width}x{info.height}':>9} {path_text:>6} {info.open_cells:>7} "
+              f"{info.keys:>5} {info.ducks:>5}  {info.content_hash[:10]}")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
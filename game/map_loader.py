@@ -0,0 +1,167 @@
+# game/map_loader.py
+# Einlesen und Vorverarbeiten einer .map-Datei, unabhängig von MazeLogic und vom UI-Thread:
+# Parsen, Prüfen, Start/Ziel suchen, Abstände zum Ziel und Kandidatenzellen für Schlüssel/Enten
+# vorberechnen. Das Ergebnis (LoadedMap) ist unveränderlich und kann an beliebig viele
+# MazeLogic-Instanzen übergeben werden (MazeLogic.load_map).
+
+import os
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+READ_CHUNK_SIZE = 1 << 20 # Bytes pro Lesevorgang (zwischen zwei Fortschrittsmeldungen)
+ITEM_CHARS = set("UAIGPRFB") # Schlüssel und Enten (siehe MazeLogic.key_types / duck_types)
+KEY_CHARS = set("UAI")
+
+
+class MapLoadError(ValueError):
+    """Die Datei ist keine gültige Map (Meldung für den Benutzer im Text)."""
+
+
+class MapLoadCancelled(Exception):
+    """Das Laden wurde über 'is_cancelled' abgebrochen."""
+
+
+@dataclass(frozen=True)
+class LoadedMap:
+    """
+    Eine fertig eingelesene Map. Die Zeilen sind Strings und die Arrays schreibgeschützt,
+    damit mehrere Logik-Instanzen (Spiel, KI-Thread) dieselbe Map teilen können.
+    """
+    path: str
+    rows: tuple # Zeilen als Strings
+    width: int
+    height: int
+    start: tuple # (x, y)
+    end: tuple # (x, y)
+    placement_cells: np.ndarray # Flache Indizes (y * Breite + x) aller leeren Zellen ' ', zeilenweise
+    keys_on_map: frozenset # Bereits in der Datei platzierte Schlüssel (Zeichen)
+    ducks_on_map: int # Bereits in der Datei platzierte Enten
+    exit_distances: np.ndarray # Schritte bis zur Tür je Zelle (Höhe x Breite), -1 = Wand oder nicht erreichbar
+
+
+def _report(progress, fraction, stage):
+    if progress is not None:
+        progress(fraction, stage)
+
+
+def _check_cancelled(is_cancelled):
+    if is_cancelled is not None and is_cancelled():
+        raise MapLoadCancelled()
+
+
+def _read_rows(filepath, progress, is_cancelled):
+    """Liest die Datei in Blöcken (für Fortschritt und Abbruch) und zerlegt sie in Zeilen."""
+    total = max(1, os.path.getsize(filepath))
+    chunks = []
+    done = 0
+    with open(filepath, 'r') as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            done += len(chunk)
+            _check_cancelled(is_cancelled)
+            _report(progress, 0.3 * min(1.0, done / total), "Lese Datei")
+    # Wie bisher: Zeilenumbrüche entfernen und leere Zeilen überspringen
+    return tuple(line for line in "".join(chunks).split("\n") if line)
+
+
+def exit_distances(rows, end, progress=None, is_cancelled=None, progress_range=(0.0, 1.0)):
+    """
+    Breitensuche von der Tür aus: Anzahl Schritte von jeder Zelle bis zur Tür (-1 = Wand/nicht erreichbar).
+    Wände sind nicht begehbar, Schlüssel werden nicht berücksichtigt.
+    """
+    height, width = len(rows), len(rows[0])
+    cells = np.frombuffer("".join(rows).encode("latin-1"), dtype=np.uint8)
+    walkable = cells != ord('W')
+    distances = np.full(height * width, -1, dtype=np.int32)
+    start_index = end[1] * width + end[0]
+    distances[start_index] = 0
+    # Ebenenweise Breitensuche auf Arrays: jede Ebene ist ein Array von Zellindizes
+    frontier = np.array([start_index], dtype=np.int64)
+    walkable_total = max(1, int(walkable.sum()))
+    reached = 1
+    level = 0
+    while frontier.size:
+        level += 1
+        x = frontier % width
+        neighbors = np.concatenate([
+            frontier[frontier >= width] - width,
+            frontier[frontier < (height - 1) * width] + width,
+            frontier[x > 0] - 1,
+            frontier[x < width - 1] + 1,
+        ])
+        neighbors = np.unique(neighbors[walkable[neighbors] & (distances[neighbors] < 0)])
+        distances[neighbors] = level
+        frontier = neighbors
+        reached += neighbors.size
+        if level % 64 == 0:
+            _check_cancelled(is_cancelled)
+            low, high = progress_range
+            _report(progress, low + (high - low) * reached / walkable_total, "Berechne Abstände")
+    return distances.reshape(height, width)
+
+
+def read_map(filepath, progress=None, is_cancelled=None):
+    """
+    Liest eine .map-Datei und berechnet alles vor, was MazeLogic zum Starten einer Episode braucht.
+    Args:
+        progress: Optionale Funktion (Anteil 0..1, Beschreibung) für Fortschrittsmeldungen.
+        is_cancelled: Optionale Funktion; gibt sie True zurück, wird mit MapLoadCancelled abgebrochen.
+    Raises:
+        MapLoadError: Wenn die Datei fehlt oder keine gültige Map enthält.
+        MapLoadCancelled: Wenn das Laden abgebrochen wurde.
+    """
+    if not os.path.exists(filepath):
+        raise MapLoadError(f"Datei existiert nicht: {filepath}")
+    try:
+        rows = _read_rows(filepath, progress, is_cancelled)
+    except (OSError, UnicodeDecodeError) as e:
+        raise MapLoadError(f"Fehler beim Lesen der Datei: {e}") from e
+    if not rows:
+        raise MapLoadError("Leere Labyrinth-Datei oder ungültiges Format.")
+
+    # Validierung der Zeilenlängen und Zeichen (alle Arrays arbeiten mit einem Byte pro Zelle)
+    width = len(rows[0])
+    for r_idx, row in enumerate(rows):
+        if len(row) != width:
+            raise MapLoadError(f"Ungleichmäßige Zeilenlängen im Labyrinth: Zeile {r_idx} hat Länge {len(row)}, erwartet {width}.")
+    text = "".join(rows)
+    try:
+        text.encode("latin-1")
+    except UnicodeEncodeError as e:
+        raise MapLoadError(f"Ungültiges Zeichen {text[e.start]!r} in Zeile {e.start // width}.") from e
+    _check_cancelled(is_cancelled)
+    _report(progress, 0.4, "Prüfe Labyrinth")
+
+    # Start und Ende (bei mehreren zählt wie bisher das letzte Vorkommen)
+    start_index, end_index = text.rfind('S'), text.rfind('E')
+    if start_index < 0:
+        raise MapLoadError("Startpunkt 'S' nicht im Labyrinth gefunden.")
+    if end_index < 0:
+        raise MapLoadError("Endpunkt 'E' nicht im Labyrinth gefunden.")
+
+    # Zellen für Schlüssel und Enten sowie bereits vorhandene Gegenstände
+    cells = np.frombuffer(text.encode("latin-1"), dtype=np.uint8)
+    placement_cells = np.flatnonzero(cells == ord(' ')).astype(np.int64)
+    present = set(np.unique(cells).tobytes().decode("latin-1"))
+    keys_on_map = frozenset(present & KEY_CHARS)
+    ducks_on_map = int(np.isin(cells, np.frombuffer("".join(ITEM_CHARS - KEY_CHARS).encode(), dtype=np.uint8)).sum())
+    _check_cancelled(is_cancelled)
+    _report(progress, 0.5, "Suche Platzierungen")
+
+    end = (end_index % width, end_index // width)
+    distances = exit_distances(rows, end, progress, is_cancelled, progress_range=(0.5, 1.0))
+
+    placement_cells.flags.writeable = False
+    distances.flags.writeable = False
+    _report(progress, 1.0, "Fertig")
+    return LoadedMap(
+        path=filepath, rows=rows, width=width, height=len(rows),
+        start=(start_index % width, start_index // width), end=end,
+        placement_cells=placement_cells, keys_on_map=keys_on_map, ducks_on_map=ducks_on_map,
+        exit_distances=distances,
+    )
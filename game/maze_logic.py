@@ -1,14 +1,31 @@
 # game/maze_logic.py
 # Diese Datei enthält die grundlegende Spiellogik.
 
-import os
 import random
+from collections import namedtuple
 from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import QMessageBox # Für Meldungen im Spiel (wird nur noch für Spielende verwendet)
 
+import config
+from game.map_loader import MapLoadError, read_map
+
+# Unveränderlicher, kompakter Spielzustand für Planung/Suche (siehe MazeLogic.clone_state).
+# Das Labyrinth selbst ist nicht enthalten: es ergibt sich aus dem Layout der Episode,
+# den eingesammelten Gegenständen (items_mask) und der Spielerposition.
+GameState = namedtuple('GameState', [
+    'player_x', 'player_y',
+    'keys_mask',       # Bit i = i-ter Schlüsseltyp (Reihenfolge von key_types) gesammelt
+    'items_mask',      # Bit i = Gegenstand item_cells[i] (Ente oder Schlüssel) eingesammelt
+    'collected_ducks', 'end_time_bonus', 'score',
+    'visited',         # Bitmap als bytes (Bit y * Breite + x) = Zelle in dieser Episode bereits betreten
+    'game_over', 'won',
+    'episode',         # Kennung der Episode (Zustände lassen sich nur innerhalb derselben Episode wiederherstellen)
+])
+
 class MazeLogic(QObject):
     # Signale, die von der Logik an die Benutzeroberfläche gesendet werden.
     maze_updated = pyqtSignal() # Signalisiert, dass das Labyrinth neu gezeichnet werden muss
+    cells_changed = pyqtSignal(object) # Nur die Zellen in der Liste [(x, y), ...] haben sich geändert (apply_snapshot)
     keys_changed = pyqtSignal(int) # Signalisiert eine Änderung der Schlüsselanzahl
     ducks_changed = pyqtSignal(int) # Signalisiert eine Änderung der Entenanzahl
     game_won = pyqtSignal() # Signalisiert, dass das Spiel gewonnen wurde
@@ -23,33 +40,52 @@ class MazeLogic(QObject):
     EXIT_BONUS = 250
     LOSS_THRESHOLD = -100
 
-    # Belohnungswerte für die KI (angepasst für bessere Lernkurve)
-    REWARD_STEP = -0.01 # Sehr kleiner Abzug pro Schritt, damit die KI mehr explorieren kann
-    REWARD_WALL_HIT = -10.0 # Hoher Abzug für Wandkollision
-    REWARD_KEY_COLLECTED = 50.0 # Hohe Belohnung für Schlüssel
-    REWARD_DUCK_COLLECTED_BASE = 10.0 # Hohe Belohnung für Enten
-    REWARD_EXIT_SUCCESS = 1000.0 # Sehr hohe Belohnung für erfolgreichen Abschluss
-    REWARD_EXIT_NO_KEY = -500.0 # Hoher Abzug für Erreichen des Ziels ohne Schlüssel
-    REWARD_GAME_LOST = -1000.0 # Sehr hoher Abzug für Spielverlust (Erreichen des LOSS_THRESHOLD)
-    REWARD_REVISIT_CELL = -20.0 # Deutlich höherer Abzug für das erneute Besuchen einer Zelle
-
-    def __init__(self):
+    # Die Belohnungswerte für die KI (REWARD_*) kommen aus der Laufkonfiguration (config.RewardConfig),
+    # siehe set_rewards()
+
+    def __init__(self, seed=None, rewards=None):
+        """
+        Args:
+            seed: Optionaler Seed. Aus ihm werden die Seeds aller Episoden abgeleitet,
+                  sodass ein ganzer Lauf reproduzierbar ist. None = zufällig.
+            rewards: Belohnungen für die KI (config.RewardConfig); None = config.RUN_CONFIG.rewards.
+        """
         super().__init__()
+        self.set_rewards(rewards if rewards is not None else config.RUN_CONFIG.rewards)
         # Initialisiere die grundlegenden Spielvariablen
         self.maze = [] # Repräsentation des Labyrinths (Liste von Listen von Zeichen)
         self.player_pos = {'x': 0, 'y': 0} # Aktuelle Position des Spielers
         self.start_pos = {'x': 0, 'y': 0} # Speichert die Startposition
-        self.collected_keys = set() # Set der gesammelten Schlüssel (z.B. 'key-ruby')
+        self.keys_mask = 0 # Gesammelte Schlüssel: Bit i = i-ter Schlüsseltyp (Reihenfolge von key_types)
         self.total_keys = 3 # Wir haben immer 3 spezifische Schlüssel (Diamond, Ruby, Saphire)
         self.collected_ducks = 0 # Anzahl der gesammelten Enten
         self.total_rewards = 0 # Gesamtanzahl der Enten, die auf der aktuellen Map platziert wurden
         self.game_over = False # Spielzustand
+        self.won = False # True, wenn die Tür mit dem richtigen Schlüssel geöffnet wurde
         self.end_time_bonus = 0 # Zeitbonus durch gesammelte Enten
         self.current_score = self.STARTING_SCORE # Aktueller Punktestand, initialisiert mit Startpunkten
         self.required_exit_key = None # Der Schlüssel, der zum Öffnen der Tür benötigt wird
         self.is_ai_controlled = False # Flag, ob das Spiel von der KI gesteuert wird
         self.original_maze_layout = [] # Speichert das ursprüngliche Labyrinth-Layout für Resets
-        self.visited_positions_in_episode = set() # Set zum Speichern besuchter Positionen im aktuellen Durchgang
+        self.visited = bytearray() # Besuchte Zellen im aktuellen Durchgang: Bit y * Breite + x, 8 Zellen pro Byte
+        self._visited_clear = b"" # Nullen in der Größe von visited (Vorlage für das Zurücksetzen)
+        self.map_path = None # Pfad der aktuell geladenen Map-Datei
+        self.loaded_map = None # Vorverarbeitete Map (game/map_loader.LoadedMap), geteilt mit anderen Instanzen
+        self.end_pos = None # Position der Tür (x, y)
+        self.verbose = True # False unterdrückt die Konsolenausgaben pro Zug (z.B. bei Planungs-Simulationen)
+
+        # Gegenstände der aktuellen Episode: item_cells[i] = (x, y, Zeichen); items_mask markiert die eingesammelten
+        self.item_cells = []
+        self.item_index = {} # (x, y) -> Index in item_cells
+        self.items_mask = 0
+
+        # Eigene Zufallsquellen: seed_source liefert die Seeds der Episoden,
+        # rng wird zu Beginn jeder Episode mit dem Episoden-Seed neu initialisiert.
+        self.seed_source = random.Random(seed)
+        self.rng = random.Random()
+        self.episode_seed = None # Seed der aktuellen Episode (für Wiederholungen)
+        self.episode_recorder = None # Optionaler EpisodeRecorder, der alle Züge mitschreibt
+        self.transition_sink = None # Optionaler DatasetWriter (ai/offline_dataset.py), der jeden Übergang mit Beobachtungen speichert
 
         # Definition der Enten-Typen und ihrer Werte
         self.duck_types = {
@@ -67,6 +103,11 @@ class MazeLogic(QObject):
             'key-diamond': {'char': 'I'}, # 'I' für Diamond Key
         }
 
+        # Nachschlagetabellen für move_player (einmal aufgebaut statt bei jedem Zug)
+        self.key_bits = {name: 1 << bit for bit, name in enumerate(self.key_types)} # Name -> Bit in keys_mask
+        self.key_by_char = {data['char']: (name, self.key_bits[name]) for name, data in self.key_types.items()}
+        self.duck_by_char = {data['char']: (name, data) for name, data in self.duck_types.items()}
+
         # Mapping von Labyrinthzeichen zu numerischen Werten für die KI-Beobachtung
         self.char_to_numeric_map = {
             'W': -1.0,  # Wand
@@ -84,142 +125,115 @@ class MazeLogic(QObject):
         }
         self.vision_radius = 2 # Die KI "sieht" ein 5x5-Feld um sich herum
 
-    def load_maze_from_file(self, filepath):
+    def set_rewards(self, rewards):
+        """Übernimmt die Belohnungen einer config.RewardConfig als REWARD_*-Attribute (z.B. wall_hit -> REWARD_WALL_HIT)."""
+        self.rewards = rewards
+        self.REWARD_STEP = rewards.step
+        self.REWARD_WALL_HIT = rewards.wall_hit
+        self.REWARD_KEY_COLLECTED = rewards.key_collected
+        self.REWARD_DUCK_COLLECTED_BASE = rewards.duck_collected_base
+        self.REWARD_EXIT_SUCCESS = rewards.exit_success
+        self.REWARD_EXIT_NO_KEY = rewards.exit_no_key
+        self.REWARD_GAME_LOST = rewards.game_lost
+        self.REWARD_REVISIT_CELL = rewards.revisit_cell
+
+    def load_maze_from_file(self, filepath, seed=None):
         """
         Lädt ein Labyrinth aus einer .map-Datei, validiert es und platziert dynamische Elemente.
+        Blockiert bis zum Ende; für große Maps im UI besser read_map() in einem Hintergrund-Thread
+        (siehe ui/map_load_worker.py) und danach load_map() verwenden.
+        Args:
+            filepath: Pfad zur .map-Datei.
+            seed: Optionaler Seed für die erste Episode (None = aus seed_source ableiten).
         """
         print(f"MazeLogic: Lade Labyrinth von {filepath}")
-        if not os.path.exists(filepath):
-            print(f"Datei existiert nicht: {filepath}")
-            return False
-
-        temp_maze = []
         try:
-            with open(filepath, 'r') as f:
-                for line_idx, line in enumerate(f):
-                    stripped_line = line.rstrip('\n') 
-                    if stripped_line:
-                        temp_maze.append(list(stripped_line))
-        except Exception as e:
-            print(f"Fehler beim Lesen der Datei: {e}")
+            loaded_map = read_map(filepath)
+        except MapLoadError as e:
+            print(f"Fehler: {e} Lade nicht.")
             return False
+        return self.load_map(loaded_map, seed)
 
-        if not temp_maze or not temp_maze[0]:
-            print("temp_maze ist leer nach dem Lesen der Datei.")
-            print("Fehler: Leere Labyrinth-Datei oder ungültiges Format geladen.")
-            return False
-        
-        # Validierung der Zeilenlängen
-        width = len(temp_maze[0])
-        for r_idx, row in enumerate(temp_maze):
-            if len(row) != width:
-                print(f"Inkonsistente Zeilenlänge entdeckt! Zeile {r_idx} hat Länge {len(row)}, erwartet {width}.")
-                print("Fehler: Ungleichmäßige Zeilenlängen im Labyrinth. Lade nicht.")
-                return False
-        
-        print("Alle Zeilenlängen sind konsistent.")
-
-        # Finde Start- und Endpunkt
-        start_found = False
-        player_start_x, player_start_y = 0, 0
-        end_found = False
-        end_x, end_y = 0, 0
-
-        for r_idx, row in enumerate(temp_maze):
-            for c_idx, cell in enumerate(row):
-                if cell == 'S':
-                    player_start_x = c_idx
-                    player_start_y = r_idx
-                    start_found = True
-                elif cell == 'E':
-                    end_x = c_idx
-                    end_y = r_idx
-                    end_found = True
-        
-        if not start_found:
-            print("Fehler: Startpunkt 'S' nicht im Labyrinth gefunden. Lade nicht.")
-            return False
-        if not end_found:
-            print("Fehler: Endpunkt 'E' nicht im Labyrinth gefunden. Lade nicht.")
-            return False
+    def load_map(self, loaded_map, seed=None):
+        """
+        Übernimmt eine mit read_map() eingelesene Map (game/map_loader.py) und startet die erste Episode.
+        Args:
+            loaded_map: Die unveränderliche LoadedMap; sie kann mit anderen Instanzen geteilt werden.
+            seed: Optionaler Seed für die erste Episode (None = aus seed_source ableiten).
+        """
+        player_start_x, player_start_y = loaded_map.start
 
         # Speichere das ursprüngliche Labyrinth-Layout
-        self.original_maze_layout = [row[:] for row in temp_maze]
+        self.loaded_map = loaded_map
+        self.original_maze_layout = [list(row) for row in loaded_map.rows]
+        self.map_path = loaded_map.path
         
         # Setze Labyrinth und Spielzustand zurück
-        self.maze = [row[:] for row in temp_maze] # Tiefe Kopie des Labyrinths
+        self.maze = [row[:] for row in self.original_maze_layout] # Tiefe Kopie des Labyrinths
         self.player_pos = {'x': player_start_x, 'y': player_start_y}
         self.start_pos = {'x': player_start_x, 'y': player_start_y} # Speichere Startposition
-        self.collected_keys.clear()
+        self.keys_mask = 0
         self.collected_ducks = 0
         self.game_over = False
+        self.won = False
         self.end_time_bonus = 0
         self.current_score = self.STARTING_SCORE # Setze Punktestand auf Startwert
-        self.visited_positions_in_episode.clear() # Besuchte Positionen zurücksetzen
+        self._clear_visited() # Besuchte Positionen zurücksetzen
+        self.end_pos = loaded_map.end
         
+        # Episoden-Zufallsquelle initialisieren
+        self._start_episode_rng(seed)
+
         # Wähle zufällig einen Schlüssel, der zum Öffnen der Tür benötigt wird
-        self.required_exit_key = random.choice(list(self.key_types.keys()))
+        self.required_exit_key = self.rng.choice(list(self.key_types.keys()))
         print(f"Für dieses Labyrinth wird der Schlüssel '{self.required_exit_key}' benötigt, um die Tür zu öffnen.")
 
         # Dynamische Elemente platzieren
         self._place_dynamic_elements()
+        self._index_items()
+
+        if self.episode_recorder is not None:
+            self.episode_recorder.start_episode(self.map_path, self.episode_seed)
+        if self.transition_sink is not None:
+            self.transition_sink.start_episode(self.map_path, self.episode_seed)
 
         # UI-Signale senden
-        self.keys_changed.emit(len(self.collected_keys))
+        self.keys_changed.emit(0)
         self.ducks_changed.emit(self.collected_ducks)
         self.maze_updated.emit()
         return True
 
+    def _start_episode_rng(self, seed=None):
+        """
+        Initialisiert die Zufallsquelle für eine neue Episode.
+        Ohne expliziten Seed wird der nächste Seed aus seed_source gezogen.
+        """
+        if seed is None:
+            seed = self.seed_source.getrandbits(63)
+        self.episode_seed = seed
+        self.rng.seed(seed)
+
     def _place_dynamic_elements(self):
         """
         Platziert Schlüssel und Enten zufällig auf der aktuell geladenen Map.
         Überprüft, ob die Map bereits Elemente enthält, und platziert nur, wenn nicht.
         """
-        height = len(self.maze)
         width = len(self.maze[0])
+        loaded_map = self.loaded_map
 
-        # 1. Alle leeren Pfadzellen finden
-        all_empty_path_cells = []
-        for r in range(height):
-            for c in range(width):
-                if self.maze[r][c] == ' ': # Nur ' ' Zellen sind potentielle Platzierungsorte
-                    all_empty_path_cells.append((r, c))
-
-        # 2. Endposition finden (Startposition ist bereits in self.player_pos)
-        end_pos = None
-        for r in range(height):
-            for c in range(width):
-                if self.maze[r][c] == 'E':
-                    end_pos = (r, c)
-                    break
-            if end_pos: break
-
-        # 3. Liste der tatsächlich verfügbaren Zellen erstellen (ohne Start und Ende)
-        current_available_cells_for_placement = []
-        player_y, player_x = self.player_pos['y'], self.player_pos['x']
-
-        for r, c in all_empty_path_cells:
-            if (r, c) != (player_y, player_x) and \
-               (r, c) != end_pos:
-                current_available_cells_for_placement.append((r, c))
-        
-        random.shuffle(current_available_cells_for_placement) # Zufällige Reihenfolge
+        # 1. Leere Pfadzellen ohne Start und Ende, zeilenweise (vorberechnet in read_map, da nur ' ' Zellen
+        #    in Frage kommen, sind Start 'S' und Tür 'E' bereits ausgeschlossen). Gemischt werden die flachen
+        #    Indizes; random.shuffle hängt nur von der Länge ab, die Platzierung ist also dieselbe wie beim
+        #    Mischen der (Zeile, Spalte)-Paare.
+        current_available_cells_for_placement = loaded_map.placement_cells.tolist()
+        self.rng.shuffle(current_available_cells_for_placement) # Zufällige Reihenfolge
+        current_available_cells_for_placement.reverse() # pop() vom Ende statt pop(0) (gleiche Reihenfolge, O(1))
 
         # Überprüfe, wie viele Schlüssel und Enten bereits auf der Map sind
         # (Dies ist wichtig, wenn Maps geladen werden, die bereits Elemente enthalten)
-        current_keys_on_map = set()
-        current_ducks_on_map = 0
-        
         key_char_to_name = {data['char']: name for name, data in self.key_types.items()}
-        duck_char_to_name = {data['char']: name for name, data in self.duck_types.items()}
-
-        for r in range(height):
-            for c in range(width):
-                cell_content = self.maze[r][c]
-                if cell_content in key_char_to_name:
-                    current_keys_on_map.add(key_char_to_name[cell_content])
-                elif cell_content in duck_char_to_name:
-                    current_ducks_on_map += 1
+        current_keys_on_map = {key_char_to_name[char] for char in loaded_map.keys_on_map}
+        current_ducks_on_map = loaded_map.ducks_on_map
 
         # Wenn die Map bereits Elemente enthält, verwenden wir diese und platziere keine neuen.
         if current_keys_on_map or current_ducks_on_map:
@@ -236,7 +250,7 @@ class MazeLogic(QObject):
             print(f"WARNUNG: Nicht genügend freie Zellen ({len(current_available_cells_for_placement)}) für alle 3 Schlüssel vorhanden. Es werden nur {len(current_available_cells_for_placement)} Schlüssel platziert.")
             # Platziere so viele Schlüssel wie möglich und entferne sie aus der Liste
             for i in range(len(current_available_cells_for_placement)):
-                r, c = current_available_cells_for_placement.pop(0)
+                r, c = divmod(current_available_cells_for_placement.pop(), width)
                 self.maze[r][c] = keys_to_place_chars[i]
             self.total_keys = len(current_available_cells_for_placement) # Anpassung der Gesamtschlüsselanzahl
             self.total_rewards = 0 # Keine Enten, wenn nicht genug Platz für Schlüssel
@@ -246,7 +260,7 @@ class MazeLogic(QObject):
             if not current_available_cells_for_placement: # Sicherheitsprüfung
                 print("Warnung: Nicht genügend Zellen, um alle Schlüssel zu platzieren. Abbruch der Schlüsselplatzierung.")
                 break
-            r, c = current_available_cells_for_placement.pop(0)
+            r, c = divmod(current_available_cells_for_placement.pop(), width)
             self.maze[r][c] = key_char
 
         # --- Enten platzieren (zufällige Anzahl, an Map-Größe angepasst) ---
@@ -257,7 +271,7 @@ class MazeLogic(QObject):
         # Dynamische Berechnung der maximalen Enten, basierend auf den verbleibenden Zellen
         max_ducks_flexible_from_cells = int(remaining_cells_for_ducks * 0.15) # z.B. 15% der freien Zellen
         
-        # Die tatsächliche Obergrenze für random.randint
+        # Die tatsächliche Obergrenze für rng.randint
         upper_bound_for_random = min(max_ducks_absolute, max_ducks_flexible_from_cells, remaining_cells_for_ducks)
         
         # Sicherstellen, dass die Untergrenze nicht höher als die Obergrenze ist
@@ -267,7 +281,7 @@ class MazeLogic(QObject):
         
         num_ducks_to_place = 0
         if remaining_cells_for_ducks >= lower_bound_for_random: # Nur versuchen, wenn genug Platz für Minimum
-            num_ducks_to_place = random.randint(lower_bound_for_random, upper_bound_for_random)
+            num_ducks_to_place = self.rng.randint(lower_bound_for_random, upper_bound_for_random)
 
         self.total_rewards = num_ducks_to_place # Aktualisiere Gesamtanzahl der Enten
 
@@ -275,18 +289,42 @@ class MazeLogic(QObject):
         available_duck_types = list(self.duck_types.keys())
 
         for _ in range(num_ducks_to_place):
-            chosen_duck_type = random.choice(available_duck_types)
+            chosen_duck_type = self.rng.choice(available_duck_types)
             duck_chars_to_place.append(self.duck_types[chosen_duck_type]['char'])
 
         for duck_char in duck_chars_to_place:
             if current_available_cells_for_placement:
-                r, c = current_available_cells_for_placement.pop(0)
+                r, c = divmod(current_available_cells_for_placement.pop(), width)
                 self.maze[r][c] = duck_char
             else:
                 self.total_rewards = self.collected_ducks # Korrigiere total_rewards basierend auf tatsächlich platzierten
                 print(f"WARNUNG: Nicht genügend Pfadzellen für alle Enten vorhanden. Es konnten nur {self.collected_ducks} Enten platziert werden.")
                 break
 
+    def _index_items(self):
+        """
+        Merkt sich die Positionen aller Schlüssel und Enten der neuen Episode (einmal pro Episode).
+        Damit lässt sich das Labyrinth aus items_mask rekonstruieren, ohne es zu kopieren.
+        """
+        item_chars = {data['char'] for data in self.key_types.values()} | {data['char'] for data in self.duck_types.values()}
+        self.item_cells = [
+            (c, r, cell) for r, row in enumerate(self.maze) for c, cell in enumerate(row) if cell in item_chars
+        ]
+        self.item_index = {(x, y): i for i, (x, y, _) in enumerate(self.item_cells)}
+        self.items_mask = 0
+
+    def _clear_visited(self):
+        """
+        Setzt die Bitmap der besuchten Zellen zurück. Bei gleicher Labyrinthgröße wird der vorhandene
+        Puffer nur mit Nullen überschrieben (memcpy), neu angelegt wird er nur nach einem Größenwechsel.
+        """
+        size = (len(self.maze) * len(self.maze[0]) + 7) >> 3
+        if len(self.visited) == size:
+            self.visited[:] = self._visited_clear
+        else:
+            self.visited = bytearray(size)
+            self._visited_clear = bytes(size)
+
     def move_player(self, dx, dy):
         """
         Bewegt den Spieler im Labyrinth und verarbeitet Kollisionen und das Sammeln von Gegenständen.
@@ -295,13 +333,31 @@ class MazeLogic(QObject):
         if self.game_over:
             return 0.0, True # Keine Belohnung, Spiel ist vorbei
 
+        sink = self.transition_sink
+        state = self.get_state_representation() if sink is not None else None
+
+        reward, done = self._apply_move(dx, dy)
+
+        # Zug für spätere Wiederholungen mitschreiben
+        if self.episode_recorder is not None:
+            self.episode_recorder.record_step(dx, dy, reward, done, self.current_score)
+        # Übergang für Offline-Datensätze mitschreiben
+        if sink is not None:
+            sink.record_transition(state, dx, dy, reward, self.get_state_representation(), done)
+        return reward, done
+
+    def _apply_move(self, dx, dy):
+        """
+        Führt einen Zug aus (ohne Aufzeichnung). Wird nur von move_player aufgerufen.
+        """
         old_x, old_y = self.player_pos['x'], self.player_pos['y'] # Speichere alte Position
         new_x, new_y = old_x + dx, old_y + dy # Berechne neue Position
         reward = self.REWARD_STEP # Standard-Belohnung (kleiner Abzug pro Schritt)
         done = False # Flag, ob das Spiel beendet ist
+        width = len(self.maze[0])
 
         # Prüfe Grenzen des Labyrinths
-        if not (0 <= new_x < len(self.maze[0]) and 0 <= new_y < len(self.maze)):
+        if not (0 <= new_x < width and 0 <= new_y < len(self.maze)):
             reward = self.REWARD_WALL_HIT # Hoher Abzug für Wandkollision
             self.current_score -= self.WALL_HIT_PENALTY
             self.maze_updated.emit()
@@ -324,7 +380,9 @@ class MazeLogic(QObject):
             return reward, done # Keine Bewegung bei Wandkollision
 
         # Belohnung für das erneute Besuchen einer Zelle
-        if (new_y, new_x) in self.visited_positions_in_episode:
+        cell = new_y * width + new_x
+        visited_byte, visited_bit = cell >> 3, 1 << (cell & 7)
+        if self.visited[visited_byte] & visited_bit:
             reward += self.REWARD_REVISIT_CELL # HIER WIRD DIE STRAFE ANGEWENDET
             # print(f"DEBUG: Zelle ({new_x},{new_y}) erneut besucht. Belohnung: {reward}")
 
@@ -337,48 +395,56 @@ class MazeLogic(QObject):
         # auch wenn ein Objekt gesammelt wurde. Das Objekt wird dann im nächsten Schritt
         # durch das neue Spielerzeichen 'S' übermalt.
         # Dies ist die korrekte Logik, da der Spieler die Zelle verlässt.
-        self.maze[old_y][old_x] = ' ' 
+        # Ausnahme: Die Tür bleibt nach einem Besuch mit falschem Schlüssel erhalten.
+        self.maze[old_y][old_x] = 'E' if (old_x, old_y) == self.end_pos else ' '
         
         # Spielerposition aktualisieren
         self.player_pos['x'] = new_x
         self.player_pos['y'] = new_y
 
         # Füge die neue Position zu den besuchten Zellen hinzu
-        self.visited_positions_in_episode.add((new_y, new_x))
+        self.visited[visited_byte] |= visited_bit
+
+        # Gegenstand auf der Zielzelle gilt ab jetzt als eingesammelt
+        item_idx = self.item_index.get((new_x, new_y))
+        if item_idx is not None:
+            self.items_mask |= 1 << item_idx
 
         # Prüfe, ob ein Schlüssel gesammelt wurde (dies muss NACH der Spielerbewegung erfolgen,
         # damit der Schlüssel auf der Zelle, die der Spieler betritt, erkannt wird)
-        key_chars = {data['char']: name for name, data in self.key_types.items()}
-        if target_cell_char in key_chars:
-            collected_key_name = key_chars[target_cell_char]
-            if collected_key_name not in self.collected_keys: # Nur sammeln, wenn noch nicht gesammelt
-                self.collected_keys.add(collected_key_name)
+        key = self.key_by_char.get(target_cell_char)
+        if key is not None:
+            collected_key_name, key_bit = key
+            if not self.keys_mask & key_bit: # Nur sammeln, wenn noch nicht gesammelt
+                self.keys_mask |= key_bit
                 self.current_score += self.KEY_BONUS # Punktebonus für Schlüssel
                 reward += self.REWARD_KEY_COLLECTED # Belohnung für Schlüssel
-                self.keys_changed.emit(len(self.collected_keys)) # UI aktualisieren
-                print(f"Schlüssel {collected_key_name} gesammelt. Insgesamt: {len(self.collected_keys)}")
+                self.keys_changed.emit(self.get_collected_keys_count()) # UI aktualisieren
+                if self.verbose:
+                    print(f"Schlüssel {collected_key_name} gesammelt. Insgesamt: {self.get_collected_keys_count()}")
 
         # Prüfe, ob eine Ente gesammelt wurde (dies muss NACH der Spielerbewegung erfolgen)
-        duck_chars = {data['char']: name for name, data in self.duck_types.items()}
-        if target_cell_char in duck_chars:
-            collected_duck_name = duck_chars[target_cell_char]
-            duck_data = self.duck_types[collected_duck_name]
+        duck = self.duck_by_char.get(target_cell_char)
+        if duck is not None:
+            collected_duck_name, duck_data = duck
             
             self.current_score += duck_data['points'] # Punkte hinzufügen
             self.end_time_bonus += duck_data['time_bonus'] # Zeitbonus hinzufügen
             self.collected_ducks += 1 # Anzahl der gesammelten Enten erhöhen
             reward += self.REWARD_DUCK_COLLECTED_BASE + (duck_data['time_bonus'] * 0.5) # Belohnung für Ente
             self.ducks_changed.emit(self.collected_ducks) # UI aktualisieren
-            print(f"Ente gesammelt: {collected_duck_name}. Punkte: {self.current_score}, Zeitbonus: {self.end_time_bonus}s")
+            if self.verbose:
+                print(f"Ente gesammelt: {collected_duck_name}. Punkte: {self.current_score}, Zeitbonus: {self.end_time_bonus}s")
 
         # Setze die neue Spielerposition im Labyrinth-Gitter
         # Dies geschieht ZULETZT, damit der Spieler über gesammelten Gegenständen liegt.
         # Wenn die Zielzelle eine Tür ist, wird sie nur dann durch 'S' ersetzt, wenn der richtige Schlüssel da ist.
         if target_cell_char == 'E': # Ende erreicht (Tür)
-            if self.required_exit_key in self.collected_keys:
+            if self.has_key(self.required_exit_key):
                 self.current_score += self.EXIT_BONUS
                 reward += self.REWARD_EXIT_SUCCESS # Hohe Belohnung für erfolgreichen Abschluss
                 self.game_over = True
+                self.won = True
                 self.game_won.emit()
                 done = True
                 # Tür verschwindet, da das Spiel gewonnen wurde
@@ -389,7 +455,8 @@ class MazeLogic(QObject):
                 # Die Tür bleibt als 'E' im Labyrinth-Gitter
                 self.maze[new_y][new_x] = 'S' # Spieler steht auf dem Türfeld
                 self.message_display_requested.emit(f"Falscher Schlüssel! Benötigt: {self.required_exit_key.replace('key-', '').capitalize()}")
-                print(f"Falscher Schlüssel! Benötigt: {self.required_exit_key.replace('key-', '').capitalize()}")
+                if self.verbose:
+                    print(f"Falscher Schlüssel! Benötigt: {self.required_exit_key.replace('key-', '').capitalize()}")
                 # game_over bleibt False, done bleibt False, damit das Spiel weitergeht
         else:
             # Normale Bewegung: Spieler auf neue Zelle setzen
@@ -433,10 +500,12 @@ class MazeLogic(QObject):
                     state_list.append(self.char_to_numeric_map['W']) # Außerhalb des Labyrinths als Wand behandeln
         return state_list
 
-    def reset_game_for_ai_training(self):
+    def reset_game_for_ai_training(self, seed=None):
         """
         Setzt das Spiel für einen neuen KI-Trainingsdurchgang zurück,
         ohne die Map neu zu laden.
+        Args:
+            seed: Optionaler Seed für die neue Episode (None = aus seed_source ableiten).
         """
         print("DEBUG: Spiel für KI-Training zurückgesetzt.")
         # Labyrinth auf den ursprünglichen Zustand zurücksetzen
@@ -447,27 +516,156 @@ class MazeLogic(QObject):
         self.maze[self.player_pos['y']][self.player_pos['x']] = 'S' # Spieler am Startpunkt setzen
 
         # Gesammelte Gegenstände und Boni zurücksetzen
-        self.collected_keys.clear()
+        self.keys_mask = 0
         self.collected_ducks = 0
         self.end_time_bonus = 0
         self.current_score = self.STARTING_SCORE
         self.game_over = False
-        self.visited_positions_in_episode.clear() # Besuchte Positionen zurücksetzen
+        self.won = False
+        self._clear_visited() # Besuchte Positionen zurücksetzen
+
+        # Episoden-Zufallsquelle initialisieren
+        self._start_episode_rng(seed)
 
         # Wähle zufällig einen NEUEN Schlüssel für diesen Durchgang
-        self.required_exit_key = random.choice(list(self.key_types.keys()))
+        self.required_exit_key = self.rng.choice(list(self.key_types.keys()))
         print(f"DEBUG: Neuer benötigter Schlüssel für KI-Durchgang: '{self.required_exit_key}'")
 
         # Dynamische Elemente neu platzieren
         self._place_dynamic_elements()
+        self._index_items()
+
+        if self.episode_recorder is not None:
+            self.episode_recorder.start_episode(self.map_path, self.episode_seed)
+        if self.transition_sink is not None:
+            self.transition_sink.start_episode(self.map_path, self.episode_seed)
 
         # UI-Signale senden
-        self.keys_changed.emit(len(self.collected_keys))
+        self.keys_changed.emit(0)
         self.ducks_changed.emit(self.collected_ducks)
         self.maze_updated.emit() # Labyrinth neu zeichnen
         print("DEBUG: MazeLogic Reset abgeschlossen.")
 
 
+    def get_snapshot(self):
+        """
+        Gibt den sichtbaren Spielzustand zurück, ohne das Labyrinth zu kopieren: nur den sich ändernden Teil
+        (clone_state) und die unveränderliche LoadedMap der Episode. Wird vom Trainings-Thread veröffentlicht,
+        damit das UI ohne Sperren zeichnen kann.
+        """
+        return {
+            'state': self.clone_state(), # Enthält item_cells als Episodenkennung (wird nie verändert, daher ohne Kopie)
+            'loaded_map': self.loaded_map,
+            'total_keys': self.total_keys,
+            'total_rewards': self.total_rewards,
+            'required_exit_key': self.required_exit_key,
+        }
+
+    def apply_snapshot(self, snapshot):
+        """
+        Übernimmt einen mit get_snapshot() erstellten Zustand (nur zur Anzeige) und aktualisiert das UI.
+        Wie bei restore_state() werden nur die geänderten Zellen angefasst und mit cells_changed gemeldet;
+        nur bei einer anderen Map wird das Labyrinth neu aufgebaut (maze_updated).
+        """
+        state = snapshot['state']
+        loaded_map = snapshot['loaded_map']
+        new_map = loaded_map is not self.loaded_map
+        if new_map:
+            # Kommt im Spiel nicht vor (beide Instanzen teilen dieselbe LoadedMap), aber sicher ist sicher
+            self.loaded_map = loaded_map
+            self.map_path = loaded_map.path
+            self.original_maze_layout = [list(row) for row in loaded_map.rows]
+            self.maze = [row[:] for row in self.original_maze_layout]
+            self.end_pos = loaded_map.end
+            self.player_pos = {'x': loaded_map.start[0], 'y': loaded_map.start[1]}
+            self.item_cells = []
+        changed_cells = []
+        if state.episode is not self.item_cells:
+            # Neue Episode: Gegenstände beider Episoden entfernen und als "alle eingesammelt" markieren,
+            # restore_state() legt dann die noch nicht eingesammelten wieder hin
+            for x, y, _ in self.item_cells + state.episode:
+                self.maze[y][x] = ' '
+                changed_cells.append((x, y))
+            self.item_cells = state.episode
+            self.item_index = {(x, y): i for i, (x, y, _) in enumerate(state.episode)}
+            self.items_mask = (1 << len(state.episode)) - 1
+        changed_cells += self.restore_state(state)
+
+        self.total_keys = snapshot['total_keys']
+        self.total_rewards = snapshot['total_rewards']
+        self.required_exit_key = snapshot['required_exit_key']
+        self.keys_changed.emit(self.get_collected_keys_count())
+        self.ducks_changed.emit(self.collected_ducks)
+        if new_map:
+            self.maze_updated.emit()
+        else:
+            self.cells_changed.emit(changed_cells)
+
+    def clone_state(self):
+        """
+        Gibt den aktuellen Spielzustand als unveränderliches GameState zurück.
+        Das Labyrinth wird nicht kopiert, nur die Bitmap der besuchten Zellen (1 Bit pro Zelle).
+        """
+        return GameState(
+            self.player_pos['x'], self.player_pos['y'], self.keys_mask, self.items_mask,
+            self.collected_ducks, self.end_time_bonus, self.current_score, bytes(self.visited),
+            self.game_over, self.won, self.item_cells
+        )
+
+    def restore_state(self, state):
+        """
+        Stellt einen mit clone_state() erstellten Zustand derselben Episode wieder her.
+        Es werden nur die Zellen geändert, die sich unterscheiden (Spielerposition und
+        Gegenstände, deren Status in items_mask abweicht). Sendet keine Signale.
+        Returns:
+            Liste der geänderten Zellen [(x, y), ...] (zum gezielten Neuzeichnen).
+        Raises:
+            ValueError: Wenn der Zustand aus einer anderen Episode stammt.
+        """
+        if state.episode is not self.item_cells:
+            raise ValueError("Der Spielzustand gehört zu einer anderen Episode.")
+
+        # Aktuelle Spielerzelle auf ihren Grundzustand setzen (Tür bleibt Tür)
+        old_x, old_y = self.player_pos['x'], self.player_pos['y']
+        self.maze[old_y][old_x] = 'E' if (old_x, old_y) == self.end_pos else ' '
+        changed_cells = [(old_x, old_y)]
+
+        # Nur Gegenstände anfassen, deren Status sich unterscheidet
+        changed = self.items_mask ^ state.items_mask
+        while changed:
+            lowest_bit = changed & -changed
+            x, y, char = self.item_cells[lowest_bit.bit_length() - 1]
+            self.maze[y][x] = ' ' if state.items_mask & lowest_bit else char
+            changed_cells.append((x, y))
+            changed ^= lowest_bit
+        self.items_mask = state.items_mask
+
+        self.player_pos = {'x': state.player_x, 'y': state.player_y}
+        self.maze[state.player_y][state.player_x] = 'S'
+        changed_cells.append((state.player_x, state.player_y))
+        self.keys_mask = state.keys_mask
+        self.collected_ducks = state.collected_ducks
+        self.end_time_bonus = state.end_time_bonus
+        self.current_score = state.score
+        self.visited[:] = state.visited
+        self.game_over = state.game_over
+        self.won = state.won
+        return changed_cells
+
+    def is_visited(self, x, y):
+        """True, wenn die Zelle (x, y) in dieser Episode bereits betreten wurde."""
+        cell = y * len(self.maze[0]) + x
+        return bool(self.visited[cell >> 3] >> (cell & 7) & 1)
+
+    @property
+    def collected_keys(self):
+        """Namen der gesammelten Schlüssel (aus keys_mask abgeleitet, nur zum Lesen)."""
+        return frozenset(name for name, bit in self.key_bits.items() if self.keys_mask & bit)
+
+    def has_key(self, key_name):
+        """True, wenn der Schlüssel 'key_name' (z.B. 'key-ruby') gesammelt wurde."""
+        return bool(self.keys_mask & self.key_bits[key_name])
+
     def get_maze_data(self):
         """Gibt die aktuelle Labyrinthdaten zurück."""
         return self.maze
@@ -478,7 +676,7 @@ class MazeLogic(QObject):
 
     def get_collected_keys_count(self):
         """Gibt die Anzahl der gesammelten Schlüssel zurück."""
-        return len(self.collected_keys)
+        return bin(self.keys_mask).count("1")
 
     def get_collected_ducks_count(self):
         """Gibt die Anzahl der gesammelten Enten zurück."""
@@ -500,6 +698,10 @@ class MazeLogic(QObject):
         """Prüft, ob das Spiel beendet ist."""
         return self.game_over
 
+    def has_won(self):
+        """Prüft, ob das Spiel gewonnen wurde."""
+        return self.won
+
     def get_is_ai_controlled(self):
         """Gibt zurück, ob das Spiel von der KI gesteuert wird."""
         return self.is_ai_controlled
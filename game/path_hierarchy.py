@@ -0,0 +1,520 @@
+# game/path_hierarchy.py
+# Hierarchische Wegsuche (nach HPA*) für Hinweise und Lösbarkeitsprüfungen auch auf sehr großen Maps.
+# Das Labyrinth wird in Cluster von cluster_size x cluster_size Zellen geteilt. Knoten des abstrakten
+# Graphen sind die Übergangszellen zwischen benachbarten Clustern, Kanten sind die Übergänge selbst
+# (ein Schritt) und die kürzesten Wege innerhalb eines Clusters. Eine Anfrage sucht mit A* nur auf
+# diesem Graphen und setzt den Zellweg danach Cluster für Cluster zusammen.
+# Wege werden nur durch Wände versperrt. Die ändern sich nie, daher wird der Graph einmal pro Map
+# gebaut; eingesammelte Gegenstände ändern nur das Ziel der Anfrage (siehe hint_path).
+#
+# Aufbau- und Anfragezeiten sowie Weglängen im Vergleich zur vollständigen Breitensuche:
+#   python -m game.path_hierarchy assets/maps/test2.map
+
+import argparse
+import heapq
+import random
+import time
+from array import array
+from collections import deque
+
+import numpy as np
+
+from game.map_loader import MapLoadCancelled, exit_distances, read_map
+
+CLUSTER_SIZE = 16 # Kantenlänge eines Clusters in Zellen
+LONG_ENTRANCE = 6 # Ab dieser Länge bekommt ein Durchgang zwei Übergänge (an beiden Enden) statt einem in der Mitte
+
+
+def _int_array(values):
+    """NumPy-Array -> array.array mit 64-Bit-Ganzzahlen."""
+    return array('q', np.ascontiguousarray(values, dtype=np.int64).tobytes())
+
+
+def _entrance_cells(open_pairs, cluster_size):
+    """
+    Sucht zusammenhängende Durchgänge entlang aller Clustergrenzen einer Richtung.
+    Args:
+        open_pairs: Bool-Array (Position entlang der Grenze x Grenze); True, wenn beide Zellen begehbar sind.
+    Returns:
+        (Positionen, Grenzen) der Übergänge: Mitte kurzer Durchgänge, beide Enden langer Durchgänge.
+    """
+    previous = np.zeros_like(open_pairs)
+    previous[1:] = open_pairs[:-1]
+    previous[::cluster_size] = False # Ein Durchgang endet an der Clustergrenze senkrecht dazu
+    following = np.zeros_like(open_pairs)
+    following[:-1] = open_pairs[1:]
+    following[cluster_size - 1::cluster_size] = False
+    # Transponiert, damit Anfänge und Enden nach Grenze und dann Position sortiert sind (gleiche Reihenfolge)
+    border, first = np.nonzero((open_pairs & ~previous).T)
+    _, last = np.nonzero((open_pairs & ~following).T)
+    long_run = last - first + 1 >= LONG_ENTRANCE
+    positions = np.concatenate([((first + last) // 2)[~long_run], first[long_run], last[long_run]])
+    borders = np.concatenate([border[~long_run], border[long_run], border[long_run]])
+    return positions, borders
+
+
+class PathHierarchy:
+    """
+    Abstrakter Wegegraph einer Map. Weglängen sind innerhalb eines Clusters exakt; über Clustergrenzen
+    hinweg können sie etwas länger als der kürzeste Weg sein (typisch wenige Prozent), dafür bleibt eine
+    Anfrage auch auf Maps mit Millionen Zellen im Millisekundenbereich.
+    """
+
+    SEGMENT_CACHE_SIZE = 4096 # Verfeinerte Teilwege, die zwischengespeichert werden (Hinweise ändern sich pro Zug kaum)
+
+    def __init__(self, rows, cluster_size=CLUSTER_SIZE, exit_distances=None, progress=None, is_cancelled=None,
+                 progress_range=(0.0, 1.0)):
+        """
+        Args:
+            rows: Labyrinth als Zeilen (Strings oder Listen von Zeichen); nur 'W' ist nicht begehbar.
+            exit_distances: Optional die Abstände zur Tür (LoadedMap.exit_distances). Sie verbessern die
+                            Schätzung von A* (Dreiecksungleichung) und erkennen unerreichbare Ziele sofort.
+            progress: Optionale Funktion (Anteil 0..1, Beschreibung) für Fortschrittsmeldungen.
+            is_cancelled: Optionale Funktion; gibt sie True zurück, wird mit MapLoadCancelled abgebrochen.
+            progress_range: Bereich, auf den der Fortschritt des Aufbaus abgebildet wird.
+        """
+        self.height, self.width = len(rows), len(rows[0])
+        self.cluster_size = cluster_size
+        self.clusters_x = -(-self.width // cluster_size)
+        cells = np.frombuffer("".join("".join(row) for row in rows).encode("latin-1"), dtype=np.uint8)
+        walkable = cells != ord('W')
+        self.walkable = walkable.tobytes() # 1 Byte pro Zelle (0/1), schneller Einzelzugriff für die Suchen
+        # Abstände zur Tür (-1 = nicht erreichbar); ohne Angabe überall 0 (dann nur Manhattan-Abstand)
+        self.exit_distances = (np.zeros(cells.size, dtype=np.int32) if exit_distances is None
+                               else np.asarray(exit_distances, dtype=np.int32).reshape(-1))
+        self._segments = {} # (Zelle, Zelle) -> Zellen dazwischen (ohne Anfang)
+
+        low, high = progress_range
+
+        def report(fraction, stage):
+            if is_cancelled is not None and is_cancelled():
+                raise MapLoadCancelled()
+            if progress is not None:
+                progress(low + (high - low) * fraction, stage)
+
+        report(0.0, "Suche Clusterübergänge")
+        node_cells, inter_from, inter_to = self._find_transitions(walkable.reshape(self.height, self.width))
+        # Knotendaten als array.array: schneller Einzelzugriff wie bei Listen, aber 8 Byte pro Eintrag
+        # (bei Maps mit Millionen Zellen hat der Graph über eine Million Knoten)
+        self.node_cells = _int_array(node_cells) # Knoten -> Zellindex (y * Breite + x)
+        self.node_x = _int_array(node_cells % self.width)
+        self.node_y = _int_array(node_cells // self.width)
+        self.node_exit = _int_array(self.exit_distances[node_cells])
+
+        # Knoten nach Cluster gruppiert: cluster_nodes[cluster_start[c]:cluster_start[c + 1]]
+        node_clusters = self._cluster_of(node_cells)
+        order = np.argsort(node_clusters, kind='stable')
+        counts = np.bincount(node_clusters, minlength=self.clusters_x * -(-self.height // cluster_size))
+        cluster_start = np.zeros(counts.size + 1, dtype=np.int64)
+        np.cumsum(counts, out=cluster_start[1:])
+        self.cluster_nodes = _int_array(order)
+        self.cluster_start = _int_array(cluster_start)
+        rank = np.empty(node_cells.size, dtype=np.int64)
+        rank[order] = np.arange(node_cells.size) - cluster_start[node_clusters[order]]
+
+        intra_from, intra_to, intra_cost = self._intra_cluster_edges(walkable, node_cells, node_clusters, rank, report)
+
+        # Ungerichteter Graph im CSR-Format: Kanten von Knoten n sind edge_targets[edge_start[n]:edge_start[n + 1]]
+        sources = np.concatenate([inter_from, inter_to, intra_from, intra_to])
+        targets = np.concatenate([inter_to, inter_from, intra_to, intra_from])
+        costs = np.concatenate([np.ones(inter_from.size * 2, dtype=np.int64), intra_cost, intra_cost])
+        order = np.argsort(sources, kind='stable')
+        edge_start = np.zeros(node_cells.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=node_cells.size), out=edge_start[1:])
+        self.edge_start = _int_array(edge_start)
+        self.edge_targets = _int_array(targets[order])
+        self.edge_costs = _int_array(costs[order])
+        report(1.0, "Wegenetz fertig")
+
+    def _cluster_of(self, cells):
+        """Clusternummer (zeilenweise) für Zellindizes (Array oder int)."""
+        size = self.cluster_size
+        return (cells // self.width // size) * self.clusters_x + cells % self.width // size
+
+    def _find_transitions(self, walkable):
+        """
+        Returns:
+            (Zellindizes aller Knoten sortiert, Knotenpaare der Übergänge als zwei Arrays).
+        """
+        size, width = self.cluster_size, self.width
+        # Senkrechte Grenzen: Spalte x (letzte eines Clusters) und x + 1
+        left = np.arange(size - 1, width - 1, size)
+        ys, border = _entrance_cells(walkable[:, left] & walkable[:, left + 1], size)
+        vertical = ys * width + left[border]
+        # Waagerechte Grenzen: Zeile y (letzte eines Clusters) und y + 1
+        top = np.arange(size - 1, self.height - 1, size)
+        xs, border = _entrance_cells((walkable[top, :] & walkable[top + 1, :]).T, size)
+        horizontal = top[border] * width + xs
+
+        first = np.concatenate([vertical, horizontal]).astype(np.int64)
+        second = np.concatenate([vertical + 1, horizontal + width]).astype(np.int64)
+        node_cells = np.unique(np.concatenate([first, second]))
+        return node_cells, np.searchsorted(node_cells, first), np.searchsorted(node_cells, second)
+
+    def _cluster_moves(self, walkable):
+        """Erlaubte Schritte je Zelle als Bits (1 hoch, 2 runter, 4 links, 8 rechts): Ziel begehbar und im selben Cluster."""
+        size = self.cluster_size
+        grid = walkable.reshape(self.height, self.width)
+        up, down, left, right = (np.zeros_like(grid) for _ in range(4))
+        up[1:] = grid[:-1]
+        up[::size] = False
+        down[:-1] = grid[1:]
+        down[size - 1::size] = False
+        left[:, 1:] = grid[:, :-1]
+        left[:, ::size] = False
+        right[:, :-1] = grid[:, 1:]
+        right[:, size - 1::size] = False
+        moves = up.astype(np.uint8) | down.astype(np.uint8) << 1 | left.astype(np.uint8) << 2 | right.astype(np.uint8) << 3
+        return moves.reshape(-1)
+
+    def _intra_cluster_edges(self, walkable, node_cells, node_clusters, rank, report):
+        """
+        Kürzeste Wege zwischen den Knoten jedes Clusters (nur durch Zellen desselben Clusters).
+        Für jeden Rang k läuft eine Breitensuche gleichzeitig in allen Clustern, jeweils vom k-ten Knoten
+        aus; Nachbarn jenseits der Clustergrenze werden nicht betreten.
+        """
+        width = self.width
+        moves = self._cluster_moves(walkable)
+        # Marke base + Abstand der aktuellen Suche; alles unter base stammt aus früheren Suchen (kein Zurücksetzen nötig)
+        visited = np.full(walkable.size, -1, dtype=np.int32)
+        claimed_by = np.zeros(walkable.size, dtype=np.int32)
+        base = 0
+        source_of_cluster = np.full(int(node_clusters.max()) + 1 if node_clusters.size else 0, -1, dtype=np.int64)
+        # Nur Knoten, nach denen im Cluster noch ein Knoten höheren Rangs kommt, brauchen eine eigene Suche
+        cluster_counts = np.bincount(node_clusters, minlength=source_of_cluster.size)
+        needs_search = cluster_counts[node_clusters] > rank + 1
+        edges_from, edges_to, edge_costs = [], [], []
+        max_rank = int(rank[needs_search].max()) + 1 if needs_search.any() else 0
+        for k in range(max_rank):
+            report(k / max_rank, "Berechne Wege in den Clustern")
+            sources = np.flatnonzero((rank == k) & needs_search)
+            frontier = node_cells[sources].astype(np.int32)
+            visited[frontier] = base
+            level = 0
+            while frontier.size:
+                level += 1
+                frontier_moves = moves[frontier]
+                neighbors = np.concatenate([
+                    frontier[(frontier_moves & 1) != 0] - width,
+                    frontier[(frontier_moves & 2) != 0] + width,
+                    frontier[(frontier_moves & 4) != 0] - 1,
+                    frontier[(frontier_moves & 8) != 0] + 1,
+                ])
+                neighbors = neighbors[visited[neighbors] < base]
+                # Doppelte entfernen ohne Sortieren: pro Zelle gewinnt der zuletzt geschriebene Eintrag
+                positions = np.arange(neighbors.size, dtype=np.int32)
+                claimed_by[neighbors] = positions
+                frontier = neighbors[claimed_by[neighbors] == positions]
+                visited[frontier] = base + level
+
+            # Kanten vom k-ten Knoten zu allen Knoten höheren Rangs desselben Clusters
+            source_of_cluster[node_clusters[sources]] = sources
+            candidates = np.flatnonzero(rank > k)
+            candidates = candidates[source_of_cluster[node_clusters[candidates]] >= 0]
+            reached = visited[node_cells[candidates]] - base
+            candidates, reached = candidates[reached >= 0], reached[reached >= 0]
+            edges_from.append(source_of_cluster[node_clusters[candidates]])
+            edges_to.append(candidates)
+            edge_costs.append(reached.astype(np.int64))
+            source_of_cluster[node_clusters[sources]] = -1
+            base += level
+        if not edges_from:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int64)
+        return np.concatenate(edges_from), np.concatenate(edges_to), np.concatenate(edge_costs)
+
+    def is_walkable(self, x, y):
+        """True, wenn (x, y) im Labyrinth liegt und keine Wand ist."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.walkable[y * self.width + x] == 1
+
+    def _cluster_search(self, cell):
+        """
+        Breitensuche von 'cell' aus, beschränkt auf dessen Cluster.
+        Returns:
+            Dictionary Zellindex -> Vorgängerzelle (Startzelle -> None) und Dictionary Zellindex -> Abstand.
+        """
+        size, width, walkable = self.cluster_size, self.width, self.walkable
+        x0, y0 = cell % width // size * size, cell // width // size * size
+        x1, y1 = min(x0 + size, width), min(y0 + size, self.height)
+        parents = {cell: None}
+        distances = {cell: 0}
+        queue = deque([cell])
+        while queue:
+            current = queue.popleft()
+            x, y = current % width, current // width
+            for neighbor, inside in ((current - width, y > y0), (current + width, y < y1 - 1),
+                                     (current - 1, x > x0), (current + 1, x < x1 - 1)):
+                if inside and neighbor not in parents and walkable[neighbor]:
+                    parents[neighbor] = current
+                    distances[neighbor] = distances[current] + 1
+                    queue.append(neighbor)
+        return parents, distances
+
+    def _cluster_links(self, cell):
+        """Abstände von 'cell' zu den Knoten seines Clusters (Knoten -> Schritte), nur innerhalb des Clusters."""
+        _, distances = self._cluster_search(cell)
+        cluster = self._cluster_of(cell)
+        links = {}
+        for node in self.cluster_nodes[self.cluster_start[cluster]:self.cluster_start[cluster + 1]]:
+            distance = distances.get(self.node_cells[node])
+            if distance is not None:
+                links[node] = distance
+        return links, distances
+
+    def _search(self, start, goal):
+        """
+        A* auf dem abstrakten Graphen von Zelle 'start' zu Zelle 'goal'.
+        Schätzung: max(Manhattan-Abstand, |Abstand zur Tür (Knoten) - Abstand zur Tür (Ziel)|).
+        Returns:
+            (Liste der Zellindizes der Wegpunkte inkl. start und goal, Länge) oder None.
+        """
+        if start == goal:
+            return [start], 0
+        goal_exit = int(self.exit_distances[goal])
+        if (int(self.exit_distances[start]) < 0) != (goal_exit < 0):
+            return None # Nur eins von beiden ist mit der Tür verbunden
+        width = self.width
+        goal_x, goal_y = goal % width, goal // width
+        node_cells, node_x, node_y, node_exit = self.node_cells, self.node_x, self.node_y, self.node_exit
+        edge_start, edge_targets, edge_costs = self.edge_start, self.edge_targets, self.edge_costs
+        start_links, start_distances = self._cluster_links(start)
+        goal_links, _ = self._cluster_links(goal)
+
+        # Knotennummern für Start und Ziel hinter den echten Knoten
+        start_node, goal_node = len(node_cells), len(node_cells) + 1
+        best = {start_node: 0}
+        parents = {start_node: None}
+        heap = [(0, 0, start_node)] # (Schätzung, -Kosten, Knoten): bei gleicher Schätzung zuerst die weiter gekommenen
+        if self._cluster_of(start) == self._cluster_of(goal) and goal in start_distances:
+            best[goal_node] = start_distances[goal] # Direkter Weg innerhalb des Clusters
+            parents[goal_node] = start_node
+            heapq.heappush(heap, (best[goal_node], -best[goal_node], goal_node))
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            cost = -cost
+            if cost > best[node]:
+                continue # Veralteter Eintrag
+            if node == goal_node:
+                waypoints = []
+                while node is not None:
+                    waypoints.append(start if node == start_node else goal if node == goal_node else node_cells[node])
+                    node = parents[node]
+                return waypoints[::-1], cost
+            if node == start_node:
+                neighbors = start_links.items()
+            else:
+                first, last = edge_start[node], edge_start[node + 1]
+                neighbors = zip(edge_targets[first:last], edge_costs[first:last])
+                goal_step = goal_links.get(node)
+                if goal_step is not None and cost + goal_step < best.get(goal_node, cost + goal_step + 1):
+                    best[goal_node] = cost + goal_step
+                    parents[goal_node] = node
+                    heapq.heappush(heap, (cost + goal_step, -cost - goal_step, goal_node))
+            for neighbor, step in neighbors:
+                new_cost = cost + step
+                if new_cost < best.get(neighbor, new_cost + 1):
+                    best[neighbor] = new_cost
+                    parents[neighbor] = node
+                    estimate = max(abs(node_x[neighbor] - goal_x) + abs(node_y[neighbor] - goal_y),
+                                   abs(node_exit[neighbor] - goal_exit))
+                    heapq.heappush(heap, (new_cost + estimate, -new_cost, neighbor))
+        return None
+
+    def _segment(self, current, target):
+        """Zellen von current (ausschließlich) bis target innerhalb eines Clusters (zwischengespeichert)."""
+        key = (current, target)
+        segment = self._segments.get(key)
+        if segment is None:
+            parents, _ = self._cluster_search(current)
+            segment = []
+            while target != current:
+                segment.append(target)
+                target = parents[target]
+            segment.reverse()
+            if len(self._segments) >= self.SEGMENT_CACHE_SIZE:
+                self._segments.clear()
+            self._segments[key] = segment
+        return segment
+
+    def _refine(self, waypoints):
+        """Setzt die Wegpunkte zu einem lückenlosen Zellweg zusammen (Suche nur im jeweiligen Cluster)."""
+        path = [waypoints[0]]
+        for current, target in zip(waypoints, waypoints[1:]):
+            if abs(current - target) in (1, self.width) and self._cluster_of(current) != self._cluster_of(target):
+                path.append(target) # Übergang zwischen zwei Clustern
+            else:
+                path.extend(self._segment(current, target))
+        return path
+
+    def distance(self, start, goal):
+        """Länge des gefundenen Wegs von start nach goal ((x, y)-Tupel) in Schritten oder None, wenn unerreichbar."""
+        if not (self.is_walkable(*start) and self.is_walkable(*goal)):
+            return None
+        result = self._search(start[1] * self.width + start[0], goal[1] * self.width + goal[0])
+        return None if result is None else result[1]
+
+    def find_path(self, start, goal):
+        """
+        Weg von start nach goal ((x, y)-Tupel).
+        Returns:
+            Liste von (x, y) inklusive Start und Ziel oder None, wenn das Ziel nicht erreichbar ist.
+        """
+        if not (self.is_walkable(*start) and self.is_walkable(*goal)):
+            return None
+        result = self._search(start[1] * self.width + start[0], goal[1] * self.width + goal[0])
+        if result is None:
+            return None
+        return [(cell % self.width, cell // self.width) for cell in self._refine(result[0])]
+
+    def num_nodes(self):
+        """Anzahl der Knoten des abstrakten Graphen."""
+        return len(self.node_cells)
+
+    def clear_cache(self):
+        """Verwirft die zwischengespeicherten Wegstücke (z.B. für Zeitmessungen)."""
+        self._segments.clear()
+
+
+def hint_targets(maze_logic):
+    """
+    Ziele des Hinweiswegs in der aktuellen Episode: zuerst der benötigte Schlüssel
+    (solange er nicht gesammelt ist, die nächstgelegene noch liegende Kopie), dann die Tür.
+    """
+    if maze_logic.end_pos is None or maze_logic.required_exit_key is None:
+        return None
+    targets = []
+    if not maze_logic.has_key(maze_logic.required_exit_key):
+        key_char = maze_logic.key_types[maze_logic.required_exit_key]['char']
+        player = maze_logic.player_pos
+        key_cells = [(x, y) for i, (x, y, char) in enumerate(maze_logic.item_cells)
+                     if char == key_char and not maze_logic.items_mask >> i & 1]
+        if not key_cells:
+            return None # Der benötigte Schlüssel liegt nicht im Labyrinth
+        targets.append(min(key_cells, key=lambda cell: abs(cell[0] - player['x']) + abs(cell[1] - player['y'])))
+    targets.append(tuple(maze_logic.end_pos))
+    return targets
+
+
+def hint_path(hierarchy, maze_logic):
+    """
+    Weg vom Spieler über den benötigten Schlüssel zur Tür.
+    Returns:
+        Liste von (x, y) oder None, wenn die Episode so nicht lösbar ist (oder keine Map geladen ist).
+    """
+    targets = hint_targets(maze_logic)
+    if targets is None:
+        return None
+    position = (maze_logic.player_pos['x'], maze_logic.player_pos['y'])
+    path = [position]
+    for target in targets:
+        segment = hierarchy.find_path(position, target)
+        if segment is None:
+            return None
+        path.extend(segment[1:])
+        position = target
+    return path
+
+
+class HintTracker:
+    """
+    Hinweisweg einer MazeLogic-Instanz, der Zug für Zug fortgeschrieben wird: Geht der Spieler auf dem
+    Weg weiter, fällt nur die erste Zelle weg; weicht er ab, wird sein Rückweg vorangestellt. Neu gesucht
+    wird nur bei einer neuen Episode, nach dem Einsammeln des benötigten Schlüssels oder wenn der Spieler
+    mehr als MAX_DETOUR Schritte vom Weg abgewichen ist.
+    """
+
+    MAX_DETOUR = 16
+
+    def __init__(self, hierarchy):
+        self.hierarchy = hierarchy
+        self._episode = None # MazeLogic.item_cells der Episode, zu der der Weg gehört
+        self._targets_key = None # (benötigter Schlüssel, bereits gesammelt)
+        self._reversed_path = None # Vom Ziel zum Spieler, damit Weitergehen/Abweichen nur das Listenende ändert
+        self._detour = 0
+
+    def path(self, maze_logic):
+        """Aktueller Hinweisweg als Liste von (x, y) vom Spieler zur Tür oder None (nicht lösbar, Spiel vorbei)."""
+        if maze_logic.game_over:
+            return None
+        position = (maze_logic.player_pos['x'], maze_logic.player_pos['y'])
+        targets_key = (maze_logic.required_exit_key, maze_logic.has_key(maze_logic.required_exit_key))
+        path = self._reversed_path
+        if maze_logic.item_cells is not self._episode or targets_key != self._targets_key:
+            path = self._search(maze_logic)
+        elif path is None or position == path[-1]:
+            pass # Nicht lösbar oder nicht bewegt (z.B. gegen eine Wand gelaufen)
+        elif len(path) > 1 and position == path[-2]:
+            path.pop() # Einen Schritt auf dem Weg weiter
+            self._detour = max(0, self._detour - 1)
+        elif abs(position[0] - path[-1][0]) + abs(position[1] - path[-1][1]) == 1 and self._detour < self.MAX_DETOUR:
+            path.append(position) # Abgewichen: zurück auf den bisherigen Weg
+            self._detour += 1
+        else:
+            path = self._search(maze_logic)
+        self._episode, self._targets_key = maze_logic.item_cells, targets_key
+        self._reversed_path = path
+        return None if path is None else path[::-1]
+
+    def _search(self, maze_logic):
+        self._detour = 0
+        path = hint_path(self.hierarchy, maze_logic)
+        if path is not None:
+            path.reverse()
+        return path
+
+
+def is_solvable(hierarchy, maze_logic):
+    """True, wenn der Spieler den benötigten Schlüssel und danach die Tür erreichen kann."""
+    targets = hint_targets(maze_logic)
+    if targets is None:
+        return False
+    position = (maze_logic.player_pos['x'], maze_logic.player_pos['y'])
+    for target in targets:
+        if hierarchy.distance(position, target) is None:
+            return False
+        position = target
+    return True
+
+
+def main(argv=None):
+    from game.maze_logic import MazeLogic
+
+    parser = argparse.ArgumentParser(description="Hierarchische Wegsuche: Aufbau, Anfragezeit und Weglängen")
+    parser.add_argument("map")
+    parser.add_argument("--cluster-size", type=int, default=CLUSTER_SIZE)
+    parser.add_argument("--queries", type=int, default=20, help="Zufällige Anfragen (Zelle -> Tür)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    loaded_map = read_map(args.map)
+    started = time.perf_counter()
+    hierarchy = PathHierarchy(loaded_map.rows, cluster_size=args.cluster_size, exit_distances=loaded_map.exit_distances)
+    print(f"{loaded_map.width}x{loaded_map.height}: {hierarchy.num_nodes()} Knoten, "
+          f"{len(hierarchy.edge_targets) // 2} Kanten, Aufbau {time.perf_counter() - started:.2f}s")
+
+    # Vergleich mit der vollständigen Breitensuche (Abstände zur Tür)
+    started = time.perf_counter()
+    exact = exit_distances(loaded_map.rows, loaded_map.end)
+    print(f"Vollständige Breitensuche: {(time.perf_counter() - started) * 1000:.1f}ms")
+    rng = random.Random(args.seed)
+    reachable = np.argwhere(exact > 0)
+    query_times, ratios = [], []
+    for y, x in reachable[[rng.randrange(len(reachable)) for _ in range(min(args.queries, len(reachable)))]].tolist():
+        started = time.perf_counter()
+        path = hierarchy.find_path((x, y), loaded_map.end)
+        query_times.append(time.perf_counter() - started)
+        if path is None:
+            print(f"FEHLER: kein Weg von ({x}, {y}) gefunden")
+            continue
+        ratios.append((len(path) - 1) / exact[y, x])
+    if ratios:
+        print(f"Anfragen: {len(query_times)}, im Mittel {np.mean(query_times) * 1000:.1f}ms, "
+              f"maximal {np.max(query_times) * 1000:.1f}ms; Weglänge / kürzeste: "
+              f"im Mittel {np.mean(ratios):.3f}, maximal {np.max(ratios):.3f}")
+
+    logic = MazeLogic(seed=args.seed)
+    logic.load_map(loaded_map)
+    print(f"Erste Episode lösbar: {is_solvable(hierarchy, logic)}")
+
+
+if __name__ == "__main__":
+    main()
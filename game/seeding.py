@@ -0,0 +1,23 @@
+# game/seeding.py
+# Hilfsfunktionen, um alle Zufallsquellen eines Laufs aus einem einzigen Run-Seed abzuleiten.
+
+import hashlib
+import secrets
+
+
+def new_run_seed():
+    """Erzeugt einen neuen, zufälligen Run-Seed (63 Bit, damit er in jedes int64 passt)."""
+    return secrets.randbits(63)
+
+
+def derive_seed(run_seed, *names):
+    """
+    Leitet aus einem Run-Seed einen unabhängigen Seed für einen benannten Zufallsstrom ab,
+    z.B. derive_seed(run_seed, 'agent', 'replay').
+    Gleicher Run-Seed und gleiche Namen ergeben immer denselben Seed.
+    """
+    if run_seed is None:
+        return None
+    text = ":".join([str(run_seed)] + [str(name) for name in names])
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little') >> 1 # 63 Bit
@@ -0,0 +1,210 @@
+# game/trajectory.py
+# Kompaktes Binärformat für aufgezeichnete Episoden und ein Abspieler mit Keyframes.
+#
+# Aufbau einer .traj-Datei (Little Endian):
+#   Header:  Magic 'MZTR' | Version (u16) | Flags (u16) | SHA-1 der Map (20 Bytes) |
+#            Seed (i64) | Anzahl Schritte (u32) | End-Punktestand (i32) | Länge Map-Pfad (u16)
+#   Map-Pfad (UTF-8)
+#   Aktionen: 2 Bit pro Schritt, 4 Schritte pro Byte (Schritt i in Bits 2*(i%4)..2*(i%4)+1)
+#   Belohnungen: float32 pro Schritt
+
+import hashlib
+import os
+import struct
+from array import array
+
+from game.maze_logic import MazeLogic
+from game.episode_recorder import ACTION_VECTORS, EpisodeRecord
+
+MAGIC = b'MZTR'
+VERSION = 1
+FLAG_DONE = 1 # Episode endete mit Sieg oder Niederlage
+HEADER_FORMAT = '<4sHH20sqIiH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+TRAJECTORY_EXTENSION = '.traj'
+
+KEYFRAME_INTERVAL = 64 # Alle wie viele Schritte der Abspieler einen Zustand zwischenspeichert
+
+_map_hash_cache = {} # (Pfad, mtime, Größe) -> SHA-1
+
+
+def map_file_hash(filepath):
+    """Gibt den SHA-1-Hash einer Map-Datei zurück (gecacht, solange sich die Datei nicht ändert)."""
+    stat = os.stat(filepath)
+    cache_key = (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+    digest = _map_hash_cache.get(cache_key)
+    if digest is None:
+        with open(filepath, 'rb') as f:
+            digest = hashlib.sha1(f.read()).digest()
+        _map_hash_cache[cache_key] = digest
+    return digest
+
+
+def pack_actions(actions):
+    """Packt eine Liste von Aktionsindizes (0-3) in 2 Bit pro Aktion."""
+    packed = bytearray((len(actions) + 3) // 4)
+    for i, action in enumerate(actions):
+        packed[i >> 2] |= (action & 3) << ((i & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_actions(packed, count):
+    """Entpackt 'count' Aktionsindizes aus dem 2-Bit-Format."""
+    return [(packed[i >> 2] >> ((i & 3) * 2)) & 3 for i in range(count)]
+
+
+def write_trajectory(record, filepath):
+    """
+    Schreibt ein EpisodeRecord als .traj-Datei.
+    Der Map-Hash wird aus der Map-Datei berechnet, falls das Record keinen enthält.
+    """
+    map_hash = record.map_hash or map_file_hash(record.map_path)
+    path_bytes = (record.map_path or "").encode('utf-8')
+    rewards = array('f', record.rewards if len(record.rewards) == len(record.actions) else [0.0] * len(record.actions))
+
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, VERSION, FLAG_DONE if record.done else 0, map_hash,
+        record.seed, len(record.actions), record.final_score or 0, len(path_bytes)
+    )
+    with open(filepath, 'wb') as f:
+        f.write(header)
+        f.write(path_bytes)
+        f.write(pack_actions(record.actions))
+        f.write(rewards.tobytes())
+
+
+def read_trajectory(filepath):
+    """
+    Liest eine .traj-Datei und gibt ein EpisodeRecord zurück.
+    Raises:
+        ValueError: Wenn die Datei kein gültiges Trajektorien-Format hat.
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Datei zu kurz für eine Trajektorie: {filepath}")
+    magic, version, flags, map_hash, seed, count, final_score, path_len = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError(f"Keine Trajektorien-Datei: {filepath}")
+    if version != VERSION:
+        raise ValueError(f"Nicht unterstützte Trajektorien-Version {version}: {filepath}")
+
+    offset = HEADER_SIZE
+    map_path = data[offset:offset + path_len].decode('utf-8')
+    offset += path_len
+    packed_len = (count + 3) // 4
+    actions = unpack_actions(data[offset:offset + packed_len], count)
+    offset += packed_len
+    rewards = array('f')
+    rewards.frombytes(data[offset:offset + 4 * count])
+    if len(actions) != count or len(rewards) != count:
+        raise ValueError(f"Trajektorie ist unvollständig: {filepath}")
+
+    record = EpisodeRecord(map_path, seed, actions, final_score, bool(flags & FLAG_DONE))
+    record.rewards = rewards
+    record.map_hash = map_hash
+    return record
+
+
+def _capture_state(logic):
+    """Speichert den veränderlichen Spielzustand einer MazeLogic-Instanz (für Keyframes)."""
+    return logic.clone_state()
+
+
+def _restore_state(logic, state):
+    """Stellt einen mit _capture_state gespeicherten Zustand wieder her."""
+    logic.restore_state(state)
+
+
+class TrajectoryPlayer:
+    """
+    Spielt eine aufgezeichnete Episode auf einer eigenen MazeLogic-Instanz ab.
+    Beim Öffnen wird die Episode einmal komplett simuliert und alle KEYFRAME_INTERVAL Schritte
+    ein Keyframe gespeichert; seek() springt dann zum nächsten Keyframe und simuliert nur den Rest.
+    """
+
+    def __init__(self, record, maze_logic=None, keyframe_interval=KEYFRAME_INTERVAL):
+        """
+        Args:
+            record: EpisodeRecord oder Pfad zu einer .traj-Datei.
+            maze_logic: MazeLogic-Instanz, auf der abgespielt wird (z.B. die eines Replay-Widgets).
+            keyframe_interval: Abstand der Keyframes in Schritten.
+        Raises:
+            ValueError: Wenn die Map fehlt, nicht zur Aufzeichnung passt oder nicht geladen werden kann.
+        """
+        if isinstance(record, str):
+            record = read_trajectory(record)
+        self.record = record
+        self.maze_logic = maze_logic if maze_logic is not None else MazeLogic()
+        self.keyframe_interval = keyframe_interval
+        self.position = 0 # Anzahl der bereits ausgeführten Schritte
+
+        if not record.map_path or not os.path.exists(record.map_path):
+            raise ValueError(f"Map der Aufzeichnung nicht gefunden: {record.map_path}")
+        if record.map_hash and map_file_hash(record.map_path) != record.map_hash:
+            raise ValueError(f"Die Map '{record.map_path}' wurde seit der Aufzeichnung verändert.")
+
+        self.maze_logic.blockSignals(True)
+        try:
+            if not self.maze_logic.load_maze_from_file(record.map_path, seed=record.seed):
+                raise ValueError(f"Map der Aufzeichnung konnte nicht geladen werden: {record.map_path}")
+            self.keyframes = self._build_keyframes()
+            _restore_state(self.maze_logic, self.keyframes[0])
+        finally:
+            self.maze_logic.blockSignals(False)
+        self._emit_updates()
+
+    def __len__(self):
+        return len(self.record.actions)
+
+    def _build_keyframes(self):
+        """Simuliert die gesamte Episode einmal und speichert regelmäßig den Zustand."""
+        keyframes = [_capture_state(self.maze_logic)]
+        for step, action_idx in enumerate(self.record.actions, start=1):
+            self.maze_logic.move_player(*ACTION_VECTORS[action_idx])
+            if step % self.keyframe_interval == 0:
+                keyframes.append(_capture_state(self.maze_logic))
+        return keyframes
+
+    def seek(self, step):
+        """Springt zu Schritt 'step' (0 = Startzustand, len(self) = Endzustand)."""
+        step = max(0, min(step, len(self)))
+        keyframe_idx = step // self.keyframe_interval
+        # Vom aktuellen Zustand aus vorwärts simulieren, wenn das kürzer ist als vom Keyframe
+        if not (keyframe_idx * self.keyframe_interval <= self.position <= step):
+            _restore_state(self.maze_logic, self.keyframes[keyframe_idx])
+            self.position = keyframe_idx * self.keyframe_interval
+
+        self.maze_logic.blockSignals(True)
+        try:
+            while self.position < step:
+                self.maze_logic.move_player(*ACTION_VECTORS[self.record.actions[self.position]])
+                self.position += 1
+        finally:
+            self.maze_logic.blockSignals(False)
+        self._emit_updates()
+
+    def step_forward(self, steps=1):
+        """Geht 'steps' Schritte vorwärts."""
+        self.seek(self.position + steps)
+
+    def step_back(self, steps=1):
+        """Geht 'steps' Schritte zurück."""
+        self.seek(self.position - steps)
+
+    def at_end(self):
+        """True, wenn der letzte Schritt erreicht ist."""
+        return self.position >= len(self)
+
+    def reward_at(self, step):
+        """Gibt die aufgezeichnete Belohnung des Schritts 'step' (1-basiert) zurück."""
+        if 1 <= step <= len(self.record.rewards):
+            return self.record.rewards[step - 1]
+        return 0.0
+
+    def _emit_updates(self):
+        """Aktualisiert das UI, nachdem Schritte mit blockierten Signalen simuliert wurden."""
+        self.maze_logic.keys_changed.emit(self.maze_logic.get_collected_keys_count())
+        self.maze_logic.ducks_changed.emit(self.maze_logic.collected_ducks)
+        self.maze_logic.maze_updated.emit()
@@ -20,7 +20,7 @@ def create_project_directories():
             print(f"Verzeichnis erstellt: {path}")
 
     # Unterverzeichnisse in 'assets'
-    assets_sub_dirs = ["images", "maps", "sounds", "scores"]
+    assets_sub_dirs = ["images", "maps", "sounds", "scores", "replays"]
     for sd in assets_sub_dirs:
         path = os.path.join(os.getcwd(), "assets", sd)
         if not os.path.exists(path):
@@ -0,0 +1,44 @@
+# tests/test_async_learner.py
+# Prüft, dass der Lern-Thread (ai/async_learner.py) die acting_policy des Agenten nach stop() zurückgibt.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m pytest -q tests
+
+import pytest
+
+from ai.agent import Agent
+from ai.async_learner import AsyncLearner
+from ai.fast_inference import NumpyQNetwork
+from ai.inference_server import RemotePolicy
+from game.maze_logic import MazeLogic
+
+
+@pytest.fixture
+def env():
+    logic = MazeLogic()
+    logic.verbose = False
+    assert logic.load_maze_from_file("assets/maps/test10.map", seed=0)
+    return logic
+
+
+def test_stop_restores_fast_inference_copy(env, tmp_path):
+    agent = Agent(env, model_path=str(tmp_path / "model.pth"), inference_mode="numpy")
+    before = agent.acting_policy
+    assert isinstance(before, NumpyQNetwork)
+    learner = AsyncLearner(agent)
+    learner.start()
+    assert agent.acting_policy == learner.q_values
+    learner.stop()
+    # Neu aus den (inzwischen trainierten) Gewichten erzeugt, nicht die alte Kopie
+    assert isinstance(agent.acting_policy, NumpyQNetwork)
+    assert agent.acting_policy is not before
+
+
+def test_stop_restores_remote_policy(env, tmp_path):
+    agent = Agent(env, model_path=str(tmp_path / "model.pth"), inference_address=f"unix:{tmp_path / 'none.sock'}")
+    remote = agent.acting_policy
+    assert isinstance(remote, RemotePolicy)
+    learner = AsyncLearner(agent)
+    learner.start()
+    learner.stop()
+    assert agent.acting_policy is remote
@@ -0,0 +1,19 @@
+# tests/test_evaluation.py
+# Prüft die Zusammenfassung der Modellbewertung (ai/evaluation.py).
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m pytest -q tests
+
+from ai.evaluation import summarize
+
+
+def test_success_rate_counts_only_solvable_episodes():
+    """Gewonnene Episoden ohne bekannten kürzesten Weg dürfen die Erfolgsquote nicht über 1 heben."""
+    summary = summarize([
+        {'won': True, 'steps': 40, 'score': 1, 'optimal_steps': None},
+        {'won': True, 'steps': 12, 'score': 1, 'optimal_steps': 12},
+        {'won': False, 'steps': 30, 'score': 0, 'optimal_steps': 10},
+    ])
+    assert summary['solvable_episodes'] == 2
+    assert summary['success_rate'] == 0.5
+    assert summary['optimality_gap'] == 0.0
@@ -0,0 +1,48 @@
+# tests/test_imitation.py
+# Prüft den Kürzeste-Wege-Löser der Demonstrationen (ai/imitation.py) gegen die Abstände der Map
+# und gegen den Value-Iteration-Löser.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m pytest -q tests
+
+import pytest
+
+from ai.imitation import shortest_path_actions
+from ai.value_iteration import ValueIterationSolver
+from game.episode_recorder import ACTION_VECTORS
+from game.map_loader import exit_distances
+from game.maze_logic import MazeLogic
+
+MAP_PATH = "assets/maps/test10.map"
+
+
+def _load(seed):
+    logic = MazeLogic()
+    logic.verbose = False
+    assert logic.load_maze_from_file(MAP_PATH, seed=seed)
+    return logic
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_shortest_path_matches_distances(seed):
+    """Kürzester Weg = Start -> Schlüssel -> Tür; die Tür darf ohne Schlüssel überquert werden."""
+    logic = _load(seed)
+    loaded_map = logic.loaded_map
+    required_char = logic.key_types[logic.required_exit_key]['char']
+    key_x, key_y = next((x, y) for x, y, char in logic.item_cells if char == required_char)
+    start_x, start_y = logic.player_pos['x'], logic.player_pos['y']
+    expected = (exit_distances(loaded_map.rows, (key_x, key_y))[start_y, start_x]
+                + loaded_map.exit_distances[key_y, key_x])
+
+    actions = shortest_path_actions(logic)
+    assert actions is not None
+    assert len(actions) == expected
+
+    solver = ValueIterationSolver(logic)
+    solver.solve()
+    assert len(actions) <= solver.optimal_path_length(start_x, start_y, logic.required_exit_key)
+
+    done = False
+    for action in actions:
+        _, done = logic.move_player(*ACTION_VECTORS[action])
+    assert done
@@ -0,0 +1,57 @@
+# tests/test_inference_server.py
+# Prüft den lokalen Inferenz-Dienst (ai/inference_server.py) mit einem kleinen Modell über einen Unix-Socket.
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m pytest -q tests
+
+import pytest
+import torch
+
+from ai.agent import QNetwork
+from ai.inference_server import InferenceServer, RemotePolicy
+
+INPUT_SIZE = 25
+ACTIONS = 4
+
+
+@pytest.fixture
+def server(tmp_path):
+    model_path = str(tmp_path / "model.pth")
+    torch.save(QNetwork(INPUT_SIZE, ACTIONS, 16).state_dict(), model_path)
+    inference = InferenceServer(model_path, address=f"unix:{tmp_path / 'ai.sock'}", reload_interval=None)
+    inference.start()
+    yield inference
+    inference.stop()
+
+
+def _failing_network(observations):
+    raise RuntimeError("Vorwärtsdurchlauf fehlgeschlagen")
+
+
+def test_remote_policy_answers_like_local_network(server):
+    policy = RemotePolicy(server.address)
+    observations = torch.rand(3, INPUT_SIZE)
+    with torch.no_grad():
+        expected = server.network(observations)
+    assert torch.allclose(policy(observations), expected)
+    policy.close()
+
+
+def test_failed_batch_uses_fallback(server):
+    """Ein fehlgeschlagener Batch verhält sich wie ein Verbindungsabbruch: 'fallback' rechnet lokal."""
+    server.network = _failing_network
+    fallback = QNetwork(INPUT_SIZE, ACTIONS, 16)
+    policy = RemotePolicy(server.address, fallback=fallback)
+    observations = torch.zeros(1, INPUT_SIZE)
+    with torch.no_grad():
+        expected = fallback(observations)
+    assert torch.equal(policy(observations), expected)
+    policy.close()
+
+
+def test_failed_batch_without_fallback_raises_connection_error(server):
+    server.network = _failing_network
+    policy = RemotePolicy(server.address)
+    with pytest.raises(ConnectionError):
+        policy(torch.zeros(1, INPUT_SIZE))
+    policy.close()
@@ -2,11 +2,39 @@
 # Dieses Widget ist für die grafische Darstellung des Labyrinths zuständig.
 
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QPixmap, QColor
-from PyQt6.QtCore import Qt, QRectF, QTimer 
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QImage, QPen, QPolygonF
+from PyQt6.QtCore import Qt, QPointF, QRectF, QTimer, pyqtSignal
 import os 
 
+import numpy as np
+
+from game.path_hierarchy import HintTracker
+from ui.palette_renderer import PaletteRenderer, EMPTY_INDEX
+from ui.viewport import Camera
+
 class GameBoardWidget(QWidget):
+    # Signalisiert im Replay-Modus die aktuelle Position (Schritt, Gesamtanzahl Schritte)
+    replay_position_changed = pyqtSignal(int, int)
+    # Signalisiert im Replay-Modus, ob gerade abgespielt wird
+    replay_playing_changed = pyqtSignal(bool)
+    # Fordert das Wegenetz für eine geladene Map an, die noch keins hat (z.B. im Replay-Viewer)
+    path_hierarchy_needed = pyqtSignal(object)
+
+    REPLAY_TICK_INTERVAL = 20 # ms zwischen zwei Abspiel-Schritten
+    REPLAY_PAGE_STEPS = 50 # Sprungweite mit Bild auf/ab im Replay-Modus
+
+    # Darstellungsarten: 'palette' zeichnet das Labyrinth als ein Bild (auch für sehr große Maps),
+    # 'classic' zeichnet wie bisher jede Zelle einzeln
+    RENDER_MODE_PALETTE = 'palette'
+    RENDER_MODE_CLASSIC = 'classic'
+    SPRITE_MIN_CELL_SIZE = 12 # Ab dieser Zellgröße (Pixel) werden die Bilder über das Palettenbild gelegt
+
+    ZOOM_STEP = 1.25 # Zoomfaktor pro Mausrad-Raste bzw. Tastendruck (+/-)
+    MINIMAP_SIZE = 160 # Maximale Kantenlänge der Minimap in Pixeln
+    MINIMAP_MARGIN = 8
+    HINT_PATH_COLOR = QColor(255, 140, 0, 170) # Halbtransparentes Orange
+    HINT_PATH_WIDTH = 0.3 # Linienbreite des Hinweiswegs in Zellen (mindestens 2 Pixel)
+
     def __init__(self, maze_logic, parent=None):
         super().__init__(parent)
         self.maze_logic = maze_logic # Referenz zur Spiellogik
@@ -19,7 +47,8 @@ class GameBoardWidget(QWidget):
         
         # Verbinde das Signal von MazeLogic, um das Widget neu zu zeichnen,
         # wenn sich das Labyrinth oder der Spielerstatus ändert.
-        self.maze_logic.maze_updated.connect(self.update)
+        self.maze_logic.maze_updated.connect(self._on_maze_updated)
+        self.maze_logic.cells_changed.connect(self._on_cells_changed)
         
         # Setze die Ränder auf 0, um sicherzustellen, dass das Widget den gesamten Platz nutzt
         self.setContentsMargins(0, 0, 0, 0)
@@ -42,6 +71,32 @@ class GameBoardWidget(QWidget):
             'B': 'duck-blue.png',
         }
 
+        # Palettenbild des Labyrinths; wird nur neu aufgebaut, wenn sich das Labyrinth geändert hat
+        self.render_mode = self.RENDER_MODE_PALETTE
+        self.palette_renderer = PaletteRenderer()
+        self.palette_dirty = True
+        self.scaled_images = {} # Dateiname -> auf die aktuelle Zellgröße skaliertes Bild
+        self.scaled_images_size = 0
+
+        # Kamera (Zoom, Verschieben, Spieler verfolgen) und Minimap
+        self.camera = Camera()
+        self.drag_start = None # Letzte Mausposition beim Verschieben mit gedrückter Maustaste
+        self.minimap_image = None # Verkleinertes Bild von Wänden und Wegen (nur beim Laden einer Map erzeugt)
+        self.minimap_key = None
+
+        # Replay-Modus: statt Tastatursteuerung wird eine aufgezeichnete Episode abgespielt
+        self.replay_player = None # TrajectoryPlayer, wenn der Replay-Modus aktiv ist
+        self.replay_steps_per_tick = 1 # Abspielgeschwindigkeit (Schritte pro Timer-Tick)
+        self.replay_timer = QTimer(self)
+        self.replay_timer.timeout.connect(self._advance_replay)
+
+        # Hinweisweg (Taste H) zum benötigten Schlüssel und zur Tür, berechnet auf dem Wegenetz der Map
+        self.show_hint_path = False
+        self.path_hierarchy = None # PathHierarchy (game/path_hierarchy.py) der Map path_hierarchy_map
+        self.path_hierarchy_map = None
+        self.hint_tracker = None
+        self.requested_hierarchy_map = None # Map, für die path_hierarchy_needed zuletzt gesendet wurde
+
     def load_images(self):
         """
         Lädt alle benötigten Bilddateien aus dem 'assets/images'-Ordner.
@@ -66,11 +121,199 @@ class GameBoardWidget(QWidget):
             else:
                 print(f"Image file not found: {filepath}")
 
+    def set_render_mode(self, mode):
+        """Wählt die Darstellungsart (RENDER_MODE_PALETTE oder RENDER_MODE_CLASSIC)."""
+        if mode not in (self.RENDER_MODE_PALETTE, self.RENDER_MODE_CLASSIC):
+            raise ValueError(f"Unbekannte Darstellungsart: {mode}")
+        self.render_mode = mode
+        self.palette_dirty = True
+        self.update()
+
+    def _on_maze_updated(self):
+        """Merkt sich, dass das Palettenbild neu aufgebaut werden muss, und zeichnet neu."""
+        self.palette_dirty = True
+        self.update()
+
+    def _on_cells_changed(self, cells):
+        """Überträgt nur die geänderten Zellen ins Palettenbild (statt es ganz neu aufzubauen) und zeichnet neu."""
+        maze = self.maze_logic.get_maze_data()
+        if not self.palette_dirty and self.palette_renderer.pixels is not None and \
+                (len(maze), len(maze[0])) == (self.palette_renderer.height, self.palette_renderer.width):
+            self.palette_renderer.update_cells(maze, cells)
+        else:
+            self.palette_dirty = True
+        self.update()
+
     def paintEvent(self, event):
         """
         Wird aufgerufen, wenn das Widget neu gezeichnet werden muss.
         Zeichnet das Labyrinth, den Spieler und alle Elemente.
         """
+        if self.render_mode == self.RENDER_MODE_PALETTE:
+            self._paint_palette()
+        else:
+            self._paint_classic()
+
+    def _maze_layout(self, maze_width_cells, maze_height_cells):
+        """Berechnet Zellgröße und Position der Zelle (0, 0) für den aktuellen Kameraausschnitt."""
+        return self.camera.layout(self.width(), self.height(), maze_width_cells, maze_height_cells,
+                                  self.maze_logic.player_pos)
+
+    def _visible_cells(self, maze_width_cells, maze_height_cells, cell_size, start_x, start_y):
+        """Gibt den sichtbaren Zellbereich (erste Spalte, erste Zeile, Ende Spalte, Ende Zeile) zurück."""
+        return Camera.visible_cells(self.width(), self.height(), maze_width_cells, maze_height_cells,
+                                    cell_size, start_x, start_y)
+
+    def _paint_palette(self):
+        """
+        Zeichnet das Labyrinth mit einem einzigen drawImage aus dem Palettenbild.
+        Die Bilder der Elemente werden nur darübergelegt, wenn die Zellen groß genug sind.
+        """
+        painter = QPainter(self)
+        maze = self.maze_logic.get_maze_data()
+
+        if not maze or not maze[0]:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No maze loaded.")
+            return
+
+        if self.palette_dirty or (len(maze), len(maze[0])) != (self.palette_renderer.height, self.palette_renderer.width):
+            self.palette_renderer.update(maze)
+            self.palette_dirty = False
+
+        maze_width_cells = self.palette_renderer.width
+        maze_height_cells = self.palette_renderer.height
+        cell_size, start_x, start_y = self._maze_layout(maze_width_cells, maze_height_cells)
+        visible = self._visible_cells(maze_width_cells, maze_height_cells, cell_size, start_x, start_y)
+        first_col, first_row, end_col, end_row = visible
+
+        # Nur der sichtbare Ausschnitt des Palettenbilds wird skaliert und gezeichnet
+        source_rect = QRectF(first_col, first_row, end_col - first_col, end_row - first_row)
+        target_rect = QRectF(start_x + first_col * cell_size, start_y + first_row * cell_size,
+                             source_rect.width() * cell_size, source_rect.height() * cell_size)
+
+        show_sprites = cell_size >= self.SPRITE_MIN_CELL_SIZE
+        self.palette_renderer.draw(painter, target_rect, source_rect, background_only=show_sprites)
+        if show_sprites:
+            self._paint_sprites(painter, cell_size, start_x, start_y, visible)
+
+        if self.show_hint_path:
+            self._paint_hint_path(painter, cell_size, start_x, start_y)
+
+        painter.setPen(QColor('blue'))
+        painter.drawRect(QRectF(start_x, start_y, maze_width_cells * cell_size, maze_height_cells * cell_size).toRect())
+
+        if self.camera.is_zoomed():
+            self._paint_minimap(painter, cell_size, start_x, start_y)
+
+    def _paint_sprites(self, painter, cell_size, start_x, start_y, visible):
+        """Zeichnet die Bilder aller sichtbaren, nicht leeren Zellen (nur bei ausreichend großen Zellen)."""
+        first_col, first_row, end_col, end_row = visible
+        cells = self.palette_renderer.cell_indices()[first_row:end_row, first_col:end_col]
+        rows, cols = np.nonzero(cells != EMPTY_INDEX)
+        maze = self.maze_logic.get_maze_data()
+        for r_idx, c_idx in zip((rows + first_row).tolist(), (cols + first_col).tolist()):
+            image = self._scaled_image(maze[r_idx][c_idx], int(cell_size))
+            if image is None:
+                continue
+            x = int(start_x + c_idx * cell_size) + (int(cell_size) - image.width()) // 2
+            y = int(start_y + r_idx * cell_size) + (int(cell_size) - image.height()) // 2
+            painter.drawPixmap(x, y, image)
+
+    def _paint_minimap(self, painter, cell_size, start_x, start_y):
+        """
+        Zeichnet oben rechts eine Übersicht des ganzen Labyrinths mit Spielerposition und sichtbarem Ausschnitt.
+        Das verkleinerte Bild wird nur neu erzeugt, wenn eine andere Map geladen wurde.
+        """
+        renderer = self.palette_renderer
+        minimap_key = (self.maze_logic.map_path, id(self.maze_logic.original_maze_layout), renderer.width, renderer.height)
+        if self.minimap_image is None or self.minimap_key != minimap_key:
+            self.minimap_image = renderer.background_image.scaled(
+                self.MINIMAP_SIZE, self.MINIMAP_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            ).convertToFormat(QImage.Format.Format_RGB32)
+            self.minimap_key = minimap_key
+
+        scale = self.minimap_image.width() / renderer.width
+        minimap_x = self.width() - self.minimap_image.width() - self.MINIMAP_MARGIN
+        minimap_y = self.MINIMAP_MARGIN
+        painter.drawImage(minimap_x, minimap_y, self.minimap_image)
+        painter.setPen(QColor('blue'))
+        painter.drawRect(minimap_x, minimap_y, self.minimap_image.width(), self.minimap_image.height())
+
+        # Sichtbarer Ausschnitt
+        painter.setPen(QColor('red'))
+        painter.drawRect(QRectF(minimap_x - start_x / cell_size * scale, minimap_y - start_y / cell_size * scale,
+                                self.width() / cell_size * scale, self.height() / cell_size * scale))
+
+        # Spielerposition
+        player_pos = self.maze_logic.player_pos
+        marker_size = max(3.0, scale)
+        painter.fillRect(QRectF(minimap_x + (player_pos['x'] + 0.5) * scale - marker_size / 2,
+                                minimap_y + (player_pos['y'] + 0.5) * scale - marker_size / 2,
+                                marker_size, marker_size), QColor(0, 90, 255))
+
+    def set_path_hierarchy(self, loaded_map, path_hierarchy):
+        """Übernimmt das Wegenetz der Map 'loaded_map' (wird vom MapLoadWorker beim Laden gebaut)."""
+        self.path_hierarchy_map = loaded_map
+        self.path_hierarchy = path_hierarchy
+        self.hint_tracker = HintTracker(path_hierarchy)
+        self.update()
+
+    def set_show_hint_path(self, show):
+        """Blendet den Hinweisweg ein oder aus."""
+        self.show_hint_path = show
+        self.update()
+
+    def _current_hint_path(self):
+        """
+        Hinweisweg für den aktuellen Spielzustand oder None. Gehört das Wegenetz nicht zur geladenen Map
+        (z.B. im Replay-Viewer), wird es einmal über 'path_hierarchy_needed' angefordert; bis es
+        (im Hintergrund gebaut) über set_path_hierarchy() ankommt, wird kein Weg gezeichnet.
+        """
+        loaded_map = self.maze_logic.loaded_map
+        if loaded_map is None:
+            return None
+        if self.path_hierarchy_map is not loaded_map:
+            if self.requested_hierarchy_map is not loaded_map:
+                self.requested_hierarchy_map = loaded_map
+                self.path_hierarchy_needed.emit(loaded_map)
+            return None
+        return self.hint_tracker.path(self.maze_logic)
+
+    def _paint_hint_path(self, painter, cell_size, start_x, start_y):
+        """Zeichnet den Hinweisweg als Linie durch die Zellmitten (in Zellkoordinaten, Qt skaliert)."""
+        path = self._current_hint_path()
+        if not path or len(path) < 2:
+            return
+        painter.save()
+        painter.translate(start_x, start_y)
+        painter.scale(cell_size, cell_size)
+        pen = QPen(self.HINT_PATH_COLOR, max(self.HINT_PATH_WIDTH, 2.0 / cell_size))
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        pen.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+        painter.setPen(pen)
+        painter.drawPolyline(QPolygonF([QPointF(x + 0.5, y + 0.5) for x, y in path]))
+        painter.restore()
+
+    def _scaled_image(self, cell, size):
+        """Gibt das Bild eines Labyrinthzeichens in der Zellgröße zurück (zwischengespeichert)."""
+        image_filename = self.char_to_image_map.get(cell)
+        if image_filename is None:
+            return None
+        if size != self.scaled_images_size:
+            self.scaled_images = {}
+            self.scaled_images_size = size
+        scaled_image = self.scaled_images.get(image_filename)
+        if scaled_image is None:
+            target_image = self.images.get(image_filename)
+            if target_image is None:
+                return None
+            scaled_image = target_image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            self.scaled_images[image_filename] = scaled_image
+        return scaled_image
+
+    def _paint_classic(self):
+        """Ursprüngliche Darstellung: jede Zelle wird einzeln gefüllt und ihr Bild einzeln skaliert."""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing) 
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform) 
@@ -91,24 +334,23 @@ class GameBoardWidget(QWidget):
         print(f"DEBUG: paintEvent - Widget size: {available_width}x{available_height}")
         print(f"DEBUG: paintEvent - Maze dimensions (cells): {maze_width_cells}x{maze_height_cells}")
 
-        cell_size_by_width = available_width / maze_width_cells
-        cell_size_by_height = available_height / maze_height_cells
-
-        cell_size = min(cell_size_by_width, cell_size_by_height)
+        cell_size, start_x, start_y = self._maze_layout(maze_width_cells, maze_height_cells)
         
         print(f"DEBUG: paintEvent - Calculated cell_size: {cell_size:.2f}")
 
         total_maze_pixel_width = maze_width_cells * cell_size
         total_maze_pixel_height = maze_height_cells * cell_size
 
-        start_x = (available_width - total_maze_pixel_width) / 2
-        start_y = (available_height - total_maze_pixel_height) / 2
-
         print(f"DEBUG: paintEvent - Total Maze Pixel Size (calculated): {total_maze_pixel_width:.2f}x{total_maze_pixel_height:.2f}")
         print(f"DEBUG: paintEvent - Start drawing coordinates (x,y): ({start_x:.2f}, {start_y:.2f})")
 
-        for r_idx, row in enumerate(maze):
-            for c_idx, cell in enumerate(row):
+        # Nur die Zellen zeichnen, die im sichtbaren Ausschnitt liegen
+        first_col, first_row, end_col, end_row = self._visible_cells(
+            maze_width_cells, maze_height_cells, cell_size, start_x, start_y)
+        for r_idx in range(first_row, end_row):
+            row = maze[r_idx]
+            for c_idx in range(first_col, end_col):
+                cell = row[c_idx]
                 x = start_x + c_idx * cell_size
                 y = start_y + r_idx * cell_size
 
@@ -127,12 +369,177 @@ class GameBoardWidget(QWidget):
                     x_offset = (int(cell_size) - scaled_image.width()) // 2
                     y_offset = (int(cell_size) - scaled_image.height()) // 2
                     painter.drawPixmap(int(x + x_offset), int(y + y_offset), scaled_image)
-                
+
+        if self.show_hint_path:
+            self._paint_hint_path(painter, cell_size, start_x, start_y)
+
         painter.setPen(QColor('blue'))
         painter.drawRect(int(start_x), int(start_y), int(total_maze_pixel_width), int(total_maze_pixel_height))
 
 
+    def set_replay_player(self, player):
+        """
+        Aktiviert den Replay-Modus mit einem TrajectoryPlayer (None beendet den Replay-Modus).
+        Der Player muss auf derselben MazeLogic-Instanz arbeiten wie dieses Widget.
+        """
+        self.pause_replay()
+        self.replay_player = player
+        if player is not None:
+            self.replay_position_changed.emit(player.position, len(player))
+        self.update()
+
+    def is_replay_mode(self):
+        """True, wenn gerade eine Aufzeichnung angezeigt wird."""
+        return self.replay_player is not None
+
+    def seek_replay(self, step):
+        """Springt im Replay-Modus zu einem bestimmten Schritt."""
+        if self.replay_player is None:
+            return
+        self.replay_player.seek(step)
+        self.replay_position_changed.emit(self.replay_player.position, len(self.replay_player))
+
+    def set_replay_speed(self, steps_per_tick):
+        """Setzt die Abspielgeschwindigkeit in Schritten pro Timer-Tick (1 = Echtzeit wie die KI)."""
+        self.replay_steps_per_tick = max(1, int(steps_per_tick))
+
+    def play_replay(self):
+        """Startet das Abspielen (am Ende beginnt es wieder von vorn)."""
+        if self.replay_player is None:
+            return
+        if self.replay_player.at_end():
+            self.seek_replay(0)
+        self.replay_timer.start(self.REPLAY_TICK_INTERVAL)
+        self.replay_playing_changed.emit(True)
+
+    def pause_replay(self):
+        """Hält das Abspielen an."""
+        if self.replay_timer.isActive():
+            self.replay_timer.stop()
+            self.replay_playing_changed.emit(False)
+
+    def toggle_replay_playback(self):
+        """Wechselt zwischen Abspielen und Pause."""
+        if self.replay_timer.isActive():
+            self.pause_replay()
+        else:
+            self.play_replay()
+
+    def _advance_replay(self):
+        """Wird vom Replay-Timer aufgerufen und geht die eingestellte Anzahl Schritte vorwärts."""
+        if self.replay_player is None or self.replay_player.at_end():
+            self.pause_replay()
+            return
+        self.seek_replay(self.replay_player.position + self.replay_steps_per_tick)
+        if self.replay_player.at_end():
+            self.pause_replay()
+
+    def _handle_replay_key(self, event):
+        """Tastatursteuerung im Replay-Modus. Gibt True zurück, wenn die Taste verarbeitet wurde."""
+        key = event.key()
+        position = self.replay_player.position
+        if key == Qt.Key.Key_Space:
+            self.toggle_replay_playback()
+        elif key == Qt.Key.Key_Right:
+            self.seek_replay(position + 1)
+        elif key == Qt.Key.Key_Left:
+            self.seek_replay(position - 1)
+        elif key == Qt.Key.Key_PageDown:
+            self.seek_replay(position + self.REPLAY_PAGE_STEPS)
+        elif key == Qt.Key.Key_PageUp:
+            self.seek_replay(position - self.REPLAY_PAGE_STEPS)
+        elif key == Qt.Key.Key_Home:
+            self.seek_replay(0)
+        elif key == Qt.Key.Key_End:
+            self.seek_replay(len(self.replay_player))
+        else:
+            return False
+        return True
+
+    def _maze_size(self):
+        """Gibt (Breite, Höhe) des Labyrinths in Zellen zurück oder None, wenn keins geladen ist."""
+        maze = self.maze_logic.get_maze_data()
+        if not maze or not maze[0]:
+            return None
+        return len(maze[0]), len(maze)
+
+    def zoom_by(self, factor, anchor_x=None, anchor_y=None):
+        """Zoomt um 'factor' zum Punkt (anchor_x, anchor_y) des Widgets (Standard: Mitte)."""
+        maze_size = self._maze_size()
+        if maze_size is None:
+            return
+        if anchor_x is None or anchor_y is None:
+            anchor_x, anchor_y = self.width() / 2, self.height() / 2
+        self.camera.zoom_at(factor, anchor_x, anchor_y, self.width(), self.height(), *maze_size)
+        self.update()
+
+    def reset_view(self):
+        """Zeigt wieder das ganze Labyrinth."""
+        self.camera.reset()
+        self.update()
+
+    def set_follow_player(self, follow):
+        """Schaltet das Verfolgen des Spielers durch die Kamera ein oder aus."""
+        self.camera.set_follow_player(follow)
+        self.update()
+
+    def _handle_camera_key(self, event):
+        """Tastatursteuerung der Kamera (+/- Zoom, 0 Gesamtansicht, F Spieler verfolgen)."""
+        key = event.key()
+        if key in (Qt.Key.Key_Plus, Qt.Key.Key_Equal):
+            self.zoom_by(self.ZOOM_STEP)
+        elif key == Qt.Key.Key_Minus:
+            self.zoom_by(1 / self.ZOOM_STEP)
+        elif key == Qt.Key.Key_0:
+            self.reset_view()
+        elif key == Qt.Key.Key_F:
+            self.set_follow_player(not self.camera.follow_player)
+        else:
+            return False
+        return True
+
+    def wheelEvent(self, event):
+        """Mausrad zoomt zum Mauszeiger."""
+        steps = event.angleDelta().y() / 120
+        if steps:
+            position = event.position()
+            self.zoom_by(self.ZOOM_STEP ** steps, position.x(), position.y())
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton and self.camera.is_zoomed():
+            self.drag_start = event.position()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        """Verschiebt den Ausschnitt, solange die linke Maustaste gedrückt ist."""
+        maze_size = self._maze_size()
+        if self.drag_start is not None and maze_size is not None:
+            position = event.position()
+            cell_size, _, _ = self._maze_layout(*maze_size)
+            self.camera.pan_by(position.x() - self.drag_start.x(), position.y() - self.drag_start.y(), cell_size)
+            self.drag_start = position
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.drag_start = None
+        super().mouseReleaseEvent(event)
+
     def keyPressEvent(self, event):
+        if self._handle_camera_key(event):
+            return
+
+        if event.key() == Qt.Key.Key_H:
+            self.set_show_hint_path(not self.show_hint_path)
+            return
+
+        if self.replay_player is not None:
+            if not self._handle_replay_key(event):
+                super().keyPressEvent(event)
+            return
+
         if self.maze_logic.is_ai_controlled:
             return
 
@@ -0,0 +1,118 @@
+# ui/highscore_table_model.py
+# Tabellenmodell für die Highscore-Ansicht, das Zeilen seitenweise aus dem HighscoreStore nachlädt.
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class HighscoreTableModel(QAbstractTableModel):
+    """
+    Virtualisiertes Modell für eine QTableView: Es lädt nur so viele Highscores, wie gerade
+    angezeigt werden (canFetchMore/fetchMore), und sortiert direkt in der Datenbank.
+    """
+
+    HEADERS = ["Datum", "Map", "Punkte", "Zeit", "Bonus"]
+    # Datenbankspalte, nach der die jeweilige Tabellenspalte sortiert wird
+    COLUMN_FIELDS = ['datetime', 'map_name', 'score', 'final_time', 'time_bonus']
+    DEFAULT_SORT_COLUMN = 3 # Angepasste Zeit
+
+    def __init__(self, highscore_store, page_size=200, parent=None):
+        super().__init__(parent)
+        self.highscore_store = highscore_store
+        self.page_size = page_size
+        self.map_name = None
+        self.rows = [] # Bereits geladene Zeilen (Dictionaries aus dem HighscoreStore)
+        self.total_rows = 0 # Anzahl aller Highscores der Map
+        self.sort_column = self.DEFAULT_SORT_COLUMN
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+    def set_map(self, map_name):
+        """Zeigt die Highscores einer anderen Map an (None leert die Tabelle)."""
+        self.map_name = map_name
+        self._reload()
+
+    def total_count(self):
+        """Gibt die Anzahl aller Highscores der aktuellen Map zurück (nicht nur der geladenen)."""
+        return self.total_rows
+
+    def _reload(self):
+        """Verwirft alle geladenen Zeilen und lädt die erste Seite neu."""
+        self.beginResetModel()
+        self.rows = []
+        self.total_rows = self.highscore_store.count(self.map_name) if self.map_name else 0
+        if self.total_rows:
+            self.rows = self._query_page()
+        self.endResetModel()
+
+    def _query_page(self, after=None):
+        """Fragt die Seite nach der Zeile 'after' (None = erste Seite) in der aktuellen Sortierung ab."""
+        return self.highscore_store.query(
+            self.map_name,
+            order_by=self.COLUMN_FIELDS[self.sort_column],
+            descending=(self.sort_order == Qt.SortOrder.DescendingOrder),
+            limit=self.page_size,
+            after=after
+        )
+
+    # --- QAbstractTableModel-Schnittstelle ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        entry = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return entry['datetime']
+        if column == 1:
+            return entry['map_name'].replace('.map', '')
+        if column == 2:
+            return str(entry['score'])
+        if column == 3:
+            minutes = entry['final_time'] // 60
+            seconds = entry['final_time'] % 60
+            return f"{minutes:02d}:{seconds:02d}"
+        if column == 4:
+            return str(entry['time_bonus'])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1) # Platzierung
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return len(self.rows) < self.total_rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        new_rows = self._query_page(after=self.rows[-1])
+        if not new_rows:
+            # Hinter der letzten Zeile kommt nichts mehr (z.B. parallel gelöscht)
+            self.total_rows = len(self.rows)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(new_rows) - 1)
+        self.rows.extend(new_rows)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sortiert in der Datenbank und lädt die erste Seite in der neuen Reihenfolge."""
+        if not 0 <= column < len(self.COLUMN_FIELDS):
+            return
+        self.sort_column = column
+        self.sort_order = order
+        if self.map_name:
+            self._reload()
@@ -8,16 +8,30 @@ from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel,
     QInputDialog, QMessageBox, QComboBox, QStackedWidget,
     QDialog, QLineEdit, QSpinBox, QDialogButtonBox, QFormLayout,
-    QTextBrowser, QTableWidget, QTableWidgetItem, QHeaderView 
+    QTextBrowser, QTableView, QHeaderView, QSlider, QFileDialog, QProgressDialog
 )
-from PyQt6.QtCore import Qt, QTimer
-from datetime import datetime 
+from PyQt6.QtCore import Qt, QTimer, QFileSystemWatcher, QSize
+from PyQt6.QtGui import QIcon, QImage, QPixmap
 
 # Importiere die Logik- und Generator-Klassen
 from game.maze_logic import MazeLogic
 from ui.game_board_widget import GameBoardWidget
 from ui.maze_generator import MazeGenerator
 from ai.agent import Agent # Import des KI-Agenten
+from ai.training_worker import AITrainingWorker
+from ai.novelty import NoveltyBonus
+from ai.evaluation import BackgroundEvaluator
+from ai.offline_dataset import DatasetWriter
+from game.episode_recorder import EpisodeRecorder
+from game.trajectory import TrajectoryPlayer, TRAJECTORY_EXTENSION
+from game.highscore_store import HighscoreStore
+from game.map_catalog import MapCatalog
+from ui.highscore_table_model import HighscoreTableModel
+from ui.map_load_worker import MapLoadWorker
+from game.seeding import derive_seed, new_run_seed
+import config
+
+AI_FRAME_RATE = 30 # Bildrate, mit der das Spielfeld während des KI-Trainings aktualisiert wird
 
 # --- Benutzerdefinierter Dialog für die Labyrinthgenerierung ---
 class MazeGenerationDialog(QDialog):
@@ -64,9 +78,38 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Maze AI Game")
         self.setGeometry(100, 100, 800, 600) # Standardfenstergröße
 
+        # Ein Run-Seed, aus dem alle Zufallsquellen abgeleitet werden (reproduzierbare Läufe)
+        self.run_seed = config.RUN_SEED if config.RUN_SEED is not None else new_run_seed()
+        print(f"DEBUG: Run-Seed: {self.run_seed}")
+
         # Instanziiere die Logik- und Generator-Klassen
-        self.maze_logic = MazeLogic()
-        self.maze_generator = MazeGenerator()
+        self.maze_logic = MazeLogic(seed=derive_seed(self.run_seed, 'environment'))
+        self.maze_generator = MazeGenerator(seed=derive_seed(self.run_seed, 'generator'))
+
+        # Zeichnet jede Episode als (Map, Seed, Aktionen) auf, um sie exakt wiederholen zu können.
+        # Abgeschlossene Episoden landen als kompakte .traj-Dateien im Replay-Ordner.
+        self.replays_dir = os.path.join("assets", "replays")
+        self.episode_recorder = EpisodeRecorder(self.maze_logic, trajectory_dir=self.replays_dir)
+
+        # Eigene Logik-Instanz und eigenes Spielfeld für den Replay-Viewer,
+        # damit das Abspielen keine Highscores, Timer oder Aufzeichnungen auslöst
+        self.replay_logic = MazeLogic()
+        self.replay_board_widget = GameBoardWidget(self.replay_logic)
+
+        # Highscores liegen in einer SQLite-Datenbank; alte .dascores-Dateien werden einmalig importiert
+        self.highscore_store = HighscoreStore()
+        self.highscore_store.import_dascores()
+
+        # Katalog aller Maps (Größe, kürzester Weg, Vorschaubild), wird nur für geänderte Dateien neu eingelesen.
+        # Der Watcher meldet neue, gelöschte und umbenannte Dateien, damit die Liste ohne Neustart aktuell bleibt.
+        self.map_catalog = MapCatalog(os.path.join("assets", "maps"))
+        os.makedirs(self.map_catalog.maps_dir, exist_ok=True)
+        self.map_watcher = QFileSystemWatcher([self.map_catalog.maps_dir], self)
+        self.map_list_timer = QTimer(self) # Fasst mehrere Meldungen kurz hintereinander zusammen
+        self.map_list_timer.setSingleShot(True)
+        self.map_list_timer.setInterval(200)
+        self.map_list_timer.timeout.connect(self.update_map_list)
+        self.map_watcher.directoryChanged.connect(self.map_list_timer.start)
 
         # Das Spielbrett-Widget (wird die Labyrinth-Grafik anzeigen)
         self.game_board_widget = GameBoardWidget(self.maze_logic)
@@ -75,18 +118,61 @@ class MainWindow(QMainWindow):
         self.timer = QTimer(self)
         self.game_time_seconds = 0
 
-        # KI-Agent und KI-Timer (für AI-Spiele/Training)
-        self.agent = Agent(self.maze_logic) # Agent-Instanz erstellen
-        self.agent.load_model() # Modell beim Start automatisch laden
-        self.ai_timer = QTimer(self)
-        self.ai_timer.timeout.connect(self.ai_make_move)
-        self.ai_move_interval = 20 # Standard-Bewegungsintervall in ms (schneller für KI-Training)
+        # KI-Agent (für AI-Spiele/Training). Der Agent spielt auf einer eigenen Logik-Instanz
+        # in einem Hintergrund-Thread; das Spielfeld zeigt nur Momentaufnahmen davon an.
+        self.ai_env = MazeLogic(seed=derive_seed(self.run_seed, 'ai_environment'))
+        self.ai_episode_recorder = None
+        if config.RECORD_AI_EPISODES:
+            self.ai_episode_recorder = EpisodeRecorder(self.ai_env, trajectory_dir=self.replays_dir,
+                                                       max_files=config.AI_REPLAY_LIMIT)
+        # Optional alle Übergänge (Tastatur und KI getrennt) für Offline-Training mitschreiben
+        self.dataset_writers = []
+        if config.DATASET_DIR is not None:
+            self.dataset_writers = [DatasetWriter.for_logic(config.DATASET_DIR, "human", self.maze_logic),
+                                    DatasetWriter.for_logic(config.DATASET_DIR, "ai", self.ai_env)]
+        # Agent-Instanz erstellen
+        self.agent = Agent(self.ai_env, seed=derive_seed(self.run_seed, 'agent'), compact_replay=config.COMPACT_REPLAY,
+                           replay_dir=config.REPLAY_DIR, replay_capacity=config.REPLAY_DISK_CAPACITY,
+                           inference_address=config.INFERENCE_SERVER, inference_mode=config.INFERENCE_MODE)
+        self.agent.load_model() # Modell beim Start automatisch laden (bei einem Inferenz-Dienst nur als Rückfallebene)
+        # Mit Inferenz-Dienst oder schneller Inferenz spielt die KI nur (die Gewichte bleiben fest)
+        play_only = config.INFERENCE_SERVER is not None or config.INFERENCE_MODE is not None
+        if play_only:
+            self.agent.epsilon = self.agent.epsilon_min # Nur spielen, nicht mehr explorieren
+        # Optionale Bewertung des gespeicherten Modells auf zurückgehaltenen Maps (eigener Prozess)
+        evaluator = BackgroundEvaluator(config.EVAL_MAPS, seed=self.run_seed) if config.EVAL_MAPS else None
+        # Optionaler Bonus für selten besuchte Zustände (zählt über alle Episoden der Sitzung)
+        novelty_scale = config.RUN_CONFIG.agent.novelty_scale
+        novelty = NoveltyBonus(scale=novelty_scale) if novelty_scale > 0 else None
+        self.ai_worker = AITrainingWorker(self.ai_env, self.agent, macro_actions=config.MACRO_ACTIONS,
+                                         replay_ratio=config.REPLAY_RATIO, evaluator=evaluator,
+                                         eval_every=config.EVAL_EVERY_EPISODES,
+                                         learn=not play_only, novelty=novelty)
+        self.ai_worker.episode_finished.connect(self.handle_ai_episode_finished)
+        # Aktion, die erst nach dem Anhalten des KI-Threads ausgeführt werden darf (siehe _when_ai_idle)
+        self.pending_ai_action = None
+        self.ai_idle_timer = QTimer(self)
+        self.ai_idle_timer.setSingleShot(True)
+        self.ai_idle_timer.setInterval(100)
+        self.ai_idle_timer.timeout.connect(self._run_pending_ai_action)
+
+        # Maps werden im Hintergrund gelesen und vorverarbeitet (siehe ui/map_load_worker.py)
+        self.map_load_worker = MapLoadWorker()
+        self.map_load_worker.progress.connect(self.update_map_load_progress)
+        self.map_load_worker.loaded.connect(self.handle_map_loaded)
+        self.map_load_worker.failed.connect(self.handle_map_load_failed)
+        # Der Replay-Viewer lädt seine Map selbst; das Wegenetz für die Hinweise baut ebenfalls der Worker
+        self.replay_board_widget.path_hierarchy_needed.connect(self.map_load_worker.build_path_hierarchy)
+        self.map_load_worker.path_hierarchy_built.connect(self.handle_replay_path_hierarchy)
+        self.map_load_dialog = None # Fortschrittsdialog des laufenden Ladevorgangs
+        self.pending_map_path = None # Map, deren Laden gerade läuft (None = keine)
+
+        # Das Spielfeld wird unabhängig vom Trainingstempo höchstens mit AI_FRAME_RATE Bildern/s aktualisiert
+        self.ai_frame_timer = QTimer(self)
+        self.ai_frame_timer.timeout.connect(self.update_ai_frame)
+        self.ai_move_interval = 20 # Wartezeit pro KI-Zug in ms bei kleinster Geschwindigkeit (Echtzeit)
         self.current_episode = 0 # Zähler für KI-Episoden
 
-        # Variablen zum Speichern des letzten KI-Zugs und dessen Ergebnis
-        self.last_ai_move_vector = None
-        self.last_ai_move_resulted_in_wall_hit = False
-
         # Initialisiere die Benutzeroberfläche (Startbildschirm und Spielbildschirm)
         self.init_ui()
         
@@ -105,6 +191,7 @@ class MainWindow(QMainWindow):
         self.create_start_screen()
         self.create_game_screen()
         self.create_highscores_screen()
+        self.create_replay_screen()
 
         # Verbinde Signale von der Spiellogik mit den UI-Updates
         self.maze_logic.maze_updated.connect(self.game_board_widget.update)
@@ -135,6 +222,7 @@ class MainWindow(QMainWindow):
         self.map_selector = QComboBox()
         self.map_selector.setPlaceholderText("Wähle ein Labyrinth...")
         self.map_selector.setMinimumWidth(250)
+        self.map_selector.setIconSize(QSize(32, 32)) # Vorschaubilder aus dem Map-Katalog
         map_selection_layout.addWidget(QLabel("Verfügbare Labyrinthe:"))
         map_selection_layout.addWidget(self.map_selector)
 
@@ -154,6 +242,10 @@ class MainWindow(QMainWindow):
         self.generate_maze_button_start.clicked.connect(self.generate_new_maze)
         start_layout.addWidget(self.generate_maze_button_start)
 
+        self.replay_button = QPushButton("Aufzeichnung ansehen")
+        self.replay_button.clicked.connect(self.open_replay)
+        start_layout.addWidget(self.replay_button)
+
         self.highscores_button = QPushButton("Highscores anzeigen")
         self.highscores_button.clicked.connect(self.show_highscores_screen)
         self.highscores_button.setEnabled(True)
@@ -220,6 +312,18 @@ class MainWindow(QMainWindow):
         self.restart_ai_episode_button.hide() # Zunächst versteckt
         right_buttons_layout.addWidget(self.restart_ai_episode_button)
 
+        # Geschwindigkeit des KI-Trainings: links Echtzeit, ganz rechts ungebremst
+        self.ai_speed_label = QLabel()
+        self.ai_speed_slider = QSlider(Qt.Orientation.Horizontal)
+        self.ai_speed_slider.setRange(0, 100)
+        self.ai_speed_slider.setValue(0)
+        self.ai_speed_slider.valueChanged.connect(self.set_ai_speed)
+        self.set_ai_speed(self.ai_speed_slider.value())
+        self.ai_speed_label.hide()
+        self.ai_speed_slider.hide()
+        right_buttons_layout.addWidget(self.ai_speed_label)
+        right_buttons_layout.addWidget(self.ai_speed_slider)
+
         self.learn_ai_button = QPushButton("AI lernen (noch nicht implementiert)")
         self.learn_ai_button.setEnabled(False) # Deaktiviert
         right_buttons_layout.addWidget(self.learn_ai_button)
@@ -247,12 +351,14 @@ class MainWindow(QMainWindow):
         title_label.setStyleSheet("font-size: 24pt; font-weight: bold; margin-bottom: 20px;")
         hs_layout.addWidget(title_label)
 
-        # Tabelle für die Highscores
-        self.highscores_table = QTableWidget()
-        self.highscores_table.setColumnCount(5) # Datum, Map, Punkte, Zeit (min:sek), Zeitbonus
-        self.highscores_table.setHorizontalHeaderLabels(["Datum", "Map", "Punkte", "Zeit", "Bonus"])
+        # Tabelle für die Highscores: Das Modell lädt Zeilen beim Scrollen nach und sortiert in der Datenbank
+        self.highscores_model = HighscoreTableModel(self.highscore_store, parent=self)
+        self.highscores_table = QTableView()
+        self.highscores_table.setModel(self.highscores_model)
         self.highscores_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch) # Spalten füllen den Platz
-        self.highscores_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers) # Nicht editierbar
+        self.highscores_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers) # Nicht editierbar
+        self.highscores_table.horizontalHeader().setSortIndicator(HighscoreTableModel.DEFAULT_SORT_COLUMN, Qt.SortOrder.AscendingOrder)
+        self.highscores_table.setSortingEnabled(True) # Klick auf Spaltenkopf sortiert über das Modell
         hs_layout.addWidget(self.highscores_table)
 
         self.highscores_map_label = QLabel("Highscores für: Keine Map ausgewählt")
@@ -266,15 +372,107 @@ class MainWindow(QMainWindow):
         self.stacked_widget.addWidget(self.highscores_screen_widget)
 
 
+    def create_replay_screen(self):
+        """
+        Erstellt das Widget und Layout für den Replay-Viewer (Abspielen von .traj-Aufzeichnungen).
+        Tastatur: Leertaste = Abspielen/Pause, Pfeile = Einzelschritt, Bild auf/ab = Sprung, Pos1/Ende.
+        """
+        self.replay_screen_widget = QWidget()
+        replay_layout = QVBoxLayout(self.replay_screen_widget)
+
+        self.replay_title_label = QLabel("Aufzeichnung")
+        self.replay_title_label.setStyleSheet("font-weight: bold;")
+        replay_layout.addWidget(self.replay_title_label)
+
+        replay_layout.addWidget(self.replay_board_widget, 1) # Stretch-Faktor 1
+
+        controls_layout = QHBoxLayout()
+        self.replay_play_button = QPushButton("Abspielen")
+        self.replay_play_button.clicked.connect(self.replay_board_widget.toggle_replay_playback)
+        controls_layout.addWidget(self.replay_play_button)
+
+        self.replay_slider = QSlider(Qt.Orientation.Horizontal)
+        self.replay_slider.setRange(0, 0)
+        self.replay_slider.valueChanged.connect(self.replay_board_widget.seek_replay)
+        controls_layout.addWidget(self.replay_slider, 1)
+
+        self.replay_position_label = QLabel("Schritt 0/0")
+        controls_layout.addWidget(self.replay_position_label)
+
+        self.replay_speed_selector = QComboBox()
+        for steps_per_tick in (1, 4, 16, 64):
+            self.replay_speed_selector.addItem(f"{steps_per_tick}x", steps_per_tick)
+        self.replay_speed_selector.currentIndexChanged.connect(
+            lambda _: self.replay_board_widget.set_replay_speed(self.replay_speed_selector.currentData())
+        )
+        controls_layout.addWidget(self.replay_speed_selector)
+
+        back_button = QPushButton("Zurück zum Menü")
+        back_button.clicked.connect(self.show_start_screen)
+        controls_layout.addWidget(back_button)
+        replay_layout.addLayout(controls_layout)
+
+        self.replay_board_widget.replay_position_changed.connect(self.update_replay_position)
+        self.replay_board_widget.replay_playing_changed.connect(
+            lambda playing: self.replay_play_button.setText("Pause" if playing else "Abspielen")
+        )
+
+        self.stacked_widget.addWidget(self.replay_screen_widget)
+
+    def open_replay(self):
+        """
+        Lässt den Benutzer eine .traj-Aufzeichnung auswählen und zeigt sie im Replay-Viewer an.
+        """
+        os.makedirs(self.replays_dir, exist_ok=True)
+        filepath, _ = QFileDialog.getOpenFileName(
+            self, "Aufzeichnung öffnen", self.replays_dir, f"Aufzeichnungen (*{TRAJECTORY_EXTENSION})"
+        )
+        if not filepath:
+            return
+
+        try:
+            player = TrajectoryPlayer(filepath, self.replay_logic)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Fehler", f"Aufzeichnung konnte nicht geöffnet werden: {e}")
+            return
+
+        self.replay_title_label.setText(
+            f"Aufzeichnung: {os.path.basename(filepath)} | Map: {os.path.basename(player.record.map_path)} | "
+            f"Seed: {player.record.seed}"
+        )
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setRange(0, len(player))
+        self.replay_slider.blockSignals(False)
+        self.replay_board_widget.set_replay_player(player)
+        self.stacked_widget.setCurrentWidget(self.replay_screen_widget)
+        self.replay_board_widget.setFocus()
+
+    def handle_replay_path_hierarchy(self, loaded_map, path_hierarchy):
+        """Übernimmt das im Hintergrund gebaute Wegenetz, solange der Replay-Viewer noch dieselbe Map zeigt."""
+        if self.replay_logic.loaded_map is loaded_map:
+            self.replay_board_widget.set_path_hierarchy(loaded_map, path_hierarchy)
+
+    def update_replay_position(self, step, total):
+        """Aktualisiert Slider und Anzeige, wenn sich die Position im Replay ändert."""
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setValue(step)
+        self.replay_slider.blockSignals(False)
+        player = self.replay_board_widget.replay_player
+        reward = player.reward_at(step) if player is not None else 0.0
+        self.replay_position_label.setText(
+            f"Schritt {step}/{total} | Punkte: {self.replay_logic.get_current_score()} | Belohnung: {reward:.2f}"
+        )
+
     def show_start_screen(self):
         """
         Wechselt zur Ansicht des Startbildschirms.
         """
         print("Zeige Startbildschirm an.")
+        self.replay_board_widget.set_replay_player(None) # Replay-Viewer beenden
         self.stacked_widget.setCurrentWidget(self.start_screen_widget)
         self.update_map_list() 
         self.timer.stop() # Stoppt den Timer, falls im Spiel gewesen
-        self.ai_timer.stop() # Stoppt den AI-Timer
+        self.stop_ai_training() # Stoppt den KI-Thread und die Bildaktualisierung
         self.maze_logic.game_over = True # Setzt den Spielzustand zurück
         self.maze_logic.is_ai_controlled = False # AI-Steuerung deaktivieren
         self.maze_logic.maze = [] # Leert das Labyrinth, damit das Spielfeld 'sauber' ist
@@ -282,6 +480,8 @@ class MainWindow(QMainWindow):
         
         # Verstecke KI-spezifische Buttons
         self.restart_ai_episode_button.hide()
+        self.ai_speed_label.hide()
+        self.ai_speed_slider.hide()
         self.ai_info_label.setText("KI-Episode: N/A | Epsilon: N/A") # KI-Info zurücksetzen
         self.status_message_label.setText("") # Nachrichten-Label leeren
 
@@ -307,32 +507,60 @@ class MainWindow(QMainWindow):
     def update_map_list(self):
         """
         Aktualisiert die Liste der verfügbaren Labyrinthe in der ComboBox.
+        Die Kenndaten kommen aus dem Map-Katalog; eingelesen werden nur neue oder geänderte Dateien.
         """
         print("update_map_list wird ausgeführt.")
-        maps_dir = "assets/maps"
-        self.map_selector.clear()
-        self.map_selector.addItem("Wähle ein Labyrinth...") # Placeholder
+        maps_dir = self.map_catalog.maps_dir
 
         # Sicherstellen, dass der Ordner existiert, bevor wir ihn lesen
         if not os.path.exists(maps_dir):
             os.makedirs(maps_dir) # Erstellt den Ordner, falls er nicht existiert
             print(f"Verzeichnis '{maps_dir}' erstellt.")
 
-        map_files = [f for f in os.listdir(maps_dir) if f.endswith('.map')]
-        
-        if not map_files:
+        added, updated, removed = self.map_catalog.refresh()
+        if added or updated or removed:
+            print(f"Map-Katalog aktualisiert: {added} neu, {updated} geändert, {removed} entfernt.")
+
+        # Auswahl über die Aktualisierung hinweg beibehalten
+        selected = self.map_selector.currentText() if self.map_selector.currentIndex() > 0 else None
+        self.map_selector.clear()
+        self.map_selector.addItem("Wähle ein Labyrinth...") # Placeholder
+
+        maps = self.map_catalog.query(valid=None)
+        if not maps:
             print("Keine .map-Dateien im Ordner gefunden.")
             self.map_selector.addItem("Keine Labyrinthe gefunden")
             self.map_selector.setEnabled(False)
             self.start_game_button.setEnabled(False)
             self.start_ai_game_button.setEnabled(False)
         else:
-            print(f"Gefundene Maps: {map_files}")
-            self.map_selector.addItems(sorted(map_files))
+            print(f"Gefundene Maps: {len(maps)}")
+            for info in maps:
+                self.map_selector.addItem(self._map_thumbnail_icon(info), info.name)
+                self.map_selector.setItemData(self.map_selector.count() - 1, self._map_tooltip(info),
+                                              Qt.ItemDataRole.ToolTipRole)
+            if selected is not None and self.map_selector.findText(selected) > 0:
+                self.map_selector.setCurrentIndex(self.map_selector.findText(selected))
             self.map_selector.setEnabled(True)
             self.start_game_button.setEnabled(True)
             self.start_ai_game_button.setEnabled(True)
 
+    def _map_thumbnail_icon(self, info):
+        """Vorschaubild einer Map aus dem Katalog als Icon (leer bei ungültigen Maps)."""
+        if not info.thumbnail:
+            return QIcon()
+        image = QImage(info.thumbnail, info.thumbnail_width, info.thumbnail_height, info.thumbnail_width,
+                       QImage.Format.Format_Grayscale8)
+        return QIcon(QPixmap.fromImage(image.copy())) # copy(): QImage verweist sonst auf die Bytes des Katalogs
+
+    def _map_tooltip(self, info):
+        """Kenndaten einer Map als Tooltip-Text."""
+        if info.error:
+            return f"Ungültige Map: {info.error}"
+        path_text = f"{info.shortest_path} Schritte" if info.solvable else "Ziel nicht erreichbar"
+        return (f"{info.width}x{info.height}, kürzester Weg: {path_text}\n"
+                f"{info.open_cells} begehbare Zellen, {info.keys} Schlüssel, {info.ducks} Enten")
+
     def start_selected_maze_game(self):
         """
         Startet ein ausgewähltes Labyrinth für manuelle Steuerung.
@@ -366,29 +594,94 @@ class MainWindow(QMainWindow):
 
     def load_maze_and_start_game(self, filepath):
         """
-        Lädt eine Map und startet das Spiel.
+        Lädt eine Map im Hintergrund (MapLoadWorker) und startet danach das Spiel.
+        Bei großen Maps erscheint ein Fortschrittsdialog, über den das Laden abgebrochen werden kann.
         """
         print(f"DEBUG: load_maze_and_start_game: Beginn. is_ai_controlled = {self.maze_logic.is_ai_controlled}")
-        if self.maze_logic.load_maze_from_file(filepath):
+        self._close_map_load_dialog()
+        self.pending_map_path = filepath
+        # Der Dialog erscheint erst, wenn das Laden länger als minimumDuration dauert
+        self.map_load_dialog = QProgressDialog(f"Lade Labyrinth '{os.path.basename(filepath)}'...", "Abbrechen", 0, 100, self)
+        self.map_load_dialog.setWindowTitle("Labyrinth laden")
+        self.map_load_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.map_load_dialog.setMinimumDuration(300)
+        self.map_load_dialog.setAutoClose(False)
+        self.map_load_dialog.setAutoReset(False)
+        self.map_load_dialog.canceled.connect(self.cancel_map_load)
+        self.map_load_worker.load(filepath)
+
+    def update_map_load_progress(self, percent, stage):
+        """Fortschrittsmeldung des MapLoadWorker."""
+        if self.map_load_dialog is not None:
+            self.map_load_dialog.setLabelText(f"Lade Labyrinth '{os.path.basename(self.pending_map_path)}'...\n{stage}")
+            self.map_load_dialog.setValue(percent)
+
+    def cancel_map_load(self):
+        """Wird vom Abbrechen-Button des Fortschrittsdialogs aufgerufen."""
+        print(f"DEBUG: Laden von '{self.pending_map_path}' abgebrochen.")
+        self.map_load_worker.cancel()
+        self.pending_map_path = None
+        self._close_map_load_dialog()
+        self.show_start_screen()
+
+    def _close_map_load_dialog(self):
+        if self.map_load_dialog is not None:
+            self.map_load_dialog.canceled.disconnect(self.cancel_map_load)
+            self.map_load_dialog.close()
+            self.map_load_dialog.deleteLater()
+            self.map_load_dialog = None
+
+    def handle_map_load_failed(self, message):
+        """Die Map konnte nicht gelesen werden (Meldung vom MapLoadWorker)."""
+        if self.pending_map_path is None:
+            return # Bereits abgebrochen
+        filepath, self.pending_map_path = self.pending_map_path, None
+        self._close_map_load_dialog()
+        QMessageBox.critical(self, "Fehler", f"Konnte Labyrinth '{filepath}' nicht laden. Möglicherweise beschädigt oder ungültig.\n\n{message}")
+        self.show_start_screen()
+
+    def handle_map_loaded(self, loaded_map, path_hierarchy):
+        """
+        Übernimmt die im Hintergrund geladene Map (mit Wegenetz für die Hinweise) und startet das Spiel.
+        """
+        if self.pending_map_path is None or loaded_map.path != self.pending_map_path:
+            return # Abgebrochen oder durch einen neueren Auftrag ersetzt
+        self.pending_map_path = None
+        self._close_map_load_dialog()
+        filepath = loaded_map.path
+        self.game_board_widget.set_path_hierarchy(loaded_map, path_hierarchy)
+        if self.maze_logic.load_map(loaded_map):
             print(f"Labyrinth '{filepath}' geladen. Spiel startet.")
             self.show_game_screen() # Wechselt zur Spielansicht
             self.start_new_game() # Startet die Spiel-Logik (Timer etc.)
             
             # Zeige/Verstecke KI-spezifische Buttons
             if self.maze_logic.is_ai_controlled:
-                self.ai_timer.start(self.ai_move_interval)
                 self.game_board_widget.setFocusPolicy(Qt.FocusPolicy.NoFocus) # Deaktiviere Fokus für manuelle Eingabe
                 self.restart_ai_episode_button.show()
+                self.ai_speed_label.show()
+                self.ai_speed_slider.show()
                 self.current_episode = 1 # Starte mit Episode 1
-                self.update_ai_info_display()
+                seed = self.maze_logic.episode_seed
+
+                def start_ai():
+                    # Die KI spielt dieselbe Episode (gleicher Seed) auf ihrer eigenen Logik-Instanz
+                    if not self.ai_env.load_map(loaded_map, seed=seed):
+                        QMessageBox.critical(self, "Fehler", f"Konnte Labyrinth '{filepath}' nicht für die KI laden.")
+                        self.show_start_screen()
+                        return
+                    self.start_ai_training()
+                self._when_ai_idle(start_ai)
                 print("DEBUG: Fokus-Policy auf NoFocus gesetzt (KI-Steuerung). KI-Buttons sichtbar.")
             else:
-                self.ai_timer.stop() # Sicherstellen, dass der AI-Timer gestoppt ist
+                self.stop_ai_training() # Sicherstellen, dass die KI nicht mehr läuft
                 self.game_board_widget.setFocusPolicy(Qt.FocusPolicy.StrongFocus) # Aktiviere Fokus für manuelle Eingabe
                 self.game_board_widget.setFocus() # Setze Fokus für manuelle Steuerung
                 self.activateWindow() # Fenster aktivieren
                 self.raise_()         # Fenster in den Vordergrund bringen
                 self.restart_ai_episode_button.hide()
+                self.ai_speed_label.hide()
+                self.ai_speed_slider.hide()
                 self.ai_info_label.setText("KI-Episode: N/A | Epsilon: N/A") # KI-Info zurücksetzen
                 print("DEBUG: Fokus-Policy auf StrongFocus gesetzt und Fokus gesetzt (manuelle Steuerung). KI-Buttons versteckt.")
 
@@ -465,76 +758,94 @@ class MainWindow(QMainWindow):
         self.maze_logic.maze_updated.emit()
 
 
-    def ai_make_move(self):
+    def start_ai_training(self):
+        """Startet eine Episode im KI-Thread und die Bildaktualisierung des Spielfelds."""
+        self.ai_worker.start_episode()
+        self.ai_frame_timer.start(1000 // AI_FRAME_RATE)
+        self.update_ai_info_display()
+
+    def stop_ai_training(self):
+        """Hält den KI-Thread und die Bildaktualisierung an (eine noch wartende Aktion entfällt)."""
+        self.ai_frame_timer.stop()
+        self.pending_ai_action = None
+        self.ai_idle_timer.stop()
+        self.ai_worker.stop_and_wait()
+
+    def _when_ai_idle(self, action):
         """
-        Lässt den KI-Agenten einen Zug machen und führt einen Lernschritt aus.
-        Wird vom ai_timer aufgerufen.
+        Führt 'action' aus, sobald der KI-Thread angehalten hat; vorher darf ai_env nicht verändert werden.
+        Ist der Thread noch beschäftigt (z.B. beim Speichern des Modells), wird es ohne Blockieren des
+        Fensters später erneut versucht. Eine neuere Aktion ersetzt eine noch wartende.
         """
-        if self.maze_logic.is_game_over():
-            self.ai_timer.stop()
-            print("DEBUG: AI Timer gestoppt, Spiel vorbei.")
-            # Modell automatisch speichern, wenn der Durchgang beendet ist
-            self.agent.save_model() 
-            return
+        self.pending_ai_action = action
+        self._run_pending_ai_action()
 
-        if not self.maze_logic.is_ai_controlled:
-            print("DEBUG: AI-Timer läuft, aber Spiel ist nicht KI-gesteuert. Stoppe AI-Timer.")
-            self.ai_timer.stop()
+    def _run_pending_ai_action(self):
+        if self.pending_ai_action is None:
             return
+        if not self.ai_worker.stop_and_wait(timeout=0.5):
+            print("DEBUG: KI-Thread ist noch beschäftigt, versuche es gleich noch einmal.")
+            self.ai_idle_timer.start()
+            return
+        action, self.pending_ai_action = self.pending_ai_action, None
+        action()
 
-        # 1. Aktuellen Zustand erfassen
-        state = self.maze_logic.get_state_representation()
-        
-        # 2. Aktion wählen (epsilon-greedy), unter Berücksichtigung des letzten Zuges
-        chosen_move_vector = self.agent.choose_action(
-            state,
-            self.last_ai_move_resulted_in_wall_hit,
-            self.last_ai_move_vector
-        )
-
-        # 3. Aktion ausführen und Belohnung/neuen Zustand erhalten
-        reward, done = self.maze_logic.move_player(chosen_move_vector[0], chosen_move_vector[1])
-        
-        # Speichere den letzten Zug und ob er zu einem Wandtreffer führte
-        self.last_ai_move_vector = chosen_move_vector
-        self.last_ai_move_resulted_in_wall_hit = (reward == self.maze_logic.REWARD_WALL_HIT)
-
-        # 4. Neuen Zustand erfassen
-        next_state = self.maze_logic.get_state_representation()
-
-        # 5. Agent lernen lassen
-        loss = self.agent.learn(state, self.agent.get_action_index(chosen_move_vector[0], chosen_move_vector[1]), reward, next_state, done)
-        self.update_ai_info_display() # Aktualisiere KI-Infos im UI
+    def set_ai_speed(self, value):
+        """
+        Setzt die Trainingsgeschwindigkeit über den Schieberegler (0-100).
+        0 entspricht einem Zug alle ai_move_interval ms, 100 lässt die KI ungebremst laufen.
+        """
+        delay_ms = self.ai_move_interval * (100 - value) / 100
+        self.ai_worker.set_step_delay(delay_ms)
+        if value >= 100:
+            self.ai_speed_label.setText("KI-Tempo: ungebremst")
+        else:
+            self.ai_speed_label.setText(f"KI-Tempo: {delay_ms:.0f} ms/Zug")
 
-        if done:
-            self.ai_timer.stop()
-            print(f"DEBUG: KI-Durchgang {self.current_episode} beendet.")
-            # Modell automatisch speichern, wenn der Durchgang beendet ist
-            self.agent.save_model() 
-            # Hier keine QMessageBox, da die handle_game_won/lost dies bereits tun
-            # und das Fenster offen bleiben soll.
+    def update_ai_frame(self):
+        """
+        Wird vom ai_frame_timer aufgerufen: übernimmt den neuesten Zustand aus dem KI-Thread
+        in die angezeigte Logik-Instanz (höchstens einmal pro Bild, egal wie viele Züge dazwischen lagen).
+        """
+        snapshot = self.ai_worker.take_snapshot()
+        if snapshot is not None:
+            self.maze_logic.apply_snapshot(snapshot)
+            self.score_label.setText(f"Punkte: {self.maze_logic.get_current_score()}")
+        self.update_ai_info_display()
 
+    def handle_ai_episode_finished(self, won):
+        """Wird aufgerufen, wenn der KI-Thread eine Episode beendet hat."""
+        self.ai_frame_timer.stop()
+        if not self.maze_logic.is_ai_controlled:
+            return
+        self.update_ai_frame() # Endzustand anzeigen
+        print(f"DEBUG: KI-Durchgang {self.current_episode} beendet.")
+        # Gleiche Behandlung wie bei manuellen Spielen (Highscore, Nachricht)
+        if won:
+            self.handle_game_won()
+        else:
+            self.handle_game_lost()
 
     def start_new_ai_episode(self):
         """
         Startet einen neuen KI-Trainingsdurchgang auf der aktuellen Map.
         """
         print("DEBUG: Starte neuen KI-Trainingsdurchgang.")
+        self._when_ai_idle(self._start_new_ai_episode)
+
+    def _start_new_ai_episode(self):
+        """Setzt beide Logik-Instanzen zurück und startet den KI-Thread (nur bei angehaltenem KI-Thread)."""
         self.current_episode += 1
         self.maze_logic.reset_game_for_ai_training() # Setzt das Labyrinth zurück
+        self.ai_env.reset_game_for_ai_training(seed=self.maze_logic.episode_seed) # Gleicher Seed für die KI-Instanz
         self.game_time_seconds = 0 # Setzt die Zeit zurück
         self.timer.start(1000) # Startet den Spielzeit-Timer
-        self.ai_timer.start(self.ai_move_interval) # Startet den KI-Bewegungs-Timer
-        self.update_ai_info_display() # Aktualisiere KI-Infos
+        self.start_ai_training() # Startet den KI-Thread
         self.update_key_display()
         self.update_reward_display()
         self.score_label.setText(f"Punkte: {self.maze_logic.get_current_score()}")
         self.maze_logic.maze_updated.emit()
 
-        # Setze die letzten Zug-Informationen für den neuen Durchgang zurück
-        self.last_ai_move_vector = None
-        self.last_ai_move_resulted_in_wall_hit = False
-
 
     def update_key_display(self):
         """Aktualisiert die Anzeige der gesammelten Schlüssel im UI."""
@@ -558,7 +869,10 @@ class MainWindow(QMainWindow):
 
     def update_ai_info_display(self):
         """Aktualisiert die Anzeige der KI-Informationen im UI."""
-        self.ai_info_label.setText(f"KI-Episode: {self.current_episode} | Epsilon: {self.agent.epsilon:.4f}")
+        text = f"KI-Episode: {self.current_episode} | Epsilon: {self.agent.epsilon:.4f}"
+        if self.ai_worker.is_running():
+            text += f" | {self.ai_worker.steps_per_second:.0f} Züge/s"
+        self.ai_info_label.setText(text)
 
     def display_temp_message(self, message):
         """
@@ -570,26 +884,10 @@ class MainWindow(QMainWindow):
 
     def save_highscore(self, map_name, score, raw_time_seconds, time_bonus):
         """
-        Speichert einen Highscore in einer Datei für die gegebene Map.
-        Format: Datum_Uhrzeit|MapName|Score|AngepassteZeit|Rohzeit|Zeitbonus
+        Speichert einen Highscore für die gegebene Map in der Highscore-Datenbank.
         """
-        scores_dir = "assets/scores"
-        if not os.path.exists(scores_dir):
-            os.makedirs(scores_dir)
-
-        filepath = os.path.join(scores_dir, f"{map_name}.dascores")
-        
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        final_time_seconds = raw_time_seconds - time_bonus
-        if final_time_seconds < 0:
-            final_time_seconds = 0
-
-        score_entry = f"{current_datetime}|{map_name}|{score}|{final_time_seconds}|{raw_time_seconds}|{time_bonus}\n"
-
         try:
-            with open(filepath, 'a') as f: # 'a' für append (anhängen)
-                f.write(score_entry)
+            self.highscore_store.add_score(map_name, score, raw_time_seconds, time_bonus)
             print(f"Highscore für '{map_name}' gespeichert.")
         except Exception as e:
             print(f"Fehler beim Speichern des Highscores für '{map_name}': {e}")
@@ -597,75 +895,35 @@ class MainWindow(QMainWindow):
 
     def load_and_display_highscores(self):
         """
-        Lädt Highscores für die aktuell ausgewählte Map und zeigt sie in der Tabelle an.
+        Zeigt die Highscores für die aktuell ausgewählte Map an.
+        Das Modell lädt nur die sichtbaren Zeilen; sortiert wird in der Datenbank
+        (Standard: angepasste Zeit aufsteigend, Score absteigend).
         """
         selected_map_file = self.map_selector.currentText()
         if selected_map_file == "Wähle ein Labyrinth..." or selected_map_file == "Keine Labyrinthe gefunden":
             self.highscores_map_label.setText("Highscores für: Keine Map ausgewählt")
-            self.highscores_table.setRowCount(0) # Tabelle leeren
+            self.highscores_model.set_map(None) # Tabelle leeren
             return
 
         map_name = selected_map_file # Dateiname ist der Map-Name
-        scores_filepath = os.path.join("assets", "scores", f"{map_name}.dascores")
-        
-        self.highscores_map_label.setText(f"Highscores für: {map_name}")
-        self.highscores_table.setRowCount(0) # Tabelle leeren vor dem Laden neuer Daten
-
-        if not os.path.exists(scores_filepath):
-            QMessageBox.information(self, "Highscores", f"Für die Map '{map_name}' wurden noch keine Highscores gespeichert.")
-            return
 
-        scores_data = []
         try:
-            with open(scores_filepath, 'r') as f:
-                for line in f:
-                    parts = line.strip().split('|')
-                    if len(parts) == 6:
-                        try:
-                            date_time_str = parts[0]
-                            score = int(parts[2])
-                            final_time_seconds = int(parts[3])
-                            raw_time_seconds = int(parts[4])
-                            time_bonus = int(parts[5])
-                            scores_data.append({
-                                'datetime': date_time_str,
-                                'map_name': parts[1],
-                                'score': score,
-                                'final_time': final_time_seconds,
-                                'raw_time': raw_time_seconds,
-                                'time_bonus': time_bonus
-                            })
-                        except ValueError as ve:
-                            print(f"Fehler beim Parsen der Highscore-Zeile (ValueError): {line.strip()} - {ve}")
-                        except IndexError as ie:
-                            print(f"Fehler beim Parsen der Highscore-Zeile (IndexError): {line.strip()} - {ie}")
-                    else:
-                        print(f"Ungültiges Highscore-Format gefunden: {line.strip()}")
-
+            self.highscores_model.set_map(map_name)
         except Exception as e:
             QMessageBox.critical(self, "Fehler beim Laden der Highscores", f"Konnte Highscores für '{map_name}' nicht laden: {e}")
             return
 
-        # Sortieren: primär nach angepasster Zeit (aufsteigend), sekundär nach Score (absteigend)
-        scores_data.sort(key=lambda x: (x['final_time'], -x['score']))
+        total_scores = self.highscores_model.total_count()
+        self.highscores_map_label.setText(f"Highscores für: {map_name} ({total_scores} Einträge)")
 
-        self.highscores_table.setRowCount(len(scores_data))
-        for row_idx, entry in enumerate(scores_data):
-            self.highscores_table.setItem(row_idx, 0, QTableWidgetItem(entry['datetime']))
-            self.highscores_table.setItem(row_idx, 1, QTableWidgetItem(entry['map_name'].replace('.map', '')))
-            self.highscores_table.setItem(row_idx, 2, QTableWidgetItem(str(entry['score'])))
-            
-            minutes = entry['final_time'] // 60
-            seconds = entry['final_time'] % 60
-            self.highscores_table.setItem(row_idx, 3, QTableWidgetItem(f"{minutes:02d}:{seconds:02d}"))
-            
-            self.highscores_table.setItem(row_idx, 4, QTableWidgetItem(str(entry['time_bonus'])))
+        if total_scores == 0:
+            QMessageBox.information(self, "Highscores", f"Für die Map '{map_name}' wurden noch keine Highscores gespeichert.")
 
 
     def handle_game_won(self):
         """Wird aufgerufen, wenn das Spiel gewonnen wurde, zeigt eine Nachricht an und setzt das Spiel zurück."""
         self.timer.stop()
-        self.ai_timer.stop() # Stoppt den AI-Timer
+        self.ai_frame_timer.stop() # Stoppt die Bildaktualisierung der KI
         
         final_score = self.maze_logic.get_current_score()
         time_bonus = self.maze_logic.get_end_time_bonus()
@@ -700,7 +958,7 @@ class MainWindow(QMainWindow):
     def handle_game_lost(self):
         """Wird aufgerufen, wenn das Spiel verloren wurde (Punktestand unter -100)."""
         self.timer.stop()
-        self.ai_timer.stop() # Stoppt den AI-Timer
+        self.ai_frame_timer.stop() # Stoppt die Bildaktualisierung der KI
         
         final_score = self.maze_logic.get_current_score()
         QMessageBox.information(self, "Spiel verloren!",
@@ -714,3 +972,13 @@ class MainWindow(QMainWindow):
         else:
             self.maze_logic.game_over = True # Nur für manuelle Spiele zurücksetzen
             self.show_start_screen()
+
+    def closeEvent(self, event):
+        """Beendet den KI-Thread sauber, bevor das Fenster geschlossen wird."""
+        self.stop_ai_training()
+        self.ai_worker.shutdown()
+        self.map_load_worker.shutdown()
+        for writer in self.dataset_writers:
+            writer.close()
+        self.map_catalog.close()
+        super().closeEvent(event)
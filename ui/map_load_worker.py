@@ -0,0 +1,132 @@
+# ui/map_load_worker.py
+# Lädt und prüft Maps in einem eigenen QThread (game/map_loader.read_map), damit das Fenster auch bei
+# großen Maps bedienbar bleibt. Im selben Schritt wird das Wegenetz für Hinweise gebaut
+# (game/path_hierarchy.py). Das UI erhält nur die fertigen, unveränderlichen Ergebnisse.
+
+import threading
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from game.map_loader import MapLoadCancelled, MapLoadError, read_map
+from game.path_hierarchy import PathHierarchy
+
+PROGRESS_STEPS = 100 # Auflösung der Fortschrittsmeldungen (Prozent)
+READ_SHARE = 0.6 # Anteil des Einlesens am Fortschritt, der Rest entfällt auf das Wegenetz
+
+
+class MapLoadWorker(QObject):
+    """
+    Liest Maps im Hintergrund. Es läuft immer höchstens ein Ladevorgang; ein neuer Auftrag
+    bricht den vorherigen ab. Alle Signale gehören zu genau einem Auftrag (laufende Nummer),
+    Meldungen abgebrochener Aufträge werden verworfen.
+    """
+
+    # Fortschritt in Prozent und aktueller Arbeitsschritt
+    progress = pyqtSignal(int, str)
+    # Die fertige LoadedMap (game/map_loader.py) und ihr Wegenetz (PathHierarchy)
+    loaded = pyqtSignal(object, object)
+    # Fehlermeldung für den Benutzer
+    failed = pyqtSignal(str)
+    # Der Auftrag wurde über cancel() abgebrochen
+    cancelled = pyqtSignal()
+    # Wegenetz zu einer bereits geladenen Map (LoadedMap, PathHierarchy), siehe build_path_hierarchy()
+    path_hierarchy_built = pyqtSignal(object, object)
+    # Interne Anforderung, eine Map im Worker-Thread zu laden (Auftragsnummer, Pfad)
+    _load_requested = pyqtSignal(int, str)
+    # Interne Anforderung, nur das Wegenetz einer LoadedMap zu bauen (Auftragsnummer, LoadedMap)
+    _build_requested = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._current_job = 0 # Nummer des aktuellen Auftrags; ältere gelten als abgebrochen
+        self._load_requested.connect(self._load)
+        self._build_requested.connect(self._build_path_hierarchy)
+
+        # Der Worker lebt in einem eigenen Thread
+        self.worker_thread = QThread()
+        self.moveToThread(self.worker_thread)
+        self.worker_thread.start()
+
+    def load(self, filepath):
+        """Startet das Laden einer Map (nicht blockierend); ein laufender Auftrag wird abgebrochen."""
+        with self._lock:
+            self._current_job += 1
+            job = self._current_job
+        self._load_requested.emit(job, filepath)
+
+    def build_path_hierarchy(self, loaded_map):
+        """
+        Baut nur das Wegenetz einer schon geladenen Map (z.B. für den Replay-Viewer) und meldet es über
+        'path_hierarchy_built'. Zählt als eigener Auftrag: ein späteres load() bricht ihn ab.
+        """
+        with self._lock:
+            self._current_job += 1
+            job = self._current_job
+        self._build_requested.emit(job, loaded_map)
+
+    def cancel(self):
+        """Bricht den laufenden Auftrag ab; danach kommt für ihn nur noch 'cancelled'."""
+        with self._lock:
+            self._current_job += 1
+
+    def shutdown(self):
+        """Bricht ab und beendet den Worker-Thread (vor dem Schließen des Fensters aufrufen)."""
+        self.cancel()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+
+    def _is_current(self, job):
+        with self._lock:
+            return job == self._current_job
+
+    @pyqtSlot(int, str)
+    def _load(self, job, filepath):
+        """Läuft im Worker-Thread."""
+        if not self._is_current(job):
+            return # Bereits vor dem Start ersetzt oder abgebrochen
+        last_percent = -1
+
+        def report(fraction, stage):
+            nonlocal last_percent
+            percent = int(fraction * PROGRESS_STEPS)
+            if percent != last_percent: # Nicht mehr Signale als nötig in die Ereignisschleife des UI
+                last_percent = percent
+                self.progress.emit(percent, stage)
+
+        is_cancelled = lambda: not self._is_current(job)
+        try:
+            loaded_map = read_map(filepath, progress=lambda fraction, stage: report(READ_SHARE * fraction, stage),
+                                  is_cancelled=is_cancelled)
+            path_hierarchy = PathHierarchy(loaded_map.rows, exit_distances=loaded_map.exit_distances, progress=report,
+                                           is_cancelled=is_cancelled, progress_range=(READ_SHARE, 1.0))
+        except MapLoadCancelled:
+            print(f"DEBUG: Laden von '{filepath}' abgebrochen.")
+            self.cancelled.emit()
+            return
+        except Exception as e: # MapLoadError oder ein unerwarteter Fehler: der Fortschrittsdialog muss sich schließen
+            print(f"Fehler beim Laden von '{filepath}': {e}")
+            if self._is_current(job):
+                self.failed.emit(str(e) if isinstance(e, MapLoadError) else f"Unerwarteter Fehler: {e}")
+            return
+        if self._is_current(job):
+            self.loaded.emit(loaded_map, path_hierarchy)
+        else:
+            self.cancelled.emit()
+
+    @pyqtSlot(int, object)
+    def _build_path_hierarchy(self, job, loaded_map):
+        """Läuft im Worker-Thread. Ohne Fortschrittsdialog, daher auch ohne 'progress' und 'cancelled'."""
+        if not self._is_current(job):
+            return
+        try:
+            path_hierarchy = PathHierarchy(loaded_map.rows, exit_distances=loaded_map.exit_distances,
+                                           is_cancelled=lambda: not self._is_current(job))
+        except MapLoadCancelled:
+            print(f"DEBUG: Wegenetz für '{loaded_map.path}' abgebrochen.")
+            return
+        except Exception as e:
+            print(f"Fehler beim Bauen des Wegenetzes für '{loaded_map.path}': {e}")
+            return
+        if self._is_current(job):
+            self.path_hierarchy_built.emit(loaded_map, path_hierarchy)
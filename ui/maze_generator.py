@@ -4,8 +4,12 @@
 import random
 
 class MazeGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, seed=None):
+        """
+        Args:
+            seed: Optionaler Seed für reproduzierbare Labyrinthe (None = zufällig).
+        """
+        self.rng = random.Random(seed) # Eigene Zufallsquelle des Generators
 
     def generate_maze(self, inner_width, inner_height):
         """
@@ -31,8 +35,8 @@ class MazeGenerator:
         # Dieser Punkt muss im INNEREN Bereich des Labyrinths liegen (nicht auf der äußeren Mauer)
         # und muss ungerade Koordinaten haben (wenn wir ein Gitter von Zellen und Wänden betrachten).
         # Hier wählen wir einfach einen zufälligen Punkt innerhalb des inneren Bereichs.
-        start_y = random.randrange(1, inner_height + 1) # +1 weil 0-indiziert und bis inner_height+1
-        start_x = random.randrange(1, inner_width + 1)   # +1 weil 0-indiziert und bis inner_width+1
+        start_y = self.rng.randrange(1, inner_height + 1) # +1 weil 0-indiziert und bis inner_height+1
+        start_x = self.rng.randrange(1, inner_width + 1)   # +1 weil 0-indiziert und bis inner_width+1
 
         # Stelle sicher, dass der Startpunkt ungerade Indizes hat, wenn wir ein "Zellen"-Gitter wollen
         # Dies ist wichtig für den Prim-Algorithmus, um saubere Pfade zu erzeugen.
@@ -47,7 +51,7 @@ class MazeGenerator:
 
         while walls:
             # Wähle eine zufällige Wand aus der Liste und entferne sie
-            wall_idx = random.randrange(len(walls))
+            wall_idx = self.rng.randrange(len(walls))
             wall_x, wall_y = walls.pop(wall_idx)
 
             # Prüfe die 4 Nachbarzellen der Wand, um die unbesuchte Zelle zu finden
@@ -114,7 +118,7 @@ class MazeGenerator:
             print("FEHLER: Kein Platz für Start/Ende im Labyrinth gefunden (alle Wände?).")
             return maze_data # Gebe das Labyrinth unverändert zurück, da es unspielbar wäre.
 
-        random.shuffle(available_cells) # Mische die verfügbaren Zellen für zufällige Platzierung
+        self.rng.shuffle(available_cells) # Mische die verfügbaren Zellen für zufällige Platzierung
 
         # Platziere Startpunkt 'S'
         if available_cells:
@@ -141,7 +145,7 @@ class MazeGenerator:
                    maze_data[ny][nx] != 'S': # Nicht den Startpunkt selbst überschreiben
                     possible_end_neighbors.append((ny, nx))
             if possible_end_neighbors:
-                end_y, end_x = random.choice(possible_end_neighbors)
+                end_y, end_x = self.rng.choice(possible_end_neighbors)
                 maze_data[end_y][end_x] = 'E'
             else:
                 print("Konnte keinen Platz für Endpunkt 'E' finden, selbst neben 'S'.")
@@ -0,0 +1,117 @@
+# ui/palette_renderer.py
+# Zeichnet das gesamte Labyrinth als ein einziges 8-Bit-Bild mit Farbtabelle (ein drawImage-Aufruf pro Frame).
+
+import numpy as np
+from PyQt6.QtGui import QImage, QColor, QPainter
+from PyQt6.QtCore import QRectF
+
+# Farbindex jedes Labyrinthzeichens und die zugehörige Farbe.
+# Bei kleinen Zellen sind Spieler, Tür, Schlüssel und Enten so als farbige Punkte erkennbar.
+CHAR_PALETTE = [
+    (' ', QColor('white')),        # Leerer Pfad
+    ('W', QColor('gray')),         # Wand
+    ('S', QColor(0, 90, 255)),     # Spieler
+    ('E', QColor(139, 69, 19)),    # Tür
+    ('U', QColor(200, 0, 60)),     # Rubin-Schlüssel
+    ('A', QColor(20, 60, 200)),    # Saphir-Schlüssel
+    ('I', QColor(0, 200, 220)),    # Diamant-Schlüssel
+    ('G', QColor(230, 180, 0)),    # Gold-Ente
+    ('P', QColor(255, 105, 180)),  # Pink-Ente
+    ('R', QColor(230, 30, 30)),    # Rote Ente
+    ('F', QColor(30, 170, 30)),    # Grüne Ente
+    ('B', QColor(60, 120, 255)),   # Blaue Ente
+]
+EMPTY_INDEX = 0
+WALL_INDEX = 1
+
+
+class PaletteRenderer:
+    """
+    Hält das Labyrinth als NumPy-Array (uint8, ein Farbindex pro Zelle) und stellt es als
+    QImage im Format Indexed8 bereit, das direkt auf den Speicher des Arrays zeigt.
+    Die Kosten pro Frame hängen damit nicht mehr von der Anzahl der Zellen ab.
+    """
+
+    def __init__(self):
+        # Zeichen (als Byte) -> Farbindex; unbekannte Zeichen werden wie ein leerer Pfad gezeichnet
+        self.lookup = np.full(256, EMPTY_INDEX, dtype=np.uint8)
+        for index, (char, _) in enumerate(CHAR_PALETTE):
+            self.lookup[ord(char)] = index
+
+        # Farbtabelle mit allen Elementen und eine, die nur Wände und Wege unterscheidet
+        # (als Hintergrund, wenn die Bilder der Elemente darübergezeichnet werden)
+        self.color_table = [color.rgb() for _, color in CHAR_PALETTE]
+        self.background_color_table = [
+            CHAR_PALETTE[WALL_INDEX][1].rgb() if index == WALL_INDEX else CHAR_PALETTE[EMPTY_INDEX][1].rgb()
+            for index in range(len(CHAR_PALETTE))
+        ]
+
+        self.pixels = None # Farbindizes, Zeilen auf 4 Bytes aufgefüllt (Vorgabe von QImage)
+        self.width = 0
+        self.height = 0
+        self.image = None
+        self.background_image = None
+
+    def update(self, maze):
+        """Überträgt das Labyrinth (Liste von Zeilen aus Zeichen) in das Array und die Bilder."""
+        if not maze or not maze[0]:
+            self.pixels = None
+            self.image = None
+            self.background_image = None
+            self.width = self.height = 0
+            return
+
+        height = len(maze)
+        width = len(maze[0])
+        if self.pixels is None or (self.width, self.height) != (width, height):
+            stride = (width + 3) & ~3
+            self.pixels = np.zeros((height, stride), dtype=np.uint8)
+            self.width = width
+            self.height = height
+            self.image = self._wrap(self.color_table)
+            self.background_image = self._wrap(self.background_color_table)
+
+        # Alle Zeilen auf einmal in Bytes umwandeln und über die Lookup-Tabelle in Farbindizes übersetzen
+        raw = np.frombuffer(''.join(map(''.join, maze)).encode('latin-1'), dtype=np.uint8)
+        self.pixels[:, :width] = self.lookup[raw.reshape(height, width)]
+
+    def update_cells(self, maze, cells):
+        """Überträgt nur die Zellen [(x, y), ...] (nach kleinen Änderungen, z.B. einem Zug)."""
+        lookup, pixels = self.lookup, self.pixels
+        for x, y in cells:
+            pixels[y, x] = lookup[ord(maze[y][x])]
+
+    def _wrap(self, color_table):
+        """Erzeugt ein Indexed8-QImage, das ohne Kopie auf self.pixels zeigt."""
+        image = QImage(self.pixels.data, self.width, self.height, self.pixels.strides[0],
+                       QImage.Format.Format_Indexed8)
+        image.setColorTable(color_table)
+        return image
+
+    def cell_indices(self):
+        """Gibt das Array der Farbindizes ohne Auffüllung zurück (Zeile, Spalte)."""
+        if self.pixels is None:
+            return None
+        return self.pixels[:, :self.width]
+
+    def draw(self, painter, target_rect, source_rect=None, background_only=False):
+        """
+        Zeichnet das Labyrinth (oder den Zellbereich source_rect) mit einem einzigen skalierten drawImage in target_rect.
+        Args:
+            source_rect: Sichtbarer Zellbereich (None = ganzes Labyrinth).
+            background_only: Nur Wände und Wege zeichnen (wenn Bilder darübergelegt werden).
+        """
+        image = self.background_image if background_only else self.image
+        if image is None:
+            return
+        if source_rect is None:
+            source_rect = QRectF(0, 0, self.width, self.height)
+        elif source_rect.width() * source_rect.height() < self.width * self.height:
+            # Nur den Ausschnitt kopieren, damit QPainter nicht das ganze Bild umwandelt
+            image = image.copy(source_rect.toRect())
+            source_rect = QRectF(0, 0, image.width(), image.height())
+        # Ohne Glättung, damit die Zellen scharfkantig bleiben
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        painter.drawImage(target_rect, image, source_rect)
+        painter.restore()
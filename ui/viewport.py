@@ -0,0 +1,97 @@
+# ui/viewport.py
+# Kamera für das Spielfeld: Zoom, Verschieben und Verfolgen des Spielers.
+
+import math
+
+
+class Camera:
+    """
+    Beschreibt, welcher Ausschnitt des Labyrinths im Widget zu sehen ist.
+    Zoom 1.0 entspricht der bisherigen Darstellung (ganzes Labyrinth passt ins Widget),
+    der Mittelpunkt wird in Zellkoordinaten angegeben.
+    """
+
+    MIN_ZOOM = 1.0
+    MAX_ZOOM = 64.0
+
+    def __init__(self):
+        self.zoom = 1.0
+        self.center_x = None # Mittelpunkt in Zellkoordinaten (None = Mitte des Labyrinths)
+        self.center_y = None
+        self.follow_player = False
+
+    def reset(self):
+        """Zurück zur Gesamtansicht."""
+        self.zoom = 1.0
+        self.center_x = None
+        self.center_y = None
+
+    def is_zoomed(self):
+        """True, wenn nur ein Ausschnitt des Labyrinths zu sehen ist."""
+        return self.zoom > self.MIN_ZOOM
+
+    def set_follow_player(self, follow):
+        """Schaltet das Verfolgen des Spielers ein oder aus."""
+        self.follow_player = follow
+
+    def layout(self, view_width, view_height, maze_width, maze_height, player_pos=None):
+        """
+        Berechnet Zellgröße und Bildschirmposition der Zelle (0, 0).
+        Der Mittelpunkt wird dabei so begrenzt, dass nicht über den Rand des Labyrinths hinaus verschoben wird.
+        Returns:
+            Ein Tupel (cell_size, origin_x, origin_y).
+        """
+        fit_cell_size = min(view_width / maze_width, view_height / maze_height)
+        cell_size = fit_cell_size * self.zoom
+
+        if self.follow_player and player_pos is not None:
+            self.center_x = player_pos['x'] + 0.5
+            self.center_y = player_pos['y'] + 0.5
+
+        self.center_x = self._clamp_center(self.center_x, view_width, maze_width, cell_size)
+        self.center_y = self._clamp_center(self.center_y, view_height, maze_height, cell_size)
+        origin_x = view_width / 2 - self.center_x * cell_size
+        origin_y = view_height / 2 - self.center_y * cell_size
+        return cell_size, origin_x, origin_y
+
+    @staticmethod
+    def _clamp_center(center, view_size, maze_size, cell_size):
+        """Begrenzt den Mittelpunkt einer Achse; passt das Labyrinth ganz hinein, wird es zentriert."""
+        half_view = view_size / 2 / cell_size
+        if center is None or maze_size <= 2 * half_view:
+            return maze_size / 2
+        return min(max(center, half_view), maze_size - half_view)
+
+    @staticmethod
+    def visible_cells(view_width, view_height, maze_width, maze_height, cell_size, origin_x, origin_y):
+        """
+        Gibt den sichtbaren Zellbereich als (erste Spalte, erste Zeile, Ende Spalte, Ende Zeile) zurück
+        (Enden exklusiv). Nur diese Zellen müssen gezeichnet werden.
+        """
+        first_col = max(0, math.floor(-origin_x / cell_size))
+        first_row = max(0, math.floor(-origin_y / cell_size))
+        end_col = min(maze_width, math.ceil((view_width - origin_x) / cell_size))
+        end_row = min(maze_height, math.ceil((view_height - origin_y) / cell_size))
+        return first_col, first_row, max(first_col, end_col), max(first_row, end_row)
+
+    def zoom_at(self, factor, anchor_x, anchor_y, view_width, view_height, maze_width, maze_height):
+        """
+        Ändert den Zoom um 'factor', wobei die Zelle unter dem Punkt (anchor_x, anchor_y) des Widgets
+        an derselben Stelle bleibt (Zoomen zum Mauszeiger).
+        """
+        cell_size, origin_x, origin_y = self.layout(view_width, view_height, maze_width, maze_height)
+        cell_x = (anchor_x - origin_x) / cell_size
+        cell_y = (anchor_y - origin_y) / cell_size
+
+        self.zoom = min(max(self.zoom * factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        new_cell_size = min(view_width / maze_width, view_height / maze_height) * self.zoom
+        self.center_x = cell_x - (anchor_x - view_width / 2) / new_cell_size
+        self.center_y = cell_y - (anchor_y - view_height / 2) / new_cell_size
+
+    def pan_by(self, dx_pixels, dy_pixels, cell_size):
+        """Verschiebt den Ausschnitt um eine Strecke in Pixeln (beendet das Verfolgen des Spielers)."""
+        self.follow_player = False
+        if self.center_x is None or self.center_y is None:
+            return
+        self.center_x -= dx_pixels / cell_size
+        self.center_y -= dy_pixels / cell_size